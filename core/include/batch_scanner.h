@@ -0,0 +1,114 @@
+#ifndef CANINANA_CORE_INCLUDE_BATCH_SCANNER_H_
+#define CANINANA_CORE_INCLUDE_BATCH_SCANNER_H_
+
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <optional>
+#include <string>
+#include <vector>
+
+#include "signature_engine.h"
+
+namespace caninana {
+namespace core {
+
+/**
+ * @class BatchScanner
+ * @brief Scans many files on a pool of worker threads, supervised by the
+ * ScanWatchdog.
+ *
+ * Every file is scanned under a watchdog deadline derived from its scan
+ * budget. A worker still stuck on a file a grace period after that deadline
+ * is abandoned: the file is reported as timed out and a fresh worker takes
+ * its place, so one pathological file cannot stall the batch. Abandoned
+ * threads are detached and exit once their blocking call returns.
+ */
+class BatchScanner {
+ public:
+  struct Options {
+    size_t worker_count{0};  ///< 0 uses the hardware concurrency.
+    /// How long a scan may overrun its deadline before its worker is
+    /// replaced.
+    std::chrono::milliseconds hang_grace{std::chrono::seconds(5)};
+    /// Budget for every file; the engine's default budget when absent.
+    std::optional<SignatureEngine::ScanBudget> budget;
+  };
+
+  /**
+   * @brief The outcome of one file. Exactly one of `result` and `error` is
+   * set, unless the batch was cancelled before the file finished. A scan
+   * that stopped on its budget is an error; `result` is only set for
+   * scans that ran to COMPLETE.
+   */
+  struct FileResult {
+    std::string path;
+    std::optional<SignatureEngine::ScanResult> result;
+    std::string error;
+    bool timed_out{false};   ///< Missed its watchdog deadline.
+    bool abandoned{false};   ///< Its worker hung and was replaced.
+    bool cancelled{false};   ///< Not scanned because of Cancel().
+  };
+
+  /// Called on a worker thread as each file finishes. Files whose worker
+  /// was abandoned are reported from the thread running the batch.
+  using ResultCallback = std::function<void(const FileResult&)>;
+
+  /**
+   * @param engine Shared with workers, which may outlive a batch if they
+   * hang.
+   */
+  BatchScanner(std::shared_ptr<SignatureEngine> engine, Options options);
+  ~BatchScanner();
+  BatchScanner(const BatchScanner&) = delete;
+  BatchScanner& operator=(const BatchScanner&) = delete;
+
+  /**
+   * @brief Scans `paths` and blocks until every file has a result, in the
+   * same order as `paths`.
+   */
+  std::vector<FileResult> ScanFiles(const std::vector<std::string>& paths,
+                                    ResultCallback on_result = {});
+
+  /**
+   * @brief Scans every regular file below `root`, recursively.
+   * @throws FileAccessError if `root` is not a readable directory.
+   */
+  std::vector<FileResult> ScanDirectory(const std::string& root,
+                                        ResultCallback on_result = {});
+
+  /**
+   * @brief Stops the running batch: queued files are skipped and in-flight
+   * scans are cancelled. ScanFiles returns once workers have let go.
+   */
+  void Cancel();
+
+  /// Workers replaced because they hung, over the scanner's lifetime.
+  uint64_t GetReplacedWorkerCount() const;
+
+ private:
+  struct BatchState;
+  struct Worker;
+
+  static void RunWorker(std::shared_ptr<BatchState> state,
+                        std::shared_ptr<Worker> worker);
+  static void OnWorkerHung(const std::shared_ptr<BatchState>& state,
+                           const std::shared_ptr<Worker>& worker,
+                           size_t index);
+  static void StartWorker(const std::shared_ptr<BatchState>& state);
+
+  std::shared_ptr<SignatureEngine> engine_;
+  Options options_;
+  std::mutex batch_mutex_;  ///< Serializes batches.
+  std::mutex current_mutex_;
+  std::shared_ptr<BatchState> current_;
+  std::shared_ptr<std::atomic<uint64_t>> replaced_workers_;
+};
+
+}  // namespace core
+}  // namespace caninana
+
+#endif  // CANINANA_CORE_INCLUDE_BATCH_SCANNER_H_
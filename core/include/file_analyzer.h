@@ -62,6 +62,20 @@ class FileTypeAnalyzer {
    */
   FileInfo AnalyzeFile(const std::string& filepath);
 
+  /**
+   * @brief Analyzes content that is already available as a seekable stream.
+   *
+   * Used for data that must never be written to disk in plaintext, such as
+   * quarantined samples decrypted on the fly. The stream is rewound to the
+   * beginning for hashing, so it must support seekg().
+   *
+   * @param stream An input stream positioned at the beginning of the content.
+   * @param size The total content size in bytes.
+   * @return A FileInfo struct with type, size and SHA256 hash. The extension
+   * is left empty.
+   */
+  FileInfo AnalyzeStream(std::istream& stream, uint64_t size);
+
  private:
   /**
    * @brief Calculates the SHA256 hash of a file stream.
@@ -0,0 +1,196 @@
+#ifndef CANINANA_CORE_INCLUDE_METRICS_H_
+#define CANINANA_CORE_INCLUDE_METRICS_H_
+
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+namespace caninana {
+namespace core {
+
+/**
+ * @class Counter
+ * @brief A monotonically increasing, lock-free event counter.
+ */
+class Counter {
+ public:
+  void Increment(uint64_t amount = 1) {
+    value_.fetch_add(amount, std::memory_order_relaxed);
+  }
+  uint64_t Value() const { return value_.load(std::memory_order_relaxed); }
+
+ private:
+  std::atomic<uint64_t> value_{0};
+};
+
+/**
+ * @brief A point-in-time copy of a LatencyHistogram.
+ */
+struct HistogramSnapshot {
+  uint64_t count{0};
+  uint64_t sum_ns{0};
+  uint64_t max_ns{0};
+  std::vector<uint64_t> buckets;  ///< Per-bucket counts, see LatencyHistogram.
+
+  /**
+   * @brief Estimates the latency at the given quantile (0.0 - 1.0), in
+   * nanoseconds. The relative error is bounded by the bucket width (~6%).
+   */
+  uint64_t Quantile(double quantile) const;
+
+  /**
+   * @brief Number of recorded values less than or equal to `bound_ns`,
+   * counting whole buckets whose upper edge is within the bound.
+   */
+  uint64_t CountAtOrBelow(uint64_t bound_ns) const;
+};
+
+/**
+ * @class LatencyHistogram
+ * @brief A lock-free, HDR-style latency histogram.
+ *
+ * Values are bucketed log-linearly: each power-of-two range is split into 16
+ * equal sub-buckets, which keeps the relative error of any quantile within
+ * about 6% across the full nanosecond-to-hours range with a fixed array of
+ * atomic counters. Recording is a handful of relaxed atomic increments.
+ */
+class LatencyHistogram {
+ public:
+  static constexpr int kSubBucketBits = 4;
+  static constexpr size_t kSubBuckets = size_t{1} << kSubBucketBits;
+  static constexpr size_t kBucketCount =
+      (64 - kSubBucketBits + 1) * kSubBuckets;
+
+  void Record(std::chrono::nanoseconds latency);
+  HistogramSnapshot Snapshot() const;
+
+  static size_t BucketIndex(uint64_t value_ns);
+  /// Smallest value that falls into bucket `index`.
+  static uint64_t BucketLowerBound(size_t index);
+  /// Largest value that falls into bucket `index`.
+  static uint64_t BucketUpperBound(size_t index);
+
+ private:
+  std::array<std::atomic<uint64_t>, kBucketCount> buckets_{};
+  std::atomic<uint64_t> sum_ns_{0};
+  std::atomic<uint64_t> max_ns_{0};
+};
+
+/**
+ * @class ScopedLatency
+ * @brief Records the lifetime of the object into a histogram.
+ */
+class ScopedLatency {
+ public:
+  explicit ScopedLatency(LatencyHistogram& histogram)
+      : histogram_(histogram), start_(std::chrono::steady_clock::now()) {}
+  ~ScopedLatency() {
+    histogram_.Record(std::chrono::steady_clock::now() - start_);
+  }
+  ScopedLatency(const ScopedLatency&) = delete;
+  ScopedLatency& operator=(const ScopedLatency&) = delete;
+
+ private:
+  LatencyHistogram& histogram_;
+  std::chrono::steady_clock::time_point start_;
+};
+
+/**
+ * @brief A point-in-time copy of every registered metric.
+ */
+struct MetricsSnapshot {
+  std::map<std::string, uint64_t> counters;
+  std::map<std::string, HistogramSnapshot> histograms;
+};
+
+/**
+ * @class MetricsRegistry
+ * @brief Process-wide registry of engine counters and latency histograms.
+ *
+ * Metrics are created on first use and live for the whole process, so call
+ * sites can cache the returned references (typically in a function-local
+ * static) and update them without any locking. The registry can be read as a
+ * snapshot, rendered in the Prometheus text exposition format, written to a
+ * file, or served from a small local HTTP endpoint.
+ */
+class MetricsRegistry {
+ public:
+  static MetricsRegistry& GetInstance();
+
+  /**
+   * @brief Returns the counter with the given name, creating it if needed.
+   * @param name Prometheus-style metric name, e.g.
+   * "caninana_files_scanned_total".
+   * @param help One-line description used in the exposition format.
+   */
+  Counter& GetCounter(const std::string& name, const std::string& help = "");
+
+  /**
+   * @brief Returns the histogram with the given name, creating it if needed.
+   * Histograms are exported in seconds.
+   */
+  LatencyHistogram& GetHistogram(const std::string& name,
+                                 const std::string& help = "");
+
+  MetricsSnapshot Snapshot() const;
+
+  /**
+   * @brief Renders all metrics in the Prometheus text exposition format.
+   */
+  std::string ExportPrometheus() const;
+
+  /**
+   * @brief Atomically replaces `path` with the current Prometheus text, for
+   * node_exporter's textfile collector and similar scrapers.
+   * @throws FileAccessError if the file cannot be written.
+   */
+  void WritePrometheusFile(const std::string& path) const;
+
+  /**
+   * @brief Serves the Prometheus text on http://<bind_address>:<port>/metrics
+   * from a background thread. Binds to loopback by default.
+   * @throws InitializationError if the socket cannot be bound.
+   */
+  void StartHttpExporter(uint16_t port,
+                         const std::string& bind_address = "127.0.0.1");
+
+  /**
+   * @brief Stops the HTTP endpoint, if running.
+   */
+  void StopHttpExporter();
+
+  MetricsRegistry(const MetricsRegistry&) = delete;
+  void operator=(const MetricsRegistry&) = delete;
+
+ private:
+  MetricsRegistry() = default;
+  ~MetricsRegistry();
+
+  template <typename Metric>
+  struct Entry {
+    std::string help;
+    std::unique_ptr<Metric> metric;
+  };
+
+  void HttpLoop(intptr_t listen_socket);
+
+  mutable std::mutex registry_mutex_;
+  std::map<std::string, Entry<Counter>> counters_;
+  std::map<std::string, Entry<LatencyHistogram>> histograms_;
+
+  std::mutex http_mutex_;
+  std::thread http_thread_;
+  std::atomic<bool> http_stop_requested_{false};
+};
+
+}  // namespace core
+}  // namespace caninana
+
+#endif  // CANINANA_CORE_INCLUDE_METRICS_H_
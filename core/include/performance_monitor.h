@@ -1,7 +1,11 @@
 #ifndef CANINANA_CORE_INCLUDE_PERFORMANCE_MONITOR_H_
 #define CANINANA_CORE_INCLUDE_PERFORMANCE_MONITOR_H_
 
+#include <array>
 #include <chrono>
+#include <cstdint>
+#include <string>
+#include <vector>
 
 namespace caninana {
 namespace core {
@@ -13,11 +17,103 @@ namespace core {
  *
  * This class provides a high-precision timer to enforce timeouts, preventing
  * denial-of-service vulnerabilities from scans that run for too long.
+ *
+ * It also hosts a lightweight span profiler for the scan pipeline. A
+ * ScopedSpan times one stage with nanosecond resolution and always feeds the
+ * calling thread's per-stage totals. While a ScopedProfile is active on the
+ * thread, spans are additionally recorded, with their nesting depth, into a
+ * TimingBreakdown that can be attached to a scan result.
  */
 class PerformanceMonitor {
  public:
   /**
-   * @brief Starts the timer, capturing the current time point.
+   * @enum Stage
+   * @brief The pipeline stages the profiler distinguishes.
+   */
+  enum class Stage { OPEN, MAGIC, HASH, AUTOMATON, LOG, QUARANTINE };
+  static constexpr size_t kStageCount = 6;
+
+  /**
+   * @brief One timed span, relative to the start of its profile.
+   */
+  struct Span {
+    Stage stage{Stage::OPEN};
+    uint32_t depth{0};  ///< Nesting depth; 0 for top-level spans.
+    std::chrono::nanoseconds start{0};
+    std::chrono::nanoseconds duration{0};
+  };
+
+  /**
+   * @brief Where the time of one profiled operation went.
+   */
+  struct TimingBreakdown {
+    std::vector<Span> spans;  ///< In completion order.
+    std::array<std::chrono::nanoseconds, kStageCount> stage_totals{};
+    std::chrono::nanoseconds total{0};  ///< Wall time since the profile began.
+  };
+
+  /**
+   * @brief Accumulated timings of one stage.
+   */
+  struct StageStats {
+    uint64_t count{0};
+    std::chrono::nanoseconds total{0};
+    std::chrono::nanoseconds max{0};
+  };
+
+  /**
+   * @brief Per-stage totals recorded by one thread.
+   */
+  struct ThreadStageStats {
+    size_t thread_id{0};  ///< Hash of the std::thread::id.
+    std::array<StageStats, kStageCount> stages{};
+  };
+
+  /**
+   * @class ScopedSpan
+   * @brief Times a pipeline stage for the lifetime of the object. When the
+   * Tracer is enabled, the span is also emitted as a trace event.
+   */
+  class ScopedSpan {
+   public:
+    explicit ScopedSpan(Stage stage);
+    ~ScopedSpan();
+    ScopedSpan(const ScopedSpan&) = delete;
+    ScopedSpan& operator=(const ScopedSpan&) = delete;
+
+   private:
+    Stage stage_;
+    uint32_t depth_;
+    bool traced_;  ///< Whether the Tracer was enabled at construction.
+    std::chrono::steady_clock::time_point start_;
+  };
+
+  /**
+   * @class ScopedProfile
+   * @brief Collects the spans recorded on this thread into a
+   * TimingBreakdown while it is alive. Profiles nest; the innermost one
+   * receives the spans.
+   */
+  class ScopedProfile {
+   public:
+    ScopedProfile();
+    ~ScopedProfile();
+    ScopedProfile(const ScopedProfile&) = delete;
+    ScopedProfile& operator=(const ScopedProfile&) = delete;
+
+    /// Returns the breakdown collected so far.
+    TimingBreakdown Snapshot() const;
+
+   private:
+    friend class ScopedSpan;
+    TimingBreakdown breakdown_;
+    std::chrono::steady_clock::time_point start_;
+    ScopedProfile* previous_;
+  };
+
+  /**
+   * @brief Starts the timer, capturing the current time point and the
+   * calling thread's CPU time.
    */
   void Start();
 
@@ -28,14 +124,52 @@ class PerformanceMonitor {
    * @return True if the elapsed time is greater than or equal to the timeout,
    * false otherwise.
    */
-  bool HasTimedOut(std::chrono::seconds timeout) const;
+  bool HasTimedOut(std::chrono::nanoseconds timeout) const;
+
+  /**
+   * @brief Returns the time elapsed since Start() was called.
+   */
+  std::chrono::steady_clock::duration Elapsed() const;
+
+  /**
+   * @brief CPU time consumed by the calling thread since Start(). Only
+   * meaningful on the thread that called Start().
+   */
+  std::chrono::nanoseconds CpuElapsed() const;
+
+  /**
+   * @brief CPU time consumed by the calling thread so far.
+   */
+  static std::chrono::nanoseconds ThreadCpuTime();
+
+  /**
+   * @brief The ScopedProfile active on the calling thread, or nullptr.
+   */
+  static const ScopedProfile* CurrentProfile();
+
+  /**
+   * @brief Per-stage totals of every running thread that has recorded a
+   * span. When a thread exits, its totals move into GetAggregateStats()
+   * and its entry is released.
+   */
+  static std::vector<ThreadStageStats> GetThreadStats();
+
+  /**
+   * @brief Per-stage totals summed over all threads, including those that
+   * have exited.
+   */
+  static std::array<StageStats, kStageCount> GetAggregateStats();
+
+  static const char* StageName(Stage stage);
 
  private:
   /// The time point when the monitor was started.
   std::chrono::steady_clock::time_point start_time_;
+  /// The thread CPU time when the monitor was started.
+  std::chrono::nanoseconds start_cpu_time_{0};
 };
 
 }  // namespace core
 }  // namespace caninana
 
-#endif  // CANINANA_CORE_INCLUDE_PERFORMANCE_MONITOR_H_
\ No newline at end of file
+#endif  // CANINANA_CORE_INCLUDE_PERFORMANCE_MONITOR_H_
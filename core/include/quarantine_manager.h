@@ -1,7 +1,14 @@
 #ifndef CANINANA_CORE_INCLUDE_QUARANTINE_MANAGER_H_
 #define CANINANA_CORE_INCLUDE_QUARANTINE_MANAGER_H_
 
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <filesystem>
+#include <memory>
+#include <mutex>
 #include <string>
+#include <thread>
 #include <vector>
 
 #include "signature_engine.h"
@@ -14,6 +21,60 @@ struct QuarantineEntry {
   std::string original_path;
   std::string quarantine_date;
   std::string threat_name;
+  uint64_t size_bytes{0};  ///< Size of the neutralized file in the vault.
+  uint8_t severity{0};     ///< Highest severity reported by the scan.
+  /// False once a rescan with newer signatures no longer detects a threat;
+  /// severity is then reset to 0.
+  bool threat_detected{true};
+  std::string last_rescan_date;  ///< Empty until the entry is rescanned.
+  /// Layout of the stored file. Entries written before the full-file XOR fix
+  /// have format 0 and only had a prefix neutralized.
+  uint8_t vault_format{1};
+};
+
+/**
+ * @brief Outcome of QuarantineManager::RescanVault().
+ */
+struct RescanSummary {
+  size_t scanned{0};       ///< Entries whose content was scanned.
+  size_t detected{0};      ///< Entries still detected as a threat.
+  size_t reclassified{0};  ///< Detected entries whose threat name changed.
+  size_t cleared{0};       ///< Entries no longer detected by any signature.
+  size_t failed{0};        ///< Entries that could not be read or timed out.
+};
+
+/**
+ * @brief Filters for paginated quarantine listings. Empty fields match
+ * everything.
+ */
+struct QuarantineQuery {
+  std::string threat;       ///< Exact threat name.
+  std::string since;        ///< Earliest quarantine date (ISO-8601, UTC).
+  std::string path_prefix;  ///< Prefix of the original file path.
+};
+
+/**
+ * @brief Selects which entries are evicted first once a retention limit is
+ * exceeded.
+ */
+enum class EvictionOrder {
+  OLDEST_FIRST,        ///< Evict by quarantine date, oldest entries first.
+  LEAST_SEVERE_FIRST,  ///< Evict low-severity entries first, then by age.
+};
+
+/**
+ * @brief Bounds applied to the quarantine vault by the retention task.
+ *
+ * A limit of zero disables that particular check, so a default-constructed
+ * policy never evicts anything.
+ */
+struct RetentionPolicy {
+  std::chrono::seconds max_age{0};  ///< Maximum age of an entry.
+  uint64_t max_total_bytes{0};      ///< Maximum size of all stored files.
+  size_t max_entries{0};            ///< Maximum number of ledger entries.
+  EvictionOrder eviction_order{EvictionOrder::OLDEST_FIRST};
+  /// How often the background task enforces the policy.
+  std::chrono::seconds enforcement_interval{std::chrono::hours(1)};
 };
 
 class QuarantineManager {
@@ -25,6 +86,14 @@ class QuarantineManager {
    */
   explicit QuarantineManager(const std::string& root_path = "");
 
+  /**
+   * @brief Stops the background retention task, if it is running.
+   */
+  ~QuarantineManager();
+
+  QuarantineManager(const QuarantineManager&) = delete;
+  QuarantineManager& operator=(const QuarantineManager&) = delete;
+
   /**
    * @brief Moves a file to quarantine.
    * @param filepath Path to the malicious file.
@@ -45,15 +114,114 @@ class QuarantineManager {
 
   std::vector<QuarantineEntry> ListQuarantinedFiles() const;
 
+  /**
+   * @brief Returns one page of quarantined entries, newest first.
+   *
+   * Served from an in-memory index that is rebuilt only when the ledger
+   * changes, so repeated calls do not re-parse the ledger.
+   *
+   * @param offset Number of matching entries to skip.
+   * @param limit Maximum number of entries to return.
+   * @param query Optional filters. `since` accepts any prefix of the
+   * "%Y-%m-%dT%H:%M:%SZ" format, e.g. "2025-06-01".
+   */
+  std::vector<QuarantineEntry> ListQuarantined(
+      size_t offset, size_t limit, const QuarantineQuery& query = {}) const;
+
+  /**
+   * @brief Counts the entries matching `query` without copying them.
+   */
+  size_t CountQuarantined(const QuarantineQuery& query = {}) const;
+
+  /**
+   * @brief Re-scans every quarantined sample with the given engine and
+   * updates the ledger verdicts.
+   *
+   * Stored files are decrypted on the fly into memory and streamed straight
+   * into the engine; plaintext is never written to disk. Legacy entries
+   * (vault_format 0) cannot be decrypted on the fly and count as failed.
+   *
+   * @param engine An engine with the (new) signature set already loaded.
+   * @param max_threads Number of worker threads; 0 uses the hardware
+   * concurrency.
+   * @throws QuarantineError if the ledger cannot be read or the updated
+   * ledger cannot be written.
+   */
+  RescanSummary RescanVault(SignatureEngine& engine, size_t max_threads = 0);
+
+  /**
+   * @brief Replaces the retention policy used by EnforceRetention().
+   *
+   * If the background task is running it picks up the new policy (including
+   * a new enforcement interval) immediately.
+   */
+  void SetRetentionPolicy(const RetentionPolicy& policy);
+
+  RetentionPolicy GetRetentionPolicy() const;
+
+  /**
+   * @brief Evicts entries that violate the retention policy and compacts the
+   * ledger.
+   *
+   * Compaction drops ledger entries whose stored file has disappeared and
+   * deletes orphaned vault files that no entry references. If the ledger
+   * cannot be read, the failure is logged and nothing is changed.
+   *
+   * @return The number of entries evicted or dropped from the ledger.
+   * @throws QuarantineError if the compacted ledger cannot be written.
+   */
+  size_t EnforceRetention();
+
+  /**
+   * @brief Starts a low-priority background thread that calls
+   * EnforceRetention() every `enforcement_interval`.
+   */
+  void StartRetentionTask();
+
+  /**
+   * @brief Stops the background retention thread and waits for it to exit.
+   */
+  void StopRetentionTask();
+
  private:
   std::string quarantine_path_;
   std::string metadata_path_;
+  std::string lock_path_;
 
   void InitializeQuarantineDirectory();
   bool ProcessFileXOR(const std::string& filepath) const;
+  bool ProcessFileXORLegacy(const std::string& filepath) const;
+  /// Entries in the ledger, or none if it cannot be read; for display only.
+  std::vector<QuarantineEntry> ReadLedger() const;
+  /// @throws QuarantineError if the ledger cannot be opened or parsed.
+  std::vector<QuarantineEntry> ReadLedgerChecked() const;
+  bool WriteLedger(const std::vector<QuarantineEntry>& entries) const;
+  void RetentionLoop();
+
+  struct LedgerIndex;
+  std::shared_ptr<const LedgerIndex> GetIndex() const;
+  void PublishIndex(std::vector<QuarantineEntry> entries,
+                    std::filesystem::file_time_type ledger_mtime,
+                    uintmax_t ledger_size) const;
+
+  /// Serializes read-modify-write cycles on the ledger within this process.
+  /// Across processes, writers additionally hold an advisory lock on
+  /// `lock_path_`. Readers take neither: the ledger is only ever replaced
+  /// atomically, and reads map whichever complete version is current.
+  std::mutex ledger_mutex_;
+
+  /// Snapshot of the ledger sorted for listing; swapped whole on change.
+  mutable std::shared_ptr<const LedgerIndex> index_;
+  mutable std::mutex index_mutex_;
+
+  RetentionPolicy retention_policy_;
+  std::thread retention_thread_;
+  std::condition_variable retention_cv_;
+  mutable std::mutex retention_mutex_;
+  bool retention_stop_requested_{false};
 };
 
 }  // namespace core
 }  // namespace caninana
 
-#endif  // CANINANA_CORE_INCLUDE_QUARANTINE_MANAGER_H_
\ No newline at end of file
+#endif  // CANINANA_CORE_INCLUDE_QUARANTINE_MANAGER_H_
@@ -0,0 +1,99 @@
+#ifndef CANINANA_CORE_INCLUDE_SCAN_WATCHDOG_H_
+#define CANINANA_CORE_INCLUDE_SCAN_WATCHDOG_H_
+
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+namespace caninana {
+namespace core {
+
+/**
+ * @class ScanWatchdog
+ * @brief A supervisor thread that tracks in-flight scans by deadline.
+ *
+ * Timeouts inside the matcher are cooperative, so a scan stalled in libmagic,
+ * OpenSSL or a blocking read never notices them. The watchdog sees every
+ * registered scan from outside: once a scan passes its deadline its cancel
+ * flag is raised, which stops it as soon as it returns to the matcher loop.
+ * If it is still running after a further grace period, it is reported as
+ * hung (metrics plus an optional callback) so its owner can replace the
+ * worker.
+ */
+class ScanWatchdog {
+ public:
+  using Clock = std::chrono::steady_clock;
+
+  static ScanWatchdog& GetInstance();
+
+  /**
+   * @class Watch
+   * @brief Registers one scan with the watchdog for the lifetime of the
+   * object. Must not be created or destroyed while holding a lock that an
+   * `on_hung` callback takes.
+   */
+  class Watch {
+   public:
+    /**
+     * @param label Shown in logs (usually the file path).
+     * @param deadline When the scan is cancelled; Clock::time_point::max()
+     *   for none.
+     * @param grace How long after the deadline the scan is declared hung.
+     * @param on_hung Called once, on the watchdog thread, if the scan hangs.
+     */
+    Watch(std::string label, Clock::time_point deadline,
+          std::chrono::milliseconds grace,
+          std::function<void()> on_hung = {});
+    ~Watch();
+    Watch(const Watch&) = delete;
+    Watch& operator=(const Watch&) = delete;
+
+    /// Moves the deadline, e.g. once the file size is known.
+    void SetDeadline(Clock::time_point deadline);
+
+    /// Requests cancellation without waiting for the deadline.
+    void Cancel();
+
+    /// The flag to hand to ScanBudget::cancel_flag.
+    const std::atomic<bool>& CancelFlag() const;
+
+    /// True if the watchdog cancelled the scan for missing its deadline.
+    bool Expired() const;
+
+   private:
+    friend class ScanWatchdog;
+    struct Entry;
+    std::shared_ptr<Entry> entry_;
+  };
+
+  /// Number of scans currently registered.
+  size_t InFlight() const;
+
+  ScanWatchdog(const ScanWatchdog&) = delete;
+  void operator=(const ScanWatchdog&) = delete;
+
+ private:
+  ScanWatchdog() = default;
+  ~ScanWatchdog();
+
+  void Register(const std::shared_ptr<Watch::Entry>& entry);
+  void Unregister(const std::shared_ptr<Watch::Entry>& entry);
+  void Supervise();
+
+  mutable std::mutex mutex_;
+  std::condition_variable wake_;
+  std::vector<std::shared_ptr<Watch::Entry>> entries_;
+  std::thread thread_;
+  bool stopping_{false};
+};
+
+}  // namespace core
+}  // namespace caninana
+
+#endif  // CANINANA_CORE_INCLUDE_SCAN_WATCHDOG_H_
@@ -1,9 +1,20 @@
 #ifndef CANINANA_CORE_INCLUDE_SECURITY_LOGGER_H_
 #define CANINANA_CORE_INCLUDE_SECURITY_LOGGER_H_
 
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <deque>
+#include <filesystem>
 #include <fstream>
+#include <memory>
 #include <mutex>
+#include <optional>
 #include <string>
+#include <thread>
+#include <utility>
+#include <vector>
 
 namespace caninana {
 namespace core {
@@ -15,6 +26,15 @@ namespace core {
  * Provides a centralized logging facility for the entire core engine, writing
  * timestamped messages to a persistent file. This is critical for auditing,
  * forensics, and debugging.
+ *
+ * By default every call writes and flushes the line under a mutex. In
+ * asynchronous mode (see EnableAsync()) callers only copy the record into a
+ * lock-free ring buffer and a single background thread writes batches to disk.
+ *
+ * Records are written either as the classic `[ts] [LEVEL] [component] msg`
+ * text lines or as one JSON object per line (see SetFormat()). The active file
+ * can be rotated by size or age; rotated segments are compressed by a
+ * background thread and pruned to a bounded count.
  */
 class SecurityLogger {
  public:
@@ -22,7 +42,65 @@ class SecurityLogger {
    * @enum LogLevel
    * @brief Defines the severity of a log message.
    */
-  enum class LogLevel { INFO, WARNING, LOG_ERROR, CRITICAL };
+  enum class LogLevel { DEBUG, INFO, WARNING, LOG_ERROR, CRITICAL };
+
+  /**
+   * @enum LogFormat
+   * @brief On-disk representation of log records.
+   */
+  enum class LogFormat {
+    TEXT,        ///< `[ts] [LEVEL] [component] msg`, the historical format.
+    JSON_LINES,  ///< One JSON object per line; `ts` is UTC ISO 8601.
+  };
+
+  /**
+   * @enum LogCompression
+   * @brief Codec applied to rotated log segments.
+   */
+  enum class LogCompression {
+    NONE,
+    GZIP,
+    ZSTD,  ///< Falls back to GZIP when built without zstd support.
+  };
+
+  /**
+   * @brief Optional structured data attached to a record. In JSON_LINES
+   * format each populated field becomes its own key; TEXT format omits them,
+   * since messages already carry the human-readable details.
+   */
+  struct LogFields {
+    std::string file_path;
+    std::vector<std::string> signatures;
+    std::optional<double> duration_ms;
+    std::optional<uint64_t> bytes;
+  };
+
+  /**
+   * @brief When to start a new log file and how to keep the old ones.
+   */
+  struct RotationPolicy {
+    /// Rotate once the active file reaches this size. 0 disables.
+    uint64_t max_bytes{0};
+    /// Rotate once the active file is older than this. 0 disables.
+    std::chrono::seconds max_age{0};
+    /// Number of rotated segments kept on disk. 0 keeps all of them.
+    size_t max_segments{10};
+    LogCompression compression{LogCompression::GZIP};
+  };
+
+  /**
+   * @brief A single log event, as queued in asynchronous mode and kept in the
+   * in-memory tail.
+   */
+  struct LogRecord {
+    LogLevel level{LogLevel::INFO};
+    std::chrono::system_clock::time_point timestamp;
+    std::string component;
+    std::string message;
+    LogFields fields;
+    /// Position in the in-memory tail, starting at 1. 0 until recorded.
+    uint64_t sequence{0};
+  };
 
   /**
    * @brief Retrieves the singleton instance of the logger.
@@ -36,9 +114,106 @@ class SecurityLogger {
    * @param component The name of the component logging the event (e.g.,
    * "SignatureEngine").
    * @param message The detailed log message.
+   * @param fields Optional structured data (file path, signatures, ...).
+   *
+   * Records below the minimum level are discarded, but the caller has already
+   * paid for building `message`. Hot paths should use CANINANA_LOG or check
+   * IsEnabled() first.
    */
   void Log(LogLevel level, const std::string& component,
-           const std::string& message);
+           const std::string& message, const LogFields& fields = {});
+
+  /**
+   * @brief Sets the lowest level that is recorded. Defaults to INFO.
+   */
+  void SetMinLevel(LogLevel level);
+  LogLevel GetMinLevel() const;
+
+  /**
+   * @brief Cheap check, safe to call from any thread, for whether a record
+   * at `level` would be written.
+   */
+  bool IsEnabled(LogLevel level) const {
+    return level >= min_level_.load(std::memory_order_relaxed);
+  }
+
+  /**
+   * @brief Selects the on-disk format. Switching formats rotates a non-empty
+   * log file so that every segment holds a single format.
+   */
+  void SetFormat(LogFormat format);
+  LogFormat GetFormat() const;
+
+  /**
+   * @brief Sets the rotation policy. Rotated segments left uncompressed by a
+   * previous run are queued for compression.
+   */
+  void SetRotationPolicy(const RotationPolicy& policy);
+  RotationPolicy GetRotationPolicy() const;
+
+  /**
+   * @brief Forces a rotation of the active log file, if it is not empty.
+   */
+  void Rotate();
+
+  /**
+   * @brief Switches to asynchronous logging.
+   *
+   * Log() then pushes into a bounded multi-producer ring and returns without
+   * taking a lock or touching the file. A writer thread drains the ring and
+   * flushes the file at most every `flush_interval`. When the ring is full,
+   * records are dropped and counted rather than blocking the caller.
+   *
+   * @param ring_capacity Number of ring slots, rounded up to a power of two.
+   * The ring is allocated by the first call and keeps its size afterwards.
+   * @param flush_interval Maximum time written records stay unflushed.
+   */
+  void EnableAsync(size_t ring_capacity = 8192,
+                   std::chrono::milliseconds flush_interval =
+                       std::chrono::milliseconds(200));
+
+  /**
+   * @brief Drains the ring, stops the writer thread and returns to
+   * synchronous logging.
+   */
+  void DisableAsync();
+
+  /**
+   * @brief Blocks until every record logged before the call is written and
+   * the file is flushed. Intended for shutdown and tests.
+   */
+  void Flush();
+
+  /**
+   * @brief Number of records dropped because the ring buffer was full.
+   */
+  uint64_t GetDroppedCount() const;
+
+  /**
+   * @brief Returns the recent records with a sequence number greater than
+   * `sequence`, oldest first.
+   *
+   * The logger keeps the last records it wrote in a bounded in-memory tail so
+   * that viewers can poll it incrementally instead of re-reading the log file.
+   * Pass 0 to get everything still retained. If the first returned sequence
+   * is more than `sequence + 1`, the records in between were evicted.
+   *
+   * @param sequence The last sequence number the caller has seen.
+   * @param max_records Upper bound on the records returned; 0 for no limit.
+   */
+  std::vector<LogRecord> GetRecordsSince(uint64_t sequence,
+                                         size_t max_records = 0) const;
+
+  /**
+   * @brief Sequence number of the newest record, or 0 if none was written.
+   */
+  uint64_t GetLastSequence() const;
+
+  /**
+   * @brief Sets how many recent records the in-memory tail keeps (default
+   * 1000). 0 disables the tail.
+   */
+  void SetTailCapacity(size_t capacity);
 
   // Delete copy constructor and assignment operator to enforce singleton
   // pattern.
@@ -50,14 +225,99 @@ class SecurityLogger {
   SecurityLogger();
   ~SecurityLogger();
 
+  /// One ring slot. `sequence` tells producers and the writer who owns it.
+  struct Slot {
+    std::atomic<size_t> sequence{0};
+    LogRecord record;
+  };
+
   std::string LevelToString(LogLevel level) const;
-  std::string GetTimestamp() const;
+  std::string FormatTimestamp(
+      std::chrono::system_clock::time_point timestamp) const;
+  std::string FormatRecord(const LogRecord& record) const;
+  std::string FormatJsonRecord(const LogRecord& record) const;
+  void WriteLine(const std::string& line);
+  void RememberRecord(const LogRecord& record);
+
+  // Rotation helpers; all expect log_mutex_ to be held.
+  void OpenLogFileLocked();
+  void MaybeRotateLocked();
+  void RotateLocked();
+
+  // Compression of rotated segments runs on its own thread.
+  void QueueCompression(const std::filesystem::path& segment,
+                        LogCompression compression);
+  void CompressorLoop();
+  void PruneSegments(size_t max_segments);
+
+  bool TryPush(LogLevel level, const std::string& component,
+               const std::string& message, const LogFields& fields);
+  void WriterLoop();
+  size_t DrainRing();
 
   std::ofstream log_file_;
-  std::mutex log_mutex_;
+  mutable std::mutex log_mutex_;
+
+  // --- Format and rotation (guarded by log_mutex_) ---
+  std::filesystem::path log_path_;
+  LogFormat format_{LogFormat::TEXT};
+  RotationPolicy rotation_policy_;
+  uint64_t current_size_{0};
+  std::chrono::system_clock::time_point segment_started_;
+
+  // --- In-memory tail of recent records ---
+  mutable std::mutex tail_mutex_;
+  std::deque<LogRecord> tail_;
+  size_t tail_capacity_{1000};
+  uint64_t next_sequence_{1};
+
+  // --- Segment compression ---
+  std::thread compressor_thread_;
+  std::mutex compress_mutex_;
+  std::condition_variable compress_cv_;
+  std::deque<std::pair<std::filesystem::path, LogCompression>> pending_segments_;
+  bool compressor_stop_requested_{false};
+
+  std::atomic<LogLevel> min_level_{LogLevel::INFO};
+
+  // --- Asynchronous mode ---
+  std::atomic<bool> async_enabled_{false};
+  std::unique_ptr<Slot[]> ring_;
+  size_t ring_mask_{0};
+  alignas(64) std::atomic<size_t> enqueue_pos_{0};
+  alignas(64) size_t dequeue_pos_{0};  ///< Owned by the writer thread.
+  std::atomic<size_t> written_pos_{0};
+  std::atomic<uint64_t> dropped_{0};
+  uint64_t dropped_reported_{0};  ///< Owned by the writer thread.
+  std::chrono::milliseconds flush_interval_{200};
+
+  std::thread writer_thread_;
+  std::mutex writer_mutex_;
+  std::condition_variable writer_cv_;
+  std::condition_variable flushed_cv_;
+  std::atomic<bool> writer_idle_{false};
+  // Guarded by writer_mutex_:
+  bool writer_stop_requested_{false};
+  size_t flush_waiters_{0};
+  size_t flushed_pos_{0};
 };
 
 }  // namespace core
 }  // namespace caninana
 
-#endif  // CANINANA_CORE_INCLUDE_SECURITY_LOGGER_H_
\ No newline at end of file
+/**
+ * @brief Logs through the SecurityLogger singleton, evaluating the message
+ * (and optional LogFields) arguments only when `level` is enabled.
+ *
+ * Usage: CANINANA_LOG(SecurityLogger::LogLevel::DEBUG, "SignatureEngine",
+ *                     "Scanned " + path);
+ */
+#define CANINANA_LOG(level, component, ...)                                   \
+  do {                                                                        \
+    auto& caninana_logger = ::caninana::core::SecurityLogger::GetInstance();  \
+    if (caninana_logger.IsEnabled(level)) {                                   \
+      caninana_logger.Log(level, component, __VA_ARGS__);                     \
+    }                                                                         \
+  } while (0)
+
+#endif  // CANINANA_CORE_INCLUDE_SECURITY_LOGGER_H_
@@ -1,13 +1,18 @@
 #ifndef CANINANA_CORE_INCLUDE_SIGNATURE_ENGINE_H_
 #define CANINANA_CORE_INCLUDE_SIGNATURE_ENGINE_H_
 
+#include <atomic>
+#include <chrono>
 #include <cstdint>
 #include <istream>
+#include <memory>
+#include <mutex>
+#include <optional>
 #include <string>
-#include <unordered_map>
 #include <vector>
 
 #include "file_analyzer.h"
+#include "performance_monitor.h"
 
 namespace caninana {
 namespace core {
@@ -21,34 +26,156 @@ class SignatureEngine {
     uint8_t severity;
   };
 
+  /**
+   * @brief Resource limits for a single scan. A zero field means unlimited.
+   *
+   * A scan that exhausts any limit stops early and reports the matching
+   * ScanStatus. Such a result says nothing about the file: threat_detected
+   * stays false, and callers should treat any status but COMPLETE as an
+   * error.
+   */
+  struct ScanBudget {
+    std::chrono::milliseconds wall_time{0};
+    std::chrono::milliseconds cpu_time{0};  ///< CPU time of the scan thread.
+    uint64_t max_bytes{0};
+    /// Polled between chunks; when set, the scan stops as CANCELLED. Not
+    /// owned, and must outlive the scan (see ScanWatchdog::Watch).
+    const std::atomic<bool>* cancel_flag{nullptr};
+
+    /**
+     * @brief A budget scaled to the file size: a fixed allowance plus time
+     * to read the file at a conservative throughput, capped at `ceiling`.
+     */
+    static ScanBudget Adaptive(
+        uint64_t file_size,
+        std::chrono::milliseconds ceiling = std::chrono::seconds(30));
+  };
+
   struct ScanResult {
     enum class ScanStatus {
       COMPLETE,
-      TIMEOUT_ERROR,
+      TIMEOUT_ERROR,      ///< The wall-time budget was exhausted.
+      CPU_BUDGET_ERROR,   ///< The CPU-time budget was exhausted.
+      SIZE_LIMIT_ERROR,   ///< The file exceeds the byte budget.
+      CANCELLED,          ///< The budget's cancel flag was raised.
     };
 
     ScanStatus status{ScanStatus::COMPLETE};
     bool threat_detected{false};
     std::vector<std::string> detected_signatures;
     uint8_t max_severity{0};
+    /// Per-stage timings, present when the timing breakdown is enabled.
+    std::optional<PerformanceMonitor::TimingBreakdown> timing;
   };
 
+  /**
+   * @brief A short, human-readable description of `status`.
+   */
+  static const char* DescribeStatus(ScanResult::ScanStatus status);
+
   /**
    * @brief Loads and parses a signature database from a JSON file.
    *
+   * The new set, matchers included, is compiled off to the side and then
+   * published atomically, so this is safe to call while other threads scan:
+   * scans already running finish on the previous set. If loading fails, the
+   * current set stays in place.
+   *
+   * When '<signature_db_path>.bin' was compiled from the database as it is
+   * now (same size and modification time), that artifact is loaded instead
+   * and neither parsing nor compiling is needed. A stale or damaged
+   * artifact is ignored.
+   *
    * @param signature_db_path The path to the JSON signature database file.
    * @throws FileAccessError if the database file cannot be opened.
    * @throws DatabaseParseError if the JSON is malformed.
    */
   void LoadSignatures(const std::string& signature_db_path);
 
+  /**
+   * @brief Writes the current set, matchers included, to
+   * '<signature_db_path>.bin' for later LoadSignatures() calls.
+   *
+   * The artifact is stamped with the database file's size and modification
+   * time, so the current set must have been loaded from that file.
+   *
+   * @throws FileAccessError if no set is loaded or the artifact cannot be
+   * written.
+   */
+  void SaveCompiledSignatures(const std::string& signature_db_path) const;
+
+  /**
+   * @brief Number of signatures in the current set.
+   */
+  size_t GetSignatureCount() const;
+
+  /**
+   * @brief Scans a stream within the default budget for its size.
+   */
   ScanResult Scan(std::istream& file_stream, const FileInfo& file_info);
 
+  /**
+   * @brief Scans a stream within an explicit budget.
+   */
+  ScanResult Scan(std::istream& file_stream, const FileInfo& file_info,
+                  const ScanBudget& budget);
+
+  /**
+   * @brief Opens, analyzes and scans a file in one call, so that the timing
+   * breakdown covers the whole pipeline (open, magic, hash, automaton, log).
+   *
+   * @param budget Limits for this scan; the default budget when absent.
+   * @throws FileAccessError if the file cannot be opened.
+   */
+  ScanResult ScanFile(const std::string& filepath, FileTypeAnalyzer& analyzer,
+                      const std::optional<ScanBudget>& budget = std::nullopt);
+
+  /**
+   * @brief Sets a fixed budget for scans that do not pass one. With
+   * std::nullopt (the default), ScanBudget::Adaptive() is used instead.
+   */
+  void SetDefaultBudget(const std::optional<ScanBudget>& budget);
+
+  /**
+   * @brief Caps the wall and CPU time of the adaptive default budget.
+   */
+  void SetAdaptiveCeiling(std::chrono::milliseconds ceiling);
+
+  /**
+   * @brief The budget a scan of `file_size` bytes gets when none is passed.
+   */
+  ScanBudget DefaultBudgetFor(uint64_t file_size) const;
+
+  /**
+   * @brief Attaches a per-stage TimingBreakdown to every ScanResult. Off by
+   * default; stage totals per thread are collected either way.
+   */
+  void EnableTimingBreakdown(bool enabled) {
+    timing_enabled_.store(enabled, std::memory_order_relaxed);
+  }
+
  private:
+  /// Immutable signatures plus their prebuilt per-type matchers.
+  class CompiledSignatureSet;
+
   FileType FileTypeFromString(const std::string& type_str) const;
 
-  std::vector<Signature> signatures_;
-  std::unordered_map<FileType, std::vector<size_t>> type_index_;
+  /**
+   * @brief Reads '<signature_db_path>.bin' if it matches the database.
+   * @return nullptr if the artifact is missing, stale or damaged.
+   */
+  static std::shared_ptr<const CompiledSignatureSet> LoadCompiledArtifact(
+      const std::string& signature_db_path);
+
+  /// The current set; shared with scans in flight. Only accessed through
+  /// std::atomic_load / std::atomic_store.
+  std::shared_ptr<const CompiledSignatureSet> signatures_;
+  /// Set from Python while scans run; each scan reads it once.
+  std::atomic<bool> timing_enabled_{false};
+  /// Guards the two budget defaults, which can change while scans run.
+  mutable std::mutex budget_mutex_;
+  std::optional<ScanBudget> default_budget_;
+  std::chrono::milliseconds adaptive_ceiling_{std::chrono::seconds(30)};
 };
 
 }  // namespace core
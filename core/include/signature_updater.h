@@ -1,6 +1,9 @@
 #ifndef CANINANA_CORE_INCLUDE_SIGNATURE_UPDATER_H_
 #define CANINANA_CORE_INCLUDE_SIGNATURE_UPDATER_H_
 
+#include <cstdint>
+#include <map>
+#include <optional>
 #include <string>
 
 namespace caninana {
@@ -15,8 +18,9 @@ class SignatureUpdater {
  public:
   /**
    * @brief Constructs the updater with a base URL for update files.
-   * @param base_url The URL prefix where 'latest_version.txt' and
-   * 'signatures.json' are hosted.
+   * @param base_url The URL prefix where 'latest_version.txt',
+   * 'signatures.json', 'manifest.json' and the delta packages it lists are
+   * hosted.
    */
   explicit SignatureUpdater(const std::string& base_url);
 
@@ -24,6 +28,23 @@ class SignatureUpdater {
    * @brief Checks for a new signature database, downloads, validates, and
    * applies it.
    *
+   * The version check is a conditional request (ETag / Last-Modified are
+   * remembered in '<current_db_path>.meta'), so an unchanged server answers
+   * 304 with no body. When a newer version exists, the delta package from
+   * the local version is tried first. Deltas are only used when
+   * 'manifest.json' lists them with their SHA256; the full database is
+   * downloaded if no verified delta is published, or if the patched
+   * database fails validation.
+   *
+   * Full downloads use 'manifest.json' when the server publishes one: the
+   * smallest supported package (zstd, gzip or plain JSON) is fetched into
+   * '<current_db_path>.download', hashed with SHA256 as it streams in, and
+   * resumed with HTTP Range requests after an interrupted transfer (also
+   * across calls). Without a manifest, 'signatures.json' is fetched as is.
+   *
+   * The applied database is accompanied by its precompiled artifact,
+   * '<current_db_path>.bin', so engines loading it skip parsing.
+   *
    * @param current_db_path The path to the current signature database file
    * (e.g., 'default.json').
    * @return True if a new version was successfully applied, false otherwise.
@@ -32,17 +53,94 @@ class SignatureUpdater {
    */
   bool CheckForUpdates(const std::string& current_db_path);
 
- private:
+  /**
+   * @brief Orders dotted version strings component by component, numerically
+   * where both components are numbers ("10" > "9", "1.10" > "1.9").
+   * @return Negative, zero or positive, like strcmp.
+   */
+  static int CompareVersions(const std::string& a, const std::string& b);
+
   /**
    * @brief Reads the 'version' field from a local JSON database file.
    * @param db_path Path to the local database.
    * @return The version string, or "0" if not found or invalid.
    */
-  std::string GetLocalVersion(const std::string& db_path);
+  static std::string GetLocalVersion(const std::string& db_path);
+
+ private:
+
+  /**
+   * @brief Performs the check-download-validate-apply sequence for
+   * CheckForUpdates(), which wraps it with metrics.
+   */
+  bool ApplyUpdate(const std::string& current_db_path);
+
+  /**
+   * @brief One downloadable file, as listed in the manifest.
+   */
+  struct Package {
+    std::string url;
+    std::string encoding;  ///< "zstd", "gzip" or "identity".
+    uint64_t size{0};
+    std::string sha256;    ///< Lowercase hex digest of the package bytes.
+  };
+
+  /**
+   * @brief The usable entries of 'manifest.json' for one version.
+   */
+  struct Manifest {
+    /// Preferred full database package, if any is supported.
+    std::optional<Package> package;
+    /// Delta packages by the version they apply to.
+    std::map<std::string, Package> deltas;
+  };
+
+  /**
+   * @brief Downloads the delta from `local_version` listed in `manifest`,
+   * verifies its SHA256 and applies it.
+   * @return False if no verified delta applies cleanly, so the caller falls
+   * back to the full database.
+   */
+  bool TryApplyDelta(const std::string& current_db_path,
+                     const std::string& local_version,
+                     const std::string& remote_version,
+                     const std::optional<Manifest>& manifest);
+
+  /**
+   * @brief Downloads the full database into '<current_db_path>.tmp', from
+   * `package` if the manifest offers one, else from 'signatures.json'.
+   */
+  void DownloadFullDatabase(const std::string& current_db_path,
+                            const std::optional<Package>& package);
+
+  /**
+   * @brief Reads 'manifest.json' for `remote_version`, or std::nullopt if
+   * no usable manifest is published.
+   */
+  std::optional<Manifest> FetchManifest(const std::string& remote_version);
+
+  /**
+   * @brief Downloads `package` to `package_path`, resuming a previous
+   * partial download of the same package, and verifies its SHA256.
+   * @throws std::runtime_error if the transfer keeps failing or the digest
+   * does not match.
+   */
+  void DownloadPackage(const Package& package,
+                       const std::string& package_path);
+
+  /**
+   * @brief Validates '<current_db_path>.tmp', moves it over the current
+   * database and saves the set compiled during validation as
+   * '<current_db_path>.bin' (see SignatureEngine::LoadSignatures).
+   * @throws DatabaseParseError if the new database is invalid.
+   */
+  void InstallDatabase(const std::string& current_db_path,
+                       const std::string& version);
 
   std::string base_url_;
   std::string version_url_;
   std::string database_url_;
+  std::string manifest_url_;
 };
 
 }  // namespace core
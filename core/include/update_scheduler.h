@@ -0,0 +1,123 @@
+#ifndef CANINANA_CORE_INCLUDE_UPDATE_SCHEDULER_H_
+#define CANINANA_CORE_INCLUDE_UPDATE_SCHEDULER_H_
+
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <random>
+#include <string>
+#include <thread>
+
+#include "signature_engine.h"
+#include "signature_updater.h"
+
+namespace caninana {
+namespace core {
+
+/**
+ * @class UpdateScheduler
+ * @brief Checks for signature updates on a background thread and applies
+ * them to a live engine.
+ *
+ * Downloading, validation and compiling all happen on the scheduler thread;
+ * the new set is then swapped into the engine (see
+ * SignatureEngine::LoadSignatures), so scans never wait for an update.
+ * Checks are spread out with random jitter, and failed checks are retried
+ * with exponential backoff instead of at the regular interval.
+ */
+class UpdateScheduler {
+ public:
+  struct Options {
+    /// Time between successful checks.
+    std::chrono::seconds interval{std::chrono::hours(24)};
+    /// Delay before the first check after Start().
+    std::chrono::seconds initial_delay{std::chrono::seconds(30)};
+    /// Every wait is drawn uniformly from +/- this fraction around its
+    /// nominal value, so many clients do not hit the server in step.
+    double jitter{0.1};
+    /// Retry delay after the first failure; doubles with each further one.
+    std::chrono::seconds min_backoff{std::chrono::minutes(1)};
+    /// Upper bound on the retry delay; never more than `interval` either.
+    std::chrono::seconds max_backoff{std::chrono::hours(6)};
+  };
+
+  struct UpdateEvent {
+    enum class Kind {
+      APPLIED,     ///< A new database was installed and loaded.
+      UP_TO_DATE,  ///< The server has nothing newer.
+      FAILED,      ///< The check, download or load failed.
+    };
+
+    Kind kind{Kind::UP_TO_DATE};
+    std::string version;  ///< The local database version after the check.
+    size_t signature_count{0};  ///< Signatures in the engine's current set.
+    std::string error;  ///< Set for FAILED.
+    uint32_t consecutive_failures{0};
+    std::chrono::seconds next_check{0};  ///< Delay until the next check.
+  };
+
+  /// Called on the scheduler thread after every check.
+  using EventCallback = std::function<void(const UpdateEvent&)>;
+
+  /**
+   * @param base_url Update server, as for SignatureUpdater.
+   * @param db_path The database the engine loads; updates replace it.
+   * @param engine Receives every applied update.
+   */
+  UpdateScheduler(const std::string& base_url, std::string db_path,
+                  std::shared_ptr<SignatureEngine> engine, Options options);
+  ~UpdateScheduler();
+  UpdateScheduler(const UpdateScheduler&) = delete;
+  UpdateScheduler& operator=(const UpdateScheduler&) = delete;
+
+  /**
+   * @brief Starts the scheduler thread. Does nothing if already running.
+   */
+  void Start(EventCallback on_event = {});
+
+  /**
+   * @brief Stops the scheduler thread and waits for it to exit. A check in
+   * progress is finished first.
+   */
+  void Stop();
+
+  /**
+   * @brief Runs a check as soon as possible instead of at the next due time.
+   */
+  void CheckNow();
+
+  /**
+   * @brief Changes the check interval; the next wait is recomputed.
+   */
+  void SetInterval(std::chrono::seconds interval);
+
+  bool IsRunning() const;
+
+ private:
+  void Run();
+  UpdateEvent RunCheck();
+  std::chrono::seconds NextDelay(uint32_t consecutive_failures);
+  std::chrono::seconds Jitter(std::chrono::seconds delay);
+
+  SignatureUpdater updater_;
+  std::string db_path_;
+  std::shared_ptr<SignatureEngine> engine_;
+  Options options_;
+  EventCallback on_event_;
+
+  std::thread thread_;
+  mutable std::mutex mutex_;
+  std::condition_variable wake_;
+  bool stop_requested_{false};
+  bool check_requested_{false};
+  bool schedule_changed_{false};
+  std::mt19937_64 random_;  ///< Used only by the scheduler thread.
+};
+
+}  // namespace core
+}  // namespace caninana
+
+#endif  // CANINANA_CORE_INCLUDE_UPDATE_SCHEDULER_H_
@@ -0,0 +1,327 @@
+#include "batch_scanner.h"
+
+#include <algorithm>
+#include <condition_variable>
+#include <filesystem>
+#include <set>
+#include <thread>
+
+#include "file_exception.h"
+#include "metrics.h"
+#include "scan_watchdog.h"
+#include "security_logger.h"
+#include "tracer.h"
+
+namespace caninana {
+namespace core {
+
+struct BatchScanner::Worker {
+  uint32_t id{0};
+  std::atomic<bool> abandoned{false};
+};
+
+struct BatchScanner::BatchState {
+  std::shared_ptr<SignatureEngine> engine;
+  Options options;
+  std::vector<std::string> paths;
+  ResultCallback on_result;
+  std::shared_ptr<std::atomic<uint64_t>> replaced_workers;
+
+  std::mutex mutex;
+  std::condition_variable changed;
+  size_t next_index{0};
+  size_t live_workers{0};  ///< Running workers that were not abandoned.
+  uint32_t next_worker_id{0};
+  bool cancelled{false};
+  std::vector<FileResult> results;
+  std::vector<bool> done;
+  std::set<ScanWatchdog::Watch*> in_flight;
+  /// Abandoned files, reported from the batch's own thread rather than
+  /// the watchdog's.
+  std::vector<FileResult> abandoned;
+};
+
+namespace {
+
+Counter& ReplacedWorkersCounter() {
+  static Counter& counter = MetricsRegistry::GetInstance().GetCounter(
+      "caninana_scan_workers_replaced_total",
+      "Batch scan workers replaced after hanging on a file.");
+  return counter;
+}
+
+void Deliver(const BatchScanner::ResultCallback& on_result,
+             const BatchScanner::FileResult& file_result) {
+  if (!on_result) return;
+  try {
+    on_result(file_result);
+  } catch (const std::exception& e) {
+    CANINANA_LOG(SecurityLogger::LogLevel::LOG_ERROR, "BatchScanner",
+                 std::string("Result callback failed: ") + e.what());
+  }
+}
+
+}  // namespace
+
+BatchScanner::BatchScanner(std::shared_ptr<SignatureEngine> engine,
+                           Options options)
+    : engine_(std::move(engine)),
+      options_(std::move(options)),
+      replaced_workers_(std::make_shared<std::atomic<uint64_t>>(0)) {}
+
+BatchScanner::~BatchScanner() {
+  Cancel();
+  // Wait for a batch running on another thread to return.
+  std::lock_guard<std::mutex> guard(batch_mutex_);
+}
+
+std::vector<BatchScanner::FileResult> BatchScanner::ScanFiles(
+    const std::vector<std::string>& paths, ResultCallback on_result) {
+  std::lock_guard<std::mutex> batch_guard(batch_mutex_);
+  auto state = std::make_shared<BatchState>();
+  state->engine = engine_;
+  state->options = options_;
+  state->paths = paths;
+  state->on_result = std::move(on_result);
+  state->replaced_workers = replaced_workers_;
+  state->results.resize(paths.size());
+  state->done.assign(paths.size(), false);
+  if (paths.empty()) return {};
+
+  size_t worker_count = options_.worker_count;
+  if (worker_count == 0) {
+    worker_count = std::max(1u, std::thread::hardware_concurrency());
+  }
+  worker_count = std::min(worker_count, paths.size());
+
+  {
+    std::lock_guard<std::mutex> guard(current_mutex_);
+    current_ = state;
+  }
+  {
+    std::lock_guard<std::mutex> guard(state->mutex);
+    state->live_workers = worker_count;
+    for (size_t i = 0; i < worker_count; ++i) StartWorker(state);
+  }
+
+  std::vector<FileResult> results;
+  ResultCallback finished_callback;
+  {
+    std::unique_lock<std::mutex> lock(state->mutex);
+    for (;;) {
+      state->changed.wait(lock, [&] {
+        return state->live_workers == 0 || !state->abandoned.empty();
+      });
+      if (state->abandoned.empty()) break;
+      std::vector<FileResult> abandoned = std::move(state->abandoned);
+      state->abandoned.clear();
+      lock.unlock();
+      for (const FileResult& file_result : abandoned) {
+        Deliver(state->on_result, file_result);
+      }
+      lock.lock();
+    }
+    for (size_t i = 0; i < paths.size(); ++i) {
+      if (!state->done[i]) {
+        state->results[i].path = paths[i];
+        state->results[i].cancelled = true;
+      }
+    }
+    results = std::move(state->results);
+    // Every delivery has happened. Release the callback on this thread, not
+    // on whichever abandoned worker drops the last reference to the state.
+    finished_callback = std::move(state->on_result);
+    state->on_result = nullptr;
+  }
+  {
+    std::lock_guard<std::mutex> guard(current_mutex_);
+    current_.reset();
+  }
+  return results;
+}
+
+std::vector<BatchScanner::FileResult> BatchScanner::ScanDirectory(
+    const std::string& root, ResultCallback on_result) {
+  std::error_code ec;
+  if (!std::filesystem::is_directory(root, ec)) {
+    throw FileAccessError("Not a directory: " + root);
+  }
+  std::vector<std::string> paths;
+  auto it = std::filesystem::recursive_directory_iterator(
+      root, std::filesystem::directory_options::skip_permission_denied, ec);
+  if (ec) {
+    throw FileAccessError("Failed to open directory '" + root +
+                          "': " + ec.message());
+  }
+  for (const auto end = std::filesystem::recursive_directory_iterator();
+       it != end; it.increment(ec)) {
+    if (ec) {
+      CANINANA_LOG(SecurityLogger::LogLevel::WARNING, "BatchScanner",
+                   "Skipping unreadable entry: " + ec.message());
+      ec.clear();
+      continue;
+    }
+    if (it->is_regular_file(ec)) paths.push_back(it->path().string());
+  }
+  return ScanFiles(paths, std::move(on_result));
+}
+
+void BatchScanner::Cancel() {
+  std::shared_ptr<BatchState> state;
+  {
+    std::lock_guard<std::mutex> guard(current_mutex_);
+    state = current_;
+  }
+  if (!state) return;
+  std::lock_guard<std::mutex> guard(state->mutex);
+  state->cancelled = true;
+  for (ScanWatchdog::Watch* watch : state->in_flight) watch->Cancel();
+}
+
+uint64_t BatchScanner::GetReplacedWorkerCount() const {
+  return replaced_workers_->load(std::memory_order_relaxed);
+}
+
+// --- Workers ---
+
+// Called with state->mutex held; the caller accounts for live_workers.
+void BatchScanner::StartWorker(const std::shared_ptr<BatchState>& state) {
+  auto worker = std::make_shared<Worker>();
+  worker->id = ++state->next_worker_id;
+  std::thread(&BatchScanner::RunWorker, state, worker).detach();
+}
+
+void BatchScanner::RunWorker(std::shared_ptr<BatchState> state,
+                             std::shared_ptr<Worker> worker) {
+  if (Tracer::GetInstance().IsEnabled()) {
+    Tracer::GetInstance().SetThreadName("scan-worker-" +
+                                        std::to_string(worker->id));
+  }
+  FileTypeAnalyzer analyzer;
+  SignatureEngine& engine = *state->engine;
+
+  for (;;) {
+    size_t index = 0;
+    {
+      std::lock_guard<std::mutex> guard(state->mutex);
+      if (state->cancelled || state->next_index >= state->paths.size()) break;
+      index = state->next_index++;
+    }
+    const std::string& path = state->paths[index];
+    FileResult file_result;
+    file_result.path = path;
+
+    const auto start = ScanWatchdog::Clock::now();
+    const auto deadline_for = [start](const SignatureEngine::ScanBudget& b) {
+      return b.wall_time.count() > 0 ? start + b.wall_time
+                                     : ScanWatchdog::Clock::time_point::max();
+    };
+    SignatureEngine::ScanBudget budget =
+        state->options.budget ? *state->options.budget
+                              : engine.DefaultBudgetFor(0);
+    {
+      ScanWatchdog::Watch watch(path, deadline_for(budget),
+                                state->options.hang_grace,
+                                [state, worker, index] {
+                                  OnWorkerHung(state, worker, index);
+                                });
+      {
+        std::lock_guard<std::mutex> guard(state->mutex);
+        state->in_flight.insert(&watch);
+        if (state->cancelled) watch.Cancel();
+      }
+      try {
+        if (!state->options.budget) {
+          // The size is read under the provisional deadline, since stat
+          // can block too.
+          std::error_code ec;
+          const auto size = std::filesystem::file_size(path, ec);
+          budget = engine.DefaultBudgetFor(ec ? 0 : size);
+          watch.SetDeadline(deadline_for(budget));
+        }
+        budget.cancel_flag = &watch.CancelFlag();
+        file_result.result = engine.ScanFile(path, analyzer, budget);
+      } catch (const std::exception& e) {
+        file_result.error = e.what();
+      }
+      file_result.timed_out = watch.Expired();
+      {
+        std::lock_guard<std::mutex> guard(state->mutex);
+        state->in_flight.erase(&watch);
+        if (file_result.result && !file_result.timed_out &&
+            file_result.result->status ==
+                SignatureEngine::ScanResult::ScanStatus::CANCELLED) {
+          // Cancelled by the user, not by the watchdog: not a finding.
+          file_result.result.reset();
+          file_result.cancelled = true;
+        } else if (file_result.result &&
+                   file_result.result->status !=
+                       SignatureEngine::ScanResult::ScanStatus::COMPLETE) {
+          // Stopped on its budget or by the watchdog: the file was not
+          // fully scanned, which is an error rather than a verdict.
+          file_result.error =
+              SignatureEngine::DescribeStatus(file_result.result->status);
+          file_result.result.reset();
+        }
+      }
+    }
+
+    {
+      std::lock_guard<std::mutex> guard(state->mutex);
+      if (worker->abandoned.load(std::memory_order_relaxed)) {
+        // A replacement already reported this file; just go away.
+        return;
+      }
+      state->results[index] = file_result;
+      state->done[index] = true;
+    }
+    Deliver(state->on_result, file_result);
+  }
+
+  std::lock_guard<std::mutex> guard(state->mutex);
+  if (!worker->abandoned.load(std::memory_order_relaxed)) {
+    --state->live_workers;
+    state->changed.notify_all();
+  }
+}
+
+// Runs on the watchdog thread, which must not run the result callback: a
+// slow callback would hold up every other watch. ScanFiles delivers the
+// result instead.
+void BatchScanner::OnWorkerHung(const std::shared_ptr<BatchState>& state,
+                                const std::shared_ptr<Worker>& worker,
+                                size_t index) {
+  FileResult file_result;
+  bool replaced = false;
+  {
+    std::lock_guard<std::mutex> guard(state->mutex);
+    if (state->done[index] || worker->abandoned.load()) return;
+    worker->abandoned.store(true, std::memory_order_relaxed);
+
+    file_result.path = state->paths[index];
+    file_result.error = "Scan abandoned: worker stopped responding";
+    file_result.timed_out = true;
+    file_result.abandoned = true;
+    state->results[index] = file_result;
+    state->done[index] = true;
+    state->abandoned.push_back(file_result);
+
+    if (!state->cancelled && state->next_index < state->paths.size()) {
+      StartWorker(state);  // Takes over the abandoned worker's slot.
+      replaced = true;
+    } else {
+      --state->live_workers;
+    }
+    state->changed.notify_all();
+  }
+  if (replaced) {
+    state->replaced_workers->fetch_add(1, std::memory_order_relaxed);
+    ReplacedWorkersCounter().Increment();
+  }
+  CANINANA_LOG(SecurityLogger::LogLevel::WARNING, "BatchScanner",
+               "Abandoned hung worker " + std::to_string(worker->id) +
+                   " on " + file_result.path);
+}
+
+}  // namespace core
+}  // namespace caninana
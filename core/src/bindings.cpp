@@ -1,17 +1,37 @@
+#include <pybind11/chrono.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
 #include <sstream>
 #include <string>
 
+#include "batch_scanner.h"
 #include "file_analyzer.h"
 #include "file_exception.h"
+#include "metrics.h"
 #include "quarantine_manager.h"
+#include "scan_watchdog.h"
+#include "security_logger.h"
 #include "signature_engine.h"
 #include "signature_updater.h"
+#include "tracer.h"
+#include "update_scheduler.h"
 
 namespace py = pybind11;
 
+namespace {
+
+// Destroying a scheduler joins its thread, which may be waiting for the GIL
+// to run the Python update callback.
+struct GilReleasingDelete {
+  void operator()(caninana::core::UpdateScheduler* scheduler) const {
+    py::gil_scoped_release release;
+    delete scheduler;
+  }
+};
+
+}  // namespace
+
 PYBIND11_MODULE(caninana_core, m) {
   m.doc() = "Python bindings for the Caninana C++ core engine";
 
@@ -47,6 +67,49 @@ PYBIND11_MODULE(caninana_core, m) {
       .def_readwrite("size", &FileInfo::size)
       .def_readwrite("sha256_hash", &FileInfo::sha256_hash);
 
+  py::enum_<PerformanceMonitor::Stage>(m, "ScanStage")
+      .value("OPEN", PerformanceMonitor::Stage::OPEN)
+      .value("MAGIC", PerformanceMonitor::Stage::MAGIC)
+      .value("HASH", PerformanceMonitor::Stage::HASH)
+      .value("AUTOMATON", PerformanceMonitor::Stage::AUTOMATON)
+      .value("LOG", PerformanceMonitor::Stage::LOG)
+      .value("QUARANTINE", PerformanceMonitor::Stage::QUARANTINE)
+      .export_values();
+
+  // Durations are exposed as integer nanoseconds; timedelta would round
+  // them to microseconds.
+  py::class_<PerformanceMonitor::Span>(m, "TimingSpan")
+      .def_readonly("stage", &PerformanceMonitor::Span::stage)
+      .def_readonly("depth", &PerformanceMonitor::Span::depth)
+      .def_property_readonly("start_ns",
+                             [](const PerformanceMonitor::Span& span) {
+                               return span.start.count();
+                             })
+      .def_property_readonly("duration_ns",
+                             [](const PerformanceMonitor::Span& span) {
+                               return span.duration.count();
+                             });
+
+  py::class_<PerformanceMonitor::TimingBreakdown>(m, "TimingBreakdown")
+      .def_readonly("spans", &PerformanceMonitor::TimingBreakdown::spans)
+      .def_property_readonly(
+          "total_ns",
+          [](const PerformanceMonitor::TimingBreakdown& breakdown) {
+            return breakdown.total.count();
+          })
+      .def_property_readonly(
+          "stage_totals",
+          [](const PerformanceMonitor::TimingBreakdown& breakdown) {
+            py::dict totals;
+            for (size_t i = 0; i < PerformanceMonitor::kStageCount; ++i) {
+              const auto stage = static_cast<PerformanceMonitor::Stage>(i);
+              totals[PerformanceMonitor::StageName(stage)] =
+                  breakdown.stage_totals[i].count();
+            }
+            return totals;
+          },
+          "Nanoseconds spent per stage, keyed by stage name.");
+
   py::class_<SignatureEngine::ScanResult>(m, "ScanResult")
       .def(py::init<>())
       .def_readwrite("status", &SignatureEngine::ScanResult::status)
@@ -55,20 +118,138 @@ PYBIND11_MODULE(caninana_core, m) {
       .def_readwrite("detected_signatures",
                      &SignatureEngine::ScanResult::detected_signatures)
       .def_readwrite("max_severity",
-                     &SignatureEngine::ScanResult::max_severity);
+                     &SignatureEngine::ScanResult::max_severity)
+      .def_readonly("timing", &SignatureEngine::ScanResult::timing)
+      .def_property_readonly(
+          "status_message",
+          [](const SignatureEngine::ScanResult& result) {
+            return SignatureEngine::DescribeStatus(result.status);
+          },
+          "A short description of the status, e.g. for error messages.");
 
   py::enum_<SignatureEngine::ScanResult::ScanStatus>(m, "ScanStatus")
       .value("COMPLETE", SignatureEngine::ScanResult::ScanStatus::COMPLETE)
       .value("TIMEOUT_ERROR",
              SignatureEngine::ScanResult::ScanStatus::TIMEOUT_ERROR)
+      .value("CPU_BUDGET_ERROR",
+             SignatureEngine::ScanResult::ScanStatus::CPU_BUDGET_ERROR)
+      .value("SIZE_LIMIT_ERROR",
+             SignatureEngine::ScanResult::ScanStatus::SIZE_LIMIT_ERROR)
+      .value("CANCELLED", SignatureEngine::ScanResult::ScanStatus::CANCELLED)
       .export_values();
 
+  py::class_<SignatureEngine::ScanBudget>(m, "ScanBudget")
+      .def(py::init([](int64_t wall_time_ms, int64_t cpu_time_ms,
+                       uint64_t max_bytes) {
+             SignatureEngine::ScanBudget budget;
+             budget.wall_time = std::chrono::milliseconds(wall_time_ms);
+             budget.cpu_time = std::chrono::milliseconds(cpu_time_ms);
+             budget.max_bytes = max_bytes;
+             return budget;
+           }),
+           py::arg("wall_time_ms") = 0, py::arg("cpu_time_ms") = 0,
+           py::arg("max_bytes") = 0, "Zero means unlimited.")
+      .def_property(
+          "wall_time_ms",
+          [](const SignatureEngine::ScanBudget& self) {
+            return self.wall_time.count();
+          },
+          [](SignatureEngine::ScanBudget& self, int64_t ms) {
+            self.wall_time = std::chrono::milliseconds(ms);
+          })
+      .def_property(
+          "cpu_time_ms",
+          [](const SignatureEngine::ScanBudget& self) {
+            return self.cpu_time.count();
+          },
+          [](SignatureEngine::ScanBudget& self, int64_t ms) {
+            self.cpu_time = std::chrono::milliseconds(ms);
+          })
+      .def_readwrite("max_bytes", &SignatureEngine::ScanBudget::max_bytes)
+      .def_static(
+          "adaptive",
+          [](uint64_t file_size, int64_t ceiling_ms) {
+            return SignatureEngine::ScanBudget::Adaptive(
+                file_size, std::chrono::milliseconds(ceiling_ms));
+          },
+          py::arg("file_size"), py::arg("ceiling_ms") = 30000);
+
   py::class_<QuarantineEntry>(m, "QuarantineEntry")
       .def(py::init<>())
       .def_readwrite("quarantine_id", &QuarantineEntry::quarantine_id)
       .def_readwrite("original_path", &QuarantineEntry::original_path)
       .def_readwrite("quarantine_date", &QuarantineEntry::quarantine_date)
-      .def_readwrite("threat_name", &QuarantineEntry::threat_name);
+      .def_readwrite("threat_name", &QuarantineEntry::threat_name)
+      .def_readwrite("size_bytes", &QuarantineEntry::size_bytes)
+      .def_readwrite("severity", &QuarantineEntry::severity)
+      .def_readwrite("threat_detected", &QuarantineEntry::threat_detected)
+      .def_readwrite("last_rescan_date", &QuarantineEntry::last_rescan_date)
+      .def_readonly("vault_format", &QuarantineEntry::vault_format);
+
+  py::class_<RescanSummary>(m, "RescanSummary")
+      .def(py::init<>())
+      .def_readonly("scanned", &RescanSummary::scanned)
+      .def_readonly("detected", &RescanSummary::detected)
+      .def_readonly("reclassified", &RescanSummary::reclassified)
+      .def_readonly("cleared", &RescanSummary::cleared)
+      .def_readonly("failed", &RescanSummary::failed);
+
+  py::enum_<EvictionOrder>(m, "EvictionOrder")
+      .value("OLDEST_FIRST", EvictionOrder::OLDEST_FIRST)
+      .value("LEAST_SEVERE_FIRST", EvictionOrder::LEAST_SEVERE_FIRST)
+      .export_values();
+
+  py::class_<RetentionPolicy>(m, "RetentionPolicy")
+      .def(py::init<>())
+      .def_readwrite("max_age", &RetentionPolicy::max_age)
+      .def_readwrite("max_total_bytes", &RetentionPolicy::max_total_bytes)
+      .def_readwrite("max_entries", &RetentionPolicy::max_entries)
+      .def_readwrite("eviction_order", &RetentionPolicy::eviction_order)
+      .def_readwrite("enforcement_interval",
+                     &RetentionPolicy::enforcement_interval);
+
+  py::enum_<SecurityLogger::LogLevel>(m, "LogLevel")
+      .value("DEBUG", SecurityLogger::LogLevel::DEBUG)
+      .value("INFO", SecurityLogger::LogLevel::INFO)
+      .value("WARNING", SecurityLogger::LogLevel::WARNING)
+      .value("ERROR", SecurityLogger::LogLevel::LOG_ERROR)
+      .value("CRITICAL", SecurityLogger::LogLevel::CRITICAL)
+      .export_values();
+
+  py::enum_<SecurityLogger::LogFormat>(m, "LogFormat")
+      .value("TEXT", SecurityLogger::LogFormat::TEXT)
+      .value("JSON_LINES", SecurityLogger::LogFormat::JSON_LINES)
+      .export_values();
+
+  py::enum_<SecurityLogger::LogCompression>(m, "LogCompression")
+      .value("NONE", SecurityLogger::LogCompression::NONE)
+      .value("GZIP", SecurityLogger::LogCompression::GZIP)
+      .value("ZSTD", SecurityLogger::LogCompression::ZSTD)
+      .export_values();
+
+  py::class_<SecurityLogger::LogFields>(m, "LogFields")
+      .def(py::init<>())
+      .def_readwrite("file_path", &SecurityLogger::LogFields::file_path)
+      .def_readwrite("signatures", &SecurityLogger::LogFields::signatures)
+      .def_readwrite("duration_ms", &SecurityLogger::LogFields::duration_ms)
+      .def_readwrite("bytes", &SecurityLogger::LogFields::bytes);
+
+  py::class_<SecurityLogger::LogRecord>(m, "LogRecord")
+      .def_readonly("level", &SecurityLogger::LogRecord::level)
+      .def_readonly("timestamp", &SecurityLogger::LogRecord::timestamp)
+      .def_readonly("component", &SecurityLogger::LogRecord::component)
+      .def_readonly("message", &SecurityLogger::LogRecord::message)
+      .def_readonly("fields", &SecurityLogger::LogRecord::fields)
+      .def_readonly("sequence", &SecurityLogger::LogRecord::sequence);
+
+  py::class_<SecurityLogger::RotationPolicy>(m, "LogRotationPolicy")
+      .def(py::init<>())
+      .def_readwrite("max_bytes", &SecurityLogger::RotationPolicy::max_bytes)
+      .def_readwrite("max_age", &SecurityLogger::RotationPolicy::max_age)
+      .def_readwrite("max_segments",
+                     &SecurityLogger::RotationPolicy::max_segments)
+      .def_readwrite("compression",
+                     &SecurityLogger::RotationPolicy::compression);
 
   // --- Class Bindings ---
   py::class_<FileTypeAnalyzer>(m, "FileTypeAnalyzer")
@@ -76,19 +257,88 @@ PYBIND11_MODULE(caninana_core, m) {
       .def("analyze_file", &FileTypeAnalyzer::AnalyzeFile,
            py::arg("filepath"));
 
-  py::class_<SignatureEngine>(m, "SignatureEngine")
+  py::class_<BatchScanner::FileResult>(m, "BatchFileResult")
+      .def_readonly("path", &BatchScanner::FileResult::path)
+      .def_readonly("result", &BatchScanner::FileResult::result)
+      .def_readonly("error", &BatchScanner::FileResult::error)
+      .def_readonly("timed_out", &BatchScanner::FileResult::timed_out)
+      .def_readonly("abandoned", &BatchScanner::FileResult::abandoned)
+      .def_readonly("cancelled", &BatchScanner::FileResult::cancelled);
+
+  // Shared ownership, so batch workers can keep the engine alive.
+  py::class_<SignatureEngine, std::shared_ptr<SignatureEngine>>(
+      m, "SignatureEngine")
       .def(py::init<>())
       .def("load_signatures", &SignatureEngine::LoadSignatures,
-           py::arg("signature_db_path"))
+           py::arg("signature_db_path"),
+           py::call_guard<py::gil_scoped_release>(),
+           "Compiles a database and swaps it in; scans may keep running.")
+      .def("get_signature_count", &SignatureEngine::GetSignatureCount)
       .def(
           "scan_bytes",
           [](SignatureEngine& self, const py::bytes& file_content,
-             const FileInfo& file_info) {
+             const FileInfo& file_info,
+             const std::optional<SignatureEngine::ScanBudget>& budget) {
             std::string content_str(file_content);
             std::stringstream stream(content_str);
-            return self.Scan(stream, file_info);
+            return self.Scan(stream, file_info,
+                             budget ? *budget
+                                    : self.DefaultBudgetFor(file_info.size));
+          },
+          py::arg("file_content"), py::arg("file_info"),
+          py::arg("budget") = py::none())
+      .def("scan_file", &SignatureEngine::ScanFile, py::arg("filepath"),
+           py::arg("analyzer"), py::arg("budget") = py::none(),
+           py::call_guard<py::gil_scoped_release>(),
+           "Opens, analyzes and scans a file in one call.")
+      .def("set_default_budget", &SignatureEngine::SetDefaultBudget,
+           py::arg("budget"),
+           "Fixed budget for scans without one; None restores the adaptive "
+           "default.")
+      .def(
+          "set_adaptive_ceiling",
+          [](SignatureEngine& self, int64_t ceiling_ms) {
+            self.SetAdaptiveCeiling(std::chrono::milliseconds(ceiling_ms));
           },
-          py::arg("file_content"), py::arg("file_info"));
+          py::arg("ceiling_ms"))
+      .def("default_budget_for", &SignatureEngine::DefaultBudgetFor,
+           py::arg("file_size"))
+      .def("enable_timing_breakdown", &SignatureEngine::EnableTimingBreakdown,
+           py::arg("enabled") = true);
+
+  const auto stage_stats_to_dict =
+      [](const std::array<PerformanceMonitor::StageStats,
+                          PerformanceMonitor::kStageCount>& stages) {
+        py::dict result;
+        for (size_t i = 0; i < PerformanceMonitor::kStageCount; ++i) {
+          py::dict stats;
+          stats["count"] = stages[i].count;
+          stats["total_ns"] = stages[i].total.count();
+          stats["max_ns"] = stages[i].max.count();
+          const auto stage = static_cast<PerformanceMonitor::Stage>(i);
+          result[PerformanceMonitor::StageName(stage)] = stats;
+        }
+        return result;
+      };
+  m.def(
+      "get_stage_stats",
+      [stage_stats_to_dict]() {
+        return stage_stats_to_dict(PerformanceMonitor::GetAggregateStats());
+      },
+      "Per-stage span totals summed over all threads.");
+  m.def(
+      "get_thread_stage_stats",
+      [stage_stats_to_dict]() {
+        py::list result;
+        for (const auto& thread : PerformanceMonitor::GetThreadStats()) {
+          py::dict entry;
+          entry["thread_id"] = thread.thread_id;
+          entry["stages"] = stage_stats_to_dict(thread.stages);
+          result.append(entry);
+        }
+        return result;
+      },
+      "Per-stage span totals for each running thread that recorded spans.");
 
   py::class_<QuarantineManager>(m, "QuarantineManager")
       .def(py::init<const std::string&>(), py::arg("root_path") = "")
@@ -97,11 +347,262 @@ PYBIND11_MODULE(caninana_core, m) {
       .def("restore_file", &QuarantineManager::RestoreFile,
            py::arg("quarantine_id"))
       .def("list_quarantined_files",
-           &QuarantineManager::ListQuarantinedFiles);
+           &QuarantineManager::ListQuarantinedFiles)
+      .def(
+          "list_quarantined",
+          [](const QuarantineManager& self, size_t offset, size_t limit,
+             const std::string& threat, const std::string& since,
+             const std::string& path_prefix) {
+            return self.ListQuarantined(offset, limit,
+                                        {threat, since, path_prefix});
+          },
+          py::arg("offset") = 0, py::arg("limit") = 100,
+          py::arg("threat") = "", py::arg("since") = "",
+          py::arg("path_prefix") = "",
+          "Returns one page of quarantined entries, newest first.")
+      .def(
+          "count_quarantined",
+          [](const QuarantineManager& self, const std::string& threat,
+             const std::string& since, const std::string& path_prefix) {
+            return self.CountQuarantined({threat, since, path_prefix});
+          },
+          py::arg("threat") = "", py::arg("since") = "",
+          py::arg("path_prefix") = "")
+      .def("rescan_vault", &QuarantineManager::RescanVault,
+           py::arg("engine"), py::arg("max_threads") = 0,
+           py::call_guard<py::gil_scoped_release>(),
+           "Re-scans quarantined samples in memory and updates verdicts.")
+      .def("set_retention_policy", &QuarantineManager::SetRetentionPolicy,
+           py::arg("policy"))
+      .def("get_retention_policy", &QuarantineManager::GetRetentionPolicy)
+      .def("enforce_retention", &QuarantineManager::EnforceRetention,
+           py::call_guard<py::gil_scoped_release>(),
+           "Evicts entries over the retention limits, returning the count.")
+      .def("start_retention_task", &QuarantineManager::StartRetentionTask)
+      .def("stop_retention_task", &QuarantineManager::StopRetentionTask,
+           py::call_guard<py::gil_scoped_release>());
+
+  // The logger is a process-wide singleton owned by C++; never delete it.
+  py::class_<SecurityLogger, std::unique_ptr<SecurityLogger, py::nodelete>>(
+      m, "SecurityLogger")
+      .def_static("get_instance", &SecurityLogger::GetInstance,
+                  py::return_value_policy::reference)
+      .def("log", &SecurityLogger::Log, py::arg("level"), py::arg("component"),
+           py::arg("message"),
+           py::arg("fields") = SecurityLogger::LogFields{})
+      .def("set_min_level", &SecurityLogger::SetMinLevel, py::arg("level"))
+      .def("get_min_level", &SecurityLogger::GetMinLevel)
+      .def("is_enabled", &SecurityLogger::IsEnabled, py::arg("level"))
+      .def("set_format", &SecurityLogger::SetFormat, py::arg("format"))
+      .def("get_format", &SecurityLogger::GetFormat)
+      .def("set_rotation_policy", &SecurityLogger::SetRotationPolicy,
+           py::arg("policy"))
+      .def("get_rotation_policy", &SecurityLogger::GetRotationPolicy)
+      .def("rotate", &SecurityLogger::Rotate,
+           py::call_guard<py::gil_scoped_release>())
+      .def("enable_async", &SecurityLogger::EnableAsync,
+           py::arg("ring_capacity") = 8192,
+           py::arg("flush_interval") = std::chrono::milliseconds(200))
+      .def("disable_async", &SecurityLogger::DisableAsync,
+           py::call_guard<py::gil_scoped_release>())
+      .def("flush", &SecurityLogger::Flush,
+           py::call_guard<py::gil_scoped_release>(),
+           "Blocks until all previously logged records are on disk.")
+      .def("dropped_count", &SecurityLogger::GetDroppedCount)
+      .def("get_records_since", &SecurityLogger::GetRecordsSince,
+           py::arg("sequence") = 0, py::arg("max_records") = 0,
+           "Returns retained records newer than `sequence`, oldest first.")
+      .def("last_sequence", &SecurityLogger::GetLastSequence)
+      .def("set_tail_capacity", &SecurityLogger::SetTailCapacity,
+           py::arg("capacity"));
+
+  py::class_<MetricsRegistry, std::unique_ptr<MetricsRegistry, py::nodelete>>(
+      m, "MetricsRegistry")
+      .def_static("get_instance", &MetricsRegistry::GetInstance,
+                  py::return_value_policy::reference)
+      .def(
+          "snapshot",
+          [](const MetricsRegistry& self) {
+            const MetricsSnapshot snapshot = self.Snapshot();
+            py::dict counters;
+            for (const auto& [name, value] : snapshot.counters) {
+              counters[py::str(name)] = value;
+            }
+            py::dict histograms;
+            for (const auto& [name, histogram] : snapshot.histograms) {
+              py::dict h;
+              h["count"] = histogram.count;
+              h["sum_seconds"] = histogram.sum_ns / 1e9;
+              h["max_seconds"] = histogram.max_ns / 1e9;
+              h["p50_seconds"] = histogram.Quantile(0.50) / 1e9;
+              h["p90_seconds"] = histogram.Quantile(0.90) / 1e9;
+              h["p99_seconds"] = histogram.Quantile(0.99) / 1e9;
+              histograms[py::str(name)] = h;
+            }
+            py::dict result;
+            result["counters"] = counters;
+            result["histograms"] = histograms;
+            return result;
+          },
+          "Returns {'counters': {...}, 'histograms': {...}} of all metrics.")
+      .def("export_prometheus", &MetricsRegistry::ExportPrometheus)
+      .def("write_prometheus_file", &MetricsRegistry::WritePrometheusFile,
+           py::arg("path"))
+      .def("start_http_exporter", &MetricsRegistry::StartHttpExporter,
+           py::arg("port"), py::arg("bind_address") = "127.0.0.1")
+      .def("stop_http_exporter", &MetricsRegistry::StopHttpExporter,
+           py::call_guard<py::gil_scoped_release>());
+
+  py::class_<Tracer, std::unique_ptr<Tracer, py::nodelete>>(m, "Tracer")
+      .def_static("get_instance", &Tracer::GetInstance,
+                  py::return_value_policy::reference)
+      .def("enable", &Tracer::Enable, py::arg("max_events_per_thread") = 1 << 20,
+           "Starts recording per-thread file and stage events.")
+      .def("disable", &Tracer::Disable)
+      .def("is_enabled", &Tracer::IsEnabled)
+      .def("clear", &Tracer::Clear)
+      .def("set_thread_name", &Tracer::SetThreadName, py::arg("name"))
+      .def("write_chrome_trace", &Tracer::WriteChromeTrace, py::arg("path"),
+           py::call_guard<py::gil_scoped_release>(),
+           "Dumps buffered events as Chrome trace-event JSON (Perfetto).")
+      .def("dropped_count", &Tracer::GetDroppedCount);
+
+  // Workers call back from their own threads, and an abandoned worker may
+  // drop the last reference after the scan call returned, so the Python
+  // callable is only touched, and released, with the GIL held.
+  const auto wrap_result_callback =
+      [](py::object callback) -> BatchScanner::ResultCallback {
+    if (callback.is_none()) return {};
+    auto held = std::shared_ptr<py::object>(
+        new py::object(std::move(callback)), [](py::object* object) {
+          py::gil_scoped_acquire gil;
+          delete object;
+        });
+    return [held](const BatchScanner::FileResult& file_result) {
+      py::gil_scoped_acquire gil;
+      try {
+        (*held)(file_result);
+      } catch (py::error_already_set& e) {
+        e.discard_as_unraisable("BatchScanner result callback");
+      }
+    };
+  };
+
+  py::class_<BatchScanner>(m, "BatchScanner")
+      .def(py::init([](std::shared_ptr<SignatureEngine> engine,
+                       size_t worker_count, int64_t hang_grace_ms,
+                       const std::optional<SignatureEngine::ScanBudget>&
+                           budget) {
+             BatchScanner::Options options;
+             options.worker_count = worker_count;
+             options.hang_grace = std::chrono::milliseconds(hang_grace_ms);
+             options.budget = budget;
+             return std::make_unique<BatchScanner>(std::move(engine), options);
+           }),
+           py::arg("engine"), py::arg("worker_count") = 0,
+           py::arg("hang_grace_ms") = 5000, py::arg("budget") = py::none())
+      .def(
+          "scan_files",
+          [wrap_result_callback](BatchScanner& self,
+                                 const std::vector<std::string>& paths,
+                                 py::object on_result) {
+            auto callback = wrap_result_callback(std::move(on_result));
+            py::gil_scoped_release release;
+            return self.ScanFiles(paths, std::move(callback));
+          },
+          py::arg("paths"), py::arg("on_result") = py::none(),
+          "Scans files on the worker pool; results keep the order of paths.")
+      .def(
+          "scan_directory",
+          [wrap_result_callback](BatchScanner& self, const std::string& root,
+                                 py::object on_result) {
+            auto callback = wrap_result_callback(std::move(on_result));
+            py::gil_scoped_release release;
+            return self.ScanDirectory(root, std::move(callback));
+          },
+          py::arg("root"), py::arg("on_result") = py::none())
+      .def("cancel", &BatchScanner::Cancel)
+      .def("replaced_worker_count", &BatchScanner::GetReplacedWorkerCount);
+
+  m.def(
+      "scans_in_flight",
+      []() { return ScanWatchdog::GetInstance().InFlight(); },
+      "Number of scans currently supervised by the watchdog.");
 
   py::class_<SignatureUpdater>(m, "SignatureUpdater")
       .def(py::init<const std::string&>(), py::arg("base_url"))
       .def("check_for_updates", &SignatureUpdater::CheckForUpdates,
            py::arg("current_db_path"),
-           "Checks for new signatures, returning True if an update was applied.");
+           py::call_guard<py::gil_scoped_release>(),
+           "Checks for new signatures, returning True if an update was applied.")
+      .def_static("compare_versions", &SignatureUpdater::CompareVersions,
+                  py::arg("a"), py::arg("b"))
+      .def_static("get_local_version", &SignatureUpdater::GetLocalVersion,
+                  py::arg("db_path"));
+
+  py::class_<UpdateScheduler::Options>(m, "UpdateSchedulerOptions")
+      .def(py::init<>())
+      .def_readwrite("interval", &UpdateScheduler::Options::interval)
+      .def_readwrite("initial_delay", &UpdateScheduler::Options::initial_delay)
+      .def_readwrite("jitter", &UpdateScheduler::Options::jitter)
+      .def_readwrite("min_backoff", &UpdateScheduler::Options::min_backoff)
+      .def_readwrite("max_backoff", &UpdateScheduler::Options::max_backoff);
+
+  py::enum_<UpdateScheduler::UpdateEvent::Kind>(m, "UpdateEventKind")
+      .value("APPLIED", UpdateScheduler::UpdateEvent::Kind::APPLIED)
+      .value("UP_TO_DATE", UpdateScheduler::UpdateEvent::Kind::UP_TO_DATE)
+      .value("FAILED", UpdateScheduler::UpdateEvent::Kind::FAILED)
+      .export_values();
+
+  py::class_<UpdateScheduler::UpdateEvent>(m, "UpdateEvent")
+      .def_readonly("kind", &UpdateScheduler::UpdateEvent::kind)
+      .def_readonly("version", &UpdateScheduler::UpdateEvent::version)
+      .def_readonly("signature_count",
+                    &UpdateScheduler::UpdateEvent::signature_count)
+      .def_readonly("error", &UpdateScheduler::UpdateEvent::error)
+      .def_readonly("consecutive_failures",
+                    &UpdateScheduler::UpdateEvent::consecutive_failures)
+      .def_readonly("next_check", &UpdateScheduler::UpdateEvent::next_check);
+
+  py::class_<UpdateScheduler, std::unique_ptr<UpdateScheduler,
+                                              GilReleasingDelete>>(
+      m, "UpdateScheduler")
+      .def(py::init([](const std::string& base_url, const std::string& db_path,
+                       std::shared_ptr<SignatureEngine> engine,
+                       const UpdateScheduler::Options& options) {
+             return std::unique_ptr<UpdateScheduler, GilReleasingDelete>(
+                 new UpdateScheduler(base_url, db_path, std::move(engine),
+                                     options));
+           }),
+           py::arg("base_url"), py::arg("db_path"), py::arg("engine"),
+           py::arg("options") = UpdateScheduler::Options())
+      .def(
+          "start",
+          [](UpdateScheduler& self, py::object on_event) {
+            UpdateScheduler::EventCallback callback;
+            if (!on_event.is_none()) {
+              // Same GIL discipline as the batch scanner callbacks.
+              auto held = std::shared_ptr<py::object>(
+                  new py::object(std::move(on_event)), [](py::object* object) {
+                    py::gil_scoped_acquire gil;
+                    delete object;
+                  });
+              callback = [held](const UpdateScheduler::UpdateEvent& event) {
+                py::gil_scoped_acquire gil;
+                try {
+                  (*held)(event);
+                } catch (py::error_already_set& e) {
+                  e.discard_as_unraisable("UpdateScheduler event callback");
+                }
+              };
+            }
+            self.Start(std::move(callback));
+          },
+          py::arg("on_event") = py::none(),
+          "Starts background checks; on_event runs on the scheduler thread.")
+      .def("stop", &UpdateScheduler::Stop,
+           py::call_guard<py::gil_scoped_release>())
+      .def("check_now", &UpdateScheduler::CheckNow)
+      .def("set_interval", &UpdateScheduler::SetInterval, py::arg("interval"))
+      .def("is_running", &UpdateScheduler::IsRunning);
 }
\ No newline at end of file
@@ -10,6 +10,8 @@
 #include <sstream>
 
 #include "file_exception.h"
+#include "metrics.h"
+#include "performance_monitor.h"
 #include "security_logger.h"
 
 namespace caninana {
@@ -17,6 +19,29 @@ namespace core {
 
 namespace {
 constexpr size_t kBufferSize = 8192;
+constexpr char kEmptySha256[] =
+    "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855";
+
+struct AnalyzerMetrics {
+  LatencyHistogram& analyze_latency;
+  LatencyHistogram& hash_latency;
+  Counter& files;
+  Counter& bytes;
+};
+
+const AnalyzerMetrics& Metrics() {
+  auto& registry = MetricsRegistry::GetInstance();
+  static const AnalyzerMetrics metrics{
+      registry.GetHistogram("caninana_analyze_duration_seconds",
+                            "Time to identify and hash a file."),
+      registry.GetHistogram("caninana_hash_duration_seconds",
+                            "Time to compute a file's SHA256."),
+      registry.GetCounter("caninana_files_analyzed_total",
+                          "Files analyzed."),
+      registry.GetCounter("caninana_bytes_analyzed_total",
+                          "Bytes of file content analyzed.")};
+  return metrics;
+}
 }
 
 FileInfo FileTypeAnalyzer::AnalyzeFile(const std::string& filepath) {
@@ -33,8 +58,7 @@ FileInfo FileTypeAnalyzer::AnalyzeFile(const std::string& filepath) {
   info.extension = path.extension().string();
 
   if (info.size == 0) {
-    info.sha256_hash =
-        "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855";
+    info.sha256_hash = kEmptySha256;
     return info;
   }
 
@@ -43,14 +67,39 @@ FileInfo FileTypeAnalyzer::AnalyzeFile(const std::string& filepath) {
     throw FileAccessError("Failed to open file for analysis: " + filepath);
   }
 
-  std::vector<char> initial_buffer(kBufferSize);
-  file.read(initial_buffer.data(), kBufferSize);
-  initial_buffer.resize(file.gcount());
-  info.type = IdentifyFileType(initial_buffer);
+  FileInfo analyzed = AnalyzeStream(file, info.size);
+  analyzed.extension = info.extension;
+  return analyzed;
+}
+
+FileInfo FileTypeAnalyzer::AnalyzeStream(std::istream& stream, uint64_t size) {
+  const AnalyzerMetrics& metrics = Metrics();
+  ScopedLatency analyze_timer(metrics.analyze_latency);
+  metrics.files.Increment();
+  metrics.bytes.Increment(size);
+
+  FileInfo info;
+  info.size = size;
+  if (size == 0) {
+    info.sha256_hash = kEmptySha256;
+    return info;
+  }
+
+  {
+    PerformanceMonitor::ScopedSpan magic_span(PerformanceMonitor::Stage::MAGIC);
+    std::vector<char> initial_buffer(kBufferSize);
+    stream.read(initial_buffer.data(), kBufferSize);
+    initial_buffer.resize(stream.gcount());
+    info.type = IdentifyFileType(initial_buffer);
+  }
 
-  file.clear();
-  file.seekg(0, std::ios::beg);
-  info.sha256_hash = CalculateSha256(file);
+  stream.clear();
+  stream.seekg(0, std::ios::beg);
+  {
+    ScopedLatency hash_timer(metrics.hash_latency);
+    PerformanceMonitor::ScopedSpan hash_span(PerformanceMonitor::Stage::HASH);
+    info.sha256_hash = CalculateSha256(stream);
+  }
 
   return info;
 }
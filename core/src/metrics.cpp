@@ -0,0 +1,405 @@
+#include "metrics.h"
+
+#ifdef _WIN32
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#include <winsock2.h>
+#include <ws2tcpip.h>
+#else
+#include <arpa/inet.h>
+#include <netinet/in.h>
+#include <sys/select.h>
+#include <sys/socket.h>
+#include <unistd.h>
+#endif
+
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <filesystem>
+#include <fstream>
+#include <iomanip>
+#include <sstream>
+
+#include "file_exception.h"
+#include "security_logger.h"
+
+namespace caninana {
+namespace core {
+
+namespace {
+
+#ifdef _WIN32
+using SocketHandle = SOCKET;
+constexpr SocketHandle kInvalidSocket = INVALID_SOCKET;
+void CloseSocket(SocketHandle socket) { closesocket(socket); }
+#else
+using SocketHandle = int;
+constexpr SocketHandle kInvalidSocket = -1;
+void CloseSocket(SocketHandle socket) { close(socket); }
+#endif
+
+/// How long a scraper gets to send its request and to take the response.
+constexpr int kClientTimeoutMs = 2000;
+/// Longest the exporter waits on a socket before rechecking the stop flag.
+constexpr int kStopPollMs = 200;
+
+// A scraper that hangs up mid-response must not SIGPIPE the process.
+#ifdef MSG_NOSIGNAL
+constexpr int kSendFlags = MSG_NOSIGNAL;
+#else
+constexpr int kSendFlags = 0;
+#endif
+
+/// Waits up to `timeout_ms` for `socket` to become readable.
+bool WaitReadable(SocketHandle socket, int timeout_ms) {
+  fd_set read_set;
+  FD_ZERO(&read_set);
+  FD_SET(socket, &read_set);
+  timeval timeout{timeout_ms / 1000, (timeout_ms % 1000) * 1000};
+  return select(static_cast<int>(socket) + 1, &read_set, nullptr, nullptr,
+                &timeout) > 0;
+}
+
+/// Bounds blocking reads and writes on a client connection.
+void SetClientTimeouts(SocketHandle client) {
+#ifdef _WIN32
+  const DWORD timeout = kClientTimeoutMs;
+#else
+  const timeval timeout{kClientTimeoutMs / 1000,
+                        (kClientTimeoutMs % 1000) * 1000};
+#endif
+  setsockopt(client, SOL_SOCKET, SO_RCVTIMEO,
+             reinterpret_cast<const char*>(&timeout), sizeof(timeout));
+  setsockopt(client, SOL_SOCKET, SO_SNDTIMEO,
+             reinterpret_cast<const char*>(&timeout), sizeof(timeout));
+#ifdef SO_NOSIGPIPE
+  int no_sigpipe = 1;
+  setsockopt(client, SOL_SOCKET, SO_NOSIGPIPE,
+             reinterpret_cast<const char*>(&no_sigpipe), sizeof(no_sigpipe));
+#endif
+}
+
+/// Bucket edges, in seconds, used when exporting histograms to Prometheus.
+constexpr double kExportBucketsSeconds[] = {0.0001, 0.00025, 0.0005, 0.001,
+                                            0.0025, 0.005,   0.01,   0.025,
+                                            0.05,   0.1,     0.25,   0.5,
+                                            1.0,    2.5,     5.0,    10.0,
+                                            30.0,   60.0};
+
+std::string FormatSeconds(double seconds) {
+  std::ostringstream ss;
+  ss << std::setprecision(9) << seconds;
+  return ss.str();
+}
+
+std::string FormatNanoseconds(uint64_t nanoseconds) {
+  return FormatSeconds(static_cast<double>(nanoseconds) / 1e9);
+}
+
+void AtomicMax(std::atomic<uint64_t>& target, uint64_t value) {
+  uint64_t current = target.load(std::memory_order_relaxed);
+  while (value > current &&
+         !target.compare_exchange_weak(current, value,
+                                       std::memory_order_relaxed)) {
+  }
+}
+
+}  // namespace
+
+// --- HistogramSnapshot ---
+
+uint64_t HistogramSnapshot::Quantile(double quantile) const {
+  if (count == 0) return 0;
+  quantile = std::clamp(quantile, 0.0, 1.0);
+  const auto rank = static_cast<uint64_t>(
+      std::ceil(quantile * static_cast<double>(count)));
+  uint64_t seen = 0;
+  for (size_t i = 0; i < buckets.size(); ++i) {
+    seen += buckets[i];
+    if (seen >= std::max<uint64_t>(rank, 1)) {
+      // Report the middle of the bucket, capped by the observed maximum.
+      const uint64_t low = LatencyHistogram::BucketLowerBound(i);
+      const uint64_t high = LatencyHistogram::BucketUpperBound(i);
+      return std::min(low + (high - low) / 2, max_ns);
+    }
+  }
+  return max_ns;
+}
+
+uint64_t HistogramSnapshot::CountAtOrBelow(uint64_t bound_ns) const {
+  uint64_t total = 0;
+  for (size_t i = 0; i < buckets.size(); ++i) {
+    if (LatencyHistogram::BucketUpperBound(i) > bound_ns) break;
+    total += buckets[i];
+  }
+  return total;
+}
+
+// --- LatencyHistogram ---
+
+size_t LatencyHistogram::BucketIndex(uint64_t value_ns) {
+  if (value_ns < kSubBuckets) return static_cast<size_t>(value_ns);
+  int exponent = 63;
+  while ((value_ns >> exponent) == 0) --exponent;
+  const int shift = exponent - kSubBucketBits;
+  const size_t sub_bucket = (value_ns >> shift) & (kSubBuckets - 1);
+  return static_cast<size_t>(shift + 1) * kSubBuckets + sub_bucket;
+}
+
+uint64_t LatencyHistogram::BucketLowerBound(size_t index) {
+  if (index < kSubBuckets) return index;
+  const size_t shift = index / kSubBuckets - 1;
+  const uint64_t sub_bucket = index % kSubBuckets;
+  return (kSubBuckets + sub_bucket) << shift;
+}
+
+uint64_t LatencyHistogram::BucketUpperBound(size_t index) {
+  if (index < kSubBuckets) return index;
+  const size_t shift = index / kSubBuckets - 1;
+  return BucketLowerBound(index) + ((uint64_t{1} << shift) - 1);
+}
+
+void LatencyHistogram::Record(std::chrono::nanoseconds latency) {
+  const uint64_t value =
+      latency.count() > 0 ? static_cast<uint64_t>(latency.count()) : 0;
+  buckets_[BucketIndex(value)].fetch_add(1, std::memory_order_relaxed);
+  sum_ns_.fetch_add(value, std::memory_order_relaxed);
+  AtomicMax(max_ns_, value);
+}
+
+HistogramSnapshot LatencyHistogram::Snapshot() const {
+  HistogramSnapshot snapshot;
+  snapshot.buckets.resize(kBucketCount);
+  uint64_t total = 0;
+  for (size_t i = 0; i < kBucketCount; ++i) {
+    snapshot.buckets[i] = buckets_[i].load(std::memory_order_relaxed);
+    total += snapshot.buckets[i];
+  }
+  // Derive the count from the buckets so the snapshot is self-consistent
+  // even while other threads keep recording.
+  snapshot.count = total;
+  snapshot.sum_ns = sum_ns_.load(std::memory_order_relaxed);
+  snapshot.max_ns = max_ns_.load(std::memory_order_relaxed);
+  return snapshot;
+}
+
+// --- MetricsRegistry ---
+
+MetricsRegistry& MetricsRegistry::GetInstance() {
+  static MetricsRegistry instance;
+  return instance;
+}
+
+MetricsRegistry::~MetricsRegistry() { StopHttpExporter(); }
+
+Counter& MetricsRegistry::GetCounter(const std::string& name,
+                                     const std::string& help) {
+  std::lock_guard<std::mutex> guard(registry_mutex_);
+  auto& entry = counters_[name];
+  if (!entry.metric) {
+    entry.help = help;
+    entry.metric = std::make_unique<Counter>();
+  }
+  return *entry.metric;
+}
+
+LatencyHistogram& MetricsRegistry::GetHistogram(const std::string& name,
+                                                const std::string& help) {
+  std::lock_guard<std::mutex> guard(registry_mutex_);
+  auto& entry = histograms_[name];
+  if (!entry.metric) {
+    entry.help = help;
+    entry.metric = std::make_unique<LatencyHistogram>();
+  }
+  return *entry.metric;
+}
+
+MetricsSnapshot MetricsRegistry::Snapshot() const {
+  std::lock_guard<std::mutex> guard(registry_mutex_);
+  MetricsSnapshot snapshot;
+  for (const auto& [name, entry] : counters_) {
+    snapshot.counters[name] = entry.metric->Value();
+  }
+  for (const auto& [name, entry] : histograms_) {
+    snapshot.histograms[name] = entry.metric->Snapshot();
+  }
+  return snapshot;
+}
+
+std::string MetricsRegistry::ExportPrometheus() const {
+  std::map<std::string, std::string> help;
+  {
+    std::lock_guard<std::mutex> guard(registry_mutex_);
+    for (const auto& [name, entry] : counters_) help[name] = entry.help;
+    for (const auto& [name, entry] : histograms_) help[name] = entry.help;
+  }
+  const MetricsSnapshot snapshot = Snapshot();
+
+  std::ostringstream out;
+  const auto write_header = [&](const std::string& name, const char* type) {
+    if (!help[name].empty()) {
+      out << "# HELP " << name << ' ' << help[name] << '\n';
+    }
+    out << "# TYPE " << name << ' ' << type << '\n';
+  };
+  for (const auto& [name, value] : snapshot.counters) {
+    write_header(name, "counter");
+    out << name << ' ' << value << '\n';
+  }
+  for (const auto& [name, histogram] : snapshot.histograms) {
+    write_header(name, "histogram");
+    for (double bound : kExportBucketsSeconds) {
+      const auto bound_ns = static_cast<uint64_t>(bound * 1e9);
+      out << name << "_bucket{le=\"" << FormatSeconds(bound) << "\"} "
+          << histogram.CountAtOrBelow(bound_ns) << '\n';
+    }
+    out << name << "_bucket{le=\"+Inf\"} " << histogram.count << '\n';
+    out << name << "_sum " << FormatNanoseconds(histogram.sum_ns) << '\n';
+    out << name << "_count " << histogram.count << '\n';
+  }
+  return out.str();
+}
+
+void MetricsRegistry::WritePrometheusFile(const std::string& path) const {
+  const std::string tmp_path = path + ".tmp";
+  {
+    std::ofstream file(tmp_path, std::ios::binary | std::ios::trunc);
+    if (!file) {
+      throw FileAccessError("Failed to open metrics file for writing: " +
+                            tmp_path);
+    }
+    file << ExportPrometheus();
+    if (!file) {
+      throw FileAccessError("Failed to write metrics file: " + tmp_path);
+    }
+  }
+  std::error_code ec;
+  std::filesystem::rename(tmp_path, path, ec);
+  if (ec) {
+    std::filesystem::remove(tmp_path, ec);
+    throw FileAccessError("Failed to replace metrics file: " + path);
+  }
+}
+
+void MetricsRegistry::StartHttpExporter(uint16_t port,
+                                        const std::string& bind_address) {
+  std::lock_guard<std::mutex> guard(http_mutex_);
+  if (http_thread_.joinable()) return;
+
+#ifdef _WIN32
+  WSADATA wsa_data;
+  if (WSAStartup(MAKEWORD(2, 2), &wsa_data) != 0) {
+    throw InitializationError("Failed to initialize Winsock for metrics.");
+  }
+#endif
+
+  SocketHandle listen_socket = socket(AF_INET, SOCK_STREAM, IPPROTO_TCP);
+  if (listen_socket == kInvalidSocket) {
+#ifdef _WIN32
+    WSACleanup();
+#endif
+    throw InitializationError("Failed to create metrics socket.");
+  }
+  int reuse = 1;
+  setsockopt(listen_socket, SOL_SOCKET, SO_REUSEADDR,
+             reinterpret_cast<const char*>(&reuse), sizeof(reuse));
+
+  sockaddr_in address{};
+  address.sin_family = AF_INET;
+  address.sin_port = htons(port);
+  if (inet_pton(AF_INET, bind_address.c_str(), &address.sin_addr) != 1 ||
+      bind(listen_socket, reinterpret_cast<sockaddr*>(&address),
+           sizeof(address)) != 0 ||
+      listen(listen_socket, 8) != 0) {
+    CloseSocket(listen_socket);
+#ifdef _WIN32
+    WSACleanup();
+#endif
+    throw InitializationError("Failed to bind metrics endpoint on " +
+                              bind_address + ":" + std::to_string(port));
+  }
+
+  http_stop_requested_ = false;
+  http_thread_ = std::thread(&MetricsRegistry::HttpLoop, this,
+                             static_cast<intptr_t>(listen_socket));
+  SecurityLogger::GetInstance().Log(
+      SecurityLogger::LogLevel::INFO, "MetricsRegistry",
+      "Serving metrics on http://" + bind_address + ":" +
+          std::to_string(port) + "/metrics");
+}
+
+void MetricsRegistry::StopHttpExporter() {
+  std::lock_guard<std::mutex> guard(http_mutex_);
+  if (!http_thread_.joinable()) return;
+  http_stop_requested_ = true;
+  http_thread_.join();
+#ifdef _WIN32
+  WSACleanup();
+#endif
+}
+
+void MetricsRegistry::HttpLoop(intptr_t raw_listen_socket) {
+  const auto listen_socket = static_cast<SocketHandle>(raw_listen_socket);
+  while (!http_stop_requested_) {
+    // Poll with a short timeout so stop requests are noticed promptly.
+    if (!WaitReadable(listen_socket, kStopPollMs)) continue;
+
+    const SocketHandle client = accept(listen_socket, nullptr, nullptr);
+    if (client == kInvalidSocket) continue;
+    SetClientTimeouts(client);
+
+    // A client that connects and sends nothing is dropped after the
+    // timeout; the stop flag is still checked while waiting for it.
+    bool readable = false;
+    for (int waited = 0; waited < kClientTimeoutMs && !http_stop_requested_;
+         waited += kStopPollMs) {
+      readable = WaitReadable(client, kStopPollMs);
+      if (readable) break;
+    }
+    if (!readable) {
+      CloseSocket(client);
+      continue;
+    }
+
+    // Scrapers send small GET requests; one read is enough to route them.
+    char request[1024];
+    const auto received =
+        recv(client, request, static_cast<int>(sizeof(request) - 1), 0);
+    std::string request_line;
+    if (received > 0) {
+      request[received] = '\0';
+      request_line.assign(request, strcspn(request, "\r\n"));
+    }
+
+    std::string status = "200 OK";
+    std::string body;
+    if (request_line.rfind("GET /metrics ", 0) == 0 ||
+        request_line.rfind("GET / ", 0) == 0) {
+      body = ExportPrometheus();
+    } else {
+      status = "404 Not Found";
+      body = "Not found. Metrics are served at /metrics.\n";
+    }
+    const std::string response =
+        "HTTP/1.1 " + status +
+        "\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8"
+        "\r\nContent-Length: " +
+        std::to_string(body.size()) + "\r\nConnection: close\r\n\r\n" + body;
+
+    size_t sent = 0;
+    while (sent < response.size() && !http_stop_requested_) {
+      const auto written =
+          send(client, response.data() + sent,
+               static_cast<int>(response.size() - sent), kSendFlags);
+      if (written <= 0) break;
+      sent += static_cast<size_t>(written);
+    }
+    CloseSocket(client);
+  }
+  CloseSocket(listen_socket);
+}
+
+}  // namespace core
+}  // namespace caninana
@@ -1,18 +1,252 @@
 #include "performance_monitor.h"
 
+#ifdef _WIN32
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+
+#include <algorithm>
+#include <atomic>
+#include <memory>
+#include <mutex>
+#include <thread>
+
+#include "tracer.h"
+
 namespace caninana {
 namespace core {
 
+namespace {
+
+// Per-thread stage totals. Only the owning thread writes, so updates are
+// plain relaxed load/store pairs; other threads only read.
+struct ThreadStats {
+  size_t thread_id{0};
+  std::array<std::atomic<uint64_t>, PerformanceMonitor::kStageCount> count{};
+  std::array<std::atomic<uint64_t>, PerformanceMonitor::kStageCount> total_ns{};
+  std::array<std::atomic<uint64_t>, PerformanceMonitor::kStageCount> max_ns{};
+};
+
+struct StatsRegistry {
+  std::mutex mutex;
+  std::vector<std::shared_ptr<ThreadStats>> threads;
+  /// Totals of threads that have exited.
+  std::array<PerformanceMonitor::StageStats, PerformanceMonitor::kStageCount>
+      retired{};
+};
+
+StatsRegistry& Registry() {
+  // Never destroyed: detached workers may still exit during shutdown.
+  static StatsRegistry* registry = new StatsRegistry();
+  return *registry;
+}
+
+PerformanceMonitor::ThreadStageStats ReadThreadStats(const ThreadStats& thread) {
+  PerformanceMonitor::ThreadStageStats entry;
+  entry.thread_id = thread.thread_id;
+  for (size_t i = 0; i < PerformanceMonitor::kStageCount; ++i) {
+    entry.stages[i].count = thread.count[i].load(std::memory_order_relaxed);
+    entry.stages[i].total = std::chrono::nanoseconds(
+        thread.total_ns[i].load(std::memory_order_relaxed));
+    entry.stages[i].max = std::chrono::nanoseconds(
+        thread.max_ns[i].load(std::memory_order_relaxed));
+  }
+  return entry;
+}
+
+/// Registers the calling thread's stats, and retires them when it exits,
+/// so short-lived workers do not accumulate in the registry.
+class ThreadStatsHandle {
+ public:
+  ThreadStatsHandle() : stats_(std::make_shared<ThreadStats>()) {
+    stats_->thread_id =
+        std::hash<std::thread::id>{}(std::this_thread::get_id());
+    StatsRegistry& registry = Registry();
+    std::lock_guard<std::mutex> guard(registry.mutex);
+    registry.threads.push_back(stats_);
+  }
+
+  ~ThreadStatsHandle() {
+    const auto final_stats = ReadThreadStats(*stats_);
+    StatsRegistry& registry = Registry();
+    std::lock_guard<std::mutex> guard(registry.mutex);
+    for (size_t i = 0; i < PerformanceMonitor::kStageCount; ++i) {
+      auto& retired = registry.retired[i];
+      retired.count += final_stats.stages[i].count;
+      retired.total += final_stats.stages[i].total;
+      retired.max = std::max(retired.max, final_stats.stages[i].max);
+    }
+    auto& threads = registry.threads;
+    threads.erase(std::remove(threads.begin(), threads.end(), stats_),
+                  threads.end());
+  }
+
+  ThreadStats& stats() { return *stats_; }
+
+ private:
+  std::shared_ptr<ThreadStats> stats_;
+};
+
+ThreadStats& LocalStats() {
+  thread_local ThreadStatsHandle handle;
+  return handle.stats();
+}
+
+thread_local PerformanceMonitor::ScopedProfile* t_active_profile = nullptr;
+thread_local uint32_t t_span_depth = 0;
+
+}  // namespace
+
 void PerformanceMonitor::Start() {
   start_time_ = std::chrono::steady_clock::now();
+  start_cpu_time_ = ThreadCpuTime();
+}
+
+bool PerformanceMonitor::HasTimedOut(std::chrono::nanoseconds timeout) const {
+  return std::chrono::steady_clock::now() - start_time_ >= timeout;
+}
+
+std::chrono::steady_clock::duration PerformanceMonitor::Elapsed() const {
+  return std::chrono::steady_clock::now() - start_time_;
+}
+
+std::chrono::nanoseconds PerformanceMonitor::CpuElapsed() const {
+  return ThreadCpuTime() - start_cpu_time_;
+}
+
+std::chrono::nanoseconds PerformanceMonitor::ThreadCpuTime() {
+#ifdef _WIN32
+  FILETIME creation, exit, kernel, user;
+  if (!GetThreadTimes(GetCurrentThread(), &creation, &exit, &kernel, &user)) {
+    return std::chrono::nanoseconds(0);
+  }
+  const auto to_100ns = [](const FILETIME& ft) {
+    return (static_cast<uint64_t>(ft.dwHighDateTime) << 32) | ft.dwLowDateTime;
+  };
+  return std::chrono::nanoseconds((to_100ns(kernel) + to_100ns(user)) * 100);
+#else
+  timespec ts{};
+  if (clock_gettime(CLOCK_THREAD_CPUTIME_ID, &ts) != 0) {
+    return std::chrono::nanoseconds(0);
+  }
+  return std::chrono::seconds(ts.tv_sec) + std::chrono::nanoseconds(ts.tv_nsec);
+#endif
+}
+
+// --- Span profiler ---
+
+PerformanceMonitor::ScopedSpan::ScopedSpan(Stage stage)
+    : stage_(stage),
+      depth_(t_span_depth++),
+      traced_(Tracer::GetInstance().IsEnabled()),
+      start_(std::chrono::steady_clock::now()) {}
+
+PerformanceMonitor::ScopedSpan::~ScopedSpan() {
+  const auto end = std::chrono::steady_clock::now();
+  const auto duration =
+      std::chrono::duration_cast<std::chrono::nanoseconds>(end - start_);
+  --t_span_depth;
+
+  if (traced_) {
+    Tracer::GetInstance().RecordComplete(StageName(stage_), "stage", start_,
+                                         end);
+  }
+
+  const auto index = static_cast<size_t>(stage_);
+  ThreadStats& stats = LocalStats();
+  const auto ns = static_cast<uint64_t>(duration.count());
+  stats.count[index].store(
+      stats.count[index].load(std::memory_order_relaxed) + 1,
+      std::memory_order_relaxed);
+  stats.total_ns[index].store(
+      stats.total_ns[index].load(std::memory_order_relaxed) + ns,
+      std::memory_order_relaxed);
+  if (ns > stats.max_ns[index].load(std::memory_order_relaxed)) {
+    stats.max_ns[index].store(ns, std::memory_order_relaxed);
+  }
+
+  if (ScopedProfile* profile = t_active_profile) {
+    Span span;
+    span.stage = stage_;
+    span.depth = depth_;
+    span.start = std::chrono::duration_cast<std::chrono::nanoseconds>(
+        start_ - profile->start_);
+    span.duration = duration;
+    profile->breakdown_.spans.push_back(span);
+    profile->breakdown_.stage_totals[index] += duration;
+  }
+}
+
+PerformanceMonitor::ScopedProfile::ScopedProfile()
+    : start_(std::chrono::steady_clock::now()), previous_(t_active_profile) {
+  t_active_profile = this;
+}
+
+PerformanceMonitor::ScopedProfile::~ScopedProfile() {
+  t_active_profile = previous_;
+}
+
+PerformanceMonitor::TimingBreakdown
+PerformanceMonitor::ScopedProfile::Snapshot() const {
+  TimingBreakdown snapshot = breakdown_;
+  snapshot.total = std::chrono::duration_cast<std::chrono::nanoseconds>(
+      std::chrono::steady_clock::now() - start_);
+  return snapshot;
+}
+
+const PerformanceMonitor::ScopedProfile* PerformanceMonitor::CurrentProfile() {
+  return t_active_profile;
+}
+
+std::vector<PerformanceMonitor::ThreadStageStats>
+PerformanceMonitor::GetThreadStats() {
+  StatsRegistry& registry = Registry();
+  std::lock_guard<std::mutex> guard(registry.mutex);
+  std::vector<ThreadStageStats> result;
+  result.reserve(registry.threads.size());
+  for (const auto& thread : registry.threads) {
+    result.push_back(ReadThreadStats(*thread));
+  }
+  return result;
+}
+
+std::array<PerformanceMonitor::StageStats, PerformanceMonitor::kStageCount>
+PerformanceMonitor::GetAggregateStats() {
+  StatsRegistry& registry = Registry();
+  std::lock_guard<std::mutex> guard(registry.mutex);
+  std::array<StageStats, kStageCount> aggregate = registry.retired;
+  for (const auto& thread : registry.threads) {
+    const ThreadStageStats stats = ReadThreadStats(*thread);
+    for (size_t i = 0; i < kStageCount; ++i) {
+      aggregate[i].count += stats.stages[i].count;
+      aggregate[i].total += stats.stages[i].total;
+      aggregate[i].max = std::max(aggregate[i].max, stats.stages[i].max);
+    }
+  }
+  return aggregate;
 }
 
-bool PerformanceMonitor::HasTimedOut(std::chrono::seconds timeout) const {
-  const auto now = std::chrono::steady_clock::now();
-  const auto elapsed =
-      std::chrono::duration_cast<std::chrono::seconds>(now - start_time_);
-  return elapsed >= timeout;
+const char* PerformanceMonitor::StageName(Stage stage) {
+  switch (stage) {
+    case Stage::OPEN:
+      return "open";
+    case Stage::MAGIC:
+      return "magic";
+    case Stage::HASH:
+      return "hash";
+    case Stage::AUTOMATON:
+      return "automaton";
+    case Stage::LOG:
+      return "log";
+    case Stage::QUARANTINE:
+      return "quarantine";
+  }
+  return "unknown";
 }
 
 }  // namespace core
-}  // namespace caninana
\ No newline at end of file
+}  // namespace caninana
@@ -2,14 +2,36 @@
 
 #include <nlohmann/json.hpp>
 
+#include <algorithm>
+#include <atomic>
+#include <cctype>
+#include <cerrno>
 #include <chrono>
+#include <ctime>
 #include <filesystem>
 #include <fstream>
 #include <iomanip>
 #include <random>
 #include <sstream>
+#include <unordered_map>
+#include <unordered_set>
+
+#ifdef _WIN32
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/file.h>
+#include <sys/mman.h>
+#include <sys/resource.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
 
 #include "file_exception.h"
+#include "metrics.h"
 #include "security_logger.h"
 
 namespace caninana {
@@ -19,7 +41,12 @@ void to_json(nlohmann::json& j, const QuarantineEntry& e) {
   j = nlohmann::json{{"quarantine_id", e.quarantine_id},
                      {"original_path", e.original_path},
                      {"quarantine_date", e.quarantine_date},
-                     {"threat_name", e.threat_name}};
+                     {"threat_name", e.threat_name},
+                     {"size_bytes", e.size_bytes},
+                     {"severity", e.severity},
+                     {"threat_detected", e.threat_detected},
+                     {"last_rescan_date", e.last_rescan_date},
+                     {"vault_format", e.vault_format}};
 }
 
 void from_json(const nlohmann::json& j, QuarantineEntry& e) {
@@ -27,20 +54,27 @@ void from_json(const nlohmann::json& j, QuarantineEntry& e) {
   j.at("original_path").get_to(e.original_path);
   j.at("quarantine_date").get_to(e.quarantine_date);
   j.at("threat_name").get_to(e.threat_name);
+  // Fields added after the first ledger format are optional.
+  e.size_bytes = j.value("size_bytes", static_cast<uint64_t>(0));
+  e.severity = j.value("severity", static_cast<uint8_t>(0));
+  e.threat_detected = j.value("threat_detected", true);
+  e.last_rescan_date = j.value("last_rescan_date", "");
+  e.vault_format = j.value("vault_format", static_cast<uint8_t>(0));
 }
 
 namespace {
 const std::vector<char> kXorKey = {'C', 'A', 'N', 'I', 'N', 'A', 'N', 'A'};
 const std::string kMetadataFileName = "ledger.json";
+const std::string kLockFileName = "ledger.lock";
 std::string GenerateUUID() {
   std::random_device rd;
   std::mt19937 gen(rd());
   std::uniform_int_distribution<> dis(0, 255);
   std::stringstream ss;
-  ss << std::hex << std::setw(2) << std::setfill('0');
+  ss << std::hex << std::setfill('0');
   for (int i = 0; i < 16; ++i) {
     if (i == 4 || i == 6 || i == 8 || i == 10) ss << "-";
-    ss << dis(gen);
+    ss << std::setw(2) << dis(gen);
   }
   return ss.str();
 }
@@ -51,8 +85,253 @@ std::string GetCurrentTimestamp() {
   ss << std::put_time(std::gmtime(&in_time_t), "%Y-%m-%dT%H:%M:%SZ");
   return ss.str();
 }
+
+// Converts a "%Y-%m-%dT%H:%M:%SZ" ledger timestamp to seconds since the epoch.
+// Uses the days-from-civil algorithm because timegm() is not portable.
+// Returns 0 for unparseable timestamps so they are treated as very old.
+int64_t ParseTimestamp(const std::string& timestamp) {
+  std::tm tm{};
+  std::istringstream ss(timestamp);
+  ss >> std::get_time(&tm, "%Y-%m-%dT%H:%M:%S");
+  if (ss.fail()) return 0;
+  int64_t year = tm.tm_year + 1900;
+  const int64_t month = tm.tm_mon + 1;
+  year -= month <= 2 ? 1 : 0;
+  const int64_t era = (year >= 0 ? year : year - 399) / 400;
+  const int64_t year_of_era = year - era * 400;
+  const int64_t day_of_year =
+      (153 * (month + (month > 2 ? -3 : 9)) + 2) / 5 + tm.tm_mday - 1;
+  const int64_t day_of_era =
+      year_of_era * 365 + year_of_era / 4 - year_of_era / 100 + day_of_year;
+  const int64_t days = era * 146097 + day_of_era - 719468;
+  return days * 86400 + tm.tm_hour * 3600 + tm.tm_min * 60 + tm.tm_sec;
+}
+
+// Vault files are named after the IDs produced by GenerateUUID(): five groups
+// of hex digits separated by dashes. Older builds did not zero-pad the groups,
+// so only the shape is checked, not the exact length.
+bool IsVaultFileName(const std::string& name) {
+  if (name.empty() || name.front() == '-' || name.back() == '-') return false;
+  int dashes = 0;
+  for (char c : name) {
+    if (c == '-') {
+      ++dashes;
+    } else if (!std::isxdigit(static_cast<unsigned char>(c))) {
+      return false;
+    }
+  }
+  return dashes == 4;
+}
+
+// Read-only view of a neutralized vault file that reverses the XOR on the
+// fly, so quarantined content can be scanned without restoring it to disk.
+class XorDecryptingStreamBuf : public std::streambuf {
+ public:
+  explicit XorDecryptingStreamBuf(const std::string& filepath)
+      : file_(filepath, std::ios::binary), buffer_(kChunkSize) {
+    setg(buffer_.data(), buffer_.data(), buffer_.data());
+  }
+
+  bool is_open() const { return file_.is_open(); }
+
+ protected:
+  int_type underflow() override {
+    if (gptr() < egptr()) return traits_type::to_int_type(*gptr());
+    file_.read(buffer_.data(), static_cast<std::streamsize>(buffer_.size()));
+    const std::streamsize bytes_read = file_.gcount();
+    if (bytes_read <= 0) return traits_type::eof();
+    for (std::streamsize i = 0; i < bytes_read; ++i) {
+      buffer_[i] ^= kXorKey[(position_ + i) % kXorKey.size()];
+    }
+    position_ += static_cast<uint64_t>(bytes_read);
+    setg(buffer_.data(), buffer_.data(), buffer_.data() + bytes_read);
+    return traits_type::to_int_type(*gptr());
+  }
+
+  pos_type seekoff(off_type offset, std::ios_base::seekdir direction,
+                   std::ios_base::openmode which) override {
+    if (direction == std::ios_base::cur) {
+      offset += static_cast<off_type>(position_) - (egptr() - gptr());
+    } else if (direction == std::ios_base::end) {
+      file_.clear();
+      file_.seekg(0, std::ios::end);
+      offset += static_cast<off_type>(file_.tellg());
+    }
+    return seekpos(pos_type(offset), which);
+  }
+
+  pos_type seekpos(pos_type position, std::ios_base::openmode which) override {
+    if (!(which & std::ios_base::in) || off_type(position) < 0) {
+      return pos_type(off_type(-1));
+    }
+    file_.clear();
+    file_.seekg(position);
+    if (!file_) return pos_type(off_type(-1));
+    position_ = static_cast<uint64_t>(off_type(position));
+    setg(buffer_.data(), buffer_.data(), buffer_.data());
+    return position;
+  }
+
+ private:
+  static constexpr size_t kChunkSize = 8192;
+  std::ifstream file_;
+  std::vector<char> buffer_;
+  uint64_t position_{0};  // Offset of the end of the buffered chunk.
+};
+
+// Exclusive advisory lock on the vault's lock file, held by writers for the
+// whole read-modify-write cycle so that several processes sharing one vault
+// cannot lose each other's ledger updates. Readers never take it.
+class LedgerFileLock {
+ public:
+  explicit LedgerFileLock(const std::filesystem::path& lock_path) {
+#ifdef _WIN32
+    handle_ = CreateFileW(lock_path.c_str(), GENERIC_READ | GENERIC_WRITE,
+                          FILE_SHARE_READ | FILE_SHARE_WRITE | FILE_SHARE_DELETE,
+                          nullptr, OPEN_ALWAYS, FILE_ATTRIBUTE_NORMAL, nullptr);
+    OVERLAPPED overlapped{};
+    if (handle_ == INVALID_HANDLE_VALUE ||
+        !LockFileEx(handle_, LOCKFILE_EXCLUSIVE_LOCK, 0, MAXDWORD, MAXDWORD,
+                    &overlapped)) {
+      if (handle_ != INVALID_HANDLE_VALUE) CloseHandle(handle_);
+      throw QuarantineError("Failed to lock metadata ledger: " +
+                            lock_path.string());
+    }
+#else
+    fd_ = open(lock_path.c_str(), O_RDWR | O_CREAT | O_CLOEXEC, 0600);
+    int rc = -1;
+    if (fd_ >= 0) {
+      do {
+        rc = flock(fd_, LOCK_EX);
+      } while (rc != 0 && errno == EINTR);
+    }
+    if (rc != 0) {
+      if (fd_ >= 0) close(fd_);
+      throw QuarantineError("Failed to lock metadata ledger: " +
+                            lock_path.string());
+    }
+#endif
+  }
+
+  ~LedgerFileLock() {
+#ifdef _WIN32
+    OVERLAPPED overlapped{};
+    UnlockFileEx(handle_, 0, MAXDWORD, MAXDWORD, &overlapped);
+    CloseHandle(handle_);
+#else
+    flock(fd_, LOCK_UN);
+    close(fd_);
+#endif
+  }
+
+  LedgerFileLock(const LedgerFileLock&) = delete;
+  LedgerFileLock& operator=(const LedgerFileLock&) = delete;
+
+ private:
+#ifdef _WIN32
+  HANDLE handle_{INVALID_HANDLE_VALUE};
+#else
+  int fd_{-1};
+#endif
+};
+
+// Read-only memory mapping of a whole file. Ledger writers replace the file
+// with an atomic rename, so a mapping always shows one complete snapshot.
+class MappedFile {
+ public:
+  explicit MappedFile(const std::filesystem::path& path) {
+#ifdef _WIN32
+    file_ = CreateFileW(path.c_str(), GENERIC_READ,
+                        FILE_SHARE_READ | FILE_SHARE_WRITE | FILE_SHARE_DELETE,
+                        nullptr, OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, nullptr);
+    if (file_ == INVALID_HANDLE_VALUE) return;
+    LARGE_INTEGER size{};
+    if (!GetFileSizeEx(file_, &size) || size.QuadPart == 0) return;
+    mapping_ = CreateFileMappingW(file_, nullptr, PAGE_READONLY, 0, 0, nullptr);
+    if (mapping_ == nullptr) return;
+    data_ = static_cast<const char*>(
+        MapViewOfFile(mapping_, FILE_MAP_READ, 0, 0, 0));
+    if (data_ != nullptr) size_ = static_cast<size_t>(size.QuadPart);
+#else
+    fd_ = open(path.c_str(), O_RDONLY | O_CLOEXEC);
+    if (fd_ < 0) return;
+    struct stat st {};
+    if (fstat(fd_, &st) != 0 || st.st_size == 0) return;
+    void* mapped = mmap(nullptr, static_cast<size_t>(st.st_size), PROT_READ,
+                        MAP_PRIVATE, fd_, 0);
+    if (mapped == MAP_FAILED) return;
+    data_ = static_cast<const char*>(mapped);
+    size_ = static_cast<size_t>(st.st_size);
+#endif
+  }
+
+  ~MappedFile() {
+#ifdef _WIN32
+    if (data_ != nullptr) UnmapViewOfFile(data_);
+    if (mapping_ != nullptr) CloseHandle(mapping_);
+    if (file_ != INVALID_HANDLE_VALUE) CloseHandle(file_);
+#else
+    if (data_ != nullptr) munmap(const_cast<char*>(data_), size_);
+    if (fd_ >= 0) close(fd_);
+#endif
+  }
+
+  MappedFile(const MappedFile&) = delete;
+  MappedFile& operator=(const MappedFile&) = delete;
+
+  const char* data() const { return data_; }
+  size_t size() const { return size_; }
+
+ private:
+  const char* data_{nullptr};
+  size_t size_{0};
+#ifdef _WIN32
+  HANDLE file_{INVALID_HANDLE_VALUE};
+  HANDLE mapping_{nullptr};
+#else
+  int fd_{-1};
+#endif
+};
+
+// Retention work must never compete with active scans for CPU time.
+void LowerCurrentThreadPriority() {
+#ifdef _WIN32
+  SetThreadPriority(GetCurrentThread(), THREAD_PRIORITY_LOWEST);
+#elif defined(__linux__)
+  // On Linux, PRIO_PROCESS with a thread ID of 0 affects only this thread.
+  setpriority(PRIO_PROCESS, 0, 19);
+#endif
+}
+
+struct QuarantineMetrics {
+  LatencyHistogram& quarantine_latency;
+  Counter& quarantined;
+  Counter& restored;
+};
+
+const QuarantineMetrics& Metrics() {
+  auto& registry = MetricsRegistry::GetInstance();
+  static const QuarantineMetrics metrics{
+      registry.GetHistogram("caninana_quarantine_duration_seconds",
+                            "Time to quarantine and record a file."),
+      registry.GetCounter("caninana_files_quarantined_total",
+                          "Files moved into quarantine."),
+      registry.GetCounter("caninana_files_restored_total",
+                          "Files restored from quarantine.")};
+  return metrics;
+}
 }  // namespace
 
+struct QuarantineManager::LedgerIndex {
+  /// All entries, newest first.
+  std::vector<QuarantineEntry> entries;
+  /// Positions in `entries` per threat name, in ascending order.
+  std::unordered_map<std::string, std::vector<size_t>> by_threat;
+  /// Identity of the ledger file this index was built from.
+  std::filesystem::file_time_type ledger_mtime;
+  uintmax_t ledger_size{0};
+};
+
 QuarantineManager::QuarantineManager(const std::string& root_path) {
   if (!root_path.empty()) {
     quarantine_path_ =
@@ -70,9 +349,13 @@ QuarantineManager::QuarantineManager(const std::string& root_path) {
   }
   metadata_path_ =
       (std::filesystem::path(quarantine_path_) / kMetadataFileName).string();
+  lock_path_ =
+      (std::filesystem::path(quarantine_path_) / kLockFileName).string();
   InitializeQuarantineDirectory();
 }
 
+QuarantineManager::~QuarantineManager() { StopRetentionTask(); }
+
 void QuarantineManager::InitializeQuarantineDirectory() {
   try {
     std::filesystem::create_directories(quarantine_path_);
@@ -93,6 +376,9 @@ void QuarantineManager::InitializeQuarantineDirectory() {
 
 void QuarantineManager::QuarantineFile(
     const std::string& filepath, const SignatureEngine::ScanResult& threat) {
+  ScopedLatency quarantine_timer(Metrics().quarantine_latency);
+  PerformanceMonitor::ScopedSpan quarantine_span(
+      PerformanceMonitor::Stage::QUARANTINE);
   if (!std::filesystem::exists(filepath)) {
     throw FileAccessError("Quarantine failed. File does not exist: " +
                           filepath);
@@ -105,11 +391,22 @@ void QuarantineManager::QuarantineFile(
   new_entry.threat_name = threat.detected_signatures.empty()
                               ? "UnknownThreat"
                               : threat.detected_signatures.front();
+  new_entry.severity = threat.max_severity;
+  std::error_code size_ec;
+  new_entry.size_bytes = std::filesystem::file_size(filepath, size_ec);
+  if (size_ec) new_entry.size_bytes = 0;
 
   const std::string quarantined_filepath =
       (std::filesystem::path(quarantine_path_) / new_entry.quarantine_id)
           .string();
 
+  // Held across the move so retention compaction never sees the new vault
+  // file before its ledger entry exists.
+  std::lock_guard<std::mutex> ledger_guard(ledger_mutex_);
+  LedgerFileLock file_lock(lock_path_);
+  // Read first: rewriting a ledger that could not be read would drop every
+  // entry in it.
+  auto entries = ReadLedgerChecked();
   try {
     std::filesystem::rename(filepath, quarantined_filepath);
   } catch (const std::filesystem::filesystem_error& e) {
@@ -129,10 +426,8 @@ void QuarantineManager::QuarantineFile(
         new_entry.quarantine_id);
   }
 
-  auto entries = ListQuarantinedFiles();
   entries.push_back(new_entry);
-  std::ofstream ledger_file(metadata_path_);
-  if (!ledger_file.is_open()) {
+  if (!WriteLedger(entries)) {
     // Critical failure: file is quarantined but not tracked. Attempt recovery.
     try {
       ProcessFileXOR(quarantined_filepath);  // De-neutralize
@@ -144,15 +439,22 @@ void QuarantineManager::QuarantineFile(
         new_entry.quarantine_id);
   }
 
-  ledger_file << nlohmann::json(entries).dump(2);
+  Metrics().quarantined.Increment();
+  SecurityLogger::LogFields fields;
+  fields.file_path = new_entry.original_path;
+  fields.signatures.push_back(new_entry.threat_name);
+  fields.bytes = new_entry.size_bytes;
   SecurityLogger::GetInstance().Log(
       SecurityLogger::LogLevel::WARNING, "QuarantineManager",
       "File quarantined. Original path: " + new_entry.original_path +
-          ", ID: " + new_entry.quarantine_id);
+          ", ID: " + new_entry.quarantine_id,
+      fields);
 }
 
 void QuarantineManager::RestoreFile(const std::string& quarantine_id) {
-  auto entries = ListQuarantinedFiles();
+  std::lock_guard<std::mutex> ledger_guard(ledger_mutex_);
+  LedgerFileLock file_lock(lock_path_);
+  auto entries = ReadLedgerChecked();
   auto it = std::find_if(
       entries.begin(), entries.end(),
       [&](const QuarantineEntry& e) { return e.quarantine_id == quarantine_id; });
@@ -172,7 +474,11 @@ void QuarantineManager::RestoreFile(const std::string& quarantine_id) {
         "Restore failed. File missing from storage. ID: " + quarantine_id);
   }
 
-  if (!ProcessFileXOR(quarantined_filepath)) {
+  auto process = [&](const std::string& path) {
+    return entry_to_restore.vault_format == 0 ? ProcessFileXORLegacy(path)
+                                              : ProcessFileXOR(path);
+  };
+  if (!process(quarantined_filepath)) {
     throw QuarantineError("Restore failed. Could not de-neutralize file. ID: " +
                           quarantine_id);
   }
@@ -186,41 +492,486 @@ void QuarantineManager::RestoreFile(const std::string& quarantine_id) {
     std::filesystem::rename(quarantined_filepath,
                             entry_to_restore.original_path);
   } catch (const std::filesystem::filesystem_error& e) {
-    ProcessFileXOR(quarantined_filepath);  // Re-neutralize on failure.
+    process(quarantined_filepath);  // Re-neutralize on failure.
     throw QuarantineError("Restore failed. Could not move file to original location '" +
                           entry_to_restore.original_path +
                           "'. Error: " + e.what());
   }
 
   entries.erase(it);
-  std::ofstream ledger_file(metadata_path_);
-  if (ledger_file.is_open()) {
-    ledger_file << nlohmann::json(entries).dump(2);
-  } else {
+  if (!WriteLedger(entries)) {
     SecurityLogger::GetInstance().Log(
         SecurityLogger::LogLevel::CRITICAL, "QuarantineManager",
         "Restore succeeded, but failed to update metadata ledger for ID: " +
             quarantine_id);
   }
 
+  Metrics().restored.Increment();
+  SecurityLogger::LogFields fields;
+  fields.file_path = entry_to_restore.original_path;
+  fields.bytes = entry_to_restore.size_bytes;
   SecurityLogger::GetInstance().Log(
       SecurityLogger::LogLevel::INFO, "QuarantineManager",
       "File restored. ID: " + quarantine_id +
-          ", Path: " + entry_to_restore.original_path);
+          ", Path: " + entry_to_restore.original_path,
+      fields);
 }
 
 std::vector<QuarantineEntry> QuarantineManager::ListQuarantinedFiles() const {
-  std::vector<QuarantineEntry> entries;
-  std::ifstream ledger_file(metadata_path_);
-  if (!ledger_file.is_open()) return entries;
+  return ReadLedger();
+}
+
+std::vector<QuarantineEntry> QuarantineManager::ReadLedger() const {
   try {
-    nlohmann::json j;
-    ledger_file >> j;
-    if (j.is_array()) entries = j.get<std::vector<QuarantineEntry>>();
-  } catch (const nlohmann::json::exception&) {
+    return ReadLedgerChecked();
+  } catch (const QuarantineError&) {
     return {};
   }
-  return entries;
+}
+
+std::vector<QuarantineEntry> QuarantineManager::ReadLedgerChecked() const {
+  // Lock-free: the mapping pins whichever complete ledger version was current
+  // when it was opened, even if a writer renames a new one into place.
+  MappedFile ledger(metadata_path_);
+  if (ledger.data() == nullptr) {
+    throw QuarantineError("Could not read metadata ledger: " + metadata_path_);
+  }
+  try {
+    const auto j = nlohmann::json::parse(ledger.data(),
+                                         ledger.data() + ledger.size());
+    if (j.is_array()) return j.get<std::vector<QuarantineEntry>>();
+  } catch (const nlohmann::json::exception& e) {
+    throw QuarantineError("Metadata ledger is corrupt: " + metadata_path_ +
+                          ". Error: " + e.what());
+  }
+  throw QuarantineError("Metadata ledger is not a JSON array: " +
+                        metadata_path_);
+}
+
+bool QuarantineManager::WriteLedger(
+    const std::vector<QuarantineEntry>& entries) const {
+  const std::string tmp_path = metadata_path_ + ".tmp";
+  {
+    std::ofstream ledger_file(tmp_path, std::ios::binary | std::ios::trunc);
+    if (!ledger_file.is_open()) return false;
+    ledger_file << nlohmann::json(entries).dump(2);
+    ledger_file.flush();
+    if (!ledger_file) return false;
+  }
+  // Windows refuses to replace a file while a reader has it mapped; readers
+  // hold their mapping only for one parse, so retry briefly.
+  std::error_code ec;
+  for (int attempt = 0; attempt < 50; ++attempt) {
+    std::filesystem::rename(tmp_path, metadata_path_, ec);
+    if (!ec) break;
+    std::this_thread::sleep_for(std::chrono::milliseconds(10));
+  }
+  if (ec) {
+    std::filesystem::remove(tmp_path, ec);
+    return false;
+  }
+  std::filesystem::file_time_type mtime =
+      std::filesystem::last_write_time(metadata_path_, ec);
+  const uintmax_t size = std::filesystem::file_size(metadata_path_, ec);
+  PublishIndex(entries, mtime, size);
+  return true;
+}
+
+void QuarantineManager::PublishIndex(
+    std::vector<QuarantineEntry> entries,
+    std::filesystem::file_time_type ledger_mtime,
+    uintmax_t ledger_size) const {
+  auto index = std::make_shared<LedgerIndex>();
+  index->ledger_mtime = ledger_mtime;
+  index->ledger_size = ledger_size;
+
+  // ISO-8601 UTC timestamps sort chronologically as plain strings. The ledger
+  // is append-ordered, so reversing first keeps same-second entries newest
+  // first as well.
+  std::reverse(entries.begin(), entries.end());
+  std::stable_sort(entries.begin(), entries.end(),
+                   [](const QuarantineEntry& a, const QuarantineEntry& b) {
+                     return a.quarantine_date > b.quarantine_date;
+                   });
+  index->entries = std::move(entries);
+  for (size_t i = 0; i < index->entries.size(); ++i) {
+    index->by_threat[index->entries[i].threat_name].push_back(i);
+  }
+
+  std::lock_guard<std::mutex> guard(index_mutex_);
+  index_ = std::move(index);
+}
+
+std::shared_ptr<const QuarantineManager::LedgerIndex>
+QuarantineManager::GetIndex() const {
+  std::error_code ec;
+  const auto mtime = std::filesystem::last_write_time(metadata_path_, ec);
+  const auto size = std::filesystem::file_size(metadata_path_, ec);
+  {
+    std::lock_guard<std::mutex> guard(index_mutex_);
+    if (index_ && index_->ledger_mtime == mtime &&
+        index_->ledger_size == size) {
+      return index_;
+    }
+  }
+  // The ledger was changed by another QuarantineManager or process. The stamp
+  // is taken before reading, so a write racing with this rebuild only causes
+  // one more rebuild on the next call.
+  PublishIndex(ReadLedger(), mtime, size);
+  std::lock_guard<std::mutex> guard(index_mutex_);
+  return index_;
+}
+
+namespace {
+// Number of leading (newest) index entries dated at or after `since`.
+size_t CountSince(const std::vector<QuarantineEntry>& newest_first,
+                  const std::string& since) {
+  if (since.empty()) return newest_first.size();
+  const auto end = std::partition_point(
+      newest_first.begin(), newest_first.end(),
+      [&](const QuarantineEntry& e) { return e.quarantine_date >= since; });
+  return static_cast<size_t>(end - newest_first.begin());
+}
+
+bool HasPrefix(const std::string& value, const std::string& prefix) {
+  return value.compare(0, prefix.size(), prefix) == 0;
+}
+
+// Calls `visit(entry)` for every match in newest-first order until it
+// returns false.
+template <typename Index, typename Visitor>
+void VisitMatches(const Index& index, const QuarantineQuery& query,
+                  Visitor visit) {
+  const size_t since_end = CountSince(index.entries, query.since);
+  auto matches = [&](size_t position) {
+    return query.path_prefix.empty() ||
+           HasPrefix(index.entries[position].original_path, query.path_prefix);
+  };
+  if (!query.threat.empty()) {
+    auto it = index.by_threat.find(query.threat);
+    if (it == index.by_threat.end()) return;
+    for (size_t position : it->second) {
+      if (position >= since_end) return;
+      if (matches(position) && !visit(index.entries[position])) return;
+    }
+    return;
+  }
+  for (size_t position = 0; position < since_end; ++position) {
+    if (matches(position) && !visit(index.entries[position])) return;
+  }
+}
+}  // namespace
+
+std::vector<QuarantineEntry> QuarantineManager::ListQuarantined(
+    size_t offset, size_t limit, const QuarantineQuery& query) const {
+  std::vector<QuarantineEntry> page;
+  if (limit == 0) return page;
+  const auto index = GetIndex();
+  size_t skipped = 0;
+  VisitMatches(*index, query, [&](const QuarantineEntry& entry) {
+    if (skipped < offset) {
+      ++skipped;
+      return true;
+    }
+    page.push_back(entry);
+    return page.size() < limit;
+  });
+  return page;
+}
+
+size_t QuarantineManager::CountQuarantined(const QuarantineQuery& query) const {
+  const auto index = GetIndex();
+  const size_t since_end = CountSince(index->entries, query.since);
+  if (query.path_prefix.empty()) {
+    if (query.threat.empty()) return since_end;
+    auto it = index->by_threat.find(query.threat);
+    if (it == index->by_threat.end()) return 0;
+    return static_cast<size_t>(
+        std::lower_bound(it->second.begin(), it->second.end(), since_end) -
+        it->second.begin());
+  }
+  size_t count = 0;
+  VisitMatches(*index, query, [&](const QuarantineEntry&) {
+    ++count;
+    return true;
+  });
+  return count;
+}
+
+RescanSummary QuarantineManager::RescanVault(SignatureEngine& engine,
+                                            size_t max_threads) {
+  const std::vector<QuarantineEntry> snapshot = ReadLedgerChecked();
+
+  enum class Outcome { FAILED, DETECTED, CLEAN };
+  struct Verdict {
+    Outcome outcome{Outcome::FAILED};
+    std::string threat_name;
+    uint8_t severity{0};
+  };
+  std::vector<Verdict> verdicts(snapshot.size());
+  std::atomic<size_t> next_index{0};
+
+  // The ledger lock is not held while scanning, so entries restored or
+  // evicted in the meantime simply fail to open and are skipped.
+  auto worker = [&]() {
+    FileTypeAnalyzer analyzer;
+    for (size_t i = next_index++; i < snapshot.size(); i = next_index++) {
+      const std::string stored_path =
+          (std::filesystem::path(quarantine_path_) /
+           snapshot[i].quarantine_id)
+              .string();
+      if (snapshot[i].vault_format == 0) continue;
+      try {
+        std::error_code ec;
+        const uint64_t size = std::filesystem::file_size(stored_path, ec);
+        if (ec) continue;
+        XorDecryptingStreamBuf decrypted(stored_path);
+        if (!decrypted.is_open()) continue;
+        std::istream stream(&decrypted);
+        const FileInfo info = analyzer.AnalyzeStream(stream, size);
+        stream.clear();
+        stream.seekg(0, std::ios::beg);
+        const auto result = engine.Scan(stream, info);
+        if (result.status != SignatureEngine::ScanResult::ScanStatus::COMPLETE) {
+          continue;
+        }
+        Verdict& verdict = verdicts[i];
+        if (result.threat_detected && !result.detected_signatures.empty()) {
+          verdict.outcome = Outcome::DETECTED;
+          verdict.threat_name = result.detected_signatures.front();
+          verdict.severity = result.max_severity;
+        } else {
+          verdict.outcome = Outcome::CLEAN;
+        }
+      } catch (const std::exception& e) {
+        SecurityLogger::GetInstance().Log(
+            SecurityLogger::LogLevel::LOG_ERROR, "QuarantineManager",
+            "Rescan failed for ID: " + snapshot[i].quarantine_id +
+                ". Error: " + e.what());
+      }
+    }
+  };
+
+  size_t thread_count =
+      max_threads > 0 ? max_threads : std::thread::hardware_concurrency();
+  thread_count = std::max<size_t>(1, std::min(thread_count, snapshot.size()));
+  std::vector<std::thread> workers;
+  for (size_t t = 1; t < thread_count; ++t) workers.emplace_back(worker);
+  worker();
+  for (auto& thread : workers) thread.join();
+
+  std::unordered_map<std::string, size_t> verdict_by_id;
+  for (size_t i = 0; i < snapshot.size(); ++i) {
+    verdict_by_id[snapshot[i].quarantine_id] = i;
+  }
+
+  RescanSummary summary;
+  const std::string rescan_date = GetCurrentTimestamp();
+  std::lock_guard<std::mutex> ledger_guard(ledger_mutex_);
+  LedgerFileLock file_lock(lock_path_);
+  auto entries = ReadLedgerChecked();
+  for (auto& entry : entries) {
+    auto it = verdict_by_id.find(entry.quarantine_id);
+    if (it == verdict_by_id.end()) continue;
+    const Verdict& verdict = verdicts[it->second];
+    if (verdict.outcome == Outcome::FAILED) {
+      ++summary.failed;
+      continue;
+    }
+    ++summary.scanned;
+    entry.last_rescan_date = rescan_date;
+    if (verdict.outcome == Outcome::CLEAN) {
+      entry.threat_detected = false;
+      // No longer a threat, so LEAST_SEVERE_FIRST evicts it first.
+      entry.severity = 0;
+      ++summary.cleared;
+      continue;
+    }
+    ++summary.detected;
+    if (entry.threat_name != verdict.threat_name) ++summary.reclassified;
+    entry.threat_detected = true;
+    entry.threat_name = verdict.threat_name;
+    entry.severity = verdict.severity;
+  }
+  if (!WriteLedger(entries)) {
+    throw QuarantineError(
+        "Rescan failed. Could not write updated metadata ledger: " +
+        metadata_path_);
+  }
+
+  SecurityLogger::GetInstance().Log(
+      SecurityLogger::LogLevel::WARNING, "QuarantineManager",
+      "Vault rescan complete. Scanned: " + std::to_string(summary.scanned) +
+          ", reclassified: " + std::to_string(summary.reclassified) +
+          ", cleared: " + std::to_string(summary.cleared) +
+          ", failed: " + std::to_string(summary.failed));
+  return summary;
+}
+
+void QuarantineManager::SetRetentionPolicy(const RetentionPolicy& policy) {
+  {
+    std::lock_guard<std::mutex> guard(retention_mutex_);
+    retention_policy_ = policy;
+  }
+  retention_cv_.notify_all();
+}
+
+RetentionPolicy QuarantineManager::GetRetentionPolicy() const {
+  std::lock_guard<std::mutex> guard(retention_mutex_);
+  return retention_policy_;
+}
+
+size_t QuarantineManager::EnforceRetention() {
+  const RetentionPolicy policy = GetRetentionPolicy();
+  std::lock_guard<std::mutex> ledger_guard(ledger_mutex_);
+  LedgerFileLock file_lock(lock_path_);
+  std::vector<QuarantineEntry> entries;
+  try {
+    entries = ReadLedgerChecked();
+  } catch (const QuarantineError& e) {
+    // An unreadable ledger is not an empty one: compacting against it would
+    // delete every file in the vault.
+    SecurityLogger::GetInstance().Log(
+        SecurityLogger::LogLevel::LOG_ERROR, "QuarantineManager",
+        "Retention skipped. " + std::string(e.what()));
+    return 0;
+  }
+
+  // Compaction: only entries whose neutralized file still exists survive.
+  std::vector<QuarantineEntry> live;
+  live.reserve(entries.size());
+  std::unordered_set<std::string> live_ids;
+  for (const auto& entry : entries) {
+    std::error_code ec;
+    const auto stored_path =
+        std::filesystem::path(quarantine_path_) / entry.quarantine_id;
+    const uint64_t stored_size = std::filesystem::file_size(stored_path, ec);
+    if (ec) continue;
+    QuarantineEntry updated = entry;
+    updated.size_bytes = stored_size;
+    live_ids.insert(updated.quarantine_id);
+    live.push_back(std::move(updated));
+  }
+  const size_t dropped = entries.size() - live.size();
+
+  std::error_code dir_ec;
+  for (const auto& dir_entry :
+       std::filesystem::directory_iterator(quarantine_path_, dir_ec)) {
+    const std::string name = dir_entry.path().filename().string();
+    if (IsVaultFileName(name) && live_ids.count(name) == 0) {
+      std::error_code remove_ec;
+      std::filesystem::remove(dir_entry.path(), remove_ec);
+    }
+  }
+
+  // Eviction candidates in the order they should be removed.
+  std::vector<size_t> order(live.size());
+  for (size_t i = 0; i < order.size(); ++i) order[i] = i;
+  std::stable_sort(order.begin(), order.end(), [&](size_t a, size_t b) {
+    if (policy.eviction_order == EvictionOrder::LEAST_SEVERE_FIRST &&
+        live[a].severity != live[b].severity) {
+      return live[a].severity < live[b].severity;
+    }
+    return live[a].quarantine_date < live[b].quarantine_date;
+  });
+
+  std::vector<bool> evict(live.size(), false);
+  uint64_t total_bytes = 0;
+  for (const auto& entry : live) total_bytes += entry.size_bytes;
+  size_t remaining = live.size();
+
+  if (policy.max_age.count() > 0) {
+    const int64_t cutoff =
+        std::chrono::duration_cast<std::chrono::seconds>(
+            std::chrono::system_clock::now().time_since_epoch())
+            .count() -
+        policy.max_age.count();
+    for (size_t i = 0; i < live.size(); ++i) {
+      if (ParseTimestamp(live[i].quarantine_date) < cutoff) {
+        evict[i] = true;
+        total_bytes -= live[i].size_bytes;
+        --remaining;
+      }
+    }
+  }
+  for (size_t index : order) {
+    const bool over_count =
+        policy.max_entries > 0 && remaining > policy.max_entries;
+    const bool over_bytes =
+        policy.max_total_bytes > 0 && total_bytes > policy.max_total_bytes;
+    if (!over_count && !over_bytes) break;
+    if (evict[index]) continue;
+    evict[index] = true;
+    total_bytes -= live[index].size_bytes;
+    --remaining;
+  }
+
+  std::vector<QuarantineEntry> kept;
+  kept.reserve(remaining);
+  size_t evicted = 0;
+  for (size_t i = 0; i < live.size(); ++i) {
+    if (!evict[i]) {
+      kept.push_back(std::move(live[i]));
+      continue;
+    }
+    std::error_code remove_ec;
+    std::filesystem::remove(
+        std::filesystem::path(quarantine_path_) / live[i].quarantine_id,
+        remove_ec);
+    ++evicted;
+  }
+
+  if (dropped == 0 && evicted == 0) {
+    return 0;
+  }
+  if (!WriteLedger(kept)) {
+    throw QuarantineError(
+        "Retention failed. Could not write compacted metadata ledger: " +
+        metadata_path_);
+  }
+  SecurityLogger::GetInstance().Log(
+      SecurityLogger::LogLevel::WARNING, "QuarantineManager",
+      "Retention enforced. Evicted: " + std::to_string(evicted) +
+          ", dropped missing: " + std::to_string(dropped) +
+          ", remaining: " + std::to_string(kept.size()));
+  return evicted + dropped;
+}
+
+void QuarantineManager::StartRetentionTask() {
+  std::lock_guard<std::mutex> guard(retention_mutex_);
+  if (retention_thread_.joinable()) return;
+  retention_stop_requested_ = false;
+  retention_thread_ = std::thread(&QuarantineManager::RetentionLoop, this);
+}
+
+void QuarantineManager::StopRetentionTask() {
+  {
+    std::lock_guard<std::mutex> guard(retention_mutex_);
+    retention_stop_requested_ = true;
+  }
+  retention_cv_.notify_all();
+  if (retention_thread_.joinable()) retention_thread_.join();
+}
+
+void QuarantineManager::RetentionLoop() {
+  LowerCurrentThreadPriority();
+  std::unique_lock<std::mutex> lock(retention_mutex_);
+  while (!retention_stop_requested_) {
+    lock.unlock();
+    try {
+      EnforceRetention();
+    } catch (const std::exception& e) {
+      SecurityLogger::GetInstance().Log(
+          SecurityLogger::LogLevel::LOG_ERROR, "QuarantineManager",
+          "Background retention pass failed: " + std::string(e.what()));
+    }
+    lock.lock();
+    const auto interval =
+        std::max(retention_policy_.enforcement_interval,
+                 std::chrono::seconds(1));
+    // Wakes early on stop requests and on policy changes.
+    retention_cv_.wait_for(lock, interval);
+  }
 }
 
 bool QuarantineManager::ProcessFileXOR(const std::string& filepath) const {
@@ -228,6 +979,38 @@ bool QuarantineManager::ProcessFileXOR(const std::string& filepath) const {
   std::fstream file(filepath, std::ios::in | std::ios::out | std::ios::binary);
   if (!file.is_open()) return false;
   char buffer[4096];
+  std::streamoff offset = 0;
+  while (true) {
+    // Explicit seeks between every read and write; switching directions
+    // on an fstream without one is undefined.
+    file.seekg(offset);
+    file.read(buffer, sizeof(buffer));
+    const std::streamsize bytes_read = file.gcount();
+    if (bytes_read <= 0) break;
+    for (std::streamsize i = 0; i < bytes_read; ++i) {
+      buffer[i] ^= kXorKey[(offset + i) % kXorKey.size()];
+    }
+    file.clear();
+    file.seekp(offset);
+    file.write(buffer, bytes_read);
+    if (!file) return false;
+    offset += bytes_read;
+  }
+  file.clear();
+  file.flush();
+  return static_cast<bool>(file);
+}
+
+// The original implementation, kept only to restore entries written before
+// vault_format 1. It switched between reading and writing without seeking, so
+// how much of the file it actually neutralized depends on the C++ runtime;
+// running the same code again is the only way to invert it.
+bool QuarantineManager::ProcessFileXORLegacy(
+    const std::string& filepath) const {
+  if (kXorKey.empty()) return false;
+  std::fstream file(filepath, std::ios::in | std::ios::out | std::ios::binary);
+  if (!file.is_open()) return false;
+  char buffer[4096];
   size_t key_index = 0;
   while (file.read(buffer, sizeof(buffer)) || file.gcount() > 0) {
     std::streamsize bytes_read = file.gcount();
@@ -0,0 +1,182 @@
+#include "scan_watchdog.h"
+
+#include <algorithm>
+
+#include "metrics.h"
+#include "security_logger.h"
+
+namespace caninana {
+namespace core {
+
+struct ScanWatchdog::Watch::Entry {
+  std::string label;
+  Clock::time_point deadline;  // Guarded by the watchdog mutex.
+  std::chrono::milliseconds grace{0};
+  std::function<void()> on_hung;
+  std::atomic<bool> cancel{false};
+  std::atomic<bool> expired{false};
+
+  Clock::time_point HangDeadline() const {
+    if (deadline == Clock::time_point::max()) return deadline;
+    return deadline + grace;
+  }
+};
+
+namespace {
+
+struct WatchdogMetrics {
+  Counter& cancelled;
+  Counter& hung;
+};
+
+const WatchdogMetrics& Metrics() {
+  auto& registry = MetricsRegistry::GetInstance();
+  static const WatchdogMetrics metrics{
+      registry.GetCounter("caninana_scans_deadline_cancelled_total",
+                          "Scans cancelled by the watchdog at their deadline."),
+      registry.GetCounter("caninana_scan_workers_hung_total",
+                          "Scans still running a grace period after their "
+                          "deadline.")};
+  return metrics;
+}
+
+}  // namespace
+
+ScanWatchdog& ScanWatchdog::GetInstance() {
+  static ScanWatchdog instance;
+  return instance;
+}
+
+ScanWatchdog::~ScanWatchdog() {
+  {
+    std::lock_guard<std::mutex> guard(mutex_);
+    stopping_ = true;
+  }
+  wake_.notify_all();
+  if (thread_.joinable()) thread_.join();
+}
+
+// --- Watch ---
+
+ScanWatchdog::Watch::Watch(std::string label, Clock::time_point deadline,
+                           std::chrono::milliseconds grace,
+                           std::function<void()> on_hung)
+    : entry_(std::make_shared<Entry>()) {
+  entry_->label = std::move(label);
+  entry_->deadline = deadline;
+  entry_->grace = grace;
+  entry_->on_hung = std::move(on_hung);
+  ScanWatchdog::GetInstance().Register(entry_);
+}
+
+ScanWatchdog::Watch::~Watch() { ScanWatchdog::GetInstance().Unregister(entry_); }
+
+void ScanWatchdog::Watch::SetDeadline(Clock::time_point deadline) {
+  ScanWatchdog& watchdog = ScanWatchdog::GetInstance();
+  {
+    std::lock_guard<std::mutex> guard(watchdog.mutex_);
+    entry_->deadline = deadline;
+  }
+  watchdog.wake_.notify_all();
+}
+
+void ScanWatchdog::Watch::Cancel() {
+  entry_->cancel.store(true, std::memory_order_relaxed);
+}
+
+const std::atomic<bool>& ScanWatchdog::Watch::CancelFlag() const {
+  return entry_->cancel;
+}
+
+bool ScanWatchdog::Watch::Expired() const {
+  return entry_->expired.load(std::memory_order_relaxed);
+}
+
+// --- Supervisor ---
+
+size_t ScanWatchdog::InFlight() const {
+  std::lock_guard<std::mutex> guard(mutex_);
+  return entries_.size();
+}
+
+void ScanWatchdog::Register(const std::shared_ptr<Watch::Entry>& entry) {
+  {
+    std::lock_guard<std::mutex> guard(mutex_);
+    entries_.push_back(entry);
+    if (!thread_.joinable()) {
+      thread_ = std::thread(&ScanWatchdog::Supervise, this);
+    }
+  }
+  wake_.notify_all();
+}
+
+void ScanWatchdog::Unregister(const std::shared_ptr<Watch::Entry>& entry) {
+  std::lock_guard<std::mutex> guard(mutex_);
+  // Hung entries were already removed by the supervisor.
+  auto it = std::find(entries_.begin(), entries_.end(), entry);
+  if (it != entries_.end()) {
+    *it = std::move(entries_.back());
+    entries_.pop_back();
+  }
+}
+
+void ScanWatchdog::Supervise() {
+  std::unique_lock<std::mutex> lock(mutex_);
+  while (!stopping_) {
+    Clock::time_point next_event = Clock::time_point::max();
+    for (const auto& entry : entries_) {
+      next_event = std::min(next_event,
+                            entry->expired.load(std::memory_order_relaxed)
+                                ? entry->HangDeadline()
+                                : entry->deadline);
+    }
+    if (next_event == Clock::time_point::max()) {
+      wake_.wait(lock);
+    } else {
+      wake_.wait_until(lock, next_event);
+    }
+    if (stopping_) break;
+
+    const auto now = Clock::now();
+    std::vector<std::shared_ptr<Watch::Entry>> expired;
+    std::vector<std::shared_ptr<Watch::Entry>> hung;
+    for (size_t i = 0; i < entries_.size();) {
+      const auto& entry = entries_[i];
+      if (!entry->expired.load(std::memory_order_relaxed) &&
+          now >= entry->deadline) {
+        entry->expired.store(true, std::memory_order_relaxed);
+        entry->cancel.store(true, std::memory_order_relaxed);
+        expired.push_back(entry);
+      }
+      if (entry->expired.load(std::memory_order_relaxed) &&
+          now >= entry->HangDeadline()) {
+        hung.push_back(entry);
+        entries_[i] = std::move(entries_.back());
+        entries_.pop_back();
+        continue;
+      }
+      ++i;
+    }
+    if (expired.empty() && hung.empty()) continue;
+
+    // Report and run callbacks without the lock; they may take owner locks
+    // and create new watches.
+    lock.unlock();
+    const WatchdogMetrics& metrics = Metrics();
+    for (const auto& entry : expired) {
+      metrics.cancelled.Increment();
+      CANINANA_LOG(SecurityLogger::LogLevel::WARNING, "ScanWatchdog",
+                   "Scan missed its deadline, cancelling: " + entry->label);
+    }
+    for (const auto& entry : hung) {
+      metrics.hung.Increment();
+      CANINANA_LOG(SecurityLogger::LogLevel::LOG_ERROR, "ScanWatchdog",
+                   "Scan worker is not responding: " + entry->label);
+      if (entry->on_hung) entry->on_hung();
+    }
+    lock.lock();
+  }
+}
+
+}  // namespace core
+}  // namespace caninana
@@ -1,14 +1,100 @@
 #include "security_logger.h"
 
+#include <algorithm>
 #include <chrono>
+#include <ctime>
 #include <filesystem>
 #include <iomanip>
 #include <iostream>
 #include <sstream>  // FIX: Missing header for std::stringstream
 
+#include <nlohmann/json.hpp>
+#include <zlib.h>
+#ifdef CANINANA_HAVE_ZSTD
+#include <zstd.h>
+#endif
+
+#include "tracer.h"
+
 namespace caninana {
 namespace core {
 
+namespace {
+
+constexpr size_t kCompressionChunkSize = 64 * 1024;
+
+/// Local time as `YYYYMMDD-HHMMSS`, used to name rotated segments.
+std::string SegmentStamp(std::chrono::system_clock::time_point now) {
+  const auto in_time_t = std::chrono::system_clock::to_time_t(now);
+  std::tm local_tm{};
+#ifdef _WIN32
+  localtime_s(&local_tm, &in_time_t);
+#else
+  localtime_r(&in_time_t, &local_tm);
+#endif
+  std::stringstream ss;
+  ss << std::put_time(&local_tm, "%Y%m%d-%H%M%S");
+  return ss.str();
+}
+
+bool IsCompressedSegment(const std::filesystem::path& path) {
+  const auto ext = path.extension();
+  return ext == ".gz" || ext == ".zst";
+}
+
+bool GzipFile(const std::filesystem::path& source,
+              const std::filesystem::path& target) {
+  std::ifstream in(source, std::ios::binary);
+  if (!in) return false;
+  gzFile out = gzopen(target.string().c_str(), "wb6");
+  if (!out) return false;
+  std::vector<char> buffer(kCompressionChunkSize);
+  bool ok = true;
+  while (ok && in) {
+    in.read(buffer.data(), static_cast<std::streamsize>(buffer.size()));
+    const auto count = static_cast<unsigned>(in.gcount());
+    if (count > 0 && gzwrite(out, buffer.data(), count) != static_cast<int>(count)) {
+      ok = false;
+    }
+  }
+  return gzclose(out) == Z_OK && ok;
+}
+
+#ifdef CANINANA_HAVE_ZSTD
+bool ZstdFile(const std::filesystem::path& source,
+              const std::filesystem::path& target) {
+  std::ifstream in(source, std::ios::binary);
+  std::ofstream out(target, std::ios::binary | std::ios::trunc);
+  if (!in || !out) return false;
+  std::unique_ptr<ZSTD_CCtx, decltype(&ZSTD_freeCCtx)> ctx(ZSTD_createCCtx(),
+                                                           &ZSTD_freeCCtx);
+  if (!ctx) return false;
+  ZSTD_CCtx_setParameter(ctx.get(), ZSTD_c_compressionLevel, 3);
+
+  std::vector<char> in_buffer(ZSTD_CStreamInSize());
+  std::vector<char> out_buffer(ZSTD_CStreamOutSize());
+  while (true) {
+    in.read(in_buffer.data(), static_cast<std::streamsize>(in_buffer.size()));
+    const size_t read = static_cast<size_t>(in.gcount());
+    const bool last = !in;
+    ZSTD_inBuffer input{in_buffer.data(), read, 0};
+    bool finished = false;
+    while (!finished) {
+      ZSTD_outBuffer output{out_buffer.data(), out_buffer.size(), 0};
+      const size_t remaining = ZSTD_compressStream2(
+          ctx.get(), &output, &input, last ? ZSTD_e_end : ZSTD_e_continue);
+      if (ZSTD_isError(remaining)) return false;
+      out.write(out_buffer.data(), static_cast<std::streamsize>(output.pos));
+      finished = last ? (remaining == 0) : (input.pos == input.size);
+    }
+    if (last) break;
+  }
+  return static_cast<bool>(out);
+}
+#endif
+
+}  // namespace
+
 SecurityLogger& SecurityLogger::GetInstance() {
   // This is thread-safe in C++11 and later.
   static SecurityLogger instance;
@@ -31,9 +117,8 @@ SecurityLogger::SecurityLogger() {
 
   try {
     std::filesystem::create_directories(app_data_path);
-    const std::string log_path =
-        (std::filesystem::path(app_data_path) / "caninana.log").string();
-    log_file_.open(log_path, std::ios::out | std::ios::app);
+    log_path_ = std::filesystem::path(app_data_path) / "caninana.log";
+    OpenLogFileLocked();
   } catch (const std::filesystem::filesystem_error& e) {
     // If we can't write to the file, log to stderr as a last resort.
     std::cerr << "FATAL: Could not open log file: " << e.what() << std::endl;
@@ -41,29 +126,491 @@ SecurityLogger::SecurityLogger() {
 }
 
 SecurityLogger::~SecurityLogger() {
+  DisableAsync();
+  {
+    std::lock_guard<std::mutex> guard(compress_mutex_);
+    compressor_stop_requested_ = true;
+  }
+  compress_cv_.notify_all();
+  if (compressor_thread_.joinable()) compressor_thread_.join();
   if (log_file_.is_open()) {
     log_file_.close();
   }
 }
 
 void SecurityLogger::Log(LogLevel level, const std::string& component,
-                         const std::string& message) {
+                         const std::string& message, const LogFields& fields) {
+  if (!IsEnabled(level)) return;
+  if (async_enabled_.load(std::memory_order_acquire)) {
+    if (!TryPush(level, component, message, fields)) {
+      dropped_.fetch_add(1, std::memory_order_relaxed);
+    }
+    return;
+  }
+
   // Lock the mutex to ensure writes from different threads are not interleaved.
+  std::unique_lock<std::mutex> guard(log_mutex_, std::defer_lock);
+  {
+    ScopedTrace wait_trace("log_lock_wait", "lock", component);
+    guard.lock();
+  }
+  LogRecord record;
+  record.level = level;
+  record.timestamp = std::chrono::system_clock::now();
+  record.component = component;
+  record.message = message;
+  record.fields = fields;
+  WriteLine(FormatRecord(record));
+  if (log_file_.is_open()) log_file_.flush();
+  RememberRecord(record);
+}
+
+void SecurityLogger::SetMinLevel(LogLevel level) {
+  min_level_.store(level, std::memory_order_relaxed);
+}
+
+SecurityLogger::LogLevel SecurityLogger::GetMinLevel() const {
+  return min_level_.load(std::memory_order_relaxed);
+}
+
+void SecurityLogger::SetFormat(LogFormat format) {
+  std::lock_guard<std::mutex> guard(log_mutex_);
+  if (format == format_) return;
+  if (current_size_ > 0) RotateLocked();
+  format_ = format;
+}
+
+SecurityLogger::LogFormat SecurityLogger::GetFormat() const {
+  std::lock_guard<std::mutex> guard(log_mutex_);
+  return format_;
+}
+
+void SecurityLogger::SetRotationPolicy(const RotationPolicy& policy) {
+  {
+    std::lock_guard<std::mutex> guard(log_mutex_);
+    rotation_policy_ = policy;
+  }
+  if (policy.compression == LogCompression::NONE || log_path_.empty()) return;
+
+  // Pick up segments a previous run rotated but did not get to compress.
+  const std::string prefix = log_path_.filename().string() + ".";
+  std::error_code ec;
+  for (const auto& item :
+       std::filesystem::directory_iterator(log_path_.parent_path(), ec)) {
+    const auto& path = item.path();
+    const std::string name = path.filename().string();
+    if (name.rfind(prefix, 0) == 0 && !IsCompressedSegment(path) &&
+        path.extension() != ".part") {
+      QueueCompression(path, policy.compression);
+    }
+  }
+}
+
+SecurityLogger::RotationPolicy SecurityLogger::GetRotationPolicy() const {
+  std::lock_guard<std::mutex> guard(log_mutex_);
+  return rotation_policy_;
+}
+
+void SecurityLogger::Rotate() {
+  std::lock_guard<std::mutex> guard(log_mutex_);
+  if (current_size_ > 0) RotateLocked();
+}
+
+void SecurityLogger::OpenLogFileLocked() {
+  log_file_.open(log_path_, std::ios::out | std::ios::app);
+  std::error_code ec;
+  const auto size = std::filesystem::file_size(log_path_, ec);
+  current_size_ = ec ? 0 : size;
+  segment_started_ = std::chrono::system_clock::now();
+}
+
+void SecurityLogger::MaybeRotateLocked() {
+  if (current_size_ == 0) return;
+  const bool too_big = rotation_policy_.max_bytes > 0 &&
+                       current_size_ >= rotation_policy_.max_bytes;
+  const bool too_old =
+      rotation_policy_.max_age.count() > 0 &&
+      std::chrono::system_clock::now() - segment_started_ >=
+          rotation_policy_.max_age;
+  if (too_big || too_old) RotateLocked();
+}
+
+void SecurityLogger::RotateLocked() {
+  if (log_path_.empty()) return;
+  log_file_.close();
+
+  // A sequence suffix keeps names unique and sortable when several
+  // rotations happen within the same second.
+  const std::string base =
+      log_path_.string() + "." + SegmentStamp(std::chrono::system_clock::now());
+  std::filesystem::path segment;
+  std::error_code ec;
+  for (int n = 0;; ++n) {
+    std::stringstream name;
+    name << base << '-' << std::setw(4) << std::setfill('0') << n;
+    segment = name.str();
+    if (!std::filesystem::exists(segment, ec) &&
+        !std::filesystem::exists(segment.string() + ".gz", ec) &&
+        !std::filesystem::exists(segment.string() + ".zst", ec)) {
+      break;
+    }
+  }
+
+  std::filesystem::rename(log_path_, segment, ec);
+  if (ec) {
+    std::cerr << "Could not rotate log file: " << ec.message() << std::endl;
+  }
+  OpenLogFileLocked();
+  if (ec) return;
+
+  if (rotation_policy_.compression != LogCompression::NONE) {
+    QueueCompression(segment, rotation_policy_.compression);
+  } else {
+    // Nothing to compress; prune right away.
+    QueueCompression({}, LogCompression::NONE);
+  }
+}
+
+void SecurityLogger::QueueCompression(const std::filesystem::path& segment,
+                                      LogCompression compression) {
+  std::lock_guard<std::mutex> guard(compress_mutex_);
+  if (compressor_stop_requested_) return;
+  pending_segments_.emplace_back(segment, compression);
+  if (!compressor_thread_.joinable()) {
+    compressor_thread_ = std::thread(&SecurityLogger::CompressorLoop, this);
+  }
+  compress_cv_.notify_one();
+}
+
+void SecurityLogger::CompressorLoop() {
+  std::unique_lock<std::mutex> lock(compress_mutex_);
+  while (true) {
+    compress_cv_.wait(lock, [this] {
+      return compressor_stop_requested_ || !pending_segments_.empty();
+    });
+    if (compressor_stop_requested_) return;
+    const auto [segment, compression] = pending_segments_.front();
+    pending_segments_.pop_front();
+    lock.unlock();
+
+    std::error_code exists_ec;
+    // Pruning may already have removed a segment that was still queued.
+    if (!segment.empty() && std::filesystem::exists(segment, exists_ec)) {
+      std::filesystem::path target = segment;
+      bool ok = false;
+#ifdef CANINANA_HAVE_ZSTD
+      if (compression == LogCompression::ZSTD) {
+        target += ".zst";
+        ok = ZstdFile(segment, target.string() + ".part");
+      }
+#endif
+      if (target == segment) {
+        target += ".gz";
+        ok = GzipFile(segment, target.string() + ".part");
+      }
+
+      std::error_code ec;
+      if (ok) {
+        std::filesystem::rename(target.string() + ".part", target, ec);
+      }
+      if (ok && !ec) {
+        std::filesystem::remove(segment, ec);
+      } else {
+        std::filesystem::remove(target.string() + ".part", ec);
+        Log(LogLevel::WARNING, "SecurityLogger",
+            "Failed to compress rotated log segment: " + segment.string());
+      }
+    }
+
+    size_t max_segments = 0;
+    {
+      std::lock_guard<std::mutex> guard(log_mutex_);
+      max_segments = rotation_policy_.max_segments;
+    }
+    if (max_segments > 0) PruneSegments(max_segments);
+    lock.lock();
+  }
+}
+
+void SecurityLogger::PruneSegments(size_t max_segments) {
+  // Segment names embed a sortable timestamp, so name order is age order.
+  const std::string prefix = log_path_.filename().string() + ".";
+  std::vector<std::filesystem::path> segments;
+  std::error_code ec;
+  for (const auto& item :
+       std::filesystem::directory_iterator(log_path_.parent_path(), ec)) {
+    const std::string name = item.path().filename().string();
+    if (name.rfind(prefix, 0) == 0 && item.path().extension() != ".part") {
+      segments.push_back(item.path());
+    }
+  }
+  if (segments.size() <= max_segments) return;
+  std::sort(segments.begin(), segments.end());
+  for (size_t i = 0; i + max_segments < segments.size(); ++i) {
+    std::filesystem::remove(segments[i], ec);
+  }
+}
+
+void SecurityLogger::EnableAsync(size_t ring_capacity,
+                                 std::chrono::milliseconds flush_interval) {
   std::lock_guard<std::mutex> guard(log_mutex_);
-  const std::string formatted_message = "[" + GetTimestamp() + "] [" +
-                                        LevelToString(level) + "] [" +
-                                        component + "] " + message;
+  if (writer_thread_.joinable()) return;
+
+  // The ring is never freed or resized once allocated: a producer that saw
+  // async mode just before DisableAsync() may still be writing into it.
+  if (!ring_) {
+    size_t capacity = 2;
+    while (capacity < ring_capacity) capacity <<= 1;
+    ring_.reset(new Slot[capacity]);
+    for (size_t i = 0; i < capacity; ++i) {
+      ring_[i].sequence.store(i, std::memory_order_relaxed);
+      // Pre-size the strings so producers copy into existing storage.
+      ring_[i].record.component.reserve(32);
+      ring_[i].record.message.reserve(256);
+    }
+    ring_mask_ = capacity - 1;
+  }
+
+  flush_interval_ = std::max(flush_interval, std::chrono::milliseconds(1));
+  {
+    std::lock_guard<std::mutex> writer_guard(writer_mutex_);
+    writer_stop_requested_ = false;
+  }
+  writer_thread_ = std::thread(&SecurityLogger::WriterLoop, this);
+  async_enabled_.store(true, std::memory_order_release);
+}
+
+void SecurityLogger::DisableAsync() {
+  async_enabled_.store(false, std::memory_order_release);
+  {
+    std::lock_guard<std::mutex> writer_guard(writer_mutex_);
+    writer_stop_requested_ = true;
+  }
+  writer_cv_.notify_all();
+  if (writer_thread_.joinable()) writer_thread_.join();
+  flushed_cv_.notify_all();
+}
+
+void SecurityLogger::Flush() {
+  if (!async_enabled_.load(std::memory_order_acquire)) {
+    std::lock_guard<std::mutex> guard(log_mutex_);
+    if (log_file_.is_open()) log_file_.flush();
+    return;
+  }
+  const size_t target = enqueue_pos_.load(std::memory_order_acquire);
+  std::unique_lock<std::mutex> lock(writer_mutex_);
+  ++flush_waiters_;
+  writer_cv_.notify_all();
+  flushed_cv_.wait(lock, [&] {
+    return flushed_pos_ >= target || writer_stop_requested_;
+  });
+  --flush_waiters_;
+}
+
+uint64_t SecurityLogger::GetDroppedCount() const {
+  return dropped_.load(std::memory_order_relaxed);
+}
+
+std::vector<SecurityLogger::LogRecord> SecurityLogger::GetRecordsSince(
+    uint64_t sequence, size_t max_records) const {
+  std::lock_guard<std::mutex> guard(tail_mutex_);
+  std::vector<LogRecord> records;
+  if (tail_.empty() || sequence >= tail_.back().sequence) return records;
+
+  const uint64_t first = tail_.front().sequence;
+  const size_t start =
+      sequence >= first ? static_cast<size_t>(sequence - first + 1) : 0;
+  size_t count = tail_.size() - start;
+  if (max_records > 0) count = std::min(count, max_records);
+  records.reserve(count);
+  for (size_t i = start; i < start + count; ++i) {
+    records.push_back(tail_[i]);
+  }
+  return records;
+}
 
+uint64_t SecurityLogger::GetLastSequence() const {
+  std::lock_guard<std::mutex> guard(tail_mutex_);
+  return next_sequence_ - 1;
+}
+
+void SecurityLogger::SetTailCapacity(size_t capacity) {
+  std::lock_guard<std::mutex> guard(tail_mutex_);
+  tail_capacity_ = capacity;
+  while (tail_.size() > tail_capacity_) tail_.pop_front();
+}
+
+void SecurityLogger::RememberRecord(const LogRecord& record) {
+  std::lock_guard<std::mutex> guard(tail_mutex_);
+  if (tail_capacity_ == 0) return;
+  if (tail_.size() >= tail_capacity_) tail_.pop_front();
+  tail_.push_back(record);
+  tail_.back().sequence = next_sequence_++;
+}
+
+bool SecurityLogger::TryPush(LogLevel level, const std::string& component,
+                             const std::string& message,
+                             const LogFields& fields) {
+  size_t pos = enqueue_pos_.load(std::memory_order_relaxed);
+  Slot* slot = nullptr;
+  while (true) {
+    slot = &ring_[pos & ring_mask_];
+    const size_t sequence = slot->sequence.load(std::memory_order_acquire);
+    const auto diff =
+        static_cast<std::ptrdiff_t>(sequence) - static_cast<std::ptrdiff_t>(pos);
+    if (diff == 0) {
+      if (enqueue_pos_.compare_exchange_weak(pos, pos + 1,
+                                             std::memory_order_relaxed)) {
+        break;
+      }
+    } else if (diff < 0) {
+      return false;  // Full: the writer has not released this slot yet.
+    } else {
+      pos = enqueue_pos_.load(std::memory_order_relaxed);
+    }
+  }
+
+  slot->record.level = level;
+  slot->record.timestamp = std::chrono::system_clock::now();
+  slot->record.component.assign(component);
+  slot->record.message.assign(message);
+  slot->record.fields = fields;
+  slot->sequence.store(pos + 1, std::memory_order_release);
+
+  // The writer wakes on its flush interval anyway; only nudge it early when
+  // the ring is filling up.
+  const size_t backlog = pos - written_pos_.load(std::memory_order_relaxed);
+  if (backlog > ring_mask_ / 2 && writer_idle_.load(std::memory_order_relaxed)) {
+    writer_cv_.notify_one();
+  }
+  return true;
+}
+
+size_t SecurityLogger::DrainRing() {
+  std::lock_guard<std::mutex> guard(log_mutex_);
+  size_t written = 0;
+  while (true) {
+    Slot& slot = ring_[dequeue_pos_ & ring_mask_];
+    if (slot.sequence.load(std::memory_order_acquire) != dequeue_pos_ + 1) {
+      break;
+    }
+    WriteLine(FormatRecord(slot.record));
+    RememberRecord(slot.record);
+    slot.sequence.store(dequeue_pos_ + ring_mask_ + 1,
+                        std::memory_order_release);
+    ++dequeue_pos_;
+    ++written;
+  }
+  written_pos_.store(dequeue_pos_, std::memory_order_release);
+
+  const uint64_t dropped = dropped_.load(std::memory_order_relaxed);
+  if (dropped != dropped_reported_) {
+    LogRecord notice;
+    notice.level = LogLevel::WARNING;
+    notice.timestamp = std::chrono::system_clock::now();
+    notice.component = "SecurityLogger";
+    notice.message = std::to_string(dropped - dropped_reported_) +
+                     " log records dropped (ring buffer full).";
+    WriteLine(FormatRecord(notice));
+    RememberRecord(notice);
+    dropped_reported_ = dropped;
+    ++written;
+  }
+  return written;
+}
+
+void SecurityLogger::WriterLoop() {
+  auto last_flush = std::chrono::steady_clock::now();
+  size_t unflushed = 0;
+  std::unique_lock<std::mutex> lock(writer_mutex_);
+  while (true) {
+    lock.unlock();
+    const size_t drained = DrainRing();
+    unflushed += drained;
+    lock.lock();
+
+    const auto now = std::chrono::steady_clock::now();
+    if (flush_waiters_ > 0 || writer_stop_requested_ ||
+        now - last_flush >= flush_interval_) {
+      if (unflushed > 0) {
+        std::lock_guard<std::mutex> guard(log_mutex_);
+        if (log_file_.is_open()) log_file_.flush();
+        unflushed = 0;
+      }
+      last_flush = now;
+      flushed_pos_ = dequeue_pos_;
+      flushed_cv_.notify_all();
+    }
+
+    if (writer_stop_requested_ &&
+        dequeue_pos_ == enqueue_pos_.load(std::memory_order_acquire)) {
+      break;
+    }
+    // Poll quickly while someone waits in Flush() or a producer is still
+    // publishing a claimed slot during shutdown.
+    const auto timeout = (flush_waiters_ > 0 || writer_stop_requested_)
+                             ? std::chrono::milliseconds(1)
+                             : flush_interval_;
+    writer_idle_.store(true, std::memory_order_relaxed);
+    writer_cv_.wait_for(lock, timeout);
+    writer_idle_.store(false, std::memory_order_relaxed);
+  }
+}
+
+void SecurityLogger::WriteLine(const std::string& line) {
   if (log_file_.is_open()) {
-    log_file_ << formatted_message << std::endl;
+    log_file_ << line << '\n';
+    current_size_ += line.size() + 1;
+    MaybeRotateLocked();
   } else {
     // Fallback to standard error if the log file is not available.
-    std::cerr << formatted_message << std::endl;
+    std::cerr << line << '\n';
   }
 }
 
+std::string SecurityLogger::FormatRecord(const LogRecord& record) const {
+  if (format_ == LogFormat::JSON_LINES) return FormatJsonRecord(record);
+  return "[" + FormatTimestamp(record.timestamp) + "] [" +
+         LevelToString(record.level) + "] [" + record.component + "] " +
+         record.message;
+}
+
+std::string SecurityLogger::FormatJsonRecord(const LogRecord& record) const {
+  // UTC with an explicit "Z", so the timestamp means the same instant to
+  // log shippers on any machine and across DST changes.
+  const auto in_time_t = std::chrono::system_clock::to_time_t(record.timestamp);
+  std::tm utc_tm{};
+#ifdef _WIN32
+  gmtime_s(&utc_tm, &in_time_t);
+#else
+  gmtime_r(&in_time_t, &utc_tm);
+#endif
+  const auto millis = std::chrono::duration_cast<std::chrono::milliseconds>(
+                          record.timestamp.time_since_epoch())
+                          .count() %
+                      1000;
+  std::stringstream ts;
+  ts << std::put_time(&utc_tm, "%Y-%m-%dT%H:%M:%S") << '.' << std::setw(3)
+     << std::setfill('0') << millis << 'Z';
+
+  nlohmann::json j;
+  j["ts"] = ts.str();
+  j["level"] = LevelToString(record.level);
+  j["component"] = record.component;
+  j["message"] = record.message;
+  const LogFields& fields = record.fields;
+  if (!fields.file_path.empty()) j["file"] = fields.file_path;
+  if (!fields.signatures.empty()) j["signatures"] = fields.signatures;
+  if (fields.duration_ms) j["duration_ms"] = *fields.duration_ms;
+  if (fields.bytes) j["bytes"] = *fields.bytes;
+  // Replace invalid UTF-8 (e.g. raw file names) instead of throwing.
+  return j.dump(-1, ' ', false, nlohmann::json::error_handler_t::replace);
+}
+
 std::string SecurityLogger::LevelToString(LogLevel level) const {
   switch (level) {
+    case LogLevel::DEBUG:
+      return "DEBUG";
     case LogLevel::INFO:
       return "INFO";
     case LogLevel::WARNING:
@@ -76,14 +623,21 @@ std::string SecurityLogger::LevelToString(LogLevel level) const {
   return "UNKNOWN";
 }
 
-std::string SecurityLogger::GetTimestamp() const {
-  const auto now = std::chrono::system_clock::now();
-  const auto in_time_t = std::chrono::system_clock::to_time_t(now);
+std::string SecurityLogger::FormatTimestamp(
+    std::chrono::system_clock::time_point timestamp) const {
+  const auto in_time_t = std::chrono::system_clock::to_time_t(timestamp);
+  std::tm local_tm{};
+  // Use the reentrant variants: the writer thread and synchronous callers
+  // may format timestamps concurrently.
+#ifdef _WIN32
+  localtime_s(&local_tm, &in_time_t);
+#else
+  localtime_r(&in_time_t, &local_tm);
+#endif
   std::stringstream ss;
-  // Use std::localtime for local time zone conversion.
-  ss << std::put_time(std::localtime(&in_time_t), "%Y-%m-%d %H:%M:%S");
+  ss << std::put_time(&local_tm, "%Y-%m-%d %H:%M:%S");
   return ss.str();
 }
 
 }  // namespace core
-}  // namespace caninana
\ No newline at end of file
+}  // namespace caninana
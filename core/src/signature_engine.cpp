@@ -1,25 +1,114 @@
 #include "signature_engine.h"
 
 #include <nlohmann/json.hpp>
+#include <zlib.h>
 
 #include <algorithm>
 #include <chrono>
+#include <cstring>
+#include <filesystem>
 #include <fstream>
 #include <iterator>
 #include <map>
 #include <queue>
 #include <set>
 #include <sstream>
+#include <unordered_map>
 
 #include "file_exception.h"
+#include "metrics.h"
 #include "performance_monitor.h"
 #include "security_logger.h"
+#include "tracer.h"
 
 namespace caninana {
 namespace core {
 
 // AhoCorasickMatcher implementation is unchanged and omitted for brevity.
 namespace {
+
+constexpr size_t kChunkSize = 8192;
+constexpr uint64_t kCpuCheckInterval = 8;
+
+// Adaptive budget: a fixed allowance plus time to scan the file at a
+// conservative throughput.
+constexpr auto kAdaptiveBaseTime = std::chrono::milliseconds(2000);
+constexpr uint64_t kAdaptiveBytesPerSecond = 4ull * 1024 * 1024;
+
+/// Which budget limit, if any, stopped a scan.
+enum class BudgetStop { NONE, WALL_TIME, CPU_TIME, BYTES, CANCELLED };
+
+bool IsCancelled(const SignatureEngine::ScanBudget& budget) {
+  return budget.cancel_flag != nullptr &&
+         budget.cancel_flag->load(std::memory_order_relaxed);
+}
+
+// Precompiled artifact: magic, format, source fingerprint, CRC-32 of the
+// payload, then the payload. Fields are in host byte order; the artifact is
+// only meant for the host that compiled it.
+constexpr char kArtifactMagic[4] = {'C', 'N', 'S', 'B'};
+constexpr uint32_t kArtifactFormat = 1;
+constexpr const char* kArtifactSuffix = ".bin";
+constexpr uint32_t kMaxArtifactString = 16u * 1024 * 1024;
+
+/// Identifies the database file an artifact was compiled from.
+struct SourceFingerprint {
+  uint64_t size{0};
+  int64_t mtime{0};
+
+  bool operator==(const SourceFingerprint& other) const {
+    return size == other.size && mtime == other.mtime;
+  }
+};
+
+std::optional<SourceFingerprint> FingerprintOf(const std::string& path) {
+  std::error_code ec;
+  SourceFingerprint fingerprint;
+  fingerprint.size = std::filesystem::file_size(path, ec);
+  if (ec) return std::nullopt;
+  const auto mtime = std::filesystem::last_write_time(path, ec);
+  if (ec) return std::nullopt;
+  fingerprint.mtime = static_cast<int64_t>(mtime.time_since_epoch().count());
+  return fingerprint;
+}
+
+DatabaseParseError CorruptArtifact() {
+  return DatabaseParseError("Compiled signature artifact is corrupt.");
+}
+
+template <typename T>
+void WritePod(std::ostream& out, T value) {
+  out.write(reinterpret_cast<const char*>(&value), sizeof(value));
+}
+
+template <typename T>
+T ReadPod(std::istream& in) {
+  T value{};
+  if (!in.read(reinterpret_cast<char*>(&value), sizeof(value))) {
+    throw CorruptArtifact();
+  }
+  return value;
+}
+
+void WriteString(std::ostream& out, const std::string& value) {
+  WritePod<uint32_t>(out, static_cast<uint32_t>(value.size()));
+  out.write(value.data(), static_cast<std::streamsize>(value.size()));
+}
+
+std::string ReadString(std::istream& in) {
+  const auto size = ReadPod<uint32_t>(in);
+  if (size > kMaxArtifactString) throw CorruptArtifact();
+  std::string value(size, '\0');
+  if (!in.read(value.data(), size)) throw CorruptArtifact();
+  return value;
+}
+
+uint32_t ReadIndex(std::istream& in, size_t limit) {
+  const auto index = ReadPod<uint32_t>(in);
+  if (index >= limit) throw CorruptArtifact();
+  return index;
+}
+
 class AhoCorasickMatcher {
  public:
   void Build(
@@ -35,21 +124,34 @@ class AhoCorasickMatcher {
     }
     ComputeFailureLinks();
   }
-  bool ScanStream(
+  BudgetStop ScanStream(
       std::istream& stream, const PerformanceMonitor& monitor,
-      std::chrono::seconds timeout,
+      const SignatureEngine::ScanBudget& budget,
       std::vector<const SignatureEngine::Signature*>& out_matches) const {
     std::set<std::string> detected_patterns;
     size_t current_node_idx = 0;
-    std::vector<char> buffer(8192);
-    int iteration_count = 0;
+    std::vector<char> buffer(kChunkSize);
+    uint64_t bytes_scanned = 0;
+    uint64_t chunk_count = 0;
     while (stream) {
-      if (++iteration_count % 16 == 0 && monitor.HasTimedOut(timeout)) {
-        return true;
+      if (IsCancelled(budget)) return BudgetStop::CANCELLED;
+      if (budget.wall_time.count() > 0 &&
+          monitor.HasTimedOut(budget.wall_time)) {
+        return BudgetStop::WALL_TIME;
+      }
+      // Reading the thread CPU clock is a system call on some platforms.
+      if (budget.cpu_time.count() > 0 &&
+          chunk_count++ % kCpuCheckInterval == 0 &&
+          monitor.CpuElapsed() >= budget.cpu_time) {
+        return BudgetStop::CPU_TIME;
       }
       stream.read(buffer.data(), buffer.size());
       std::streamsize bytes_read = stream.gcount();
       if (bytes_read == 0) break;
+      bytes_scanned += static_cast<uint64_t>(bytes_read);
+      if (budget.max_bytes > 0 && bytes_scanned > budget.max_bytes) {
+        return BudgetStop::BYTES;
+      }
       for (std::streamsize i = 0; i < bytes_read; ++i) {
         char c = buffer[i];
         current_node_idx = FindNextNode(current_node_idx, c);
@@ -70,7 +172,70 @@ class AhoCorasickMatcher {
         out_matches.push_back(it->second);
       }
     }
-    return false;
+    return BudgetStop::NONE;
+  }
+
+  /// Writes the automaton; signatures are stored as indices from `base`.
+  void Write(std::ostream& out,
+             const SignatureEngine::Signature* base) const {
+    WritePod<uint32_t>(out, static_cast<uint32_t>(pattern_map_.size()));
+    for (const auto& [pattern, sig] : pattern_map_) {
+      WritePod<uint32_t>(out, static_cast<uint32_t>(sig - base));
+    }
+    WritePod<uint32_t>(out, static_cast<uint32_t>(nodes_.size()));
+    for (const Node& node : nodes_) {
+      WritePod<uint32_t>(out, static_cast<uint32_t>(node.failure_link));
+      WritePod<uint32_t>(out, static_cast<uint32_t>(node.transitions.size()));
+      for (const auto& [character, next_node_idx] : node.transitions) {
+        WritePod<char>(out, character);
+        WritePod<uint32_t>(out, static_cast<uint32_t>(next_node_idx));
+      }
+      WritePod<uint32_t>(out,
+                         static_cast<uint32_t>(node.output_patterns.size()));
+      for (const std::string& pattern : node.output_patterns) {
+        WritePod<uint32_t>(
+            out, static_cast<uint32_t>(pattern_map_.at(pattern) - base));
+      }
+    }
+  }
+
+  /// Reads an automaton written by Write() over `signatures`.
+  /// @throws DatabaseParseError if the data is inconsistent.
+  void Read(std::istream& in,
+            const std::vector<SignatureEngine::Signature>& signatures) {
+    nodes_.clear();
+    pattern_map_.clear();
+    const auto pattern_count = ReadPod<uint32_t>(in);
+    size_t max_nodes = 1;
+    for (uint32_t i = 0; i < pattern_count; ++i) {
+      const auto& sig = signatures[ReadIndex(in, signatures.size())];
+      pattern_map_[sig.pattern] = &sig;
+      max_nodes += sig.pattern.size();
+    }
+    const auto node_count = ReadPod<uint32_t>(in);
+    if (node_count == 0 || node_count > max_nodes) throw CorruptArtifact();
+    nodes_.resize(node_count);
+    for (Node& node : nodes_) {
+      node.failure_link = ReadIndex(in, node_count);
+      const auto transition_count = ReadPod<uint32_t>(in);
+      if (transition_count > 256) throw CorruptArtifact();
+      for (uint32_t i = 0; i < transition_count; ++i) {
+        const char character = ReadPod<char>(in);
+        // Written in key order, so every insert goes at the end.
+        node.transitions.emplace_hint(node.transitions.end(), character,
+                                      ReadIndex(in, node_count));
+      }
+      const auto output_count = ReadPod<uint32_t>(in);
+      node.output_patterns.reserve(std::min<size_t>(output_count,
+                                                    pattern_map_.size()));
+      for (uint32_t i = 0; i < output_count; ++i) {
+        const auto& sig = signatures[ReadIndex(in, signatures.size())];
+        if (pattern_map_.find(sig.pattern) == pattern_map_.end()) {
+          throw CorruptArtifact();
+        }
+        node.output_patterns.push_back(sig.pattern);
+      }
+    }
   }
 
  private:
@@ -143,11 +308,157 @@ class AhoCorasickMatcher {
     return 0;
   }
 };
+
+struct ScanMetrics {
+  LatencyHistogram& scan_latency;
+  Counter& files;
+  Counter& bytes;
+  Counter& threats;
+  Counter& timeouts;
+};
+
+const ScanMetrics& Metrics() {
+  auto& registry = MetricsRegistry::GetInstance();
+  static const ScanMetrics metrics{
+      registry.GetHistogram("caninana_scan_duration_seconds",
+                            "Time to match a file against the signatures."),
+      registry.GetCounter("caninana_files_scanned_total", "Files scanned."),
+      registry.GetCounter("caninana_bytes_scanned_total",
+                          "Bytes of file content scanned."),
+      registry.GetCounter("caninana_threats_detected_total",
+                          "Scans that matched at least one signature."),
+      registry.GetCounter("caninana_scan_timeouts_total",
+                          "Scans aborted by an exhausted scan budget.")};
+  return metrics;
+}
+
+struct LoadMetrics {
+  LatencyHistogram& load_latency;
+  Counter& reloads;
+  Counter& artifact_loads;
+};
+
+const LoadMetrics& SignatureLoadMetrics() {
+  auto& registry = MetricsRegistry::GetInstance();
+  static const LoadMetrics metrics{
+      registry.GetHistogram("caninana_signature_load_duration_seconds",
+                            "Time to parse and compile a signature set."),
+      registry.GetCounter("caninana_signature_reloads_total",
+                          "Signature sets published to the engine."),
+      registry.GetCounter("caninana_signature_artifact_loads_total",
+                          "Signature sets loaded from a precompiled "
+                          "artifact.")};
+  return metrics;
+}
 }  // namespace
 
+class SignatureEngine::CompiledSignatureSet {
+ public:
+  explicit CompiledSignatureSet(std::vector<Signature> signatures)
+      : signatures_(std::move(signatures)) {
+    std::unordered_map<FileType, std::vector<const Signature*>> by_type;
+    for (const Signature& sig : signatures_) {
+      by_type[sig.target_type].push_back(&sig);
+    }
+    // Signatures for "any" file type apply to every file.
+    std::vector<const Signature*> generic;
+    auto it = by_type.find(FileType::UNKNOWN);
+    if (it != by_type.end()) {
+      generic = std::move(it->second);
+      by_type.erase(it);
+      generic_matcher_ = std::make_shared<AhoCorasickMatcher>();
+      generic_matcher_->Build(generic);
+    }
+    for (auto& [type, typed] : by_type) {
+      typed.insert(typed.end(), generic.begin(), generic.end());
+      auto matcher = std::make_shared<AhoCorasickMatcher>();
+      matcher->Build(typed);
+      matchers_.emplace(type, std::move(matcher));
+    }
+  }
+
+  size_t size() const { return signatures_.size(); }
+
+  void Write(std::ostream& out) const {
+    WritePod<uint32_t>(out, static_cast<uint32_t>(signatures_.size()));
+    for (const Signature& sig : signatures_) {
+      WriteString(out, sig.name);
+      WriteString(out, sig.pattern);
+      WritePod<uint8_t>(out, static_cast<uint8_t>(sig.target_type));
+      WritePod<uint8_t>(out, sig.severity);
+    }
+    const Signature* base = signatures_.data();
+    WritePod<uint8_t>(out, generic_matcher_ ? 1 : 0);
+    if (generic_matcher_) generic_matcher_->Write(out, base);
+    WritePod<uint32_t>(out, static_cast<uint32_t>(matchers_.size()));
+    for (const auto& [type, matcher] : matchers_) {
+      WritePod<uint8_t>(out, static_cast<uint8_t>(type));
+      matcher->Write(out, base);
+    }
+  }
+
+  /// Reads a set written by Write().
+  /// @throws DatabaseParseError if the data is inconsistent.
+  static std::shared_ptr<const CompiledSignatureSet> Read(std::istream& in) {
+    std::shared_ptr<CompiledSignatureSet> set(new CompiledSignatureSet());
+    const auto read_type = [&in]() {
+      const auto type = ReadPod<uint8_t>(in);
+      if (type > static_cast<uint8_t>(FileType::SUSPICIOUS)) {
+        throw CorruptArtifact();
+      }
+      return static_cast<FileType>(type);
+    };
+    const auto signature_count = ReadPod<uint32_t>(in);
+    for (uint32_t i = 0; i < signature_count; ++i) {
+      Signature sig;
+      sig.name = ReadString(in);
+      sig.pattern = ReadString(in);
+      sig.target_type = read_type();
+      sig.severity = ReadPod<uint8_t>(in);
+      set->signatures_.push_back(std::move(sig));
+    }
+    if (ReadPod<uint8_t>(in) != 0) {
+      set->generic_matcher_ = std::make_shared<AhoCorasickMatcher>();
+      set->generic_matcher_->Read(in, set->signatures_);
+    }
+    const auto matcher_count = ReadPod<uint32_t>(in);
+    for (uint32_t i = 0; i < matcher_count; ++i) {
+      const FileType type = read_type();
+      auto matcher = std::make_shared<AhoCorasickMatcher>();
+      matcher->Read(in, set->signatures_);
+      set->matchers_[type] = std::move(matcher);
+    }
+    return set;
+  }
+
+  /// The matcher for files of `type`, or nullptr when no signature applies.
+  const AhoCorasickMatcher* MatcherFor(FileType type) const {
+    auto it = matchers_.find(type);
+    return it != matchers_.end() ? it->second.get() : generic_matcher_.get();
+  }
+
+ private:
+  CompiledSignatureSet() = default;
+
+  std::vector<Signature> signatures_;  // Matchers point into this.
+  std::unordered_map<FileType, std::shared_ptr<AhoCorasickMatcher>> matchers_;
+  std::shared_ptr<AhoCorasickMatcher> generic_matcher_;
+};
+
 void SignatureEngine::LoadSignatures(const std::string& signature_db_path) {
-  signatures_.clear();
-  type_index_.clear();
+  const LoadMetrics& metrics = SignatureLoadMetrics();
+  ScopedLatency load_timer(metrics.load_latency);
+
+  if (auto compiled = LoadCompiledArtifact(signature_db_path)) {
+    const size_t count = compiled->size();
+    std::atomic_store(&signatures_, std::move(compiled));
+    metrics.reloads.Increment();
+    metrics.artifact_loads.Increment();
+    CANINANA_LOG(SecurityLogger::LogLevel::INFO, "SignatureEngine",
+                 "Loaded " + std::to_string(count) +
+                     " precompiled signatures for " + signature_db_path);
+    return;
+  }
 
   std::ifstream db_file(signature_db_path);
   if (!db_file.is_open()) {
@@ -169,6 +480,7 @@ void SignatureEngine::LoadSignatures(const std::string& signature_db_path) {
         "Signature database is malformed: missing 'signatures' array.");
   }
 
+  std::vector<Signature> signatures;
   for (const auto& sig_json : db_json["signatures"]) {
     if (!sig_json.is_object()) continue;
     Signature new_signature;
@@ -181,85 +493,321 @@ void SignatureEngine::LoadSignatures(const std::string& signature_db_path) {
     if (new_signature.pattern.empty()) {
       continue;
     }
-    signatures_.push_back(new_signature);
-    const size_t new_index = signatures_.size() - 1;
-    type_index_[new_signature.target_type].push_back(new_index);
+    signatures.push_back(std::move(new_signature));
   }
+
+  auto compiled =
+      std::make_shared<const CompiledSignatureSet>(std::move(signatures));
+  const size_t count = compiled->size();
+  std::atomic_store(&signatures_,
+                    std::shared_ptr<const CompiledSignatureSet>(
+                        std::move(compiled)));
+  metrics.reloads.Increment();
+  CANINANA_LOG(SecurityLogger::LogLevel::INFO, "SignatureEngine",
+               "Loaded " + std::to_string(count) + " signatures from " +
+                   signature_db_path);
 }
 
-SignatureEngine::ScanResult SignatureEngine::Scan(std::istream& file_stream,
-                                                  const FileInfo& file_info) {
-  ScanResult result;
-  const auto kScanTimeout = std::chrono::seconds(30);
-  std::vector<const Signature*> signatures_to_check;
-  std::set<size_t> added_indices;
-
-  auto it = type_index_.find(file_info.type);
-  if (it != type_index_.end()) {
-    for (size_t index : it->second) {
-      if (added_indices.find(index) == added_indices.end()) {
-        signatures_to_check.push_back(&signatures_[index]);
-        added_indices.insert(index);
-      }
+void SignatureEngine::SaveCompiledSignatures(
+    const std::string& signature_db_path) const {
+  const auto signatures = std::atomic_load(&signatures_);
+  if (!signatures) {
+    throw FileAccessError("No signatures loaded to compile for " +
+                          signature_db_path);
+  }
+  const auto fingerprint = FingerprintOf(signature_db_path);
+  if (!fingerprint) {
+    throw FileAccessError("Failed to stat signature database: " +
+                          signature_db_path);
+  }
+
+  std::ostringstream payload_stream;
+  signatures->Write(payload_stream);
+  const std::string payload = payload_stream.str();
+  const uint32_t crc = static_cast<uint32_t>(
+      crc32(0L, reinterpret_cast<const Bytef*>(payload.data()),
+            static_cast<uInt>(payload.size())));
+
+  // Written aside and renamed, so readers never see a partial artifact.
+  const std::string artifact_path = signature_db_path + kArtifactSuffix;
+  const std::string tmp_path = artifact_path + ".tmp";
+  {
+    std::ofstream out(tmp_path, std::ios::binary | std::ios::trunc);
+    if (!out) {
+      throw FileAccessError("Failed to open compiled signature artifact: " +
+                            tmp_path);
+    }
+    out.write(kArtifactMagic, sizeof(kArtifactMagic));
+    WritePod<uint32_t>(out, kArtifactFormat);
+    WritePod<uint64_t>(out, fingerprint->size);
+    WritePod<int64_t>(out, fingerprint->mtime);
+    WritePod<uint32_t>(out, crc);
+    out.write(payload.data(), static_cast<std::streamsize>(payload.size()));
+    if (!out.flush()) {
+      out.close();
+      std::filesystem::remove(tmp_path);
+      throw FileAccessError("Failed to write compiled signature artifact: " +
+                            tmp_path);
     }
   }
-  it = type_index_.find(FileType::UNKNOWN);
-  if (it != type_index_.end()) {
-    for (size_t index : it->second) {
-      if (added_indices.find(index) == added_indices.end()) {
-        signatures_to_check.push_back(&signatures_[index]);
-        added_indices.insert(index);
-      }
+  std::error_code ec;
+  std::filesystem::rename(tmp_path, artifact_path, ec);
+  if (ec) {
+    std::filesystem::remove(tmp_path);
+    throw FileAccessError("Failed to install compiled signature artifact: " +
+                          ec.message());
+  }
+}
+
+std::shared_ptr<const SignatureEngine::CompiledSignatureSet>
+SignatureEngine::LoadCompiledArtifact(const std::string& signature_db_path) {
+  const std::string artifact_path = signature_db_path + kArtifactSuffix;
+  std::ifstream in(artifact_path, std::ios::binary);
+  if (!in) return nullptr;
+  const auto fingerprint = FingerprintOf(signature_db_path);
+  if (!fingerprint) return nullptr;
+
+  try {
+    char magic[sizeof(kArtifactMagic)];
+    if (!in.read(magic, sizeof(magic)) ||
+        std::memcmp(magic, kArtifactMagic, sizeof(magic)) != 0 ||
+        ReadPod<uint32_t>(in) != kArtifactFormat) {
+      throw CorruptArtifact();
+    }
+    SourceFingerprint source;
+    source.size = ReadPod<uint64_t>(in);
+    source.mtime = ReadPod<int64_t>(in);
+    if (!(source == *fingerprint)) {
+      CANINANA_LOG(SecurityLogger::LogLevel::DEBUG, "SignatureEngine",
+                   "Ignoring stale compiled signatures: " + artifact_path);
+      return nullptr;
+    }
+    const auto crc = ReadPod<uint32_t>(in);
+    const auto payload_start = in.tellg();
+    in.seekg(0, std::ios::end);
+    std::string payload(static_cast<size_t>(in.tellg() - payload_start),
+                        '\0');
+    in.seekg(payload_start);
+    if (!in.read(payload.data(),
+                 static_cast<std::streamsize>(payload.size()))) {
+      throw CorruptArtifact();
+    }
+    if (crc != static_cast<uint32_t>(crc32(
+                   0L, reinterpret_cast<const Bytef*>(payload.data()),
+                   static_cast<uInt>(payload.size())))) {
+      throw CorruptArtifact();
+    }
+    std::istringstream payload_stream(payload);
+    auto compiled = CompiledSignatureSet::Read(payload_stream);
+    if (payload_stream.peek() != std::char_traits<char>::eof()) {
+      throw CorruptArtifact();
     }
+    return compiled;
+  } catch (const DatabaseParseError& e) {
+    CANINANA_LOG(SecurityLogger::LogLevel::WARNING, "SignatureEngine",
+                 std::string(e.what()) + " Parsing " + signature_db_path +
+                     " instead.");
+    return nullptr;
+  }
+}
+
+size_t SignatureEngine::GetSignatureCount() const {
+  const auto signatures = std::atomic_load(&signatures_);
+  return signatures ? signatures->size() : 0;
+}
+
+SignatureEngine::ScanBudget SignatureEngine::ScanBudget::Adaptive(
+    uint64_t file_size, std::chrono::milliseconds ceiling) {
+  const auto scaled =
+      kAdaptiveBaseTime +
+      std::chrono::milliseconds(file_size * 1000 / kAdaptiveBytesPerSecond);
+  ScanBudget budget;
+  budget.wall_time = std::min(scaled, ceiling);
+  budget.cpu_time = budget.wall_time;
+  return budget;
+}
+
+void SignatureEngine::SetDefaultBudget(
+    const std::optional<ScanBudget>& budget) {
+  std::lock_guard<std::mutex> guard(budget_mutex_);
+  default_budget_ = budget;
+}
+
+void SignatureEngine::SetAdaptiveCeiling(std::chrono::milliseconds ceiling) {
+  std::lock_guard<std::mutex> guard(budget_mutex_);
+  adaptive_ceiling_ = ceiling;
+}
+
+SignatureEngine::ScanBudget SignatureEngine::DefaultBudgetFor(
+    uint64_t file_size) const {
+  std::lock_guard<std::mutex> guard(budget_mutex_);
+  if (default_budget_) return *default_budget_;
+  return ScanBudget::Adaptive(file_size, adaptive_ceiling_);
+}
+
+const char* SignatureEngine::DescribeStatus(ScanResult::ScanStatus status) {
+  switch (status) {
+    case ScanResult::ScanStatus::COMPLETE:
+      return "Scan completed.";
+    case ScanResult::ScanStatus::TIMEOUT_ERROR:
+      return "Scan timed out.";
+    case ScanResult::ScanStatus::CPU_BUDGET_ERROR:
+      return "Scan exceeded its CPU time budget.";
+    case ScanResult::ScanStatus::SIZE_LIMIT_ERROR:
+      return "File exceeds the scan size limit.";
+    case ScanResult::ScanStatus::CANCELLED:
+      return "Scan cancelled before completion.";
+  }
+  return "Unknown scan status.";
+}
+
+SignatureEngine::ScanResult SignatureEngine::Scan(std::istream& file_stream,
+                                                  const FileInfo& file_info) {
+  return Scan(file_stream, file_info, DefaultBudgetFor(file_info.size));
+}
+
+SignatureEngine::ScanResult SignatureEngine::Scan(std::istream& file_stream,
+                                                  const FileInfo& file_info,
+                                                  const ScanBudget& budget) {
+  const ScanMetrics& metrics = Metrics();
+  ScopedLatency scan_timer(metrics.scan_latency);
+  metrics.files.Increment();
+  metrics.bytes.Increment(file_info.size);
+
+  // Collect a breakdown of this scan unless the caller (e.g. ScanFile)
+  // already profiles the surrounding pipeline.
+  // The flag can change mid-scan, so both decisions use one reading of it.
+  const bool timing = timing_enabled_.load(std::memory_order_relaxed);
+  std::optional<PerformanceMonitor::ScopedProfile> profile;
+  if (timing && PerformanceMonitor::CurrentProfile() == nullptr) {
+    profile.emplace();
   }
+  const auto attach_timing = [timing](ScanResult& scan_result) {
+    const auto* current = PerformanceMonitor::CurrentProfile();
+    if (timing && current != nullptr) {
+      scan_result.timing = current->Snapshot();
+    }
+  };
+
+  ScanResult result;
+  // Held for the whole scan, so a concurrent reload cannot free the matcher
+  // or the signatures it reports.
+  const std::shared_ptr<const CompiledSignatureSet> signatures =
+      std::atomic_load(&signatures_);
+  const AhoCorasickMatcher* matcher =
+      signatures ? signatures->MatcherFor(file_info.type) : nullptr;
 
-  if (signatures_to_check.empty()) {
-    SecurityLogger::GetInstance().Log(SecurityLogger::LogLevel::INFO,
-                                      "SignatureEngine",
-                                      "Scan completed (no relevant signatures).");
+  if (matcher == nullptr) {
+    {
+      PerformanceMonitor::ScopedSpan log_span(PerformanceMonitor::Stage::LOG);
+      CANINANA_LOG(SecurityLogger::LogLevel::DEBUG, "SignatureEngine",
+                   "Scan completed (no relevant signatures).");
+    }
+    attach_timing(result);
     return result;
   }
 
-  AhoCorasickMatcher matcher;
-  matcher.Build(signatures_to_check);
   PerformanceMonitor monitor;
   monitor.Start();
   std::vector<const Signature*> matched_signatures;
-  bool timed_out = matcher.ScanStream(file_stream, monitor, kScanTimeout,
-                                      matched_signatures);
-
-  if (timed_out) {
-    result.status = ScanResult::ScanStatus::TIMEOUT_ERROR;
-    result.threat_detected = true;
-    result.max_severity = 8;
-    result.detected_signatures.push_back("Error.ScanTimeoutExceeded");
-    SecurityLogger::GetInstance().Log(SecurityLogger::LogLevel::LOG_ERROR,
-                                      "SignatureEngine", "Scan timed out.");
-  } else if (!matched_signatures.empty()) {
-    result.status = ScanResult::ScanStatus::COMPLETE;
-    result.threat_detected = true;
-    std::stringstream sig_names;
-    for (const Signature* sig : matched_signatures) {
-      result.detected_signatures.push_back(sig->name);
-      result.max_severity = std::max(result.max_severity, sig->severity);
-      sig_names << sig->name << ", ";
-    }
-    std::string sig_list = sig_names.str();
-    if (sig_list.length() > 2) {
-      sig_list.resize(sig_list.length() - 2);
-    }
-    SecurityLogger::GetInstance().Log(
-        SecurityLogger::LogLevel::CRITICAL, "SignatureEngine",
-        "Threat detected. Signatures: [" + sig_list + "]");
+  BudgetStop stop = BudgetStop::NONE;
+  if (IsCancelled(budget)) {
+    stop = BudgetStop::CANCELLED;
+  } else if (budget.max_bytes > 0 && file_info.size > budget.max_bytes) {
+    // Known to be over budget; don't read any of it.
+    stop = BudgetStop::BYTES;
   } else {
-    SecurityLogger::GetInstance().Log(SecurityLogger::LogLevel::INFO,
-                                      "SignatureEngine",
-                                      "Scan completed (clean).");
+    PerformanceMonitor::ScopedSpan automaton_span(
+        PerformanceMonitor::Stage::AUTOMATON);
+    stop = matcher->ScanStream(file_stream, monitor, budget,
+                               matched_signatures);
   }
 
+  // Builds the structured fields only for records that will be written.
+  const auto scan_fields = [&]() {
+    SecurityLogger::LogFields fields;
+    fields.duration_ms =
+        std::chrono::duration<double, std::milli>(monitor.Elapsed()).count();
+    fields.bytes = file_info.size;
+    return fields;
+  };
+
+  {
+    PerformanceMonitor::ScopedSpan log_span(PerformanceMonitor::Stage::LOG);
+    if (stop != BudgetStop::NONE) {
+      // An unfinished scan is reported through the status only; it is not
+      // a finding about the file.
+      result.status = ScanResult::ScanStatus::TIMEOUT_ERROR;
+      if (stop == BudgetStop::CPU_TIME) {
+        result.status = ScanResult::ScanStatus::CPU_BUDGET_ERROR;
+      } else if (stop == BudgetStop::BYTES) {
+        result.status = ScanResult::ScanStatus::SIZE_LIMIT_ERROR;
+      } else if (stop == BudgetStop::CANCELLED) {
+        result.status = ScanResult::ScanStatus::CANCELLED;
+      }
+      metrics.timeouts.Increment();
+      CANINANA_LOG(SecurityLogger::LogLevel::LOG_ERROR, "SignatureEngine",
+                   DescribeStatus(result.status), scan_fields());
+    } else if (!matched_signatures.empty()) {
+      result.status = ScanResult::ScanStatus::COMPLETE;
+      result.threat_detected = true;
+      metrics.threats.Increment();
+      for (const Signature* sig : matched_signatures) {
+        result.detected_signatures.push_back(sig->name);
+        result.max_severity = std::max(result.max_severity, sig->severity);
+      }
+      auto& logger = SecurityLogger::GetInstance();
+      if (logger.IsEnabled(SecurityLogger::LogLevel::CRITICAL)) {
+        std::string sig_list;
+        for (const std::string& name : result.detected_signatures) {
+          if (!sig_list.empty()) sig_list += ", ";
+          sig_list += name;
+        }
+        SecurityLogger::LogFields fields = scan_fields();
+        fields.signatures = result.detected_signatures;
+        logger.Log(SecurityLogger::LogLevel::CRITICAL, "SignatureEngine",
+                   "Threat detected. Signatures: [" + sig_list + "]", fields);
+      }
+    } else {
+      CANINANA_LOG(SecurityLogger::LogLevel::DEBUG, "SignatureEngine",
+                   "Scan completed (clean).", scan_fields());
+    }
+  }
+
+  attach_timing(result);
   return result;
 }
 
+SignatureEngine::ScanResult SignatureEngine::ScanFile(
+    const std::string& filepath, FileTypeAnalyzer& analyzer,
+    const std::optional<ScanBudget>& budget) {
+  ScopedTrace file_trace("scan_file", "file", filepath);
+  std::optional<PerformanceMonitor::ScopedProfile> profile;
+  if (timing_enabled_.load(std::memory_order_relaxed)) profile.emplace();
+
+  std::ifstream file;
+  uint64_t size = 0;
+  {
+    PerformanceMonitor::ScopedSpan open_span(PerformanceMonitor::Stage::OPEN);
+    std::error_code ec;
+    size = std::filesystem::file_size(filepath, ec);
+    if (ec) {
+      throw FileAccessError("Failed to get file size for '" + filepath +
+                            "': " + ec.message());
+    }
+    file.open(filepath, std::ios::binary);
+    if (!file.is_open()) {
+      throw FileAccessError("Failed to open file for scanning: " + filepath);
+    }
+  }
+
+  FileInfo file_info = analyzer.AnalyzeStream(file, size);
+  file_info.extension = std::filesystem::path(filepath).extension().string();
+  file.clear();
+  file.seekg(0, std::ios::beg);
+  return Scan(file, file_info, budget ? *budget : DefaultBudgetFor(size));
+}
+
 FileType SignatureEngine::FileTypeFromString(
     const std::string& type_str) const {
   if (type_str == "executable") return FileType::EXECUTABLE;
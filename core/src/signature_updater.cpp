@@ -2,17 +2,225 @@
 
 #include <cpr/cpr.h>
 #include <nlohmann/json.hpp>
+#include <openssl/evp.h>
+#include <zlib.h>
+#ifdef CANINANA_HAVE_ZSTD
+#include <zstd.h>
+#endif
 
+#include <algorithm>
+#include <cctype>
+#include <chrono>
 #include <filesystem>
 #include <fstream>
+#include <iomanip>
+#include <map>
+#include <memory>
+#include <set>
+#include <sstream>
+#include <thread>
+#include <vector>
 
 #include "file_exception.h"
+#include "metrics.h"
 #include "security_logger.h"
 #include "signature_engine.h"
 
 namespace caninana {
 namespace core {
 
+namespace {
+
+struct UpdateMetrics {
+  LatencyHistogram& update_latency;
+  Counter& checks;
+  Counter& applied;
+  Counter& failures;
+};
+
+const UpdateMetrics& Metrics() {
+  auto& registry = MetricsRegistry::GetInstance();
+  static const UpdateMetrics metrics{
+      registry.GetHistogram("caninana_update_duration_seconds",
+                            "Time to check for and apply a signature update."),
+      registry.GetCounter("caninana_update_checks_total",
+                          "Signature update checks started."),
+      registry.GetCounter("caninana_updates_applied_total",
+                          "Signature updates downloaded and applied."),
+      registry.GetCounter("caninana_update_failures_total",
+                          "Signature update checks that raised an error.")};
+  return metrics;
+}
+
+/**
+ * @brief HTTP validators of the last version check, persisted next to the
+ * database as '<db>.meta'.
+ */
+struct UpdateState {
+  std::string version;  ///< The local version the validators belong to.
+  std::string etag;
+  std::string last_modified;
+};
+
+std::string MetaPath(const std::string& db_path) { return db_path + ".meta"; }
+
+UpdateState ReadUpdateState(const std::string& db_path) {
+  UpdateState state;
+  try {
+    std::ifstream meta_file(MetaPath(db_path));
+    if (!meta_file.is_open()) return state;
+    nlohmann::json meta;
+    meta_file >> meta;
+    state.version = meta.value("version", "");
+    state.etag = meta.value("etag", "");
+    state.last_modified = meta.value("last_modified", "");
+  } catch (const std::exception&) {
+    // A damaged meta file only costs one unconditional request.
+  }
+  return state;
+}
+
+void WriteUpdateState(const std::string& db_path, const UpdateState& state) {
+  nlohmann::json meta = {{"version", state.version},
+                         {"etag", state.etag},
+                         {"last_modified", state.last_modified}};
+  std::ofstream meta_file(MetaPath(db_path), std::ios::trunc);
+  if (meta_file) meta_file << meta.dump(2);
+}
+
+std::string HeaderValue(const cpr::Header& headers, const std::string& name) {
+  auto it = headers.find(name);
+  return it != headers.end() ? it->second : "";
+}
+
+/// Returns the next '.'-separated component of `version` from `pos`, or ""
+/// past the end.
+std::string NextVersionPart(const std::string& version, size_t& pos) {
+  if (pos >= version.size()) return "";
+  const size_t dot = version.find('.', pos);
+  const size_t end = dot == std::string::npos ? version.size() : dot;
+  std::string part = version.substr(pos, end - pos);
+  pos = end + 1;
+  return part;
+}
+
+constexpr int kMaxDownloadAttempts = 5;
+constexpr size_t kFileChunkSize = 64 * 1024;
+
+/**
+ * @brief SHA256 over data that arrives in pieces.
+ */
+class StreamingSha256 {
+ public:
+  StreamingSha256() : ctx_(EVP_MD_CTX_new(), &EVP_MD_CTX_free) { Reset(); }
+
+  void Reset() { EVP_DigestInit_ex(ctx_.get(), EVP_sha256(), nullptr); }
+
+  void Update(const char* data, size_t size) {
+    EVP_DigestUpdate(ctx_.get(), data, size);
+  }
+
+  /// Lowercase hex digest; finalizes a copy, so updates may continue.
+  std::string HexDigest() const {
+    std::unique_ptr<EVP_MD_CTX, decltype(&EVP_MD_CTX_free)> copy(
+        EVP_MD_CTX_new(), &EVP_MD_CTX_free);
+    EVP_MD_CTX_copy_ex(copy.get(), ctx_.get());
+    unsigned char digest[EVP_MAX_MD_SIZE];
+    unsigned int length = 0;
+    EVP_DigestFinal_ex(copy.get(), digest, &length);
+    std::stringstream hex;
+    for (unsigned int i = 0; i < length; ++i) {
+      hex << std::hex << std::setw(2) << std::setfill('0')
+          << static_cast<int>(digest[i]);
+    }
+    return hex.str();
+  }
+
+ private:
+  std::unique_ptr<EVP_MD_CTX, decltype(&EVP_MD_CTX_free)> ctx_;
+};
+
+/// Lower is preferred; -1 for encodings this build cannot decode.
+int EncodingRank(const std::string& encoding) {
+#ifdef CANINANA_HAVE_ZSTD
+  if (encoding == "zstd") return 0;
+#endif
+  if (encoding == "gzip") return 1;
+  if (encoding == "identity") return 2;
+  return -1;
+}
+
+bool GunzipFile(const std::string& source, const std::string& target) {
+  gzFile in = gzopen(source.c_str(), "rb");
+  if (in == nullptr) return false;
+  std::ofstream out(target, std::ios::binary | std::ios::trunc);
+  std::vector<char> buffer(kFileChunkSize);
+  int count = 0;
+  while ((count = gzread(in, buffer.data(),
+                         static_cast<unsigned>(buffer.size()))) > 0) {
+    out.write(buffer.data(), count);
+  }
+  const bool ok = count == 0 && static_cast<bool>(out);
+  gzclose(in);
+  return ok;
+}
+
+#ifdef CANINANA_HAVE_ZSTD
+bool ZstdDecompressFile(const std::string& source, const std::string& target) {
+  std::ifstream in(source, std::ios::binary);
+  std::ofstream out(target, std::ios::binary | std::ios::trunc);
+  if (!in || !out) return false;
+  std::unique_ptr<ZSTD_DCtx, decltype(&ZSTD_freeDCtx)> ctx(ZSTD_createDCtx(),
+                                                           &ZSTD_freeDCtx);
+  std::vector<char> in_buffer(ZSTD_DStreamInSize());
+  std::vector<char> out_buffer(ZSTD_DStreamOutSize());
+  size_t pending = 0;  // Non-zero while a frame is incomplete.
+  while (in) {
+    in.read(in_buffer.data(), in_buffer.size());
+    ZSTD_inBuffer input{in_buffer.data(), static_cast<size_t>(in.gcount()), 0};
+    while (input.pos < input.size) {
+      ZSTD_outBuffer output{out_buffer.data(), out_buffer.size(), 0};
+      pending = ZSTD_decompressStream(ctx.get(), &output, &input);
+      if (ZSTD_isError(pending)) return false;
+      out.write(out_buffer.data(), output.pos);
+    }
+  }
+  return pending == 0 && static_cast<bool>(out);
+}
+#endif
+
+bool DecompressPackage(const std::string& encoding, const std::string& source,
+                       const std::string& target) {
+#ifdef CANINANA_HAVE_ZSTD
+  if (encoding == "zstd") return ZstdDecompressFile(source, target);
+#endif
+  if (encoding == "gzip") return GunzipFile(source, target);
+  std::error_code ec;
+  std::filesystem::rename(source, target, ec);
+  return !ec;
+}
+
+// The string under key, or "" if it is missing or not a string; value()
+// throws type_error for the latter.
+std::string StringField(const nlohmann::json& object, const char* key) {
+  const auto it = object.find(key);
+  return it != object.end() && it->is_string() ? it->get<std::string>()
+                                                : std::string();
+}
+
+long ParseStatusLine(const std::string_view& line) {
+  // "HTTP/1.1 206 Partial Content"
+  const size_t space = line.find(' ');
+  if (space == std::string_view::npos) return 0;
+  long status = 0;
+  for (size_t i = space + 1; i < line.size() && std::isdigit(line[i]); ++i) {
+    status = status * 10 + (line[i] - '0');
+  }
+  return status;
+}
+
+}  // namespace
+
 SignatureUpdater::SignatureUpdater(const std::string& base_url)
     : base_url_(base_url) {
   if (base_url_.back() != '/') {
@@ -20,6 +228,7 @@ SignatureUpdater::SignatureUpdater(const std::string& base_url)
   }
   version_url_ = base_url_ + "latest_version.txt";
   database_url_ = base_url_ + "signatures.json";
+  manifest_url_ = base_url_ + "manifest.json";
 }
 
 std::string SignatureUpdater::GetLocalVersion(const std::string& db_path) {
@@ -37,6 +246,48 @@ std::string SignatureUpdater::GetLocalVersion(const std::string& db_path) {
 }
 
 bool SignatureUpdater::CheckForUpdates(const std::string& current_db_path) {
+  const UpdateMetrics& metrics = Metrics();
+  ScopedLatency update_timer(metrics.update_latency);
+  metrics.checks.Increment();
+  try {
+    const bool applied = ApplyUpdate(current_db_path);
+    if (applied) metrics.applied.Increment();
+    return applied;
+  } catch (...) {
+    metrics.failures.Increment();
+    throw;
+  }
+}
+
+int SignatureUpdater::CompareVersions(const std::string& a,
+                                      const std::string& b) {
+  const auto is_number = [](const std::string& part) {
+    return !part.empty() &&
+           std::all_of(part.begin(), part.end(),
+                       [](unsigned char c) { return std::isdigit(c); });
+  };
+  size_t pos_a = 0;
+  size_t pos_b = 0;
+  while (pos_a < a.size() || pos_b < b.size()) {
+    std::string part_a = NextVersionPart(a, pos_a);
+    std::string part_b = NextVersionPart(b, pos_b);
+    if (part_a.empty()) part_a = "0";
+    if (part_b.empty()) part_b = "0";
+    if (is_number(part_a) && is_number(part_b)) {
+      // Compare arbitrarily long numbers without converting them.
+      part_a.erase(0, std::min(part_a.find_first_not_of('0'), part_a.size()));
+      part_b.erase(0, std::min(part_b.find_first_not_of('0'), part_b.size()));
+      if (part_a.size() != part_b.size()) {
+        return part_a.size() < part_b.size() ? -1 : 1;
+      }
+    }
+    const int order = part_a.compare(part_b);
+    if (order != 0) return order < 0 ? -1 : 1;
+  }
+  return 0;
+}
+
+bool SignatureUpdater::ApplyUpdate(const std::string& current_db_path) {
   auto& logger = SecurityLogger::GetInstance();
   logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
              "Checking for updates...");
@@ -45,7 +296,22 @@ bool SignatureUpdater::CheckForUpdates(const std::string& current_db_path) {
   logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
              "Local database version: " + local_version);
 
-  cpr::Response r = cpr::Get(cpr::Url{version_url_});
+  // The validators only describe the database they were saved with.
+  const UpdateState state = ReadUpdateState(current_db_path);
+  cpr::Header conditional;
+  if (state.version == local_version) {
+    if (!state.etag.empty()) conditional["If-None-Match"] = state.etag;
+    if (!state.last_modified.empty()) {
+      conditional["If-Modified-Since"] = state.last_modified;
+    }
+  }
+
+  cpr::Response r = cpr::Get(cpr::Url{version_url_}, conditional);
+  if (r.status_code == 304) {
+    logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
+               "Version file not modified; database is up to date.");
+    return false;
+  }
   if (r.status_code != 200) {
     throw std::runtime_error("Failed to download version file from " +
                              version_url_ + ". Status code: " +
@@ -59,16 +325,166 @@ bool SignatureUpdater::CheckForUpdates(const std::string& current_db_path) {
   logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
              "Remote database version: " + remote_version);
 
-  if (remote_version <= local_version) {
+  UpdateState new_state;
+  new_state.etag = HeaderValue(r.header, "ETag");
+  new_state.last_modified = HeaderValue(r.header, "Last-Modified");
+
+  if (CompareVersions(remote_version, local_version) <= 0) {
     logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
                "Signature database is already up to date.");
+    new_state.version = local_version;
+    WriteUpdateState(current_db_path, new_state);
+    return false;
+  }
+
+  const std::optional<Manifest> manifest = FetchManifest(remote_version);
+  if (local_version == "0" ||
+      !TryApplyDelta(current_db_path, local_version, remote_version,
+                     manifest)) {
+    DownloadFullDatabase(current_db_path,
+                         manifest ? manifest->package : std::nullopt);
+    InstallDatabase(current_db_path, remote_version);
+  }
+
+  new_state.version = GetLocalVersion(current_db_path);
+  WriteUpdateState(current_db_path, new_state);
+  return true;
+}
+
+bool SignatureUpdater::TryApplyDelta(const std::string& current_db_path,
+                                     const std::string& local_version,
+                                     const std::string& remote_version,
+                                     const std::optional<Manifest>& manifest) {
+  auto& logger = SecurityLogger::GetInstance();
+  const Package* package = nullptr;
+  if (manifest) {
+    const auto listed = manifest->deltas.find(local_version);
+    if (listed != manifest->deltas.end()) package = &listed->second;
+  }
+  if (package == nullptr) {
+    logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
+               "No verified delta package from version " + local_version +
+                   " is published; downloading the full database.");
+    return false;
+  }
+  cpr::Response r = cpr::Get(cpr::Url{package->url});
+  if (r.status_code != 200) {
+    logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
+               "Delta package from version " + local_version +
+                   " is unavailable (status " +
+                   std::to_string(r.status_code) +
+                   "); downloading the full database.");
+    return false;
+  }
+  StreamingSha256 hash;
+  hash.Update(r.text.data(), r.text.size());
+  const std::string digest = hash.HexDigest();
+  if (r.text.size() != package->size || digest != package->sha256) {
+    logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
+               "Delta package checksum mismatch: expected " + package->sha256 +
+                   ", got " + digest + "; downloading the full database.");
+    return false;
+  }
+
+  nlohmann::json delta;
+  nlohmann::json db_json;
+  try {
+    delta = nlohmann::json::parse(r.text);
+    std::ifstream db_file(current_db_path);
+    db_file >> db_json;
+  } catch (const std::exception& e) {
+    logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
+               "Cannot apply delta package: " + std::string(e.what()));
+    return false;
+  }
+  if (!delta.is_object() ||
+      StringField(delta, "from_version") != local_version ||
+      StringField(delta, "version") != remote_version ||
+      !db_json.contains("signatures") || !db_json["signatures"].is_array()) {
+    logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
+               "Delta package does not lead from version " + local_version +
+                   " to " + remote_version + "; ignoring it.");
+    return false;
+  }
+
+  // Removed names go first, so a signature can be replaced by removing and
+  // re-adding it; added entries also replace same-named ones.
+  std::set<std::string> dropped;
+  for (const auto& name : delta.value("removed", nlohmann::json::array())) {
+    if (name.is_string()) dropped.insert(name.get<std::string>());
+  }
+  const nlohmann::json added = delta.value("added", nlohmann::json::array());
+  for (const auto& sig : added) {
+    if (sig.is_object()) dropped.insert(StringField(sig, "name"));
+  }
+  nlohmann::json signatures = nlohmann::json::array();
+  for (const auto& sig : db_json["signatures"]) {
+    if (!sig.is_object() || dropped.count(StringField(sig, "name")) == 0) {
+      signatures.push_back(sig);
+    }
+  }
+  const size_t removed_count =
+      db_json["signatures"].size() - signatures.size();
+  for (const auto& sig : added) {
+    if (sig.is_object()) signatures.push_back(sig);
+  }
+  db_json["signatures"] = std::move(signatures);
+  db_json["version"] = remote_version;
+
+  const std::string tmp_db_path = current_db_path + ".tmp";
+  {
+    std::ofstream tmp_file(tmp_db_path, std::ios::binary | std::ios::trunc);
+    if (!tmp_file) {
+      throw FileAccessError("Failed to open temporary file for writing: " +
+                            tmp_db_path);
+    }
+    tmp_file << db_json.dump(2);
+  }
+  try {
+    InstallDatabase(current_db_path, remote_version);
+  } catch (const DatabaseParseError&) {
+    // The current database is untouched; the full one replaces it instead.
+    logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
+               "Database patched by the delta package is invalid; "
+               "downloading the full database.");
     return false;
   }
+  logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
+             "Applied delta package (" + std::to_string(added.size()) +
+                 " added, " + std::to_string(removed_count) + " removed, " +
+                 std::to_string(r.text.size()) + " bytes).");
+  return true;
+}
+
+void SignatureUpdater::DownloadFullDatabase(
+    const std::string& current_db_path, const std::optional<Package>& package) {
+  auto& logger = SecurityLogger::GetInstance();
+  const std::string tmp_db_path = current_db_path + ".tmp";
+
+  if (package) {
+    logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
+               "New version available. Downloading " + package->encoding +
+                   " package (" + std::to_string(package->size) +
+                   " bytes) from " + package->url);
+    const std::string package_path = current_db_path + ".download";
+    DownloadPackage(*package, package_path);
+    const bool ok =
+        DecompressPackage(package->encoding, package_path, tmp_db_path);
+    std::error_code ec;
+    std::filesystem::remove(package_path, ec);
+    std::filesystem::remove(package_path + ".sha256", ec);
+    if (!ok) {
+      std::filesystem::remove(tmp_db_path, ec);
+      throw std::runtime_error("Failed to decompress the signature package.");
+    }
+    logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
+               "Download complete. Validating new database...");
+    return;
+  }
 
   logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
              "New version available. Downloading from " + database_url_);
 
-  const std::string tmp_db_path = current_db_path + ".tmp";
   std::ofstream tmp_file(tmp_db_path, std::ios::binary);
   if (!tmp_file) {
       throw FileAccessError("Failed to open temporary file for writing: " + tmp_db_path);
@@ -84,9 +500,216 @@ bool SignatureUpdater::CheckForUpdates(const std::string& current_db_path) {
 
   logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
              "Download complete. Validating new database...");
+}
+
+std::optional<SignatureUpdater::Manifest> SignatureUpdater::FetchManifest(
+    const std::string& remote_version) {
+  auto& logger = SecurityLogger::GetInstance();
+  cpr::Response r = cpr::Get(cpr::Url{manifest_url_});
+  if (r.status_code != 200) return std::nullopt;
+
+  nlohmann::json manifest;
+  try {
+    manifest = nlohmann::json::parse(r.text);
+  } catch (const nlohmann::json::parse_error& e) {
+    logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
+               "Ignoring malformed manifest: " + std::string(e.what()));
+    return std::nullopt;
+  }
+  if (!manifest.is_object() ||
+      StringField(manifest, "version") != remote_version) {
+    logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
+               "Manifest does not describe version " + remote_version +
+                   "; ignoring it.");
+    return std::nullopt;
+  }
+
+  // Entries without a file, size or digest cannot be verified and are
+  // skipped.
+  const auto read_package = [this](const nlohmann::json& entry,
+                                   const std::string& default_file) {
+    std::optional<Package> package;
+    if (!entry.is_object()) return package;
+    package.emplace();
+    const auto size = entry.find("size");
+    package->encoding = entry.contains("encoding")
+                            ? StringField(entry, "encoding")
+                            : std::string("identity");
+    package->size = size != entry.end() && size->is_number_unsigned()
+                        ? size->get<uint64_t>()
+                        : 0;
+    package->sha256 = StringField(entry, "sha256");
+    std::transform(package->sha256.begin(), package->sha256.end(),
+                   package->sha256.begin(),
+                   [](unsigned char c) { return std::tolower(c); });
+    const std::string file = entry.contains("file")
+                                 ? StringField(entry, "file")
+                                 : default_file;
+    if (file.empty() || package->size == 0 || package->sha256.size() != 64) {
+      package.reset();
+    } else {
+      package->url = base_url_ + file;
+    }
+    return package;
+  };
+
+  Manifest result;
+  const auto packages = manifest.value("packages", nlohmann::json::array());
+  for (const auto& entry : packages) {
+    std::optional<Package> package = read_package(entry, "");
+    if (!package) continue;
+    const int rank = EncodingRank(package->encoding);
+    if (rank < 0) continue;
+    if (!result.package || rank < EncodingRank(result.package->encoding)) {
+      result.package = std::move(package);
+    }
+  }
+  const auto deltas = manifest.value("deltas", nlohmann::json::array());
+  for (const auto& entry : deltas) {
+    if (!entry.is_object()) continue;
+    const std::string from_version = StringField(entry, "from_version");
+    std::optional<Package> package =
+        read_package(entry, "deltas/" + from_version + ".json");
+    if (from_version.empty() || !package ||
+        package->encoding != "identity") {
+      continue;
+    }
+    result.deltas[from_version] = std::move(*package);
+  }
+  return result;
+}
+
+void SignatureUpdater::DownloadPackage(const Package& package,
+                                       const std::string& package_path) {
+  auto& logger = SecurityLogger::GetInstance();
+  const std::string marker_path = package_path + ".sha256";
+  std::error_code ec;
+
+  // A partial download is only resumed if it belongs to the same package.
+  std::string marker;
+  {
+    std::ifstream marker_file(marker_path);
+    std::getline(marker_file, marker);
+  }
+  if (marker != package.sha256) {
+    std::filesystem::remove(package_path, ec);
+    std::ofstream marker_file(marker_path, std::ios::trunc);
+    marker_file << package.sha256 << '\n';
+  }
+
+  // Rebuild the digest of what is already on disk.
+  StreamingSha256 hash;
+  uint64_t offset = 0;
+  {
+    std::ifstream existing(package_path, std::ios::binary);
+    std::vector<char> buffer(kFileChunkSize);
+    while (existing) {
+      existing.read(buffer.data(), buffer.size());
+      hash.Update(buffer.data(), static_cast<size_t>(existing.gcount()));
+      offset += static_cast<uint64_t>(existing.gcount());
+    }
+  }
+  if (offset > package.size) {
+    std::filesystem::remove(package_path, ec);
+    hash.Reset();
+    offset = 0;
+  } else if (offset > 0) {
+    logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
+               "Resuming package download at byte " + std::to_string(offset));
+  }
+
+  for (int attempt = 1; offset < package.size; ++attempt) {
+    if (attempt > kMaxDownloadAttempts) {
+      throw std::runtime_error(
+          "Package download did not complete after " +
+          std::to_string(kMaxDownloadAttempts) + " attempts (" +
+          std::to_string(offset) + " of " + std::to_string(package.size) +
+          " bytes); it will resume on the next update check.");
+    }
+
+    std::ofstream out(package_path, std::ios::binary | std::ios::app);
+    if (!out) {
+      throw FileAccessError("Failed to open package file for writing: " +
+                            package_path);
+    }
+    cpr::Header headers;
+    if (offset > 0) headers["Range"] = "bytes=" + std::to_string(offset) + "-";
+
+    // Body bytes are only kept from 200/206 responses, which the header
+    // callback reports before any body arrives.
+    long status = 0;
+    bool first_chunk = true;
+    bool write_failed = false;
+    cpr::Response r = cpr::Download(
+        cpr::WriteCallback{[&](const std::string_view& data, intptr_t) {
+          if (status != 200 && status != 206) return true;
+          if (first_chunk && status == 200 && offset > 0) {
+            // The server ignored the range and is sending everything again.
+            out.close();
+            out.open(package_path, std::ios::binary | std::ios::trunc);
+            hash.Reset();
+            offset = 0;
+          }
+          first_chunk = false;
+          out.write(data.data(), static_cast<std::streamsize>(data.size()));
+          if (!out) {
+            write_failed = true;
+            return false;
+          }
+          hash.Update(data.data(), data.size());
+          offset += data.size();
+          return offset <= package.size;
+        }},
+        cpr::HeaderCallback{[&](const std::string_view& header, intptr_t) {
+          if (header.rfind("HTTP/", 0) == 0) status = ParseStatusLine(header);
+          return true;
+        }},
+        cpr::Url{package.url}, headers);
+    out.close();
+
+    if (write_failed) {
+      throw FileAccessError("Failed to write package file: " + package_path);
+    }
+    if (offset > package.size || r.status_code == 416) {
+      // Longer than published, or a stale partial file: start over.
+      std::filesystem::remove(package_path, ec);
+      hash.Reset();
+      offset = 0;
+    } else if (!r.error && r.status_code >= 400 && r.status_code < 500) {
+      throw std::runtime_error("Failed to download package " + package.url +
+                               ". Status code: " +
+                               std::to_string(r.status_code));
+    }
+    if (offset < package.size) {
+      logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
+                 "Package download interrupted at " + std::to_string(offset) +
+                     " of " + std::to_string(package.size) + " bytes (" +
+                     (r.error ? r.error.message
+                              : "status " + std::to_string(r.status_code)) +
+                     "); retrying.");
+      std::this_thread::sleep_for(std::chrono::milliseconds(250 * attempt));
+    }
+  }
+
+  const std::string digest = hash.HexDigest();
+  if (digest != package.sha256) {
+    std::filesystem::remove(package_path, ec);
+    std::filesystem::remove(marker_path, ec);
+    throw std::runtime_error("Package checksum mismatch: expected " +
+                             package.sha256 + ", got " + digest);
+  }
+  logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
+             "Package SHA256 verified.");
+}
 
+void SignatureUpdater::InstallDatabase(const std::string& current_db_path,
+                                       const std::string& version) {
+  auto& logger = SecurityLogger::GetInstance();
+  const std::string tmp_db_path = current_db_path + ".tmp";
+  // Validation compiles the whole set; it is kept and saved as the artifact
+  // that loaders pick up instead of parsing the JSON again.
+  SignatureEngine validator;
   try {
-    SignatureEngine validator;
     validator.LoadSignatures(tmp_db_path);
     logger.Log(SecurityLogger::LogLevel::INFO, "SignatureUpdater",
                "New database is valid.");
@@ -94,20 +717,27 @@ bool SignatureUpdater::CheckForUpdates(const std::string& current_db_path) {
     std::filesystem::remove(tmp_db_path);
     logger.Log(SecurityLogger::LogLevel::LOG_ERROR, "SignatureUpdater",
                "Downloaded database failed validation: " + std::string(e.what()));
-    throw std::runtime_error("Downloaded database is corrupt or invalid.");
+    throw DatabaseParseError("Downloaded database is corrupt or invalid.");
   }
 
   try {
     std::filesystem::rename(tmp_db_path, current_db_path);
     logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
                "Successfully updated signature database to version " +
-                   remote_version);
+                   version);
   } catch (const std::filesystem::filesystem_error& e) {
     std::filesystem::remove(tmp_db_path);
     throw FileAccessError("Failed to apply update: " + std::string(e.what()));
   }
 
-  return true;
+  // The rename keeps the size and mtime the artifact is stamped with. An
+  // artifact that cannot be written only costs a JSON parse on next load.
+  try {
+    validator.SaveCompiledSignatures(current_db_path);
+  } catch (const std::exception& e) {
+    logger.Log(SecurityLogger::LogLevel::WARNING, "SignatureUpdater",
+               "Could not save compiled signatures: " + std::string(e.what()));
+  }
 }
 
 }  // namespace core
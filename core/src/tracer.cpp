@@ -0,0 +1,177 @@
+#include "tracer.h"
+
+#include <nlohmann/json.hpp>
+
+#include <algorithm>
+#include <filesystem>
+#include <fstream>
+#include <iomanip>
+
+#include "file_exception.h"
+
+namespace caninana {
+namespace core {
+
+namespace {
+
+std::string JsonString(const std::string& value) {
+  return nlohmann::json(value).dump(-1, ' ', false,
+                                    nlohmann::json::error_handler_t::replace);
+}
+
+/// Trace timestamps are microseconds; keep nanosecond precision as decimals.
+void WriteMicros(std::ostream& out, int64_t nanoseconds) {
+  out << nanoseconds / 1000 << '.' << std::setw(3) << std::setfill('0')
+      << nanoseconds % 1000;
+}
+
+}  // namespace
+
+Tracer& Tracer::GetInstance() {
+  // Never destroyed: detached workers may still exit during shutdown.
+  static Tracer* instance = new Tracer();
+  return *instance;
+}
+
+Tracer::Tracer() : epoch_(std::chrono::steady_clock::now()) {}
+
+void Tracer::Enable(size_t max_events_per_thread) {
+  max_events_per_thread_.store(max_events_per_thread,
+                               std::memory_order_relaxed);
+  enabled_.store(true, std::memory_order_relaxed);
+}
+
+void Tracer::Disable() { enabled_.store(false, std::memory_order_relaxed); }
+
+void Tracer::Clear() {
+  std::lock_guard<std::mutex> guard(buffers_mutex_);
+  for (const auto& buffer : buffers_) {
+    std::lock_guard<std::mutex> buffer_guard(buffer->mutex);
+    buffer->events.clear();
+    buffer->events.shrink_to_fit();
+  }
+  retired_.clear();
+  retired_events_ = 0;
+  dropped_.store(0, std::memory_order_relaxed);
+}
+
+void Tracer::SetThreadName(const std::string& name) {
+  ThreadBuffer& buffer = LocalBuffer();
+  std::lock_guard<std::mutex> guard(buffer.mutex);
+  buffer.name = name;
+}
+
+Tracer::ThreadBuffer& Tracer::LocalBuffer() {
+  // Registers the thread's buffer on first use and retires it when the
+  // thread exits, so short-lived workers do not accumulate in buffers_.
+  struct BufferHandle {
+    explicit BufferHandle(Tracer& tracer)
+        : buffer(std::make_shared<ThreadBuffer>()) {
+      std::lock_guard<std::mutex> guard(tracer.buffers_mutex_);
+      buffer->tid = tracer.next_tid_++;
+      tracer.buffers_.push_back(buffer);
+    }
+    ~BufferHandle() { Tracer::GetInstance().RetireBuffer(buffer); }
+    std::shared_ptr<ThreadBuffer> buffer;
+  };
+  thread_local BufferHandle handle(*this);
+  return *handle.buffer;
+}
+
+void Tracer::RetireBuffer(const std::shared_ptr<ThreadBuffer>& buffer) {
+  std::lock_guard<std::mutex> guard(buffers_mutex_);
+  buffers_.erase(std::remove(buffers_.begin(), buffers_.end(), buffer),
+                 buffers_.end());
+
+  std::lock_guard<std::mutex> buffer_guard(buffer->mutex);
+  auto& events = buffer->events;
+  const size_t limit = max_events_per_thread_.load(std::memory_order_relaxed);
+  const size_t room = limit > retired_events_ ? limit - retired_events_ : 0;
+  if (events.size() > room) {
+    dropped_.fetch_add(events.size() - room, std::memory_order_relaxed);
+    events.resize(room);
+  }
+  if (events.empty()) {
+    return;
+  }
+  events.shrink_to_fit();
+  retired_events_ += events.size();
+  retired_.push_back(buffer);
+}
+
+void Tracer::RecordComplete(const char* name, const char* category,
+                            std::chrono::steady_clock::time_point start,
+                            std::chrono::steady_clock::time_point end,
+                            const std::string& detail) {
+  ThreadBuffer& buffer = LocalBuffer();
+  std::lock_guard<std::mutex> guard(buffer.mutex);
+  if (buffer.events.size() >=
+      max_events_per_thread_.load(std::memory_order_relaxed)) {
+    dropped_.fetch_add(1, std::memory_order_relaxed);
+    return;
+  }
+  buffer.events.push_back(
+      {name, category,
+       std::chrono::duration_cast<std::chrono::nanoseconds>(start - epoch_)
+           .count(),
+       std::chrono::duration_cast<std::chrono::nanoseconds>(end - start)
+           .count(),
+       detail});
+}
+
+uint64_t Tracer::GetDroppedCount() const {
+  return dropped_.load(std::memory_order_relaxed);
+}
+
+void Tracer::WriteChromeTrace(const std::string& path) const {
+  const std::string tmp_path = path + ".tmp";
+  std::ofstream out(tmp_path, std::ios::binary | std::ios::trunc);
+  if (!out) {
+    throw FileAccessError("Failed to open trace file for writing: " +
+                          tmp_path);
+  }
+
+  out << "{\"displayTimeUnit\":\"ns\",\"traceEvents\":[\n";
+  out << "{\"ph\":\"M\",\"pid\":1,\"name\":\"process_name\","
+         "\"args\":{\"name\":\"Caninana\"}}";
+
+  std::lock_guard<std::mutex> guard(buffers_mutex_);
+  std::vector<std::shared_ptr<ThreadBuffer>> buffers = retired_;
+  buffers.insert(buffers.end(), buffers_.begin(), buffers_.end());
+  for (const auto& buffer : buffers) {
+    std::lock_guard<std::mutex> buffer_guard(buffer->mutex);
+    const std::string thread_name = buffer->name.empty()
+                                        ? "thread-" + std::to_string(buffer->tid)
+                                        : buffer->name;
+    out << ",\n{\"ph\":\"M\",\"pid\":1,\"tid\":" << buffer->tid
+        << ",\"name\":\"thread_name\",\"args\":{\"name\":"
+        << JsonString(thread_name) << "}}";
+    for (const Event& event : buffer->events) {
+      out << ",\n{\"ph\":\"X\",\"pid\":1,\"tid\":" << buffer->tid
+          << ",\"name\":" << JsonString(event.name)
+          << ",\"cat\":" << JsonString(event.category) << ",\"ts\":";
+      WriteMicros(out, event.start_ns);
+      out << ",\"dur\":";
+      WriteMicros(out, event.duration_ns);
+      if (!event.detail.empty()) {
+        out << ",\"args\":{\"detail\":" << JsonString(event.detail) << '}';
+      }
+      out << '}';
+    }
+  }
+  out << "\n]}\n";
+  out.close();
+  if (!out) {
+    throw FileAccessError("Failed to write trace file: " + tmp_path);
+  }
+
+  std::error_code ec;
+  std::filesystem::rename(tmp_path, path, ec);
+  if (ec) {
+    std::filesystem::remove(tmp_path, ec);
+    throw FileAccessError("Failed to replace trace file: " + path);
+  }
+}
+
+}  // namespace core
+}  // namespace caninana
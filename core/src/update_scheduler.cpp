@@ -0,0 +1,176 @@
+#include "update_scheduler.h"
+
+#include <algorithm>
+
+#include "security_logger.h"
+
+namespace caninana {
+namespace core {
+
+namespace {
+
+using Clock = std::chrono::steady_clock;
+
+void Deliver(const UpdateScheduler::EventCallback& on_event,
+             const UpdateScheduler::UpdateEvent& event) {
+  if (!on_event) return;
+  try {
+    on_event(event);
+  } catch (const std::exception& e) {
+    CANINANA_LOG(SecurityLogger::LogLevel::LOG_ERROR, "UpdateScheduler",
+                 std::string("Update callback failed: ") + e.what());
+  }
+}
+
+}  // namespace
+
+UpdateScheduler::UpdateScheduler(const std::string& base_url,
+                                 std::string db_path,
+                                 std::shared_ptr<SignatureEngine> engine,
+                                 Options options)
+    : updater_(base_url),
+      db_path_(std::move(db_path)),
+      engine_(std::move(engine)),
+      options_(options),
+      random_(std::random_device{}()) {}
+
+UpdateScheduler::~UpdateScheduler() { Stop(); }
+
+void UpdateScheduler::Start(EventCallback on_event) {
+  std::lock_guard<std::mutex> guard(mutex_);
+  if (thread_.joinable()) return;
+  on_event_ = std::move(on_event);
+  stop_requested_ = false;
+  check_requested_ = false;
+  thread_ = std::thread(&UpdateScheduler::Run, this);
+}
+
+void UpdateScheduler::Stop() {
+  std::thread thread;
+  {
+    std::lock_guard<std::mutex> guard(mutex_);
+    stop_requested_ = true;
+    if (thread_.get_id() == std::this_thread::get_id()) {
+      // Called from an update callback; the loop exits once it returns.
+      return;
+    }
+    thread = std::move(thread_);
+  }
+  wake_.notify_all();
+  if (thread.joinable()) thread.join();
+}
+
+void UpdateScheduler::CheckNow() {
+  {
+    std::lock_guard<std::mutex> guard(mutex_);
+    check_requested_ = true;
+  }
+  wake_.notify_all();
+}
+
+void UpdateScheduler::SetInterval(std::chrono::seconds interval) {
+  {
+    std::lock_guard<std::mutex> guard(mutex_);
+    options_.interval = interval;
+    schedule_changed_ = true;
+  }
+  wake_.notify_all();
+}
+
+bool UpdateScheduler::IsRunning() const {
+  std::lock_guard<std::mutex> guard(mutex_);
+  return thread_.joinable() && !stop_requested_;
+}
+
+void UpdateScheduler::Run() {
+  std::unique_lock<std::mutex> lock(mutex_);
+  uint32_t failures = 0;
+  bool checked = false;
+  Clock::time_point last_check = Clock::now();
+  Clock::time_point due = last_check + Jitter(options_.initial_delay);
+
+  while (!stop_requested_) {
+    if (schedule_changed_) {
+      schedule_changed_ = false;
+      // A pending retry keeps its backoff; otherwise count the new interval
+      // from the last check.
+      if (checked && failures == 0) due = last_check + NextDelay(0);
+    }
+    if (!check_requested_ && Clock::now() < due) {
+      wake_.wait_until(lock, due);
+      continue;
+    }
+    check_requested_ = false;
+    lock.unlock();
+
+    UpdateEvent event = RunCheck();
+    failures = event.kind == UpdateEvent::Kind::FAILED ? failures + 1 : 0;
+
+    lock.lock();
+    checked = true;
+    last_check = Clock::now();
+    event.consecutive_failures = failures;
+    event.next_check = NextDelay(failures);
+    due = last_check + event.next_check;
+    EventCallback on_event = on_event_;
+    lock.unlock();
+
+    if (event.kind == UpdateEvent::Kind::FAILED) {
+      CANINANA_LOG(SecurityLogger::LogLevel::WARNING, "UpdateScheduler",
+                   "Update check failed (" + std::to_string(failures) +
+                       " in a row), retrying in " +
+                       std::to_string(event.next_check.count()) +
+                       "s: " + event.error);
+    }
+    Deliver(on_event, event);
+    lock.lock();
+  }
+}
+
+UpdateScheduler::UpdateEvent UpdateScheduler::RunCheck() {
+  UpdateEvent event;
+  try {
+    if (updater_.CheckForUpdates(db_path_)) {
+      // Compiles off to the side and swaps; running scans are unaffected.
+      engine_->LoadSignatures(db_path_);
+      event.kind = UpdateEvent::Kind::APPLIED;
+    } else {
+      event.kind = UpdateEvent::Kind::UP_TO_DATE;
+    }
+  } catch (const std::exception& e) {
+    event.kind = UpdateEvent::Kind::FAILED;
+    event.error = e.what();
+  }
+  event.version = SignatureUpdater::GetLocalVersion(db_path_);
+  event.signature_count = engine_->GetSignatureCount();
+  if (event.kind == UpdateEvent::Kind::APPLIED) {
+    CANINANA_LOG(SecurityLogger::LogLevel::INFO, "UpdateScheduler",
+                 "Signature version " + event.version + " is now active (" +
+                     std::to_string(event.signature_count) + " signatures).");
+  }
+  return event;
+}
+
+// Called with mutex_ held.
+std::chrono::seconds UpdateScheduler::NextDelay(uint32_t consecutive_failures) {
+  const auto interval = std::max(options_.interval, std::chrono::seconds(1));
+  if (consecutive_failures == 0) return Jitter(interval);
+  const auto cap = std::min(options_.max_backoff, interval);
+  auto backoff = std::max(options_.min_backoff, std::chrono::seconds(1));
+  for (uint32_t i = 1; i < consecutive_failures && backoff < cap; ++i) {
+    backoff *= 2;
+  }
+  return Jitter(std::min(backoff, cap));
+}
+
+std::chrono::seconds UpdateScheduler::Jitter(std::chrono::seconds delay) {
+  const double spread = std::clamp(options_.jitter, 0.0, 1.0);
+  std::uniform_real_distribution<double> factor(1.0 - spread, 1.0 + spread);
+  const auto jittered = std::chrono::seconds(
+      static_cast<int64_t>(static_cast<double>(delay.count()) *
+                           factor(random_)));
+  return std::max(jittered, std::chrono::seconds(0));
+}
+
+}  // namespace core
+}  // namespace caninana
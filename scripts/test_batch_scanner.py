@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# The logger writes to ~/.caninana/caninana.log as soon as it is first used,
+# so point HOME at a throwaway directory before loading the core.
+home_dir = tempfile.mkdtemp(prefix="caninana_batch_")
+os.environ["HOME"] = home_dir
+os.environ["USERPROFILE"] = home_dir
+
+# --- Setup Python Path ---
+# Same layout as test_core.py: the compiled module lives in the 'ui' folder.
+print("1. Setting up Python path...")
+try:
+    ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui'))
+    sys.path.append(ui_path)
+    print(f"   Added '{ui_path}' to sys.path")
+    import caninana_core
+    print("   Successfully imported 'caninana_core' module.")
+except ImportError as e:
+    print("\n[FATAL ERROR] Could not import 'caninana_core'.")
+    print(f"   Details: {e}")
+    print("   Please ensure 'caninana_core.pyd' (or .so) exists in the 'ui' directory.")
+    sys.exit(1)
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+def write_sample(path, content, size_mb=0):
+    """Writes content followed by size_mb MiB of filler"""
+    with open(path, "wb") as f:
+        f.write(content)
+        chunk = b"\0" * (1024 * 1024)
+        for _ in range(size_mb):
+            f.write(chunk)
+    return path
+
+
+class Recorder:
+    """Records each reported result with the thread it was reported on."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def __call__(self, file_result):
+        with self.lock:
+            self.calls.append((file_result, threading.current_thread()))
+
+
+def main():
+    """Exercises the batch scanner and its watchdog on a throwaway directory."""
+    results = []
+
+    try:
+        samples_dir = os.path.join(home_dir, "samples")
+        os.makedirs(os.path.join(samples_dir, "nested"))
+        signatures_path = os.path.join(home_dir, "signatures.json")
+        with open(signatures_path, "w") as f:
+            json.dump({"version": "1", "signatures": [
+                {"name": "Test.Sig", "pattern": "MALWARE-ONE", "file_type": "any", "severity": 9}]}, f)
+        paths = []
+        for i in range(40):
+            directory = samples_dir if i % 2 else os.path.join(samples_dir, "nested")
+            content = b"header MALWARE-ONE" if i % 5 == 0 else b"nothing to see here"
+            paths.append(write_sample(os.path.join(directory, f"sample{i:02d}.txt"), content))
+        engine = caninana_core.SignatureEngine()
+        engine.load_signatures(signatures_path)
+
+        print("\n\n--- ORDERED RESULTS ---")
+        scanner = caninana_core.BatchScanner(engine, worker_count=4)
+        recorder = Recorder()
+        missing = os.path.join(samples_dir, "missing.txt")
+        batch = scanner.scan_files(paths + [missing], recorder)
+        results.append(check("Results keep the order of the paths.",
+                             [r.path for r in batch] == paths + [missing]))
+        results.append(check("Every file is scanned and threats are found.",
+                             all(r.result is not None and not r.error for r in batch[:-1])
+                             and [r.result.threat_detected for r in batch[:-1]] == [i % 5 == 0 for i in range(40)]))
+        results.append(check("A file that cannot be read is reported as an error.",
+                             batch[-1].result is None and "missing.txt" in batch[-1].error))
+        results.append(check("The callback sees every file once, from the workers.",
+                             sorted(r.path for r, _ in recorder.calls) == sorted(paths + [missing])
+                             and all(t is not threading.main_thread() for _, t in recorder.calls)))
+        batch = scanner.scan_directory(samples_dir)
+        results.append(check("scan_directory() scans every file below the root.",
+                             sorted(r.path for r in batch) == sorted(paths)))
+
+        print("\n\n--- HUNG WORKERS ---")
+        # With a 1 ms budget and no grace, the watchdog gives up on any worker
+        # still busy after a millisecond; analysing 64 MiB takes far longer.
+        large = [write_sample(os.path.join(home_dir, f"large{i}.bin"), b"", 64) for i in range(3)]
+        hung_scanner = caninana_core.BatchScanner(engine, worker_count=2, hang_grace_ms=0,
+                                                  budget=caninana_core.ScanBudget(wall_time_ms=1))
+        recorder = Recorder()
+        started = time.perf_counter()
+        batch = hung_scanner.scan_files(large + paths[:4], recorder)
+        elapsed = time.perf_counter() - started
+        abandoned = [r for r in batch if r.abandoned]
+        print(f"   {len(abandoned)} files abandoned, {hung_scanner.replaced_worker_count()} workers replaced, "
+              f"{elapsed * 1000:.0f} ms")
+        results.append(check("Hung workers are abandoned, reported as timed out and replaced.",
+                             bool(abandoned) and all(r.timed_out and r.error for r in abandoned)
+                             and hung_scanner.replaced_worker_count() >= 1))
+        results.append(check("The batch still reports every file once.",
+                             [r.path for r in batch] == large + paths[:4]
+                             and sorted(r.path for r, _ in recorder.calls) == sorted(large + paths[:4])))
+        results.append(check("Abandoned files are reported from the thread running the batch.",
+                             all(t is threading.main_thread() for r, t in recorder.calls if r.abandoned)))
+        deadline = time.perf_counter() + 10
+        while caninana_core.scans_in_flight() and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        results.append(check("Abandoned scans leave the watchdog once they return.",
+                             caninana_core.scans_in_flight() == 0))
+
+        print("\n\n--- CANCEL ---")
+        slow = [write_sample(os.path.join(home_dir, f"slow{i}.bin"), b"", 16) for i in range(24)]
+        cancel_scanner = caninana_core.BatchScanner(engine, worker_count=2)
+        first = threading.Event()
+        recorder = Recorder()
+
+        def on_result(file_result):
+            recorder(file_result)
+            first.set()
+
+        canceller = threading.Thread(target=lambda: first.wait(30) and cancel_scanner.cancel())
+        canceller.start()
+        started = time.perf_counter()
+        batch = cancel_scanner.scan_files(slow, on_result)
+        elapsed = time.perf_counter() - started
+        canceller.join()
+        cancelled = [r for r in batch if r.cancelled]
+        print(f"   {len(cancelled)} of {len(slow)} files cancelled after {elapsed * 1000:.0f} ms")
+        results.append(check("cancel() skips the files still queued.",
+                             len(batch) == len(slow) and bool(cancelled) and cancelled[-1].path == slow[-1]
+                             and all(r.result is None for r in cancelled)))
+        batch = cancel_scanner.scan_files(paths[:4])
+        results.append(check("The next batch runs normally.",
+                             all(r.result is not None and not r.cancelled for r in batch)))
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n2. Cleaning up...")
+        shutil.rmtree(home_dir, ignore_errors=True)
+        print(f"   Removed '{home_dir}'")
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# The logger writes to ~/.caninana/caninana.log as soon as it is first used,
+# so point HOME at a throwaway directory before loading the core.
+home_dir = tempfile.mkdtemp(prefix="caninana_budgets_")
+os.environ["HOME"] = home_dir
+os.environ["USERPROFILE"] = home_dir
+
+# --- Setup Python Path ---
+# Same layout as test_core.py: the compiled module lives in the 'ui' folder.
+print("1. Setting up Python path...")
+try:
+    ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui'))
+    sys.path.append(ui_path)
+    print(f"   Added '{ui_path}' to sys.path")
+    import caninana_core
+    print("   Successfully imported 'caninana_core' module.")
+except ImportError as e:
+    print("\n[FATAL ERROR] Could not import 'caninana_core'.")
+    print(f"   Details: {e}")
+    print("   Please ensure 'caninana_core.pyd' (or .so) exists in the 'ui' directory.")
+    sys.exit(1)
+
+Budget = caninana_core.ScanBudget
+Status = caninana_core.ScanStatus
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+def stopped_cleanly(result, status):
+    """A budget stop reports only its status, never a partial finding"""
+    return (result.status == status and not result.threat_detected
+            and not result.detected_signatures and result.max_severity == 0)
+
+
+def main():
+    """Exercises scan budgets on files in a throwaway directory."""
+    results = []
+
+    try:
+        samples_dir = os.path.join(home_dir, "samples")
+        os.makedirs(samples_dir)
+        signatures_path = os.path.join(samples_dir, "signatures.json")
+        with open(signatures_path, "w") as f:
+            json.dump({"version": "1", "signatures": [
+                {"name": "Test.Sig", "pattern": "MALWARE-ONE", "file_type": "any", "severity": 9}]}, f)
+        # The pattern sits at the start, so a partial scan would already
+        # have matched it.
+        large_path = os.path.join(samples_dir, "large.bin")
+        with open(large_path, "wb") as f:
+            f.write(b"MALWARE-ONE")
+            chunk = os.urandom(1024 * 1024)
+            for _ in range(64):
+                f.write(chunk)
+        engine = caninana_core.SignatureEngine()
+        engine.load_signatures(signatures_path)
+        analyzer = caninana_core.FileTypeAnalyzer()
+
+        print("\n\n--- BUDGET STOPS ---")
+        started = time.perf_counter()
+        result = engine.scan_file(large_path, analyzer, Budget(max_bytes=1024))
+        elapsed = time.perf_counter() - started
+        print(f"   Size limit: {result.status_message} ({elapsed * 1000:.0f} ms)")
+        results.append(check("A file over max_bytes is not scanned.",
+                             stopped_cleanly(result, Status.SIZE_LIMIT_ERROR)
+                             and result.status_message == "File exceeds the scan size limit."))
+
+        started = time.perf_counter()
+        result = engine.scan_file(large_path, analyzer, Budget(wall_time_ms=1))
+        elapsed = time.perf_counter() - started
+        print(f"   Wall time: {result.status_message} ({elapsed * 1000:.0f} ms)")
+        results.append(check("The wall-time budget stops a scan as TIMEOUT_ERROR.",
+                             stopped_cleanly(result, Status.TIMEOUT_ERROR)
+                             and result.status_message == "Scan timed out."))
+
+        result = engine.scan_file(large_path, analyzer, Budget(cpu_time_ms=1))
+        print(f"   CPU time: {result.status_message}")
+        results.append(check("The CPU-time budget stops a scan as CPU_BUDGET_ERROR.",
+                             stopped_cleanly(result, Status.CPU_BUDGET_ERROR)))
+
+        with open(large_path, "rb") as f:
+            content = f.read(256 * 1024)
+        file_info = analyzer.analyze_file(large_path)
+        result = engine.scan_bytes(content, file_info, Budget(max_bytes=1024))
+        results.append(check("scan_bytes() honours a budget too.",
+                             stopped_cleanly(result, Status.SIZE_LIMIT_ERROR)))
+
+        result = engine.scan_file(large_path, analyzer, Budget(wall_time_ms=60000, cpu_time_ms=60000))
+        results.append(check("A scan within its budget completes and reports the threat.",
+                             result.status == Status.COMPLETE and result.threat_detected
+                             and result.detected_signatures == ["Test.Sig"] and result.max_severity == 9))
+
+        print("\n\n--- DEFAULT BUDGETS ---")
+        small, large = Budget.adaptive(0), Budget.adaptive(40 * 1024 * 1024)
+        print(f"   Adaptive: {small.wall_time_ms} ms for an empty file, {large.wall_time_ms} ms for 40 MiB")
+        results.append(check("Adaptive budgets grow with the file size.",
+                             (small.wall_time_ms, small.cpu_time_ms) == (2000, 2000)
+                             and (large.wall_time_ms, large.cpu_time_ms) == (12000, 12000)
+                             and Budget.adaptive(40 * 1024 * 1024, ceiling_ms=5000).wall_time_ms == 5000))
+        results.append(check("The engine defaults to the adaptive budget.",
+                             engine.default_budget_for(40 * 1024 * 1024).wall_time_ms == 12000))
+        engine.set_adaptive_ceiling(5000)
+        results.append(check("set_adaptive_ceiling() caps the default.",
+                             engine.default_budget_for(40 * 1024 * 1024).wall_time_ms == 5000
+                             and engine.default_budget_for(0).wall_time_ms == 2000))
+
+        engine.set_default_budget(Budget(max_bytes=1024))
+        result = engine.scan_file(large_path, analyzer)
+        results.append(check("A fixed default budget applies to scans without one.",
+                             engine.default_budget_for(0).max_bytes == 1024
+                             and stopped_cleanly(result, Status.SIZE_LIMIT_ERROR)))
+        engine.set_default_budget(None)
+        result = engine.scan_file(large_path, analyzer)
+        results.append(check("None restores the adaptive default.",
+                             engine.default_budget_for(0).max_bytes == 0
+                             and engine.default_budget_for(0).wall_time_ms == 2000
+                             and result.status == Status.COMPLETE and result.threat_detected))
+
+        seen = set()
+        stop = threading.Event()
+
+        def read_defaults():
+            while not stop.is_set():
+                budget = engine.default_budget_for(0)
+                seen.add((budget.wall_time_ms, budget.max_bytes))
+
+        readers = [threading.Thread(target=read_defaults) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(20000):
+            engine.set_default_budget(Budget(wall_time_ms=100, max_bytes=1024) if i % 2 else None)
+        stop.set()
+        for reader in readers:
+            reader.join()
+        results.append(check("Defaults read while another thread sets them are never torn.",
+                             seen <= {(2000, 0), (100, 1024)}))
+        engine.set_default_budget(None)
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n2. Cleaning up...")
+        shutil.rmtree(home_dir, ignore_errors=True)
+        print(f"   Removed '{home_dir}'")
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# --- Setup Python Path ---
+# The history store is a plain module under 'ui/components'; it needs no
+# display and no compiled core.
+print("1. Setting up Python path...")
+components_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui', 'components'))
+sys.path.append(components_path)
+print(f"   Added '{components_path}' to sys.path")
+from history_store import ScanHistoryStore
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+def main():
+    """Exercises the scan history store on a throwaway database."""
+    work_dir = tempfile.mkdtemp(prefix="caninana_history_")
+    db_path = os.path.join(work_dir, "history.db")
+    commits = []
+    store = ScanHistoryStore(db_path, on_commit=lambda: commits.append(time.monotonic()))
+    results = []
+
+    try:
+        print("\n\n--- GROUP COMMIT (concurrent writers) ---")
+        now = time.time()
+
+        def write(worker):
+            for i in range(2500):
+                result = "threat" if i % 50 == 0 else "error" if i % 97 == 0 else "clean"
+                store.record(
+                    f"file_{worker}_{i:05d}.exe" if i % 10 == 0 else f"doc_{worker}_{i:05d}.pdf",
+                    result,
+                    size=1024 * (i % 300),
+                    duration=0.5,
+                    threats=["Test.Threat"] if result == "threat" else [],
+                    timestamp=now - i * 600
+                )
+
+        started = time.perf_counter()
+        writers = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        queued = time.perf_counter() - started
+        store.flush(timeout=30)
+        written = time.perf_counter() - started
+        print(f"   Queued 10000 scans in {queued * 1000:.0f} ms, "
+              f"committed in {written * 1000:.0f} ms with {len(commits)} commits")
+        total = store.query().count()
+        results.append(check("Every scan was written.", total == 10000))
+        results.append(check("Scans were grouped into few transactions.", len(commits) <= 100))
+
+        print("\n\n--- SQL PAGING AND FILTERS ---")
+        query = store.query()
+        first_page = query.fetch(0, 100)
+        deep_page = query.fetch(9950, 100)
+        print(f"   First row: {first_page[0]['filename']} at {first_page[0]['timestamp']}")
+        results.append(check("Pages are newest first.",
+                             first_page[0]["timestamp"] >= first_page[-1]["timestamp"]))
+        results.append(check("Last page is partial.", len(deep_page) == 50))
+        threats = store.query(result="Threats Found")
+        results.append(check("Result filter counts threats.", threats.count() == 4 * 50))
+        results.append(check("Threat names survive the round trip.",
+                             threats.fetch(0, 1)[0]["threats"] == ["Test.Threat"]))
+        results.append(check("Search matches names case-insensitively.",
+                             store.query(search="FILE_1_").count() == 250))
+        results.append(check("'%' in a search is literal, not a wildcard.",
+                             store.query(search="%").count() == 0))
+        results.append(check("Time filter keeps the last day only.",
+                             store.query(time_range="Today").count() == 4 * 144))
+
+        print("\n\n--- INCREMENTAL STATISTICS ---")
+        started = time.perf_counter()
+        stats = store.get_stats()
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"   Stats in {elapsed:.2f} ms: total {stats['total']}, "
+              f"by result {stats['by_result']}")
+        results.append(check("Totals match the history.",
+                             stats["total"] == 10000
+                             and stats["by_result"]["threat"]["scans"] == 200))
+        results.append(check("Average duration comes from the aggregates.",
+                             abs(stats["total_duration"] / stats["total"] - 0.5) < 1e-9))
+        results.append(check("Last week's scans are counted separately.",
+                             0 < stats["recent"] < stats["total"]))
+        with store.connect() as connection:
+            connection.execute("DELETE FROM scans WHERE result = 'error'")
+        stats = store.get_stats()
+        results.append(check("Deleting scans updates the aggregates.",
+                             stats["total"] == store.query().count()
+                             and stats["by_result"]["error"]["scans"] == 0))
+
+        print("\n\n--- SEARCH WHILE TYPING (100k scans) ---")
+        for i in range(90000):
+            store.record(f"Report_{i:06d}_Ünïcode.DOCX" if i % 3 else f"setup_{i:06d}.exe",
+                         "clean", duration=0.1, timestamp=now - 30 - i)
+        store.flush(timeout=60)
+        started = time.perf_counter()
+        store.query(search="x")
+        print(f"   Index built for {store.query().count()} scans in "
+              f"{(time.perf_counter() - started) * 1000:.0f} ms")
+        timings = []
+        pages_match = True
+        for term in ["r", "re", "rep", "repo", "report_0", "report_01", "report_012", "report_01", "report_0"]:
+            started = time.perf_counter()
+            matches = store.query(search=term)
+            page = matches.fetch(0, 20)
+            timings.append((term, (time.perf_counter() - started) * 1000, matches.count()))
+            pages_match = pages_match and len(page) == min(20, timings[-1][2]) and all(
+                term in scan["filename"].lower() for scan in page)
+        for term, elapsed, count in timings:
+            print(f"   '{term}': {count} matches in {elapsed:.1f} ms")
+        results.append(check("Each keystroke's first page holds only matching scans.", pages_match))
+        results.append(check("Search folds case, including non-ASCII letters.",
+                             store.query(search="ÜNÏCODE").count() == 60000))
+        results.append(check("Narrowed results match a full search.",
+                             timings[6][2] == len([i for i in range(90000) if i % 3 and f"{i:06d}".startswith("012")])))
+        results.append(check("Deleting back reuses the earlier matches.",
+                             timings[8][2] == timings[4][2]))
+        results.append(check("Every narrowing keystroke stays under 50 ms.",
+                             all(elapsed < 50 for _, elapsed, _ in timings[2:])))
+        results.append(check("Search results are newest first.",
+                             [scan["filename"] for scan in store.query(search="report_00000").fetch(0, 2)]
+                             == ["Report_000001_Ünïcode.DOCX", "Report_000002_Ünïcode.DOCX"]))
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n2. Cleaning up...")
+        store.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+        print(f"   Removed '{work_dir}'")
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# The logger writes to ~/.caninana/caninana.log as soon as it is first used,
+# so point HOME at a throwaway directory before loading the core.
+home_dir = tempfile.mkdtemp(prefix="caninana_hot_swap_")
+os.environ["HOME"] = home_dir
+os.environ["USERPROFILE"] = home_dir
+
+# --- Setup Python Path ---
+# Same layout as test_core.py: the compiled module lives in the 'ui' folder.
+print("1. Setting up Python path...")
+try:
+    ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui'))
+    sys.path.append(ui_path)
+    print(f"   Added '{ui_path}' to sys.path")
+    import caninana_core
+    print("   Successfully imported 'caninana_core' module.")
+except ImportError as e:
+    print("\n[FATAL ERROR] Could not import 'caninana_core'.")
+    print(f"   Details: {e}")
+    print("   Please ensure 'caninana_core.pyd' (or .so) exists in the 'ui' directory.")
+    sys.exit(1)
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+def write_database(path, name, pattern, fillers):
+    """A database with one signature the sample matches, plus fillers"""
+    signatures = [{"name": name, "pattern": pattern, "file_type": "any", "severity": 8}]
+    signatures += [{"name": f"{name}.Filler{i}", "pattern": f"{name}-filler-{i:05d}",
+                    "file_type": "any", "severity": 1} for i in range(fillers)]
+    with open(path, "w") as f:
+        json.dump({"version": "1", "signatures": signatures}, f)
+    return path
+
+
+def main():
+    """Reloads signatures while other threads keep scanning."""
+    results = []
+
+    try:
+        old_db = write_database(os.path.join(home_dir, "old.json"), "Old.Sig", "OLD-PATTERN", 3000)
+        new_db = write_database(os.path.join(home_dir, "new.json"), "New.Sig", "NEW-PATTERN", 2000)
+        broken_db = os.path.join(home_dir, "broken.json")
+        with open(broken_db, "w") as f:
+            f.write('{"signatures": [')
+        sample = os.path.join(home_dir, "sample.txt")
+        with open(sample, "w") as f:
+            f.write("header OLD-PATTERN " + "nothing to see here " * 20000 + " NEW-PATTERN trailer")
+        engine = caninana_core.SignatureEngine()
+        engine.load_signatures(old_db)
+        analyzer = caninana_core.FileTypeAnalyzer()
+
+        print("\n\n--- RELOADS DURING SCANS ---")
+        findings = []
+        errors = []
+        stop = threading.Event()
+
+        def scan():
+            while not stop.is_set():
+                try:
+                    result = engine.scan_file(sample, analyzer)
+                    findings.append(tuple(result.detected_signatures))
+                except Exception as e:
+                    errors.append(e)
+
+        scanners = [threading.Thread(target=scan) for _ in range(4)]
+        for scanner in scanners:
+            scanner.start()
+        reload_times = []
+        for i in range(40):
+            started = time.perf_counter()
+            engine.load_signatures(new_db if i % 2 == 0 else old_db)
+            reload_times.append(time.perf_counter() - started)
+        stop.set()
+        for scanner in scanners:
+            scanner.join()
+        print(f"   {len(findings)} scans during 40 reloads "
+              f"(slowest reload {max(reload_times) * 1000:.0f} ms), {len(errors)} errors")
+        results.append(check("Scans keep running while signatures are reloaded.",
+                             not errors and len(findings) >= 40))
+        results.append(check("Every scan sees one whole signature set, never a mix.",
+                             set(findings) <= {("Old.Sig",), ("New.Sig",)}))
+        results.append(check("Both sets were seen by scans.",
+                             set(findings) == {("Old.Sig",), ("New.Sig",)}))
+        results.append(check("The last set loaded is the one in use.",
+                             engine.get_signature_count() == 3001
+                             and engine.scan_file(sample, analyzer).detected_signatures == ["Old.Sig"]))
+
+        print("\n\n--- FAILED RELOADS ---")
+        engine.load_signatures(new_db)
+        failures = []
+        for path in (broken_db, os.path.join(home_dir, "missing.json")):
+            try:
+                engine.load_signatures(path)
+            except caninana_core.FileError as e:
+                failures.append(type(e).__name__)
+        print(f"   Raised: {failures}")
+        results.append(check("A broken or missing database raises.",
+                             failures == ["DatabaseParseError", "FileAccessError"]))
+        results.append(check("The current set stays in place after a failed reload.",
+                             engine.get_signature_count() == 2001
+                             and engine.scan_file(sample, analyzer).detected_signatures == ["New.Sig"]))
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n2. Cleaning up...")
+        shutil.rmtree(home_dir, ignore_errors=True)
+        print(f"   Removed '{home_dir}'")
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
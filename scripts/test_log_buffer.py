@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# --- Setup Python Path ---
+# The log buffer is a plain module under 'ui/components'; it needs no
+# display and no compiled core.
+print("1. Setting up Python path...")
+components_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui', 'components'))
+sys.path.append(components_path)
+print(f"   Added '{components_path}' to sys.path")
+from log_buffer import LogBuffer, LogEntry, LogLevel
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+def main():
+    """Exercises the bounded log buffer with entries spilled to disk."""
+    levels = [LogLevel.INFO, LogLevel.INFO, LogLevel.WARNING, LogLevel.DEBUG, LogLevel.ERROR]
+    start = datetime(2024, 1, 1)
+    buffer = LogBuffer(max_entries=1000)
+    results = []
+
+    try:
+        print("\n\n--- BOUNDED APPEND ---")
+        started = time.perf_counter()
+        for i in range(100000):
+            buffer.append(LogEntry(start + timedelta(seconds=i), levels[i % len(levels)],
+                                   f"Message {i}", "Test", {"index": i}))
+        elapsed = time.perf_counter() - started
+        print(f"   Appended 100000 entries in {elapsed * 1000:.0f} ms")
+        results.append(check("Memory holds at most max_entries.", len(buffer.memory()) == 1000))
+        results.append(check("Per-level memory is bounded too.",
+                             sum(len(buffer.memory(level)) for level in set(levels)) == 1000))
+
+        print("\n\n--- PAGING THROUGH THE VIEW ---")
+        view = buffer.view()
+        results.append(check("View counts spilled and in-memory entries.", view.count() == 100000))
+        first = view.fetch(0, 3)
+        results.append(check("Spilled entries read back oldest first.",
+                             [entry.message for entry in first] == ["Message 0", "Message 1", "Message 2"]
+                             and first[0].details == {"index": 0}
+                             and first[0].timestamp == start))
+        boundary = view.fetch(98998, 4)
+        results.append(check("A page across the spill boundary is contiguous.",
+                             [entry.details["index"] for entry in boundary] == [98998, 98999, 99000, 99001]))
+        results.append(check("The last page is partial.", len(view.fetch(99990, 100)) == 10))
+
+        print("\n\n--- LEVEL VIEWS ---")
+        warnings = buffer.view(LogLevel.WARNING)
+        page = warnings.fetch(19990, 20)
+        results.append(check("Level view counts only its level.", warnings.count() == 20000))
+        results.append(check("Level view pages across the spill boundary.",
+                             [entry.details["index"] for entry in page]
+                             == [i for i in range(100000) if i % 5 == 2][19990:]))
+        results.append(check("Unused levels are empty.", buffer.view(LogLevel.CRITICAL).count() == 0))
+
+        print("\n\n--- BOUNDED SPILL ---")
+        ring = LogBuffer(max_entries=100, max_spilled=1000)
+        for i in range(10000):
+            ring.append(LogEntry(start + timedelta(seconds=i), levels[i % len(levels)],
+                                 f"Message {i}", "Test", {"index": i}))
+        view = ring.view()
+        oldest = view.fetch(0, 1)[0].details["index"]
+        print(f"   {view.count()} entries kept in {len(ring.segments)} spill files, oldest #{oldest}")
+        results.append(check("Spilled entries stay within max_spilled.",
+                             900 <= len(ring.spill_offsets()) <= 1000 and len(ring.segments) <= 11))
+        results.append(check("The oldest entries are dropped first.",
+                             [entry.details["index"] for entry in view.fetch(0, view.count())]
+                             == list(range(oldest, 10000))))
+        errors = ring.view(LogLevel.ERROR)
+        results.append(check("Level views drop the same entries.",
+                             errors.fetch(0, 1)[0].details["index"] >= oldest
+                             and errors.count() == len([i for i in range(oldest, 10000) if i % 5 == 4])))
+        ring.close()
+
+        buffer.clear()
+        results.append(check("Clear drops every entry.", buffer.view().count() == 0))
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n2. Cleaning up...")
+        buffer.close()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+# --- Setup Python Path ---
+# The tailer is a plain module under 'ui/components'; it needs no display
+# and no compiled core.
+print("1. Setting up Python path...")
+ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui'))
+sys.path.append(ui_path)
+print(f"   Added '{ui_path}' to sys.path")
+from components.log_buffer import LogEntry
+from components.log_tailer import LogTailer, RecordMatcher, parse_log_line
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+class Collector:
+    """Gathers delivered entries so the checks can wait for them."""
+
+    def __init__(self):
+        self.entries = []
+        self.batches = 0
+        self.condition = threading.Condition()
+
+    def __call__(self, entries):
+        with self.condition:
+            self.entries.extend(entries)
+            self.batches += 1
+            self.condition.notify_all()
+
+    def wait_for(self, count, timeout=5.0):
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.entries) >= count, timeout)
+            return len(self.entries) >= count
+
+    def messages(self):
+        with self.condition:
+            return [entry.message for entry in self.entries]
+
+
+def text_line(number, level="INFO", component="Test"):
+    return f"[2024-01-31 12:00:00] [{level}] [{component}] Message {number}\n"
+
+
+def append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def main():
+    """Exercises the log tailer on files in a throwaway directory."""
+    work_dir = tempfile.mkdtemp(prefix="caninana_tailer_")
+    log_path = os.path.join(work_dir, "caninana.log")
+    tailers = []
+    results = []
+
+    try:
+        print("\n\n--- PARSING ---")
+        entry = parse_log_line("[2024-01-31 12:00:05] [WARNING] [RealTime] Suspicious [file] found")
+        results.append(check("Text lines are parsed.",
+                             entry.level == "WARNING" and entry.component == "RealTime"
+                             and entry.message == "Suspicious [file] found"
+                             and entry.timestamp == datetime(2024, 1, 31, 12, 0, 5)))
+        entry = parse_log_line(json.dumps({
+            "ts": "2024-01-31T12:00:05.250", "level": "ERROR", "component": "Scanner",
+            "message": "Scan failed", "file": "a.exe", "duration_ms": 12.5
+        }))
+        results.append(check("JSON lines are parsed with their fields.",
+                             entry.level == "ERROR" and entry.details == {"file": "a.exe", "duration_ms": 12.5}
+                             and entry.timestamp.microsecond == 250000))
+        entry = parse_log_line(json.dumps({
+            "ts": "2024-01-31T12:00:05.250Z", "level": "INFO", "component": "Scanner", "message": "UTC"
+        }))
+        utc = datetime(2024, 1, 31, 12, 0, 5, 250000, tzinfo=timezone.utc)
+        results.append(check("UTC timestamps are shown in local time.",
+                             entry.timestamp == utc.astimezone().replace(tzinfo=None)))
+
+        print("\n\n--- BACKFILL OF A LARGE LOG ---")
+        line = text_line(0)
+        with open(log_path, "w", encoding="utf-8") as f:
+            block = "".join(text_line(i) for i in range(10000))
+            for _ in range(50):
+                f.write(block)
+            f.write(text_line("last"))
+        size = os.path.getsize(log_path)
+        collector = Collector()
+        started = time.perf_counter()
+        tailer = LogTailer(log_path, collector, poll_interval=5.0, initial_bytes=64 * 1024)
+        tailers.append(tailer)
+        tailer.start()
+        tailer.caught_up.wait(10)
+        elapsed = time.perf_counter() - started
+        print(f"   Caught up on a {size / 1e6:.0f} MB log in {elapsed * 1000:.0f} ms "
+              f"with {len(collector.entries)} entries, inotify: {tailer.inotify_fd is not None}")
+        results.append(check("Only the end of the file is read.",
+                             len(collector.entries) <= 64 * 1024 // len(line) + 1
+                             and collector.messages()[-1] == "Message last"))
+        results.append(check("Backfill starts on a line boundary.",
+                             all(message.startswith("Message ") for message in collector.messages())))
+
+        print("\n\n--- APPENDS, PARTIAL LINES, TRUNCATION, ROTATION ---")
+        backfill = len(collector.entries)
+        started = time.perf_counter()
+        append(log_path, text_line("new 1"))
+        collector.wait_for(backfill + 1)
+        latency = time.perf_counter() - started
+        print(f"   Appended line seen after {latency * 1000:.0f} ms (poll interval 5000 ms)")
+        if sys.platform.startswith("linux"):
+            results.append(check("inotify wakes the tailer before the poll interval.",
+                                 tailer.inotify_fd is not None and latency < 1.0))
+        append(log_path, "[2024-01-31 12:00:00] [INFO] [Test] Message ")
+        time.sleep(0.3)
+        results.append(check("A partial line is held back.", len(collector.entries) == backfill + 1))
+        append(log_path, "new 2\n")
+        results.append(check("The rest of the line completes it.",
+                             collector.wait_for(backfill + 2)
+                             and collector.messages()[-1] == "Message new 2"))
+
+        with open(log_path, "w", encoding="utf-8") as f:
+            f.write(text_line("after truncate"))
+        results.append(check("Truncation restarts at the beginning.",
+                             collector.wait_for(backfill + 3)
+                             and collector.messages()[-1] == "Message after truncate"))
+
+        rotated_path = log_path + ".20240131-120000-0000"
+        with open(log_path, "a", encoding="utf-8") as writer:
+            writer.write(text_line("before rotate"))
+            writer.flush()
+            os.rename(log_path, rotated_path)
+            writer.write(text_line("old file tail"))
+        append(log_path, text_line("new file"))
+        collector.wait_for(backfill + 6)
+        results.append(check("Rotation drains the old file, then reads the new one.",
+                             collector.messages()[-3:]
+                             == ["Message before rotate", "Message old file tail", "Message new file"]))
+
+        print("\n\n--- POLLING FALLBACK ---")
+        polled = Collector()
+        poller = LogTailer(log_path, polled, poll_interval=0.1, use_inotify=False)
+        tailers.append(poller)
+        poller.start()
+        poller.caught_up.wait(5)
+        append(log_path, "".join(text_line(f"burst {i}") for i in range(2500)))
+        results.append(check("Polling picks up a burst in batches.",
+                             poller.inotify_fd is None and polled.wait_for(2501)
+                             and polled.batches >= 3 and polled.messages()[-1] == "Message burst 2499"))
+
+        print("\n\n--- ONE ENTRY PER RECORD ---")
+        matcher = RecordMatcher()
+        ring = LogEntry(datetime(2024, 1, 31, 12, 0, 0, 123456), "INFO", "Scan done", "Scanner")
+        same = LogEntry(datetime(2024, 1, 31, 12, 0, 0), "INFO", "Scan done", "Scanner")
+        results.append(check("The first source to deliver a record shows it.",
+                             matcher.is_new(ring, "engine") and not matcher.is_new(same, "file")))
+        results.append(check("Repeated records are each shown once.",
+                             matcher.is_new(same, "file") and matcher.is_new(same, "file")
+                             and not matcher.is_new(ring, "engine") and not matcher.is_new(ring, "engine")
+                             and matcher.is_new(ring, "engine")))
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n2. Cleaning up...")
+        for tailer in tailers:
+            tailer.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+        print(f"   Removed '{work_dir}'")
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# The logger writes to ~/.caninana/caninana.log as soon as it is first used,
+# so point HOME at a throwaway directory before loading the core.
+home_dir = tempfile.mkdtemp(prefix="caninana_logger_")
+os.environ["HOME"] = home_dir
+os.environ["USERPROFILE"] = home_dir
+log_dir = os.path.join(home_dir, ".caninana")
+log_path = os.path.join(log_dir, "caninana.log")
+
+# --- Setup Python Path ---
+# Same layout as test_core.py: the compiled module lives in the 'ui' folder.
+print("1. Setting up Python path...")
+try:
+    ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui'))
+    sys.path.append(ui_path)
+    print(f"   Added '{ui_path}' to sys.path")
+    import caninana_core
+    print("   Successfully imported 'caninana_core' module.")
+except ImportError as e:
+    print("\n[FATAL ERROR] Could not import 'caninana_core'.")
+    print(f"   Details: {e}")
+    print("   Please ensure 'caninana_core.pyd' (or .so) exists in the 'ui' directory.")
+    sys.exit(1)
+
+Level = caninana_core.LogLevel
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+def log_lines(component):
+    """Lines of the active log file written by component"""
+    with open(log_path, encoding="utf-8") as f:
+        return [line for line in f.read().splitlines() if f"[{component}]" in line]
+
+
+def rotated_segments():
+    """Names of rotated log segments, oldest first"""
+    return sorted(name for name in os.listdir(log_dir)
+                  if name.startswith("caninana.log.") and not name.endswith(".part"))
+
+
+def log_from_threads(logger, component, threads, per_thread):
+    """Logs per_thread numbered messages from each of several threads"""
+    def worker(thread):
+        for i in range(per_thread):
+            logger.log(Level.INFO, component, f"t{thread} {i}")
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    started = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    return time.perf_counter() - started
+
+
+# Run in a child process by the full-ring check; prints the dropped count.
+BURST_SCRIPT = """
+import sys, threading
+from datetime import timedelta
+sys.path.append(sys.argv[1])
+import caninana_core
+logger = caninana_core.SecurityLogger.get_instance()
+logger.enable_async(ring_capacity=2, flush_interval=timedelta(seconds=1))
+def burst():
+    for i in range(5000):
+        logger.log(caninana_core.LogLevel.INFO, "BurstTest", f"burst {i}")
+threads = [threading.Thread(target=burst) for _ in range(4)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+logger.disable_async()
+print(logger.dropped_count())
+"""
+
+
+def main():
+    """Exercises the SecurityLogger singleton in a throwaway home directory."""
+    logger = caninana_core.SecurityLogger.get_instance()
+    results = []
+
+    try:
+        print("\n\n--- ASYNCHRONOUS WRITER ---")
+        sync_elapsed = log_from_threads(logger, "SyncTest", 4, 2000)
+        logger.enable_async(ring_capacity=1 << 16, flush_interval=timedelta(milliseconds=50))
+        dropped_before = logger.dropped_count()
+        async_elapsed = log_from_threads(logger, "AsyncTest", 4, 2000)
+        logger.flush()
+        lines = log_lines("AsyncTest")
+        dropped = logger.dropped_count() - dropped_before
+        print(f"   8000 records from 4 threads: {sync_elapsed * 1000:.0f} ms synchronous, "
+              f"{async_elapsed * 1000:.0f} ms asynchronous, {dropped} dropped")
+        results.append(check("Every record reaches the file after flush().",
+                             len(lines) == 8000 and dropped == 0))
+        in_order = True
+        for thread in range(4):
+            numbers = [int(line.rsplit(" ", 1)[1]) for line in lines if f"] t{thread} " in line]
+            in_order = in_order and numbers == list(range(2000))
+        results.append(check("Each thread's records keep their order.", in_order))
+
+        logger.log(Level.WARNING, "AsyncTest", "written without flush")
+        deadline = time.perf_counter() + 2
+        while time.perf_counter() < deadline and not log_lines("AsyncTest")[-1].endswith("written without flush"):
+            time.sleep(0.02)
+        results.append(check("The writer flushes on its own within the interval.",
+                             log_lines("AsyncTest")[-1].endswith("written without flush")))
+
+        logger.log(Level.INFO, "AsyncTest", "drained on disable")
+        logger.disable_async()
+        results.append(check("disable_async() drains the ring.",
+                             log_lines("AsyncTest")[-1].endswith("drained on disable")))
+
+        print("\n\n--- FULL RING ---")
+        # The ring keeps the size it was first allocated with, so a tiny one
+        # needs a fresh process (with its own log directory).
+        burst_home = os.path.join(home_dir, "burst")
+        burst = subprocess.run([sys.executable, "-c", BURST_SCRIPT, ui_path],
+                               env=dict(os.environ, HOME=burst_home, USERPROFILE=burst_home),
+                               capture_output=True, text=True, timeout=60)
+        dropped = int(burst.stdout.split()[-1])
+        with open(os.path.join(burst_home, ".caninana", "caninana.log"), encoding="utf-8") as f:
+            text = f.read()
+        written = text.count("[BurstTest]")
+        notices = re.findall(r"(\d+) log records dropped \(ring buffer full\)", text)
+        print(f"   20000 records into 2 slots: {written} written, {dropped} dropped")
+        results.append(check("A full ring drops records instead of blocking.",
+                             dropped > 0 and written + dropped == 20000))
+        results.append(check("Drops are reported in the log.",
+                             sum(int(count) for count in notices) == dropped))
+
+        print("\n\n--- LEVEL FILTER ---")
+        results.append(check("INFO is the default minimum level.",
+                             logger.get_min_level() == Level.INFO
+                             and not logger.is_enabled(Level.DEBUG) and logger.is_enabled(Level.INFO)))
+        logger.log(Level.DEBUG, "LevelTest", "debug while INFO")
+        logger.set_min_level(Level.DEBUG)
+        logger.log(Level.DEBUG, "LevelTest", "debug while DEBUG")
+        logger.set_min_level(Level.ERROR)
+        for level in (Level.DEBUG, Level.INFO, Level.WARNING, Level.ERROR, Level.CRITICAL):
+            logger.log(level, "LevelTest", f"{level.name} while ERROR")
+        messages = [line.split("[LevelTest] ", 1)[1] for line in log_lines("LevelTest")]
+        results.append(check("Records below the minimum level are not written.",
+                             messages == ["debug while DEBUG", "ERROR while ERROR", "CRITICAL while ERROR"]))
+
+        samples_dir = os.path.join(home_dir, "samples")
+        os.makedirs(samples_dir)
+        signatures_path = os.path.join(samples_dir, "signatures.json")
+        with open(signatures_path, "w") as f:
+            json.dump({"version": "1", "signatures": [
+                {"name": "Test.Sig", "pattern": "MALWARE-ONE", "file_type": "any", "severity": 9}]}, f)
+        clean_path = os.path.join(samples_dir, "clean.txt")
+        infected_path = os.path.join(samples_dir, "infected.txt")
+        with open(clean_path, "w") as f:
+            f.write("nothing to see here")
+        with open(infected_path, "w") as f:
+            f.write("header MALWARE-ONE")
+        engine = caninana_core.SignatureEngine()
+        engine.load_signatures(signatures_path)
+        analyzer = caninana_core.FileTypeAnalyzer()
+        engine.scan_file(clean_path, analyzer)
+        engine.scan_file(infected_path, analyzer)
+        logger.set_min_level(Level.DEBUG)
+        engine.scan_file(clean_path, analyzer)
+        messages = [line.split("] ", 2)[2] for line in log_lines("SignatureEngine")]
+        results.append(check("At ERROR only threats are logged; clean scans appear at DEBUG.",
+                             len(messages) == 2 and messages[0].startswith("[SignatureEngine] Threat detected.")
+                             and messages[1] == "[SignatureEngine] Scan completed (clean)."))
+
+        logger.set_min_level(Level.INFO)
+        started = time.perf_counter()
+        for i in range(100000):
+            logger.log(Level.DEBUG, "LevelTest", "disabled")
+        elapsed = time.perf_counter() - started
+        print(f"   100000 disabled records in {elapsed * 1000:.0f} ms "
+              f"({elapsed * 1e9 / 100000:.0f} ns each, mostly the Python call)")
+        results.append(check("Disabled records are never written.",
+                             not any(line.endswith("disabled") for line in log_lines("LevelTest"))))
+
+        print("\n\n--- RECENT RECORDS TAIL ---")
+        cursor = logger.last_sequence()
+        fields = caninana_core.LogFields()
+        fields.file_path = "sample.exe"
+        for i in range(5):
+            logger.log(Level.WARNING, "TailTest", f"tail {i}", fields)
+        logger.log(Level.DEBUG, "TailTest", "filtered out")
+        records = logger.get_records_since(cursor)
+        results.append(check("Records after a sequence come back oldest first, with their fields.",
+                             [r.sequence for r in records] == list(range(cursor + 1, cursor + 6))
+                             and [r.message for r in records] == [f"tail {i}" for i in range(5)]
+                             and all(r.level == Level.WARNING and r.component == "TailTest"
+                                     and r.fields.file_path == "sample.exe" for r in records)
+                             and logger.last_sequence() == cursor + 5))
+        limited = logger.get_records_since(cursor, max_records=2)
+        results.append(check("max_records returns the oldest records first.",
+                             [r.message for r in limited] == ["tail 0", "tail 1"]
+                             and not logger.get_records_since(logger.last_sequence())))
+
+        logger.set_tail_capacity(10)
+        cursor = logger.last_sequence()
+        for i in range(25):
+            logger.log(Level.INFO, "TailTest", f"evicted {i}")
+        records = logger.get_records_since(cursor)
+        results.append(check("Only the newest records are kept; the gap shows in the sequence.",
+                             len(records) == 10 and records[0].sequence == cursor + 16
+                             and records[-1].message == "evicted 24"))
+
+        logger.set_tail_capacity(20000)
+        cursor = logger.last_sequence()
+        seen = []
+        writers = threading.Thread(target=log_from_threads, args=(logger, "TailTest", 4, 2000))
+        writers.start()
+        while writers.is_alive() or logger.last_sequence() > cursor:
+            for record in logger.get_records_since(cursor, max_records=500):
+                seen.append(record.sequence)
+                cursor = record.sequence
+            time.sleep(0.001)
+        print(f"   Polled {len(seen)} records while 4 threads logged")
+        results.append(check("Polling while threads log sees every record exactly once.",
+                             len(seen) == 8000 and seen == list(range(seen[0], seen[0] + 8000))))
+        logger.set_tail_capacity(1000)
+
+        print("\n\n--- JSON LINES ---")
+        logger.log(Level.INFO, "FormatTest", "last text record")
+        logger.set_format(caninana_core.LogFormat.JSON_LINES)
+        results.append(check("Switching format starts a new file.",
+                             bool(rotated_segments()) and os.path.getsize(log_path) == 0))
+        fields = caninana_core.LogFields()
+        fields.file_path = "C:\\Temp\\\"quoted\".exe"
+        fields.signatures = ["EICAR", "Test.Sig"]
+        fields.duration_ms = 12.5
+        fields.bytes = 4096
+        before = datetime.now(timezone.utc)
+        logger.log(Level.WARNING, "FormatTest", "line one\nline two", fields)
+        with open(log_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        record = json.loads(lines[-1])
+        print(f"   {lines[-1]}")
+        results.append(check("Each record is one JSON object on one line.",
+                             len(lines) == 1 and record["message"] == "line one\nline two"
+                             and record["level"] == "WARNING" and record["component"] == "FormatTest"))
+        results.append(check("Structured fields are kept as JSON values.",
+                             record["file"] == fields.file_path and record["signatures"] == ["EICAR", "Test.Sig"]
+                             and record["duration_ms"] == 12.5 and record["bytes"] == 4096))
+        ts = datetime.strptime(record["ts"], "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+        results.append(check("Timestamps are UTC with a trailing Z.",
+                             abs((ts - before).total_seconds()) < 5))
+
+        print("\n\n--- SIZE ROTATION ---")
+        policy = caninana_core.LogRotationPolicy()
+        policy.max_bytes = 4096
+        policy.max_segments = 3
+        policy.compression = caninana_core.LogCompression.GZIP
+        logger.set_rotation_policy(policy)
+        for i in range(400):
+            logger.log(Level.INFO, "RotationTest", f"record {i:04d} " + "x" * 40)
+        deadline = time.perf_counter() + 5
+        while time.perf_counter() < deadline and not (
+                len(rotated_segments()) == 3 and all(name.endswith(".gz") for name in rotated_segments())):
+            time.sleep(0.05)
+        segments = rotated_segments()
+        print(f"   Active file {os.path.getsize(log_path)} bytes, segments: {segments}")
+        results.append(check("The active file stays near max_bytes.",
+                             os.path.getsize(log_path) < 4096 + 200))
+        results.append(check("Only max_segments rotated files are kept, all compressed.",
+                             len(segments) == 3 and all(name.endswith(".gz") for name in segments)))
+        newest = []
+        for name in segments:
+            with gzip.open(os.path.join(log_dir, name), "rt", encoding="utf-8") as f:
+                newest.extend(json.loads(line)["message"] for line in f.read().splitlines())
+        with open(log_path, encoding="utf-8") as f:
+            newest.extend(json.loads(line)["message"] for line in f.read().splitlines())
+        results.append(check("Kept segments and the active file hold the newest records in order.",
+                             newest[-1].startswith("record 0399")
+                             and newest == sorted(newest) and len(newest) < 400))
+
+        logger.set_rotation_policy(caninana_core.LogRotationPolicy())
+        logger.set_format(caninana_core.LogFormat.TEXT)
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n2. Cleaning up...")
+        logger.disable_async()
+        shutil.rmtree(home_dir, ignore_errors=True)
+        print(f"   Removed '{home_dir}'")
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
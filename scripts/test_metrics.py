@@ -0,0 +1,194 @@
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# The logger writes to ~/.caninana/caninana.log as soon as it is first used,
+# so point HOME at a throwaway directory before loading the core.
+home_dir = tempfile.mkdtemp(prefix="caninana_metrics_")
+os.environ["HOME"] = home_dir
+os.environ["USERPROFILE"] = home_dir
+
+# --- Setup Python Path ---
+# Same layout as test_core.py: the compiled module lives in the 'ui' folder.
+print("1. Setting up Python path...")
+try:
+    ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui'))
+    sys.path.append(ui_path)
+    print(f"   Added '{ui_path}' to sys.path")
+    import caninana_core
+    print("   Successfully imported 'caninana_core' module.")
+except ImportError as e:
+    print("\n[FATAL ERROR] Could not import 'caninana_core'.")
+    print(f"   Details: {e}")
+    print("   Please ensure 'caninana_core.pyd' (or .so) exists in the 'ui' directory.")
+    sys.exit(1)
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+def free_port():
+    """A loopback port nothing is listening on"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def scrape(port, path="/metrics", timeout=10):
+    """Status, body and duration of one GET against the exporter"""
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=timeout) as response:
+            status, body = response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        status, body = e.code, e.read().decode("utf-8")
+    return status, body, time.perf_counter() - started
+
+
+def metric_value(text, name):
+    """Value of an unlabelled sample in Prometheus text, or None"""
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.split()[1])
+    return None
+
+
+def main():
+    """Exercises the metrics registry and its HTTP exporter."""
+    registry = caninana_core.MetricsRegistry.get_instance()
+    results = []
+
+    try:
+        print("\n\n--- COUNTERS AND HISTOGRAMS ---")
+        samples_dir = os.path.join(home_dir, "samples")
+        os.makedirs(samples_dir)
+        signatures_path = os.path.join(samples_dir, "signatures.json")
+        with open(signatures_path, "w") as f:
+            json.dump({"version": "1", "signatures": [
+                {"name": "Test.Sig", "pattern": "MALWARE-ONE", "file_type": "any", "severity": 9}]}, f)
+        paths = []
+        for i in range(20):
+            paths.append(os.path.join(samples_dir, f"sample{i}.txt"))
+            with open(paths[-1], "w") as f:
+                f.write("header MALWARE-ONE" if i < 5 else "nothing to see here " * 50)
+        engine = caninana_core.SignatureEngine()
+        engine.load_signatures(signatures_path)
+        analyzer = caninana_core.FileTypeAnalyzer()
+        engine.scan_file(paths[0], analyzer)
+        before = registry.snapshot()
+        for path in paths:
+            engine.scan_file(path, analyzer)
+        after = registry.snapshot()
+
+        def delta(name):
+            return after["counters"].get(name, 0) - before["counters"].get(name, 0)
+
+        scans = after["histograms"]["caninana_scan_duration_seconds"]
+        print(f"   {delta('caninana_files_scanned_total')} scans, p50 {scans['p50_seconds'] * 1e6:.0f} us, "
+              f"p99 {scans['p99_seconds'] * 1e6:.0f} us, max {scans['max_seconds'] * 1e6:.0f} us")
+        results.append(check("Scans update the engine counters.",
+                             delta("caninana_files_scanned_total") == 20
+                             and delta("caninana_threats_detected_total") == 5
+                             and delta("caninana_bytes_scanned_total") == 5 * 18 + 15 * 1000))
+        results.append(check("The scan histogram counts every scan with ordered quantiles.",
+                             scans["count"] - before["histograms"]["caninana_scan_duration_seconds"]["count"] == 20
+                             and 0 < scans["p50_seconds"] <= scans["p90_seconds"] <= scans["p99_seconds"]
+                             and scans["p99_seconds"] <= scans["max_seconds"] * 1.07))
+
+        def count_from_threads():
+            for path in paths:
+                engine.scan_file(path, analyzer)
+
+        workers = [threading.Thread(target=count_from_threads) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        results.append(check("Counters do not lose increments across threads.",
+                             registry.snapshot()["counters"]["caninana_files_scanned_total"]
+                             == after["counters"]["caninana_files_scanned_total"] + 80))
+
+        print("\n\n--- PROMETHEUS TEXT ---")
+        text = registry.export_prometheus()
+        bucket_counts = [float(line.split()[1]) for line in text.splitlines()
+                         if line.startswith("caninana_scan_duration_seconds_bucket{")]
+        results.append(check("Counters carry HELP and TYPE lines.",
+                             "# TYPE caninana_files_scanned_total counter" in text
+                             and "# HELP caninana_files_scanned_total " in text
+                             and metric_value(text, "caninana_files_scanned_total")
+                             == registry.snapshot()["counters"]["caninana_files_scanned_total"]))
+        results.append(check("Histograms export cumulative buckets, _sum and _count.",
+                             "# TYPE caninana_scan_duration_seconds histogram" in text
+                             and bucket_counts == sorted(bucket_counts)
+                             and 'caninana_scan_duration_seconds_bucket{le="+Inf"}' in text
+                             and bucket_counts[-1] == metric_value(text, "caninana_scan_duration_seconds_count")
+                             and metric_value(text, "caninana_scan_duration_seconds_sum") > 0))
+        textfile = os.path.join(home_dir, "caninana.prom")
+        registry.write_prometheus_file(textfile)
+        with open(textfile, encoding="utf-8") as f:
+            written = f.read()
+        results.append(check("write_prometheus_file() leaves the full text and no temporary file.",
+                             written == registry.export_prometheus()
+                             and not [name for name in os.listdir(home_dir) if name.startswith("caninana.prom.")]))
+
+        print("\n\n--- HTTP EXPORTER ---")
+        port = free_port()
+        registry.start_http_exporter(port)
+        status, body, elapsed = scrape(port)
+        print(f"   Scraped {len(body)} bytes in {elapsed * 1000:.0f} ms")
+        results.append(check("/metrics serves the Prometheus text.",
+                             status == 200 and "caninana_files_scanned_total" in body))
+        status, body, _ = scrape(port, "/other")
+        results.append(check("Other paths get a 404.", status == 404))
+
+        idle = socket.create_connection(("127.0.0.1", port))
+        status, body, elapsed = scrape(port)
+        idle.close()
+        print(f"   Scrape behind a silent client took {elapsed * 1000:.0f} ms")
+        results.append(check("A client that sends nothing does not block scrapes for long.",
+                             status == 200 and elapsed < 4))
+
+        idle = socket.create_connection(("127.0.0.1", port))
+        time.sleep(0.3)
+        started = time.perf_counter()
+        registry.stop_http_exporter()
+        stop_elapsed = time.perf_counter() - started
+        idle.close()
+        print(f"   stop_http_exporter() with a silent client connected took {stop_elapsed * 1000:.0f} ms")
+        results.append(check("Stopping does not wait out an idle client.", stop_elapsed < 1))
+        try:
+            scrape(port, timeout=2)
+            stopped = False
+        except OSError:
+            stopped = True
+        results.append(check("The port is closed after stopping.", stopped))
+
+        registry.start_http_exporter(port)
+        status, _, _ = scrape(port)
+        results.append(check("The exporter can be started again on the same port.", status == 200))
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n2. Cleaning up...")
+        registry.stop_http_exporter()
+        shutil.rmtree(home_dir, ignore_errors=True)
+        print(f"   Removed '{home_dir}'")
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
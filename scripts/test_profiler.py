@@ -0,0 +1,219 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# The logger writes to ~/.caninana/caninana.log as soon as it is first used,
+# so point HOME at a throwaway directory before loading the core.
+home_dir = tempfile.mkdtemp(prefix="caninana_profiler_")
+os.environ["HOME"] = home_dir
+os.environ["USERPROFILE"] = home_dir
+
+# --- Setup Python Path ---
+# Same layout as test_core.py: the compiled module lives in the 'ui' folder.
+print("1. Setting up Python path...")
+try:
+    ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui'))
+    sys.path.append(ui_path)
+    print(f"   Added '{ui_path}' to sys.path")
+    import caninana_core
+    print("   Successfully imported 'caninana_core' module.")
+except ImportError as e:
+    print("\n[FATAL ERROR] Could not import 'caninana_core'.")
+    print(f"   Details: {e}")
+    print("   Please ensure 'caninana_core.pyd' (or .so) exists in the 'ui' directory.")
+    sys.exit(1)
+
+Stage = caninana_core.ScanStage
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+def run_threads(target, count):
+    """Runs target(index) on count threads and waits for all of them"""
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def settled(read, condition, timeout=2.0):
+    """Polls read() until condition holds for its value or timeout passes"""
+    # Thread.join() returns before the OS thread runs its thread-local
+    # destructors, which is where the core retires per-thread state.
+    deadline = time.perf_counter() + timeout
+    value = read()
+    while not condition(value) and time.perf_counter() < deadline:
+        time.sleep(0.02)
+        value = read()
+    return value
+
+
+def timing_is_consistent(timing):
+    """Spans are top-level, ordered, within the scan and add up per stage"""
+    if timing is None or timing.total_ns <= 0:
+        return False
+    totals = dict.fromkeys(timing.stage_totals, 0)
+    end = 0
+    for span in timing.spans:
+        if span.start_ns < end or span.start_ns + span.duration_ns > timing.total_ns:
+            return False
+        end = span.start_ns + span.duration_ns
+        totals[span.stage.name.lower()] += span.duration_ns
+    return totals == timing.stage_totals
+
+
+def trace_events(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["traceEvents"]
+
+
+def main():
+    """Exercises per-scan timing, per-stage statistics and the tracer."""
+    tracer = caninana_core.Tracer.get_instance()
+    results = []
+
+    try:
+        samples_dir = os.path.join(home_dir, "samples")
+        os.makedirs(samples_dir)
+        signatures_path = os.path.join(samples_dir, "signatures.json")
+        with open(signatures_path, "w") as f:
+            json.dump({"version": "1", "signatures": [
+                {"name": "Test.Sig", "pattern": "MALWARE-ONE", "file_type": "any", "severity": 9}]}, f)
+        paths = []
+        for i in range(10):
+            paths.append(os.path.join(samples_dir, f"sample{i}.txt"))
+            with open(paths[-1], "w") as f:
+                f.write("nothing to see here " * 5000 + ("MALWARE-ONE" if i % 2 else ""))
+        engine = caninana_core.SignatureEngine()
+        engine.load_signatures(signatures_path)
+        analyzer = caninana_core.FileTypeAnalyzer()
+
+        print("\n\n--- TIMING BREAKDOWN ---")
+        results.append(check("Scans carry no timing unless it is enabled.",
+                             engine.scan_file(paths[0], analyzer).timing is None))
+        engine.enable_timing_breakdown()
+        timing = engine.scan_file(paths[1], analyzer).timing
+        print("   " + ", ".join(f"{stage} {ns / 1000:.0f} us" for stage, ns in timing.stage_totals.items()
+                                 if ns) + f"; total {timing.total_ns / 1000:.0f} us")
+        results.append(check("Every stage of a file scan shows up in order.",
+                             [span.stage for span in timing.spans]
+                             == [Stage.OPEN, Stage.MAGIC, Stage.HASH, Stage.AUTOMATON, Stage.LOG]))
+        results.append(check("Spans fit within the scan and add up to the stage totals.",
+                             timing_is_consistent(timing)))
+        engine.enable_timing_breakdown(False)
+        results.append(check("Disabling timing drops it from later results.",
+                             engine.scan_file(paths[1], analyzer).timing is None))
+
+        print("\n\n--- TOGGLING WHILE SCANNING ---")
+        timings = []
+        stop = threading.Event()
+
+        def scan(_):
+            while not stop.is_set():
+                for path in paths:
+                    timings.append(engine.scan_file(path, analyzer).timing)
+
+        scanners = [threading.Thread(target=scan, args=(i,)) for i in range(4)]
+        for scanner in scanners:
+            scanner.start()
+        toggles = 0
+        while len(timings) < 400:
+            engine.enable_timing_breakdown(toggles % 2 == 0)
+            toggles += 1
+            time.sleep(0.001)
+        stop.set()
+        for scanner in scanners:
+            scanner.join()
+        timed = [timing for timing in timings if timing is not None]
+        print(f"   {len(timings)} scans during {toggles} toggles, {len(timed)} with timing")
+        results.append(check("Scans racing a toggle carry either no timing or a complete one.",
+                             0 < len(timed) < len(timings) and all(timing_is_consistent(timing) for timing in timed)))
+
+        print("\n\n--- STAGE STATISTICS ---")
+        before = caninana_core.get_stage_stats()
+        live_before = len(caninana_core.get_thread_stage_stats())
+        run_threads(lambda _: [engine.scan_file(path, analyzer) for path in paths], 8)
+        after = caninana_core.get_stage_stats()
+        live_after = settled(lambda: len(caninana_core.get_thread_stage_stats()),
+                             lambda live: live <= live_before)
+        print(f"   {after['open']['count'] - before['open']['count']} file opens counted, "
+              f"{live_before} -> {live_after} threads listed")
+        results.append(check("Spans of threads that exited are still counted.",
+                             all(after[stage]["count"] - before[stage]["count"] == 80
+                                 for stage in ("open", "magic", "hash", "automaton"))
+                             and after["automaton"]["total_ns"] > before["automaton"]["total_ns"]))
+        results.append(check("Exited threads are no longer listed per thread.",
+                             live_after <= live_before))
+
+        print("\n\n--- CHROME TRACE ---")
+        trace_path = os.path.join(home_dir, "trace.json")
+        tracer.clear()
+        tracer.enable()
+
+        def traced_scans(i):
+            tracer.set_thread_name(f"scan-worker-{i}")
+            for path in paths:
+                engine.scan_file(path, analyzer)
+
+        run_threads(traced_scans, 3)
+        tracer.disable()
+        engine.scan_file(paths[0], analyzer)
+        tracer.write_chrome_trace(trace_path)
+        events = trace_events(trace_path)
+        names = {event["tid"]: event["args"]["name"] for event in events
+                 if event["ph"] == "M" and event["name"] == "thread_name"}
+        files = [event for event in events if event["ph"] == "X" and event["name"] == "scan_file"]
+        stages = [event for event in events if event["ph"] == "X" and event.get("cat") == "stage"]
+        print(f"   {len(events)} events from {len(names)} threads, {len(files)} file scans")
+        results.append(check("Events of exited threads are kept under their names.",
+                             sorted(names.values()) == ["scan-worker-0", "scan-worker-1", "scan-worker-2"]
+                             and all(event["tid"] in names for event in files)))
+        results.append(check("Nothing is recorded while disabled.", len(files) == 30))
+        nested = all(any(f["tid"] == s["tid"] and f["ts"] <= s["ts"]
+                         and s["ts"] + s["dur"] <= f["ts"] + f["dur"] + 0.001 for f in files)
+                     for s in stages)
+        results.append(check("Stage events nest inside their file scan.", bool(stages) and nested))
+
+        tracer.clear()
+        tracer.enable(max_events_per_thread=20)
+        run_threads(traced_scans, 3)
+
+        def capped_events():
+            tracer.write_chrome_trace(trace_path)
+            return [event for event in trace_events(trace_path) if event["ph"] == "X"]
+
+        events = settled(capped_events, lambda events: len(events) <= 20)
+        print(f"   Capped at 20 events: {len(events)} kept, {tracer.dropped_count()} dropped")
+        results.append(check("Exited threads share one capped pool; the rest is counted as dropped.",
+                             len(events) == 20 and tracer.dropped_count() > 0))
+        tracer.clear()
+        tracer.write_chrome_trace(trace_path)
+        results.append(check("clear() discards every event and the dropped count.",
+                             not [event for event in trace_events(trace_path) if event["ph"] == "X"]
+                             and tracer.dropped_count() == 0))
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n2. Cleaning up...")
+        tracer.disable()
+        tracer.clear()
+        shutil.rmtree(home_dir, ignore_errors=True)
+        print(f"   Removed '{home_dir}'")
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
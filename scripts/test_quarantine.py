@@ -0,0 +1,341 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# --- Setup Python Path ---
+# Same layout as test_core.py: the compiled module lives in the 'ui' folder.
+print("1. Setting up Python path...")
+try:
+    ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui'))
+    sys.path.append(ui_path)
+    print(f"   Added '{ui_path}' to sys.path")
+    import caninana_core
+    print("   Successfully imported 'caninana_core' module.")
+except ImportError as e:
+    print("\n[FATAL ERROR] Could not import 'caninana_core'.")
+    print(f"   Details: {e}")
+    print("   Please ensure 'caninana_core.pyd' (or .so) exists in the 'ui' directory.")
+    sys.exit(1)
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+def quarantine(manager, directory, name, content, threat="Test.Threat", severity=5):
+    """Writes a sample and quarantines it as if a scan had flagged it."""
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(content)
+    result = caninana_core.ScanResult()
+    result.threat_detected = True
+    result.detected_signatures = [threat]
+    result.max_severity = severity
+    manager.quarantine_file(path, result)
+    return path
+
+
+def vault_path(root):
+    return os.path.join(root, "quarantine")
+
+
+def rewrite_ledger(root, update):
+    """Edits the ledger in place, e.g. to age an entry."""
+    ledger_path = os.path.join(vault_path(root), "ledger.json")
+    with open(ledger_path) as f:
+        entries = json.load(f)
+    for entry in entries:
+        update(entry)
+    with open(ledger_path, "w") as f:
+        json.dump(entries, f)
+
+
+# Run by each writer process of the cross-process check.
+WRITER_SCRIPT = """
+import os, sys
+sys.path.append(sys.argv[1])
+import caninana_core
+root, samples, writer, count = sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5])
+manager = caninana_core.QuarantineManager(root)
+result = caninana_core.ScanResult()
+result.detected_signatures = ["Test.Concurrent"]
+for i in range(count):
+    path = os.path.join(samples, f"writer{writer}-{i}.bin")
+    with open(path, "wb") as f:
+        f.write(os.urandom(64))
+    manager.quarantine_file(path, result)
+"""
+
+
+def main():
+    """Exercises the quarantine vault in a throwaway directory."""
+    work_dir = tempfile.mkdtemp(prefix="caninana_quarantine_")
+    samples_dir = os.path.join(work_dir, "samples")
+    os.makedirs(samples_dir)
+    results = []
+
+    try:
+        print("\n\n--- RETENTION LIMITS ---")
+        root = os.path.join(work_dir, "retention")
+        manager = caninana_core.QuarantineManager(root)
+        for i, severity in enumerate([9, 2, 7, 1, 5, 3]):
+            quarantine(manager, samples_dir, f"sample{i}.bin", b"x" * 1000, severity=severity)
+
+        policy = caninana_core.RetentionPolicy()
+        results.append(check("A default policy evicts nothing.",
+                             manager.enforce_retention() == 0
+                             and len(manager.list_quarantined_files()) == 6))
+
+        policy.max_entries = 4
+        policy.eviction_order = caninana_core.EvictionOrder.LEAST_SEVERE_FIRST
+        manager.set_retention_policy(policy)
+        evicted = manager.enforce_retention()
+        severities = sorted(entry.severity for entry in manager.list_quarantined_files())
+        print(f"   Evicted {evicted}, severities left: {severities}")
+        results.append(check("Least severe entries are evicted first.",
+                             evicted == 2 and severities == [3, 5, 7, 9]))
+
+        policy = caninana_core.RetentionPolicy()
+        policy.max_total_bytes = 2500
+        manager.set_retention_policy(policy)
+        evicted = manager.enforce_retention()
+        entries = manager.list_quarantined_files()
+        results.append(check("The byte quota is enforced.",
+                             evicted == 2 and sum(entry.size_bytes for entry in entries) <= 2500))
+
+        aged = entries[0].quarantine_id
+
+        def age(entry):
+            if entry["quarantine_id"] == aged:
+                entry["quarantine_date"] = "2000-01-01T00:00:00Z"
+
+        rewrite_ledger(root, age)
+        policy = caninana_core.RetentionPolicy()
+        policy.max_age = timedelta(days=30)
+        manager.set_retention_policy(policy)
+        evicted = manager.enforce_retention()
+        ids = [entry.quarantine_id for entry in manager.list_quarantined_files()]
+        results.append(check("Entries older than max_age are evicted.",
+                             evicted == 1 and aged not in ids
+                             and not os.path.exists(os.path.join(vault_path(root), aged))))
+
+        print("\n\n--- COMPACTION ---")
+        quarantine(manager, samples_dir, "missing.bin", b"y" * 10)
+        missing = [entry.quarantine_id for entry in manager.list_quarantined_files() if entry.quarantine_id not in ids]
+        os.remove(os.path.join(vault_path(root), missing[0]))
+        orphan = os.path.join(vault_path(root), "0123abcd-0000-0000-0000-0123456789ab")
+        with open(orphan, "wb") as f:
+            f.write(b"orphan")
+        manager.set_retention_policy(caninana_core.RetentionPolicy())
+        dropped = manager.enforce_retention()
+        results.append(check("Entries whose vault file disappeared are dropped.",
+                             dropped == 1 and len(manager.list_quarantined_files()) == 1))
+        results.append(check("Vault files without an entry are deleted.",
+                             not os.path.exists(orphan)
+                             and os.path.exists(os.path.join(vault_path(root), "ledger.json"))))
+
+        print("\n\n--- UNREADABLE LEDGER ---")
+        root = os.path.join(work_dir, "unreadable")
+        manager = caninana_core.QuarantineManager(root)
+        for i in range(3):
+            quarantine(manager, samples_dir, f"kept{i}.bin", b"k" * 100)
+        ledger_path = os.path.join(vault_path(root), "ledger.json")
+        with open(ledger_path) as f:
+            ledger = f.read()
+        stored = sorted(name for name in os.listdir(vault_path(root)) if not name.startswith("ledger."))
+        policy = caninana_core.RetentionPolicy()
+        policy.max_entries = 1
+        manager.set_retention_policy(policy)
+        survived = True
+        for broken in (ledger[:len(ledger) // 2], ""):
+            with open(ledger_path, "w") as f:
+                f.write(broken)
+            survived = (survived and manager.enforce_retention() == 0
+                        and all(os.path.exists(os.path.join(vault_path(root), name)) for name in stored))
+        results.append(check("A truncated or empty ledger leaves every vault file in place.", survived))
+        sample = os.path.join(samples_dir, "late.bin")
+        with open(sample, "wb") as f:
+            f.write(b"late")
+        try:
+            manager.quarantine_file(sample, caninana_core.ScanResult())
+            refused = False
+        except caninana_core.QuarantineError:
+            refused = True
+        with open(ledger_path) as f:
+            untouched = f.read() == ""
+        results.append(check("Quarantining refuses to overwrite an unreadable ledger.",
+                             refused and untouched and os.path.exists(sample)))
+        with open(ledger_path, "w") as f:
+            f.write(ledger)
+        results.append(check("Retention resumes once the ledger is readable again.",
+                             manager.enforce_retention() == 2 and len(manager.list_quarantined_files()) == 1))
+
+        print("\n\n--- BACKGROUND TASK ---")
+        for i in range(3):
+            quarantine(manager, samples_dir, f"task{i}.bin", b"z" * 100)
+        policy = caninana_core.RetentionPolicy()
+        policy.max_entries = 2
+        policy.enforcement_interval = timedelta(seconds=1)
+        manager.set_retention_policy(policy)
+        started = time.perf_counter()
+        manager.start_retention_task()
+        while len(manager.list_quarantined_files()) > 2 and time.perf_counter() - started < 10:
+            time.sleep(0.1)
+        elapsed = time.perf_counter() - started
+        manager.stop_retention_task()
+        print(f"   Task enforced the policy after {elapsed * 1000:.0f} ms")
+        results.append(check("The background task enforces the policy.",
+                             len(manager.list_quarantined_files()) == 2))
+
+        print("\n\n--- PAGED LISTING ---")
+        root = os.path.join(work_dir, "listing")
+        manager = caninana_core.QuarantineManager(root)
+        for directory in ("downloads", "documents"):
+            os.makedirs(os.path.join(samples_dir, directory))
+        for i in range(250):
+            directory = "downloads" if i % 2 == 0 else "documents"
+            quarantine(manager, os.path.join(samples_dir, directory), f"listed{i}.bin",
+                       str(i).encode(), threat=f"Test.Family.{i % 5}")
+        dates = {}
+
+        def spread(entry):
+            # One minute apart, in the order the files were quarantined.
+            index = int(os.path.basename(entry["original_path"])[len("listed"):-len(".bin")])
+            date = datetime(2024, 2, 1) + timedelta(minutes=index)
+            entry["quarantine_date"] = date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            dates[entry["quarantine_id"]] = entry["quarantine_date"]
+
+        rewrite_ledger(root, spread)
+        pages = []
+        offset = 0
+        while True:
+            page = manager.list_quarantined(offset, 40)
+            if not page:
+                break
+            pages.append(page)
+            offset += len(page)
+        listed = [entry.quarantine_id for page in pages for entry in page]
+        results.append(check("Pages cover every entry once, newest first.",
+                             len(pages) == 7 and len(set(listed)) == 250
+                             and listed == sorted(dates, key=dates.get, reverse=True)))
+
+        family = manager.list_quarantined(0, 1000, threat="Test.Family.3")
+        results.append(check("Threat filter matches exactly.",
+                             len(family) == 50 and all(e.threat_name == "Test.Family.3" for e in family)
+                             and manager.count_quarantined(threat="Test.Family.3") == 50))
+        since = sorted(dates.values())[200]
+        recent = manager.list_quarantined(0, 1000, since=since)
+        results.append(check("Since filter keeps entries from that date on.",
+                             len(recent) == 50 and all(e.quarantine_date >= since for e in recent)))
+        prefix = os.path.join(os.path.abspath(samples_dir), "downloads")
+        downloads = manager.list_quarantined(0, 1000, path_prefix=prefix)
+        results.append(check("Path prefix filter and combined filters.",
+                             len(downloads) == 125
+                             and manager.count_quarantined(threat="Test.Family.0", path_prefix=prefix) == 25
+                             and manager.count_quarantined(since="2024-02-01") == 250
+                             and manager.count_quarantined(since="2025") == 0))
+
+        started = time.perf_counter()
+        for i in range(1000):
+            manager.list_quarantined(i % 200, 20)
+        elapsed = time.perf_counter() - started
+        print(f"   1000 page reads in {elapsed * 1000:.0f} ms")
+        newest = quarantine(manager, samples_dir, "newest.bin", b"new", threat="Test.Newest")
+        results.append(check("The listing follows changes to the ledger.",
+                             manager.count_quarantined() == 251
+                             and manager.list_quarantined(0, 1)[0].original_path == os.path.abspath(newest)))
+
+        print("\n\n--- VAULT RESCAN ---")
+        root = os.path.join(work_dir, "rescan")
+        manager = caninana_core.QuarantineManager(root)
+        quarantine(manager, samples_dir, "renamed.bin", b"header MALWARE-ONE trailer",
+                   threat="Old.Name", severity=8)
+        quarantine(manager, samples_dir, "cleared.bin", b"header GOODWARE trailer",
+                   threat="False.Positive", severity=6)
+        quarantine(manager, samples_dir, "lost.bin", b"header MALWARE-ONE", threat="Old.Name")
+        lost = [e.quarantine_id for e in manager.list_quarantined_files()
+                if e.original_path.endswith("lost.bin")][0]
+        os.remove(os.path.join(vault_path(root), lost))
+        before = sorted(os.listdir(vault_path(root)))
+
+        signatures_path = os.path.join(work_dir, "new_signatures.json")
+        with open(signatures_path, "w") as f:
+            json.dump({"version": "2", "signatures": [
+                {"name": "New.Name", "pattern": "MALWARE-ONE", "file_type": "any", "severity": 9}]}, f)
+        engine = caninana_core.SignatureEngine()
+        engine.load_signatures(signatures_path)
+        summary = manager.rescan_vault(engine, max_threads=2)
+        print(f"   Scanned {summary.scanned}, detected {summary.detected}, "
+              f"reclassified {summary.reclassified}, cleared {summary.cleared}, failed {summary.failed}")
+        results.append(check("Rescan summary counts every outcome.",
+                             (summary.scanned, summary.detected, summary.reclassified,
+                              summary.cleared, summary.failed) == (2, 1, 1, 1, 1)))
+        by_name = {os.path.basename(e.original_path): e for e in manager.list_quarantined_files()}
+        renamed, cleared = by_name["renamed.bin"], by_name["cleared.bin"]
+        results.append(check("A detected sample takes the new threat name and severity.",
+                             renamed.threat_detected and renamed.threat_name == "New.Name"
+                             and renamed.severity == 9 and bool(renamed.last_rescan_date)))
+        results.append(check("A cleared sample is no longer a threat and has no severity.",
+                             not cleared.threat_detected and cleared.severity == 0
+                             and bool(cleared.last_rescan_date)))
+        results.append(check("An unreadable sample keeps its verdict.",
+                             by_name["lost.bin"].threat_name == "Old.Name"
+                             and not by_name["lost.bin"].last_rescan_date))
+
+        plaintext = False
+        for name in os.listdir(vault_path(root)):
+            with open(os.path.join(vault_path(root), name), "rb") as f:
+                plaintext = plaintext or b"MALWARE-ONE" in f.read()
+        results.append(check("No plaintext was written during the rescan.",
+                             not plaintext and sorted(os.listdir(vault_path(root))) == before
+                             and not os.path.exists(os.path.join(samples_dir, "renamed.bin"))))
+
+        print("\n\n--- SEVERAL PROCESSES, ONE LEDGER ---")
+        root = os.path.join(work_dir, "shared")
+        manager = caninana_core.QuarantineManager(root)
+        started = time.perf_counter()
+        writers = [subprocess.Popen([sys.executable, "-c", WRITER_SCRIPT, ui_path, root,
+                                     samples_dir, str(writer), "25"])
+                   for writer in range(4)]
+        reads = 0
+        read_errors = []
+        while any(writer.poll() is None for writer in writers):
+            try:
+                manager.count_quarantined()
+                reads += 1
+            except Exception as e:
+                read_errors.append(e)
+        exit_codes = [writer.wait() for writer in writers]
+        elapsed = time.perf_counter() - started
+        entries = manager.list_quarantined_files()
+        print(f"   4 processes quarantined {len(entries)} files in {elapsed * 1000:.0f} ms, "
+              f"{reads} concurrent reads")
+        results.append(check("Every writer process finished cleanly.", exit_codes == [0] * 4))
+        results.append(check("No ledger update was lost.",
+                             len(entries) == 100 and len({e.quarantine_id for e in entries}) == 100))
+        results.append(check("Readers never saw a partial ledger.", not read_errors))
+        manager.enforce_retention()
+        results.append(check("Every entry has its vault file.",
+                             len(manager.list_quarantined_files()) == 100))
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n2. Cleaning up...")
+        shutil.rmtree(work_dir, ignore_errors=True)
+        print(f"   Removed '{work_dir}'")
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
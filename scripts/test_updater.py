@@ -0,0 +1,339 @@
+import gzip
+import hashlib
+import json
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Setup Python Path ---
+# Same layout as test_core.py: the compiled module lives in the 'ui' folder.
+print("1. Setting up Python path...")
+try:
+    ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ui'))
+    sys.path.append(ui_path)
+    print(f"   Added '{ui_path}' to sys.path")
+    import caninana_core
+    print("   Successfully imported 'caninana_core' module.")
+except ImportError as e:
+    print("\n[FATAL ERROR] Could not import 'caninana_core'.")
+    print(f"   Details: {e}")
+    print("   Please ensure 'caninana_core.pyd' (or .so) exists in the 'ui' directory.")
+    sys.exit(1)
+
+
+def make_signature(name, pattern, severity=5):
+    return {"name": name, "pattern": pattern, "file_type": "any", "severity": severity}
+
+
+class UpdateServer:
+    """Local stand-in for the signature update server.
+
+    Serves an in-memory file tree, answers conditional and Range requests,
+    can drop a connection part-way through a file once, and records every
+    request so the checks can see what went over the wire.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        self.drop_once = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = server.files.get(self.path.lstrip('/'))
+                if body is None:
+                    server.requests.append((self.path, 404, 0))
+                    self.send_error(404)
+                    return
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    server.requests.append((self.path, 304, 0))
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                status, start = 200, 0
+                requested = self.headers.get("Range", "")
+                if requested.startswith("bytes=") and requested.endswith("-"):
+                    status, start = 206, int(requested[len("bytes="):-1])
+                payload = body[start:]
+                server.requests.append((self.path, status, len(payload)))
+                self.send_response(status)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(payload)))
+                if status == 206:
+                    self.send_header("Content-Range",
+                                     f"bytes {start}-{len(body) - 1}/{len(body)}")
+                self.end_headers()
+                cut = server.drop_once.pop(self.path.lstrip('/'), None)
+                if cut is not None:
+                    # Simulate a flaky link: close before the body is complete.
+                    self.wfile.write(payload[:cut])
+                    self.close_connection = True
+                    server.requests[-1] = (self.path, status, cut)
+                    return
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def publish(self, version, signatures, delta=None, delta_sha256=None):
+        """Publishes the database; a delta is listed in manifest.json."""
+        self.files["latest_version.txt"] = f"{version}\n".encode()
+        self.files["signatures.json"] = json.dumps(
+            {"version": version, "signatures": signatures}).encode()
+        if delta is not None:
+            file = f"deltas/{delta['from_version']}.json"
+            self.files[file] = json.dumps(delta).encode()
+            self.files["manifest.json"] = json.dumps({
+                "version": version,
+                "deltas": [{
+                    "from_version": delta["from_version"],
+                    "file": file,
+                    "size": len(self.files[file]),
+                    "sha256": delta_sha256 or hashlib.sha256(self.files[file]).hexdigest(),
+                }],
+            }).encode()
+
+    def publish_package(self, version, signatures, sha256=None):
+        """Publishes the database as a gzip package listed in manifest.json."""
+        self.publish(version, signatures)
+        package = gzip.compress(self.files["signatures.json"])
+        self.files["signatures.json.gz"] = package
+        self.files["manifest.json"] = json.dumps({
+            "version": version,
+            "packages": [{
+                "file": "signatures.json.gz",
+                "encoding": "gzip",
+                "size": len(package),
+                "sha256": sha256 or hashlib.sha256(package).hexdigest(),
+            }],
+        }).encode()
+        return package
+
+    def take_requests(self):
+        requests, self.requests = self.requests, []
+        return requests
+
+
+def check(description, condition):
+    status = "PASSED" if condition else "FAILED"
+    print(f"   VERIFICATION: {status}. {description}")
+    return condition
+
+
+def local_database(db_path):
+    with open(db_path) as f:
+        db = json.load(f)
+    return db.get("version"), {sig["name"] for sig in db["signatures"]}
+
+
+def artifact_loads():
+    counters = caninana_core.MetricsRegistry.get_instance().snapshot()["counters"]
+    return counters.get("caninana_signature_artifact_loads_total", 0)
+
+
+def main():
+    """Runs the updater against the local stand-in server."""
+    print("\n2. Starting local update server...")
+    server = UpdateServer()
+    server.thread.start()
+    print(f"   Serving on {server.url}")
+
+    work_dir = tempfile.mkdtemp(prefix="caninana_update_")
+    db_path = os.path.join(work_dir, "signatures.json")
+    updater = caninana_core.SignatureUpdater(server.url)
+    base = [make_signature(f"Test.Signature.{i}", f"pattern-{i:04d}") for i in range(200)]
+    results = []
+
+    try:
+        print("\n\n--- FRESH INSTALL (full download) ---")
+        server.publish("9", base)
+        applied = updater.check_for_updates(db_path)
+        requests = server.take_requests()
+        results.append(check("Update applied.", applied))
+        results.append(check("Local version is 9.", local_database(db_path)[0] == "9"))
+        results.append(check("Full database downloaded.",
+                             any(path == "/signatures.json" for path, _, _ in requests)))
+        results.append(check("Precompiled artifact written next to the database.",
+                             os.path.exists(db_path + ".bin")))
+
+        print("\n\n--- UNCHANGED SERVER (conditional request) ---")
+        applied = updater.check_for_updates(db_path)
+        requests = server.take_requests()
+        print(f"   Requests: {requests}")
+        results.append(check("No update applied.", not applied))
+        results.append(check("Version check answered 304 with no body.",
+                             requests == [("/latest_version.txt", 304, 0)]))
+
+        print("\n\n--- VERSION 9 -> 10 (delta package) ---")
+        added = make_signature("Test.Signature.New", "brand-new-pattern", 9)
+        delta = {"from_version": "9", "version": "10",
+                 "added": [added], "removed": ["Test.Signature.0"]}
+        server.publish("10", base[1:] + [added], delta)
+        applied = updater.check_for_updates(db_path)
+        requests = server.take_requests()
+        print(f"   Requests: {requests}")
+        version, names = local_database(db_path)
+        delta_bytes = sum(size for _, _, size in requests)
+        full_bytes = len(server.files["signatures.json"])
+        print(f"   Transferred {delta_bytes} bytes (full database: {full_bytes} bytes)")
+        results.append(check("'10' is newer than '9' and was applied.",
+                             applied and version == "10"))
+        results.append(check("Delta added and removed signatures.",
+                             "Test.Signature.New" in names and "Test.Signature.0" not in names))
+        results.append(check("Full database was not downloaded.",
+                             not any(path == "/signatures.json" for path, _, _ in requests)))
+
+        print("\n\n--- VERSION 10 -> 11 (no delta, full fallback) ---")
+        server.publish("11", base)
+        applied = updater.check_for_updates(db_path)
+        requests = server.take_requests()
+        print(f"   Requests: {[(path, status) for path, status, _ in requests]}")
+        results.append(check("Missing delta fell back to the full database.",
+                             applied and local_database(db_path)[0] == "11"))
+
+        print("\n\n--- OLDER REMOTE VERSION ---")
+        server.publish("9", base)
+        applied = updater.check_for_updates(db_path)
+        results.append(check("Version 9 does not replace version 11.",
+                             not applied and local_database(db_path)[0] == "11"))
+
+        print("\n\n--- VERSION 11 -> 11.1 (delta fails SHA256 verification) ---")
+        delta = {"from_version": "11", "version": "11.1",
+                 "added": [added], "removed": []}
+        server.publish("11.1", base + [added], delta, delta_sha256="0" * 64)
+        applied = updater.check_for_updates(db_path)
+        requests = server.take_requests()
+        print(f"   Requests: {[(path, status) for path, status, _ in requests]}")
+        results.append(check("Tampered delta fell back to the full database.",
+                             applied and local_database(db_path)[0] == "11.1"
+                             and any(path == "/signatures.json" for path, _, _ in requests)))
+
+        print("\n\n--- VERSION 11.1 -> 11.2 (patched database is invalid) ---")
+        broken = {"name": "Test.Signature.Broken", "pattern": "broken", "severity": "high"}
+        delta = {"from_version": "11.1", "version": "11.2",
+                 "added": [broken], "removed": ["Test.Signature.New"]}
+        server.publish("11.2", base, delta)
+        applied = updater.check_for_updates(db_path)
+        requests = server.take_requests()
+        print(f"   Requests: {[(path, status) for path, status, _ in requests]}")
+        version, names = local_database(db_path)
+        results.append(check("Invalid delta result fell back to the full database.",
+                             applied and version == "11.2" and "Test.Signature.Broken" not in names
+                             and any(path == "/signatures.json" for path, _, _ in requests)))
+
+        print("\n\n--- VERSION 11.2 -> 11.3 (delta with non-string fields) ---")
+        delta = {"from_version": "11.2", "version": 11.3,
+                 "added": [dict(added, name=7)], "removed": []}
+        server.publish("11.3", base + [added], delta)
+        applied = updater.check_for_updates(db_path)
+        requests = server.take_requests()
+        print(f"   Requests: {[(path, status) for path, status, _ in requests]}")
+        results.append(check("Malformed delta fell back to the full database.",
+                             applied and local_database(db_path)[0] == "11.3"
+                             and any(path == "/signatures.json" for path, _, _ in requests)))
+
+        print("\n\n--- VERSION 11.3 -> 11.4 (manifest with mistyped entries) ---")
+        server.publish("11.4", base)
+        server.files["manifest.json"] = json.dumps({"version": "11.4", "packages": [
+            {"file": "signatures.json.gz", "encoding": "gzip", "size": "1", "sha256": 7}]}).encode()
+        applied = updater.check_for_updates(db_path)
+        requests = server.take_requests()
+        print(f"   Requests: {[(path, status) for path, status, _ in requests]}")
+        results.append(check("Mistyped manifest entries are skipped for the full database.",
+                             applied and local_database(db_path)[0] == "11.4"
+                             and any(path == "/signatures.json" for path, _, _ in requests)))
+
+        print("\n\n--- VERSION 11 -> 12 (gzip package, interrupted transfer) ---")
+        large = [make_signature(f"Test.Large.{i}", hashlib.sha256(str(i).encode()).hexdigest())
+                 for i in range(3000)]
+        package = server.publish_package("12", large)
+        server.drop_once["signatures.json.gz"] = len(package) // 2
+        applied = updater.check_for_updates(db_path)
+        requests = [r for r in server.take_requests() if r[0] == "/signatures.json.gz"]
+        print(f"   Package requests: {requests}")
+        print(f"   Package: {len(package)} bytes "
+              f"(plain JSON: {len(server.files['signatures.json'])} bytes)")
+        results.append(check("Update applied from the compressed package.",
+                             applied and local_database(db_path)[0] == "12"))
+        results.append(check("Transfer resumed with a Range request (206).",
+                             len(requests) == 2 and requests[1][1] == 206))
+        results.append(check("No byte was downloaded twice.",
+                             sum(size for _, _, size in requests) == len(package)))
+
+        print("\n\n--- VERSION 12 -> 13 (package fails SHA256 verification) ---")
+        server.publish_package("13", base, sha256="0" * 64)
+        try:
+            updater.check_for_updates(db_path)
+            rejected = False
+        except Exception as e:
+            print(f"   Update rejected: {e}")
+            rejected = True
+        leftovers = [name for name in os.listdir(work_dir) if ".download" in name]
+        results.append(check("Corrupted package was rejected.", rejected))
+        results.append(check("Database still at version 12, no partial files left.",
+                             local_database(db_path)[0] == "12" and not leftovers))
+
+        print("\n\n--- BACKGROUND SCHEDULER (hot apply, backoff) ---")
+        engine = caninana_core.SignatureEngine()
+        loads_before = artifact_loads()
+        engine.load_signatures(db_path)
+        del server.files["manifest.json"]
+        server.publish("14", base + [added])
+        options = caninana_core.UpdateSchedulerOptions()
+        options.initial_delay = timedelta(0)
+        options.interval = timedelta(hours=1)
+        options.min_backoff = timedelta(seconds=30)
+        events = queue.Queue()
+        scheduler = caninana_core.UpdateScheduler(server.url, db_path, engine, options)
+        scheduler.start(events.put)
+        event = events.get(timeout=30)
+        print(f"   Event: {event.kind.name}, version {event.version}, "
+              f"{event.signature_count} signatures, next check in {event.next_check}")
+        results.append(check("Scheduler applied version 14 to the live engine.",
+                             event.kind == caninana_core.UpdateEventKind.APPLIED
+                             and event.version == "14"
+                             and engine.get_signature_count() == len(base) + 1))
+        results.append(check("Engine loaded both sets from precompiled artifacts.",
+                             artifact_loads() == loads_before + 2))
+        results.append(check("Next check is the interval with +/-10% jitter.",
+                             timedelta(minutes=54) <= event.next_check <= timedelta(minutes=66)))
+
+        del server.files["latest_version.txt"]
+        scheduler.check_now()
+        event = events.get(timeout=30)
+        print(f"   Event: {event.kind.name} ({event.error}), "
+              f"retry in {event.next_check}")
+        results.append(check("Failed check is retried after the minimum backoff.",
+                             event.kind == caninana_core.UpdateEventKind.FAILED
+                             and event.consecutive_failures == 1
+                             and timedelta(seconds=27) <= event.next_check <= timedelta(seconds=33)))
+        scheduler.stop()
+        results.append(check("Scheduler stopped.", not scheduler.is_running()))
+
+    except Exception as e:
+        print(f"\n[ERROR] An exception occurred during testing: {e}")
+        results.append(False)
+    finally:
+        print("\n\n3. Cleaning up...")
+        server.httpd.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+        print(f"   Removed '{work_dir}'")
+
+    print(f"\n{sum(results)}/{len(results)} checks passed.")
+    return 0 if results and all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
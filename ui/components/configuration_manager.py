@@ -204,19 +204,81 @@ class SettingsCategory(customtkinter.CTkFrame):
         )
 
 
+class ConfigurationStore:
+    """
+    Settings persisted in caninana_config.json, without any widgets, so the
+    application can read them before the settings view is built
+    """
+    
+    def __init__(self, config_file="caninana_config.json"):
+        self.config_file = config_file
+        self.config_data = {}
+        
+    def load_configuration(self):
+        """Load configuration from file"""
+        try:
+            if os.path.exists(self.config_file):
+                with open(self.config_file, 'r') as f:
+                    self.config_data = json.load(f)
+            else:
+                self.config_data = self.get_default_config()
+        except Exception as e:
+            print(f"Error loading configuration: {e}")
+            self.config_data = self.get_default_config()
+            
+    def save_configuration(self):
+        """Save configuration to file"""
+        try:
+            with open(self.config_file, 'w') as f:
+                json.dump(self.config_data, f, indent=2)
+            print("Configuration saved successfully")
+        except Exception as e:
+            print(f"Error saving configuration: {e}")
+            
+    def get_default_config(self):
+        """Get default configuration values"""
+        return {
+            "realtime_protection": True,
+            "scan_downloads": True,
+            "email_protection": True,
+            "scan_sensitivity": "Medium",
+            "scan_archives": True,
+            "scan_timeout": "5",
+            "show_notifications": True,
+            "auto_start": False,
+            "theme": "Light",
+            "cloud_lookup": True,
+            "debug_logging": False,
+            "update_frequency": "Daily",
+            "update_url": ""
+        }
+        
+    def get_config(self, key, default=None):
+        """Get configuration value"""
+        return self.config_data.get(key, default)
+        
+    def set_config(self, key, value):
+        """Set configuration value"""
+        self.config_data[key] = value
+
+
 class ConfigurationManager(customtkinter.CTkFrame):
     """
     ⚙️ Premium Configuration Manager
     Comprehensive settings interface with beautiful organization
     """
     
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, store=None, **kwargs):
         super().__init__(parent, **kwargs)
         
         self.configure(fg_color="transparent")
         
-        self.config_data = {}
-        self.config_file = "caninana_config.json"
+        # A store shared with the application is already loaded.
+        if store is None:
+            store = ConfigurationStore()
+            store.load_configuration()
+        self.store = store
+        self.config_change_callback = None
         
         self.grid_columnconfigure(0, weight=1)
         
@@ -224,7 +286,13 @@ class ConfigurationManager(customtkinter.CTkFrame):
         self.create_settings_content()
         self.create_footer()
         
-        self.load_configuration()
+    @property
+    def config_data(self):
+        return self.store.config_data
+        
+    @config_data.setter
+    def config_data(self, value):
+        self.store.config_data = value
         
     def create_header(self):
         """Create settings header"""
@@ -476,54 +544,40 @@ class ConfigurationManager(customtkinter.CTkFrame):
     def update_config(self, key, value):
         """Update configuration value"""
         self.config_data[key] = value
+        self.notify_config_change(key, value)
+        
+    def set_config_change_callback(self, callback):
+        """Set callback invoked as callback(key, value) when a setting changes"""
+        self.config_change_callback = callback
+        
+    def notify_config_change(self, key, value):
+        """Notify the application that a setting changed"""
+        if self.config_change_callback:
+            self.config_change_callback(key, value)
         
     def load_configuration(self):
-        """Load configuration from file"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    self.config_data = json.load(f)
-            else:
-                self.config_data = self.get_default_config()
-        except Exception as e:
-            print(f"Error loading configuration: {e}")
-            self.config_data = self.get_default_config()
+        """Reload configuration from file"""
+        self.store.load_configuration()
             
     def save_configuration(self):
         """Save configuration to file"""
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config_data, f, indent=2)
-            print("Configuration saved successfully")
-        except Exception as e:
-            print(f"Error saving configuration: {e}")
+        self.store.save_configuration()
             
     def get_default_config(self):
         """Get default configuration values"""
-        return {
-            "realtime_protection": True,
-            "scan_downloads": True,
-            "email_protection": True,
-            "scan_sensitivity": "Medium",
-            "scan_archives": True,
-            "scan_timeout": "5",
-            "show_notifications": True,
-            "auto_start": False,
-            "theme": "Light",
-            "cloud_lookup": True,
-            "debug_logging": False,
-            "update_frequency": "Daily"
-        }
+        return self.store.get_default_config()
         
     def reset_to_defaults(self):
         """Reset all settings to default values"""
         self.config_data = self.get_default_config()
+        for key, value in self.config_data.items():
+            self.notify_config_change(key, value)
         print("Settings reset to defaults")
         
     def get_config(self, key, default=None):
         """Get configuration value"""
-        return self.config_data.get(key, default)
+        return self.store.get_config(key, default)
         
     def set_config(self, key, value):
         """Set configuration value"""
-        self.config_data[key] = value
\ No newline at end of file
+        self.store.set_config(key, value)
\ No newline at end of file
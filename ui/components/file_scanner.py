@@ -593,6 +593,10 @@ class PremiumFileScanner(customtkinter.CTkFrame):
         """Update scan progress"""
         self.progress_panel.set_progress(value, message)
         
+    def show_waiting(self, message):
+        """Show indeterminate progress while the scan waits to start"""
+        self.progress_panel.start_indeterminate(message)
+        
     def show_scan_results(self, scan_result, filename):
         """Show scan results"""
         self.results_panel.show_results(scan_result, filename)
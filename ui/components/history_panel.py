@@ -4,11 +4,12 @@ Beautiful scan history with filtering, search, and detailed view
 """
 
 import customtkinter
-from datetime import datetime, timedelta
-import random
+import threading
 from .design_system import PremiumDesignSystem, IconManager
 from .animated_widgets import PremiumCard
 from .status_cards import StatsCard
+from .virtual_list import VirtualList
+from .history_store import ScanHistoryStore
 
 
 class HistoryFilterBar(customtkinter.CTkFrame):
@@ -17,6 +18,9 @@ class HistoryFilterBar(customtkinter.CTkFrame):
     Advanced filtering and search capabilities
     """
     
+    # Quiet time after the last keystroke before the search runs.
+    SEARCH_DEBOUNCE_MS = 150
+    
     def __init__(self, parent, **kwargs):
         super().__init__(parent, **kwargs)
         
@@ -26,6 +30,8 @@ class HistoryFilterBar(customtkinter.CTkFrame):
         )
         
         self.filter_callback = None
+        self.search_job = None
+        self.applied_search = ""
         
         self.content_frame = customtkinter.CTkFrame(
             self,
@@ -121,12 +127,25 @@ class HistoryFilterBar(customtkinter.CTkFrame):
         self.clear_btn.pack(side="right")
         
     def on_search_change(self, event=None):
-        """Handle search text change"""
+        """Handle search text change once typing pauses"""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(self.SEARCH_DEBOUNCE_MS, self.on_search_settled)
+        
+    def on_search_settled(self):
+        """Apply the search if its text changed"""
+        self.search_job = None
+        search = self.search_entry.get()
+        # Keys such as arrows and Shift also fire <KeyRelease>.
+        if search == self.applied_search:
+            return
+        self.applied_search = search
         if self.filter_callback:
             self.filter_callback()
             
     def on_filter_change(self, value=None):
         """Handle filter change"""
+        self.applied_search = self.search_entry.get()
         if self.filter_callback:
             self.filter_callback()
             
@@ -154,14 +173,17 @@ class HistoryFilterBar(customtkinter.CTkFrame):
 class HistoryItem(PremiumCard):
     """
     📋 Individual History Item
-    Beautiful card displaying scan details
+    Beautiful card displaying scan details, reused for whichever scan
+    scrolls into its slot
     """
     
-    def __init__(self, parent, scan_data, **kwargs):
+    HEIGHT = 80
+    
+    def __init__(self, parent, scan_data=None, **kwargs):
         super().__init__(parent, elevated=False, hoverable=True, **kwargs)
         
-        self.scan_data = scan_data
-        self.configure(height=80)
+        self.scan_data = {}
+        self.configure(height=self.HEIGHT)
         
         self.content_frame = customtkinter.CTkFrame(
             self,
@@ -182,12 +204,10 @@ class HistoryItem(PremiumCard):
         self.status_frame.pack(side="left", fill="y")
         self.status_frame.pack_propagate(False)
         
-        status_config = self.get_status_config()
         self.status_icon = customtkinter.CTkLabel(
             self.status_frame,
-            text=status_config["icon"],
-            font=customtkinter.CTkFont(size=24),
-            text_color=status_config["color"]
+            text="",
+            font=customtkinter.CTkFont(size=24)
         )
         self.status_icon.pack(expand=True)
         
@@ -204,27 +224,24 @@ class HistoryItem(PremiumCard):
         
         self.filename_label = customtkinter.CTkLabel(
             self.details_frame,
-            text=scan_data.get("filename", "Unknown File"),
+            text="",
             font=customtkinter.CTkFont(size=14, weight="bold"),
             text_color=PremiumDesignSystem.TEXT_PRIMARY,
             anchor="w"
         )
         self.filename_label.pack(anchor="w")
         
-        result_text = self.get_result_text()
         self.result_label = customtkinter.CTkLabel(
             self.details_frame,
-            text=result_text,
+            text="",
             font=customtkinter.CTkFont(size=11),
-            text_color=status_config["color"],
             anchor="w"
         )
         self.result_label.pack(anchor="w")
         
-        scan_info = f"Size: {scan_data.get('size', 'Unknown')} • Duration: {scan_data.get('duration', 'Unknown')}"
         self.info_label = customtkinter.CTkLabel(
             self.details_frame,
-            text=scan_info,
+            text="",
             font=customtkinter.CTkFont(size=10),
             text_color=PremiumDesignSystem.TEXT_SECONDARY,
             anchor="w"
@@ -239,30 +256,55 @@ class HistoryItem(PremiumCard):
         
         self.time_label = customtkinter.CTkLabel(
             self.meta_frame,
-            text=scan_data.get("timestamp", "Unknown"),
+            text="",
             font=customtkinter.CTkFont(size=10),
             text_color=PremiumDesignSystem.TEXT_MUTED,
             anchor="e"
         )
         self.time_label.pack(side="top", anchor="e")
         
+        button_style = PremiumDesignSystem.get_button_style("secondary")
+        self.action_btn = customtkinter.CTkButton(
+            self.meta_frame,
+            text="Details",
+            width=60,
+            height=24,
+            font=customtkinter.CTkFont(size=10),
+            fg_color=button_style["fg_color"],
+            hover_color=button_style["hover_color"],
+            text_color=button_style["text_color"],
+            corner_radius=button_style["corner_radius"],
+            border_width=button_style["border_width"],
+            border_color=button_style["border_color"]
+        )
+        
+        if scan_data is not None:
+            self.set_row_data(scan_data)
+            
+    def set_row_data(self, scan_data):
+        """Show another scan in this card"""
+        self.scan_data = scan_data
+        status_config = self.get_status_config()
+        
+        self.status_icon.configure(
+            text=status_config["icon"],
+            text_color=status_config["color"]
+        )
+        self.filename_label.configure(text=scan_data.get("filename", "Unknown File"))
+        self.result_label.configure(
+            text=self.get_result_text(),
+            text_color=status_config["color"]
+        )
+        self.info_label.configure(
+            text=f"Size: {scan_data.get('size', 'Unknown')} • Duration: {scan_data.get('duration', 'Unknown')}"
+        )
+        self.time_label.configure(text=scan_data.get("timestamp", "Unknown"))
+        
         if scan_data.get("result") == "threat":
-            button_style = PremiumDesignSystem.get_button_style("secondary")
-            self.action_btn = customtkinter.CTkButton(
-                self.meta_frame,
-                text="Details",
-                width=60,
-                height=24,
-                font=customtkinter.CTkFont(size=10),
-                fg_color=button_style["fg_color"],
-                hover_color=button_style["hover_color"],
-                text_color=button_style["text_color"],
-                corner_radius=button_style["corner_radius"],
-                border_width=button_style["border_width"],
-                border_color=button_style["border_color"]
-            )
             self.action_btn.pack(side="bottom", anchor="e", pady=(4, 0))
-    
+        else:
+            self.action_btn.pack_forget()
+            
     def get_status_config(self):
         """Get status configuration based on scan result"""
         result = self.scan_data.get("result", "clean")
@@ -287,7 +329,7 @@ class HistoryItem(PremiumCard):
                 "icon": IconManager.get("info"),
                 "color": PremiumDesignSystem.TEXT_SECONDARY
             }
-    
+            
     def get_result_text(self):
         """Get result description text"""
         result = self.scan_data.get("result", "clean")
@@ -373,16 +415,40 @@ class HistoryStats(customtkinter.CTkFrame):
             row=0, column=3,
             sticky="ew"
         )
-    
-    def update_stats(self, history_data):
-        """Update stats based on history data"""
-        total_scans = len(history_data)
-        clean_scans = sum(1 for item in history_data if item.get("result") == "clean")
-        threat_scans = sum(1 for item in history_data if item.get("result") == "threat")
-        
-        self.total_scans_card.update_value(str(total_scans))
-        self.clean_files_card.update_value(str(clean_scans))
-        self.threats_card.update_value(str(threat_scans))
+        
+    def update_stats(self, stats):
+        """Update stats from the history store's running totals"""
+        total_scans = stats["total"]
+        by_result = stats["by_result"]
+        clean = by_result.get("clean", {"scans": 0, "recent": 0})
+        threats = by_result.get("threat", {"scans": 0, "recent": 0})
+        
+        def share(count):
+            return f"{count / total_scans:.1%}" if total_scans else "0%"
+            
+        self.total_scans_card.update_value(
+            f"{total_scans:,}",
+            trend=f"↑ {stats['recent']:,} this week",
+            subtitle="All time"
+        )
+        self.clean_files_card.update_value(
+            f"{clean['scans']:,}",
+            trend=f"↑ {share(clean['scans'])}",
+            subtitle=share(clean["scans"])
+        )
+        self.threats_card.update_value(
+            f"{threats['scans']:,}",
+            trend=f"{'↑' if threats['recent'] else '↓'} {threats['recent']:,} this week",
+            subtitle=share(threats["scans"])
+        )
+        
+        if total_scans:
+            average = stats["total_duration"] / total_scans
+            trend = None
+            if stats["recent"] and average > 0:
+                change = stats["recent_duration"] / stats["recent"] / average - 1
+                trend = f"↓ {-change:.0%} faster" if change < 0 else f"↑ {change:.0%} slower"
+            self.avg_time_card.update_value(f"{average:.1f}s", trend=trend)
 
 
 class ScanHistoryPanel(customtkinter.CTkFrame):
@@ -391,16 +457,17 @@ class ScanHistoryPanel(customtkinter.CTkFrame):
     Comprehensive history view with filtering and statistics
     """
     
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, store=None, **kwargs):
         super().__init__(parent, **kwargs)
         
         self.configure(fg_color="transparent")
         
-        self.history_data = self.generate_sample_data()
-        self.filtered_data = self.history_data.copy()
+        self.store = store or ScanHistoryStore()
+        # Load the search index before the first keystroke needs it.
+        threading.Thread(target=self.store.search_index.update, daemon=True).start()
         
         self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(2, weight=1)
+        self.grid_rowconfigure(3, weight=1)
         
         self.create_header()
         self.create_stats_section()
@@ -463,19 +530,21 @@ class ScanHistoryPanel(customtkinter.CTkFrame):
         self.filter_bar.set_filter_callback(self.apply_filters)
         
     def create_history_list(self):
-        """Create scrollable history list"""
-        self.history_frame = customtkinter.CTkScrollableFrame(
+        """Create virtualized history list"""
+        self.history_list = VirtualList(
             self,
-            fg_color="transparent"
+            row_factory=HistoryItem,
+            row_height=HistoryItem.HEIGHT + PremiumDesignSystem.SPACE_SM,
+            row_spacing=PremiumDesignSystem.SPACE_SM
         )
-        self.history_frame.grid(
+        self.history_list.grid(
             row=3,
             column=0,
             sticky="nsew",
             pady=(0, PremiumDesignSystem.SPACE_LG)
         )
         
-        self.populate_history_list()
+        self.apply_filters()
         
     def create_footer(self):
         """Create footer with navigation"""
@@ -506,100 +575,21 @@ class ScanHistoryPanel(customtkinter.CTkFrame):
         )
         back_button.pack(pady=PremiumDesignSystem.SPACE_MD)
         
-    def generate_sample_data(self):
-        """Generate sample scan history data"""
-        sample_data = []
-        
-        filenames = [
-            "document.pdf", "application.exe", "image.jpg", "archive.zip",
-            "script.py", "presentation.pptx", "suspicious_file.exe", "malware.dll",
-            "clean_app.msi", "photo.png", "video.mp4", "trojan.exe"
-        ]
-        
-        results = ["clean", "clean", "clean", "threat", "clean", "error"]
-        
-        for i in range(50):
-            filename = random.choice(filenames)
-            result = random.choice(results)
-            
-            days_ago = random.randint(0, 30)
-            timestamp = datetime.now() - timedelta(days=days_ago)
-            
-            scan_data = {
-                "filename": filename,
-                "result": result,
-                "timestamp": timestamp.strftime("%Y-%m-%d %H:%M"),
-                "size": f"{random.randint(1, 999)} KB",
-                "duration": f"{random.randint(1, 30)}s",
-                "threats": ["Trojan.Win32.Example", "Malware.Generic"] if result == "threat" else []
-            }
-            
-            sample_data.append(scan_data)
-            
-        return sorted(sample_data, key=lambda x: x["timestamp"], reverse=True)
-    
-    def populate_history_list(self):
-        """Populate history list with filtered data"""
-        for widget in self.history_frame.winfo_children():
-            widget.destroy()
-            
-        for scan_data in self.filtered_data:
-            history_item = HistoryItem(
-                self.history_frame,
-                scan_data
-            )
-            history_item.pack(
-                fill="x",
-                pady=(0, PremiumDesignSystem.SPACE_SM)
-            )
-            
     def apply_filters(self):
-        """Apply current filters to history data"""
+        """Query the history store with the current filters"""
         filters = self.filter_bar.get_filters()
+        self.history_list.set_data_source(
+            self.store.query(filters["search"], filters["result"], filters["time"])
+        )
+        self.stats_panel.update_stats(self.store.get_stats())
         
-        filtered = self.history_data.copy()
-        
-        if filters["search"]:
-            search_term = filters["search"].lower()
-            filtered = [
-                item for item in filtered
-                if search_term in item["filename"].lower()
-            ]
-        
-        if filters["result"] != "All Results":
-            result_map = {
-                "Clean Files": "clean",
-                "Threats Found": "threat", 
-                "Errors": "error"
-            }
-            if filters["result"] in result_map:
-                target_result = result_map[filters["result"]]
-                filtered = [
-                    item for item in filtered
-                    if item["result"] == target_result
-                ]
-        
-        if filters["time"] != "All Time":
-            now = datetime.now()
-            if filters["time"] == "Today":
-                cutoff = now - timedelta(days=1)
-            elif filters["time"] == "This Week":
-                cutoff = now - timedelta(days=7)
-            elif filters["time"] == "This Month":
-                cutoff = now - timedelta(days=30)
-            else:
-                cutoff = None
-                
-            if cutoff:
-                filtered = [
-                    item for item in filtered
-                    if datetime.strptime(item["timestamp"], "%Y-%m-%d %H:%M") >= cutoff
-                ]
-        
-        self.filtered_data = filtered
-        self.populate_history_list()
-        
-        self.stats_panel.update_stats(filtered)
+    def refresh(self):
+        """Show newly recorded scans without losing the scroll position"""
+        filters = self.filter_bar.get_filters()
+        self.history_list.refresh(
+            self.store.query(filters["search"], filters["result"], filters["time"])
+        )
+        self.stats_panel.update_stats(self.store.get_stats())
         
     def go_back(self):
         """Navigate back to dashboard"""
@@ -0,0 +1,399 @@
+"""
+🗄️ SCAN HISTORY STORE
+Persistent scan history in SQLite, written in the background
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL,
+    filepath TEXT NOT NULL DEFAULT '',
+    result TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    day TEXT NOT NULL,
+    size INTEGER,
+    duration REAL NOT NULL DEFAULT 0,
+    threats TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_scans_timestamp ON scans(timestamp);
+CREATE INDEX IF NOT EXISTS idx_scans_result ON scans(result, timestamp);
+CREATE INDEX IF NOT EXISTS idx_scans_filename ON scans(filename);
+
+-- Per-day, per-result totals kept up to date by triggers, so the
+-- statistics never scan the history itself.
+CREATE TABLE IF NOT EXISTS scan_stats (
+    day TEXT NOT NULL,
+    result TEXT NOT NULL,
+    scans INTEGER NOT NULL,
+    total_duration REAL NOT NULL,
+    PRIMARY KEY (day, result)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS scans_stats_insert AFTER INSERT ON scans BEGIN
+    INSERT INTO scan_stats (day, result, scans, total_duration)
+    VALUES (NEW.day, NEW.result, 1, NEW.duration)
+    ON CONFLICT (day, result) DO UPDATE SET
+        scans = scans + 1,
+        total_duration = total_duration + excluded.total_duration;
+END;
+CREATE TRIGGER IF NOT EXISTS scans_stats_delete AFTER DELETE ON scans BEGIN
+    UPDATE scan_stats SET
+        scans = scans - 1,
+        total_duration = total_duration - OLD.duration
+    WHERE day = OLD.day AND result = OLD.result;
+END;
+"""
+
+RESULT_FILTERS = {
+    "Clean Files": "clean",
+    "Threats Found": "threat",
+    "Errors": "error"
+}
+
+TIME_FILTERS = {
+    "Today": 1,
+    "This Week": 7,
+    "This Month": 30
+}
+
+
+def format_size(size):
+    """Get human-readable file size"""
+    if size is None:
+        return "Unknown"
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} PB"
+
+
+def row_to_scan_data(row):
+    """Convert a scans row to the dict HistoryItem displays"""
+    return {
+        "id": row["id"],
+        "filename": row["filename"],
+        "filepath": row["filepath"],
+        "result": row["result"],
+        "timestamp": datetime.fromtimestamp(row["timestamp"]).strftime("%Y-%m-%d %H:%M"),
+        "size": format_size(row["size"]),
+        "duration": f"{row['duration']:.1f}s",
+        "threats": json.loads(row["threats"])
+    }
+
+
+class HistoryQuery:
+    """
+    🔎 History Query
+    One filtered view of the history, read a page at a time with SQL paging
+    """
+    
+    def __init__(self, store, where, params):
+        self.store = store
+        self.where = where
+        self.params = params
+        
+    def count(self):
+        """Get the number of matching scans"""
+        return self.store.read(
+            f"SELECT COUNT(*) FROM scans{self.where}", self.params
+        )[0][0]
+        
+    def fetch(self, offset, limit):
+        """Get up to limit matching scans, newest first"""
+        rows = self.store.read(
+            f"SELECT * FROM scans{self.where} "
+            "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            self.params + [limit, offset]
+        )
+        return [row_to_scan_data(row) for row in rows]
+
+
+class HistorySearchResults:
+    """
+    🔎 History Search Results
+    Matching scan ids from the search index, with rows read a page at a time
+    """
+    
+    def __init__(self, store, ids):
+        self.store = store
+        self.ids = ids
+        
+    def count(self):
+        """Get the number of matching scans"""
+        return len(self.ids)
+        
+    def fetch(self, offset, limit):
+        """Get up to limit matching scans, in index order"""
+        page = self.ids[offset:offset + limit]
+        if not page:
+            return []
+        rows = self.store.read(
+            f"SELECT * FROM scans WHERE id IN ({', '.join('?' * len(page))})", page
+        )
+        rows_by_id = {row["id"]: row for row in rows}
+        return [row_to_scan_data(rows_by_id[scan_id]) for scan_id in page if scan_id in rows_by_id]
+
+
+class FilenameSearchIndex:
+    """
+    🔤 Filename Search Index
+    Casefolded names, results and epoch timestamps held in memory, oldest
+    first, so a search never re-normalizes or re-parses a row
+    
+    Results are remembered for the last few search terms; a term that
+    contains one of them (typing on, or deleting back to it) only checks
+    that term's matches instead of the whole history.
+    """
+    
+    MAX_REMEMBERED = 16
+    
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self.clear()
+        
+    def clear(self):
+        """Drop every indexed scan"""
+        self.ids = []
+        self.name_keys = []
+        self.results = []
+        self.timestamps = []
+        self.last_id = 0
+        self.remembered = {}
+        self.remembered_filters = None
+        
+    def update(self):
+        """Add the scans written since the last update"""
+        with self.lock:
+            self.load_new_scans()
+            
+    def load_new_scans(self):
+        """Append new scans to the columns; called with the lock held"""
+        # A rowid range read, sorted here: ordering by timestamp in SQL
+        # would walk the whole timestamp index every time.
+        rows = self.store.read(
+            "SELECT id, filename, result, timestamp FROM scans WHERE id > ?",
+            (self.last_id,),
+            row_factory=None
+        )
+        if not rows:
+            return
+        rows.sort(key=lambda row: (row[3], row[0]))
+        if self.timestamps and rows[0][3] < self.timestamps[-1]:
+            # Recorded out of order; rebuild so the columns stay sorted.
+            self.clear()
+            self.load_new_scans()
+            return
+            
+        ids, filenames, results, timestamps = zip(*rows)
+        self.ids.extend(ids)
+        self.name_keys.extend(filename.casefold() for filename in filenames)
+        self.results.extend(results)
+        self.timestamps.extend(timestamps)
+        self.last_id = max(self.last_id, max(ids))
+        self.remembered.clear()
+        
+    def search(self, term, result=None, time_range="All Time"):
+        """Get the ids of scans whose name contains term, newest first"""
+        with self.lock:
+            self.load_new_scans()
+            return self.find(term.casefold(), result, time_range)
+            
+    def find(self, term, result, time_range):
+        """Match the indexed scans; called with the lock held"""
+        since = time.time() - TIME_FILTERS[time_range] * 86400 if time_range in TIME_FILTERS else None
+        
+        # A later cutoff for the same time range only removes rows, so
+        # earlier matches stay a valid superset.
+        filters = (result, time_range)
+        if filters != self.remembered_filters:
+            self.remembered.clear()
+            self.remembered_filters = filters
+        narrowest = max(
+            (known for known in self.remembered if known in term),
+            key=len,
+            default=None
+        )
+        candidates = self.remembered[narrowest] if narrowest is not None else range(len(self.ids))
+        
+        name_keys = self.name_keys
+        results = self.results
+        timestamps = self.timestamps
+        matches = [
+            position for position in candidates
+            if term in name_keys[position]
+            and (result is None or results[position] == result)
+            and (since is None or timestamps[position] >= since)
+        ]
+        
+        if len(self.remembered) >= self.MAX_REMEMBERED:
+            self.remembered.pop(next(iter(self.remembered)))
+        self.remembered[term] = matches
+        
+        ids = self.ids
+        return [ids[position] for position in reversed(matches)]
+
+
+class ScanHistoryStore:
+    """
+    Scan history persisted in caninana_history.db, without any widgets
+    
+    Scans are recorded from any thread and written by a single writer
+    thread, which commits everything queued within COMMIT_WINDOW_S in one
+    transaction. Reads go through their own connection; WAL mode keeps
+    them from waiting on the writer.
+    """
+    
+    COMMIT_WINDOW_S = 0.05
+    MAX_BATCH = 500
+    
+    def __init__(self, db_path="caninana_history.db", on_commit=None):
+        self.db_path = db_path
+        self.on_commit = on_commit
+        self.pending = queue.Queue()
+        self.read_lock = threading.Lock()
+        self.search_index = FilenameSearchIndex(self)
+        
+        connection = self.connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+        self.reader = self.connect(check_same_thread=False)
+        
+        self.writer = threading.Thread(target=self.run_writer, daemon=True)
+        self.writer.start()
+        
+    def connect(self, check_same_thread=True):
+        """Open a connection configured for the history database"""
+        connection = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+        
+    def record(self, filename, result, filepath="", size=None, duration=0.0,
+               threats=(), timestamp=None):
+        """Queue a finished scan for writing; returns immediately"""
+        if timestamp is None:
+            timestamp = time.time()
+        self.pending.put((
+            filename,
+            filepath,
+            result,
+            timestamp,
+            time.strftime("%Y-%m-%d", time.localtime(timestamp)),
+            size,
+            duration,
+            json.dumps(list(threats))
+        ))
+        
+    def flush(self, timeout=None):
+        """Wait until every scan recorded so far is committed"""
+        done = threading.Event()
+        self.pending.put(done)
+        return done.wait(timeout)
+        
+    def close(self):
+        """Commit pending scans and stop the writer"""
+        self.pending.put(None)
+        self.writer.join()
+        with self.read_lock:
+            self.reader.close()
+            
+    def run_writer(self):
+        """Write queued scans in group commits until closed"""
+        connection = self.connect()
+        running = True
+        while running:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + self.COMMIT_WINDOW_S
+            while batch[-1] is not None and len(batch) < self.MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                    
+            rows = [item for item in batch if isinstance(item, tuple)]
+            if rows:
+                try:
+                    with connection:
+                        connection.executemany(
+                            "INSERT INTO scans (filename, filepath, result, timestamp, "
+                            "day, size, duration, threats) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            rows
+                        )
+                except sqlite3.Error as e:
+                    print(f"Error saving scan history: {e}")
+                else:
+                    if self.on_commit:
+                        self.on_commit()
+                        
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is None:
+                    running = False
+        connection.close()
+        
+    def read(self, sql, params=(), row_factory=sqlite3.Row):
+        """Run a query on the reader connection and get all rows"""
+        with self.read_lock:
+            cursor = self.reader.cursor()
+            cursor.row_factory = row_factory
+            return cursor.execute(sql, params).fetchall()
+            
+    def query(self, search="", result="All Results", time_range="All Time"):
+        """Get the scans matching the history filters, as a paged data source"""
+        if search:
+            return HistorySearchResults(
+                self,
+                self.search_index.search(search, RESULT_FILTERS.get(result), time_range)
+            )
+            
+        clauses = []
+        params = []
+        if result in RESULT_FILTERS:
+            clauses.append("result = ?")
+            params.append(RESULT_FILTERS[result])
+        if time_range in TIME_FILTERS:
+            clauses.append("timestamp >= ?")
+            params.append(time.time() - TIME_FILTERS[time_range] * 86400)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return HistoryQuery(self, where, params)
+        
+    def get_stats(self, recent_days=7):
+        """Get totals per result, overall and for the last recent_days days"""
+        since = time.strftime(
+            "%Y-%m-%d", time.localtime(time.time() - (recent_days - 1) * 86400)
+        )
+        stats = {
+            "total": 0,
+            "recent": 0,
+            "total_duration": 0.0,
+            "recent_duration": 0.0,
+            "by_result": {}
+        }
+        rows = self.read(
+            "SELECT result, SUM(scans), SUM(total_duration), "
+            "SUM(CASE WHEN day >= ? THEN scans ELSE 0 END), "
+            "SUM(CASE WHEN day >= ? THEN total_duration ELSE 0 END) "
+            "FROM scan_stats GROUP BY result",
+            (since, since)
+        )
+        for result, scans, total_duration, recent, recent_duration in rows:
+            stats["by_result"][result] = {"scans": scans, "recent": recent}
+            stats["total"] += scans
+            stats["recent"] += recent
+            stats["total_duration"] += total_duration
+            stats["recent_duration"] += recent_duration
+        return stats
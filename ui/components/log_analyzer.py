@@ -10,46 +10,9 @@ from datetime import datetime, timedelta
 from .design_system import PremiumDesignSystem, IconManager
 from .animated_widgets import PremiumCard
 from .status_cards import StatsCard
-
-
-class LogLevel:
-    """Log level constants"""
-    DEBUG = "DEBUG"
-    INFO = "INFO"
-    WARNING = "WARNING"
-    ERROR = "ERROR"
-    CRITICAL = "CRITICAL"
-
-
-class LogEntry:
-    """Individual log entry"""
-    
-    def __init__(self, timestamp, level, message, component="System", details=None):
-        self.timestamp = timestamp
-        self.level = level
-        self.message = message
-        self.component = component
-        self.details = details or {}
-        
-    def to_dict(self):
-        return {
-            "timestamp": self.timestamp.isoformat(),
-            "level": self.level,
-            "message": self.message,
-            "component": self.component,
-            "details": self.details
-        }
-    
-    @classmethod
-    def from_dict(cls, data):
-        timestamp = datetime.fromisoformat(data["timestamp"])
-        return cls(
-            timestamp,
-            data["level"],
-            data["message"],
-            data.get("component", "System"),
-            data.get("details", {})
-        )
+from .log_buffer import LogLevel, LogEntry, LogBuffer
+from .log_tailer import LogTailer, RecordMatcher
+from .virtual_list import VirtualList
 
 
 class LogViewer(PremiumCard):
@@ -58,11 +21,24 @@ class LogViewer(PremiumCard):
     Beautiful log display with syntax highlighting and filtering
     """
     
+    # Entries kept in memory; older ones are paged back from spill files,
+    # which keep at most LogBuffer.max_spilled entries.
+    MAX_ENTRIES = 5000
+    CATCH_UP_POLL_MS = 50
+    
     def __init__(self, parent, **kwargs):
         super().__init__(parent, elevated=True, **kwargs)
         
-        self.log_entries = []
-        self.filtered_entries = []
+        self.log_buffer = LogBuffer(self.MAX_ENTRIES)
+        self.log_view = self.log_buffer.view()
+        self.refresh_pending = False
+        self.showing_samples = True
+        
+        self.record_source = None
+        self.last_sequence = 0
+        self.poll_interval_ms = 1000
+        self.log_tailer = None
+        self.record_matcher = RecordMatcher()
         
         self.content_frame = customtkinter.CTkFrame(
             self,
@@ -102,7 +78,7 @@ class LogViewer(PremiumCard):
         
         self.level_filter = customtkinter.CTkOptionMenu(
             header_frame,
-            values=["All Levels", "INFO", "WARNING", "ERROR", "CRITICAL"],
+            values=["All Levels", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
             command=self.apply_level_filter,
             width=120,
             fg_color=PremiumDesignSystem.ICE_PRIMARY,
@@ -121,13 +97,16 @@ class LogViewer(PremiumCard):
         self.auto_scroll.select()
         
     def create_log_display(self):
-        """Create scrollable log display"""
-        self.log_frame = customtkinter.CTkScrollableFrame(
+        """Create virtualized log display"""
+        self.log_list = VirtualList(
             self.content_frame,
+            row_factory=LogItem,
+            row_height=LogItem.HEIGHT + PremiumDesignSystem.SPACE_TINY,
+            row_spacing=PremiumDesignSystem.SPACE_TINY,
             fg_color=PremiumDesignSystem.FROST_LIGHT,
             corner_radius=PremiumDesignSystem.RADIUS_SM
         )
-        self.log_frame.pack(fill="both", expand=True)
+        self.log_list.pack(fill="both", expand=True)
         
         self.load_sample_logs()
         self.apply_level_filter()
@@ -149,61 +128,146 @@ class LogViewer(PremiumCard):
             LogEntry(now - timedelta(minutes=35), LogLevel.DEBUG, "Debug logging enabled", "System")
         ]
         
-        self.log_entries = sample_logs
-        
+        for entry in reversed(sample_logs):
+            self.log_buffer.append(entry)
+            
     def apply_level_filter(self, selected_level=None):
         """Apply log level filter"""
         if selected_level == "All Levels" or selected_level is None:
-            self.filtered_entries = self.log_entries.copy()
+            self.log_view = self.log_buffer.view()
         else:
-            self.filtered_entries = [
-                entry for entry in self.log_entries 
-                if entry.level == selected_level
-            ]
-            
-        self.refresh_log_display()
-        
-    def refresh_log_display(self):
-        """Refresh the log display"""
-        for widget in self.log_frame.winfo_children():
-            widget.destroy()
+            self.log_view = self.log_buffer.view(selected_level)
             
-        for entry in reversed(self.filtered_entries):
-            log_item = LogItem(self.log_frame, entry)
-            log_item.pack(
-                fill="x",
-                pady=(0, PremiumDesignSystem.SPACE_TINY),
-                padx=PremiumDesignSystem.SPACE_SM
-            )
+        self.log_list.set_data_source(self.log_view)
+        if self.auto_scroll.get():
+            self.log_list.scroll_to_end()
             
+    def refresh_log_display(self):
+        """Show entries added since the last refresh"""
+        self.refresh_pending = False
+        self.log_list.refresh(self.log_view)
         if self.auto_scroll.get():
-            self.log_frame._parent_canvas.yview_moveto(1.0)
+            self.log_list.scroll_to_end()
+            
+    def schedule_refresh(self):
+        """Refresh once Tk is idle, however many entries arrive meanwhile"""
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.after_idle(self.refresh_log_display)
             
     def add_log_entry(self, entry):
         """Add new log entry"""
-        self.log_entries.append(entry)
-        self.apply_level_filter(self.level_filter.get())
+        self.log_buffer.append(entry)
+        self.schedule_refresh()
+        
+    def add_log_entries(self, entries):
+        """Add several log entries with a single refresh"""
+        if not entries:
+            return
+        for entry in entries:
+            self.log_buffer.append(entry)
+        self.schedule_refresh()
+        
+    def set_record_source(self, source, poll_interval_ms=1000):
+        """
+        Show live engine records instead of the sample data.
+        source(sequence) must return the records newer than sequence,
+        oldest first, e.g. SecurityLogger.get_records_since.
+        """
+        self.record_source = source
+        self.poll_interval_ms = poll_interval_ms
+        self.last_sequence = 0
+        self.clear_sample_logs()
+        self.poll_records()
+        
+    def poll_records(self):
+        """Fetch records logged since the last poll"""
+        if self.record_source is None:
+            return
+        if self.log_tailer is not None and not self.log_tailer.caught_up.is_set():
+            # Show the file's backlog before the newer records in the ring.
+            self.after(self.CATCH_UP_POLL_MS, self.poll_records)
+            return
+        try:
+            records = self.record_source(self.last_sequence)
+        except Exception as e:
+            print(f"Error reading engine logs: {e}")
+            records = []
+            
+        entries = []
+        if records and self.last_sequence and records[0].sequence > self.last_sequence + 1:
+            missed = records[0].sequence - self.last_sequence - 1
+            entries.append(LogEntry(
+                records[0].timestamp,
+                LogLevel.WARNING,
+                f"{missed} older engine log records were not shown",
+                "LogViewer"
+            ))
+        for record in records:
+            entry = LogEntry.from_core_record(record)
+            if self.record_matcher.is_new(entry, "engine"):
+                entries.append(entry)
+        if records:
+            self.last_sequence = records[-1].sequence
+        self.add_log_entries(entries)
+        
+        self.after(self.poll_interval_ms, self.poll_records)
+        
+    def follow_log_file(self, path, poll_interval=1.0):
+        """
+        Show lines appended to a log file, e.g. caninana.log.
+        Records that also come from the record source are shown once.
+        """
+        if self.log_tailer is not None:
+            self.log_tailer.stop()
+        self.clear_sample_logs()
+        self.log_tailer = LogTailer(
+            path,
+            lambda entries: self.after(0, self.add_file_entries, entries),
+            poll_interval
+        )
+        self.log_tailer.start()
+        
+    def add_file_entries(self, entries):
+        """Add entries read from the log file"""
+        self.add_log_entries([
+            entry for entry in entries
+            if self.record_matcher.is_new(entry, "file")
+        ])
+        
+    def clear_sample_logs(self):
+        """Drop the sample entries once real logs are shown"""
+        if self.showing_samples:
+            self.showing_samples = False
+            self.log_buffer.clear()
+            self.apply_level_filter(self.level_filter.get())
+            
+    def destroy(self):
+        """Stop following the log file and remove the spill file"""
+        if self.log_tailer is not None:
+            self.log_tailer.stop()
+        self.log_buffer.close()
+        super().destroy()
 
 
 class LogItem(customtkinter.CTkFrame):
     """
     📄 Individual Log Item
-    Beautiful display for single log entry with level-based styling
+    Beautiful display for single log entry with level-based styling,
+    reused for whichever entry scrolls into its slot
     """
     
-    def __init__(self, parent, log_entry, **kwargs):
+    HEIGHT = 60
+    
+    def __init__(self, parent, log_entry=None, **kwargs):
         super().__init__(parent, **kwargs)
         
-        self.log_entry = log_entry
-        
-        level_config = self.get_level_config()
+        self.log_entry = None
         
         self.configure(
-            fg_color=level_config["bg_color"],
             corner_radius=PremiumDesignSystem.RADIUS_SM,
             border_width=1,
-            border_color=level_config["border_color"],
-            height=60
+            height=self.HEIGHT
         )
         
         content_frame = customtkinter.CTkFrame(
@@ -223,46 +287,69 @@ class LogItem(customtkinter.CTkFrame):
         )
         top_row.pack(fill="x")
         
-        timestamp_label = customtkinter.CTkLabel(
+        self.timestamp_label = customtkinter.CTkLabel(
             top_row,
-            text=log_entry.timestamp.strftime("%H:%M:%S"),
+            text="",
             font=customtkinter.CTkFont(size=10, family="Consolas"),
             text_color=PremiumDesignSystem.TEXT_SECONDARY,
             anchor="w"
         )
-        timestamp_label.pack(side="left")
+        self.timestamp_label.pack(side="left")
         
-        level_badge = customtkinter.CTkLabel(
+        self.level_badge = customtkinter.CTkLabel(
             top_row,
-            text=log_entry.level,
+            text="",
             font=customtkinter.CTkFont(size=9, weight="bold"),
-            text_color=level_config["text_color"],
-            fg_color=level_config["badge_color"],
             corner_radius=PremiumDesignSystem.RADIUS_TINY,
             width=60,
             height=16
         )
-        level_badge.pack(side="right")
+        self.level_badge.pack(side="right")
         
-        component_label = customtkinter.CTkLabel(
+        self.component_label = customtkinter.CTkLabel(
             top_row,
-            text=f"[{log_entry.component}]",
+            text="",
             font=customtkinter.CTkFont(size=10, weight="bold"),
-            text_color=level_config["text_color"],
             anchor="w"
         )
-        component_label.pack(side="right", padx=(0, PremiumDesignSystem.SPACE_SM))
+        self.component_label.pack(side="right", padx=(0, PremiumDesignSystem.SPACE_SM))
         
-        message_label = customtkinter.CTkLabel(
+        self.message_label = customtkinter.CTkLabel(
             content_frame,
-            text=log_entry.message,
+            text="",
             font=customtkinter.CTkFont(size=11),
             text_color=PremiumDesignSystem.TEXT_PRIMARY,
             anchor="w",
             wraplength=500
         )
-        message_label.pack(anchor="w", fill="x")
+        self.message_label.pack(anchor="w", fill="x")
+        
+        if log_entry is not None:
+            self.set_row_data(log_entry)
+            
+    def set_row_data(self, log_entry):
+        """Show another log entry in this item"""
+        previous_level = self.log_entry.level if self.log_entry else None
+        self.log_entry = log_entry
+        
+        self.timestamp_label.configure(text=log_entry.timestamp.strftime("%H:%M:%S"))
+        self.component_label.configure(text=f"[{log_entry.component}]")
+        self.message_label.configure(text=log_entry.message)
         
+        # Restyling redraws the whole item, so only do it when the level changes.
+        if log_entry.level != previous_level:
+            level_config = self.get_level_config()
+            self.configure(
+                fg_color=level_config["bg_color"],
+                border_color=level_config["border_color"]
+            )
+            self.level_badge.configure(
+                text=log_entry.level,
+                text_color=level_config["text_color"],
+                fg_color=level_config["badge_color"]
+            )
+            self.component_label.configure(text_color=level_config["text_color"])
+            
     def get_level_config(self):
         """Get styling configuration based on log level"""
         level_configs = {
@@ -458,7 +545,7 @@ class SystemMonitor(customtkinter.CTkFrame):
                 text_color=PremiumDesignSystem.TEXT_MUTED
             )
             time_label.pack(side="right")
-        
+            
         logs_card = PremiumCard(
             self,
             elevated=True
@@ -598,7 +685,15 @@ class LogAnalyzer(customtkinter.CTkFrame):
         """Set back navigation callback"""
         self.back_callback = callback
         
+    def set_record_source(self, source, poll_interval_ms=1000):
+        """Stream engine records from source(sequence) into the log viewer"""
+        self.monitor.log_viewer.set_record_source(source, poll_interval_ms)
+        
+    def follow_log_file(self, path, poll_interval=1.0):
+        """Stream lines appended to a log file into the log viewer"""
+        self.monitor.log_viewer.follow_log_file(path, poll_interval)
+        
     def add_log_entry(self, level, message, component="System", details=None):
         """Add new log entry"""
         entry = LogEntry(datetime.now(), level, message, component, details)
-        self.monitor.log_viewer.add_log_entry(entry)
\ No newline at end of file
+        self.monitor.log_viewer.add_log_entry(entry)
@@ -0,0 +1,209 @@
+"""
+🧾 LOG BUFFER
+Log entries kept in memory up to a limit, with older ones spilled to disk
+"""
+
+import itertools
+import json
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+
+
+class LogLevel:
+    """Log level constants"""
+    DEBUG = "DEBUG"
+    INFO = "INFO"
+    WARNING = "WARNING"
+    ERROR = "ERROR"
+    CRITICAL = "CRITICAL"
+
+
+class LogEntry:
+    """Individual log entry"""
+    
+    def __init__(self, timestamp, level, message, component="System", details=None):
+        self.timestamp = timestamp
+        self.level = level
+        self.message = message
+        self.component = component
+        self.details = details or {}
+        
+    def to_dict(self):
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "level": self.level,
+            "message": self.message,
+            "component": self.component,
+            "details": self.details
+        }
+        
+    @classmethod
+    def from_core_record(cls, record):
+        """Build an entry from a caninana_core.LogRecord"""
+        fields = record.fields
+        details = {"sequence": record.sequence}
+        if fields.file_path:
+            details["file"] = fields.file_path
+        if fields.signatures:
+            details["signatures"] = list(fields.signatures)
+        if fields.duration_ms is not None:
+            details["duration_ms"] = fields.duration_ms
+        if fields.bytes is not None:
+            details["bytes"] = fields.bytes
+        return cls(
+            record.timestamp,
+            record.level.name,
+            record.message,
+            record.component,
+            details
+        )
+        
+    @classmethod
+    def from_dict(cls, data):
+        timestamp = datetime.fromisoformat(data["timestamp"])
+        return cls(
+            timestamp,
+            data["level"],
+            data["message"],
+            data.get("component", "System"),
+            data.get("details", {})
+        )
+
+
+class LogBufferView:
+    """
+    🔎 Log Buffer View
+    The entries of one level (or all of them), oldest first, as a paged
+    data source; spilled entries are read back from disk
+    """
+    
+    def __init__(self, buffer, level=None):
+        self.buffer = buffer
+        self.level = level
+        
+    def count(self):
+        """Get the number of entries in view"""
+        return len(self.buffer.spill_offsets(self.level)) + len(self.buffer.memory(self.level))
+        
+    def fetch(self, offset, limit):
+        """Get up to limit entries starting at offset"""
+        spilled = self.buffer.spill_offsets(self.level)
+        entries = []
+        if offset < len(spilled):
+            entries = self.buffer.read_spilled(spilled[offset:offset + limit])
+        start = max(0, offset - len(spilled))
+        stop = offset + limit - len(spilled)
+        if stop > start:
+            entries.extend(itertools.islice(self.buffer.memory(self.level), start, stop))
+        return entries
+
+
+class LogBuffer:
+    """
+    Log entries held in memory up to max_entries, without any widgets
+    
+    Appending is O(1): entries go to a deque for all levels and one for
+    their own level. Once the limit is reached the oldest entry moves to
+    a temporary spill file, and the byte offset of its line is kept so
+    views can still page it back in.
+    
+    The spill is a ring of segment files, each holding a tenth of
+    max_spilled entries. Once more than max_spilled entries are on disk,
+    the oldest segment is deleted along with its offsets, so a session
+    that logs for days does not fill the disk.
+    """
+    
+    SEGMENTS = 10
+    
+    def __init__(self, max_entries=5000, max_spilled=200000):
+        self.max_entries = max_entries
+        self.max_spilled = max_spilled
+        self.segment_entries = max(1, max_spilled // self.SEGMENTS)
+        self.segments = []
+        self.clear()
+        
+    def clear(self):
+        """Drop every entry, in memory and on disk"""
+        self.entries = deque()
+        self.entries_by_level = {}
+        self.close()
+        # Offsets grow across segments, so they stay sorted; segment_bases
+        # holds the offset each segment starts at.
+        self.spilled = array('q')
+        self.spilled_by_level = {}
+        self.segments = []
+        self.segment_bases = []
+        self.segment_used = 0
+        self.spill_end = 0
+        
+    def close(self):
+        """Remove the spill files"""
+        for segment in self.segments:
+            segment.close()
+            
+    def append(self, entry):
+        """Add an entry, spilling the oldest one past the limit"""
+        self.entries.append(entry)
+        self.entries_by_level.setdefault(entry.level, deque()).append(entry)
+        if len(self.entries) > self.max_entries:
+            self.spill_oldest()
+            
+    def spill_oldest(self):
+        """Move the oldest entry in memory to the spill file"""
+        entry = self.entries.popleft()
+        self.entries_by_level[entry.level].popleft()
+        if not self.segments or self.segment_used >= self.segment_entries:
+            self.segments.append(tempfile.TemporaryFile(prefix="caninana_logs_"))
+            self.segment_bases.append(self.spill_end)
+            self.segment_used = 0
+            
+        segment = self.segments[-1]
+        line = json.dumps(entry.to_dict(), default=str).encode() + b"\n"
+        segment.seek(0, 2)
+        segment.write(line)
+        offset = self.spill_end
+        self.spill_end += len(line)
+        self.segment_used += 1
+        self.spilled.append(offset)
+        self.spilled_by_level.setdefault(entry.level, array('q')).append(offset)
+        
+        if len(self.spilled) > self.max_spilled and len(self.segments) > 1:
+            self.drop_oldest_segment()
+            
+    def drop_oldest_segment(self):
+        """Delete the oldest spill segment and forget its entries"""
+        self.segments.pop(0).close()
+        self.segment_bases.pop(0)
+        end = self.segment_bases[0]
+        del self.spilled[:bisect_left(self.spilled, end)]
+        for offsets in self.spilled_by_level.values():
+            del offsets[:bisect_left(offsets, end)]
+            
+    def memory(self, level=None):
+        """Get the in-memory entries of level (all levels if None)"""
+        if level is None:
+            return self.entries
+        return self.entries_by_level.get(level, ())
+        
+    def spill_offsets(self, level=None):
+        """Get the spill file offsets of level's entries (all levels if None)"""
+        if level is None:
+            return self.spilled
+        return self.spilled_by_level.get(level, ())
+        
+    def read_spilled(self, offsets):
+        """Read back the spilled entries at offsets"""
+        entries = []
+        for offset in offsets:
+            index = bisect_right(self.segment_bases, offset) - 1
+            segment = self.segments[index]
+            segment.seek(offset - self.segment_bases[index])
+            entries.append(LogEntry.from_dict(json.loads(segment.readline())))
+        return entries
+        
+    def view(self, level=None):
+        """Get the entries of level (all levels if None) as a data source"""
+        return LogBufferView(self, level)
@@ -0,0 +1,365 @@
+"""
+📡 LOG TAILER
+Follows the engine's log file, reading only what was appended
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import re
+import select
+import struct
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+
+from .log_buffer import LogLevel, LogEntry
+
+# inotify(7) event bits for changes to files in a watched directory.
+IN_MODIFY = 0x002
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+# "[2024-01-31 12:00:00] [INFO] [Scanner] message", as written by
+# SecurityLogger in its text format.
+TEXT_LINE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] \[([A-Z]+)\] \[([^\]]*)\] ?(.*)$")
+
+
+def default_log_path():
+    """Get the log file SecurityLogger writes, ~/.caninana/caninana.log"""
+    home_dir = os.environ.get("HOME") or os.environ.get("USERPROFILE")
+    app_data_path = os.path.join(home_dir, ".caninana") if home_dir else "."
+    return os.path.join(app_data_path, "caninana.log")
+
+
+def parse_json_timestamp(ts):
+    """Get a JSON record's timestamp as naive local time, like text lines"""
+    # The engine writes UTC with a "Z", which fromisoformat only accepts
+    # from Python 3.11.
+    if ts.endswith("Z"):
+        ts = ts[:-1] + "+00:00"
+    timestamp = datetime.fromisoformat(ts)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+
+def parse_log_line(line):
+    """Build an entry from a text or JSON-lines log line (None if neither)"""
+    if line.startswith("{"):
+        try:
+            data = json.loads(line)
+            timestamp = parse_json_timestamp(data["ts"])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+        details = {key: data[key] for key in ("file", "signatures", "duration_ms", "bytes") if key in data}
+        return LogEntry(
+            timestamp,
+            data.get("level", LogLevel.INFO),
+            data.get("message", ""),
+            data.get("component", "System"),
+            details
+        )
+        
+    match = TEXT_LINE.match(line)
+    if match is None:
+        return None
+    timestamp, level, component, message = match.groups()
+    return LogEntry(datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S"), level, message, component)
+
+
+def open_inotify(directory):
+    """Get an inotify descriptor watching directory, or None where unavailable"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        # Watching the directory rather than the file also sees the log
+        # being renamed away and created again on rotation.
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+def read_inotify_names(fd):
+    """Drain pending inotify events, returning the file names they name"""
+    names = set()
+    while True:
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            names.add(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+            offset += length
+
+
+class RecordMatcher:
+    """
+    Shows each engine record once when it arrives from two sources
+    
+    The engine's record ring and its log file carry the same records.
+    Whichever source delivers a record first shows it, and the matching
+    entry from the other source is dropped. Entries match on timestamp
+    (to the second, as the text log has it), level, component and
+    message. Only the last max_keys entries are remembered.
+    """
+    
+    def __init__(self, max_keys=20000):
+        self.max_keys = max_keys
+        self.clear()
+        
+    def clear(self):
+        """Forget every entry seen"""
+        self.unmatched = {}
+        self.order = deque()
+        
+    def is_new(self, entry, source):
+        """Check whether entry from source was not shown by another source"""
+        key = (entry.timestamp.replace(microsecond=0), entry.level, entry.component, entry.message)
+        pending = self.unmatched.get(key)
+        if pending is not None and pending[0] != source:
+            self.release(key)
+            return False
+            
+        if pending is None:
+            self.unmatched[key] = [source, 1]
+        else:
+            pending[1] += 1
+        self.order.append(key)
+        if len(self.order) > self.max_keys:
+            self.release(self.order.popleft())
+        return True
+        
+    def release(self, key):
+        """Forget one unmatched entry with key"""
+        pending = self.unmatched.get(key)
+        if pending is not None:
+            pending[1] -= 1
+            if pending[1] == 0:
+                del self.unmatched[key]
+
+
+class LogTailer:
+    """
+    Follows a log file from a worker thread, without any widgets
+    
+    The tailer keeps its byte offset and only reads what was appended.
+    On start it skips to the last initial_bytes of the file, so a multi-GB
+    log is never read from the beginning. A file that shrank was
+    truncated and is read again from the start. A file with a new identity
+    was rotated: what was left of the old file is read first (where the
+    old file can be kept open), then the new one from the start.
+    
+    On Linux the worker sleeps on inotify until the log's directory
+    changes; elsewhere, or if inotify is unavailable, it checks the file
+    every poll_interval seconds. Lines are parsed on the worker and
+    on_entries(entries) is called from it with batches of at most
+    batch_size entries, oldest first. caught_up is set once the backfill
+    has been handed over.
+    """
+    
+    READ_SIZE = 1024 * 1024
+    COALESCE_DELAY_S = 0.05
+    
+    def __init__(self, path, on_entries, poll_interval=1.0,
+                 initial_bytes=256 * 1024, batch_size=1000, use_inotify=True):
+        self.path = path
+        self.on_entries = on_entries
+        self.poll_interval = poll_interval
+        self.initial_bytes = initial_bytes
+        self.batch_size = batch_size
+        self.use_inotify = use_inotify
+        
+        # Windows cannot rename a file someone holds open, so there the
+        # file is only opened while reading, which would block rotation
+        # otherwise.
+        self.keep_open = os.name == "posix"
+        
+        self.handle = None
+        self.identity = None
+        self.offset = 0
+        self.partial = b""
+        self.skip_line = False
+        self.backfilled = False
+        
+        self.inotify_fd = None
+        self.wake_pipe = None
+        self.wake_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.caught_up = threading.Event()
+        self.thread = None
+        
+    def start(self):
+        """Start following the file on a worker thread"""
+        if self.use_inotify:
+            self.inotify_fd = open_inotify(os.path.dirname(os.path.abspath(self.path)))
+        if self.inotify_fd is not None:
+            self.wake_pipe = os.pipe()
+        self.thread = threading.Thread(target=self.run, name="caninana-log-tailer", daemon=True)
+        self.thread.start()
+        
+    def stop(self, timeout=1.0):
+        """Stop following; on_entries is not called afterwards"""
+        # The callback usually posts to Tk, which must not be waited on
+        # from a main thread blocked in join().
+        self.on_entries = None
+        self.stop_event.set()
+        with self.wake_lock:
+            if self.wake_pipe is not None:
+                os.write(self.wake_pipe[1], b"\0")
+        if self.thread is not None:
+            self.thread.join(timeout)
+            
+    def run(self):
+        """Read new lines until stopped"""
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self.read_new()
+                except OSError as e:
+                    print(f"Error reading log file: {e}")
+                    self.close_handle()
+                self.caught_up.set()
+                self.wait_for_change()
+        finally:
+            self.close_handle()
+            if self.inotify_fd is not None:
+                os.close(self.inotify_fd)
+                with self.wake_lock:
+                    for fd in self.wake_pipe:
+                        os.close(fd)
+                    self.wake_pipe = None
+                    
+    def wait_for_change(self):
+        """Sleep until the log may have changed"""
+        if self.inotify_fd is None:
+            self.stop_event.wait(self.poll_interval)
+            return
+            
+        # poll_interval still bounds the wait, in case an event is missed.
+        filename = os.path.basename(self.path)
+        while not self.stop_event.is_set():
+            readable, _, _ = select.select([self.inotify_fd, self.wake_pipe[0]], [], [], self.poll_interval)
+            if not readable:
+                return
+            if self.inotify_fd in readable and filename in read_inotify_names(self.inotify_fd):
+                # A burst of writes is read in one go.
+                self.stop_event.wait(self.COALESCE_DELAY_S)
+                return
+                
+    def read_new(self):
+        """Read whatever was appended since the last call"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+            
+        if self.handle is not None and stat is not None and (stat.st_dev, stat.st_ino) != self.identity:
+            # Rotated: finish the old file before moving on to the new one.
+            self.read_to_end(final=True)
+            self.close_handle()
+            
+        if self.handle is None:
+            if stat is None:
+                return
+            self.open_log()
+        elif stat is not None and stat.st_size < self.offset:
+            # Truncated in place.
+            self.seek(0)
+            
+        self.read_to_end()
+        if not self.keep_open:
+            self.close_handle()
+            
+    def open_log(self):
+        """Open the file, resuming at the offset if it is the same file"""
+        self.handle = open(self.path, "rb")
+        stat = os.fstat(self.handle.fileno())
+        identity = (stat.st_dev, stat.st_ino)
+        if not self.backfilled:
+            self.backfilled = True
+            self.seek(max(0, stat.st_size - self.initial_bytes))
+            # Backfill starts at a line boundary.
+            self.skip_line = self.offset > 0
+        elif identity != self.identity or stat.st_size < self.offset:
+            self.seek(0)
+        else:
+            self.handle.seek(self.offset)
+        self.identity = identity
+        
+    def seek(self, offset):
+        """Continue reading at offset, dropping any partial line"""
+        self.handle.seek(offset)
+        self.offset = offset
+        self.partial = b""
+        self.skip_line = False
+        
+    def close_handle(self):
+        """Close the file, keeping offset and identity for reopening"""
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+            
+    def read_to_end(self, final=False):
+        """Parse complete lines up to the end of the file"""
+        while not self.stop_event.is_set():
+            chunk = self.handle.read(self.READ_SIZE)
+            if not chunk:
+                break
+            self.offset += len(chunk)
+            lines = (self.partial + chunk).split(b"\n")
+            # A line without its newline yet is kept for the next read.
+            self.partial = lines.pop()
+            if self.skip_line:
+                if not lines:
+                    self.partial = b""
+                    continue
+                lines = lines[1:]
+                self.skip_line = False
+            self.deliver(lines)
+            
+        # Nothing more will be written to a rotated file.
+        if final and self.partial:
+            self.deliver([self.partial])
+            self.partial = b""
+            
+    def deliver(self, lines):
+        """Parse lines and hand them to on_entries in batches"""
+        entries = []
+        for raw in lines:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r")
+            if not line:
+                continue
+            entry = parse_log_line(line)
+            if entry is not None:
+                entries.append(entry)
+            elif entries:
+                # Messages may span lines; keep the rest with their entry.
+                entries[-1].message += "\n" + line
+            else:
+                entries.append(LogEntry(datetime.now(), LogLevel.INFO, line, "Log"))
+                
+        for start in range(0, len(entries), self.batch_size):
+            on_entries = self.on_entries
+            if on_entries is None:
+                return
+            try:
+                on_entries(entries[start:start + self.batch_size])
+            except Exception as e:
+                print(f"Error delivering log entries: {e}")
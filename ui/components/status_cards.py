@@ -414,9 +414,11 @@ class StatsCard(PremiumCard):
             )
             self.trend_label.pack(side="right")
     
-    def update_value(self, new_value, trend=None):
-        """Update the stats value with optional trend"""
+    def update_value(self, new_value, trend=None, subtitle=None):
+        """Update the stats value with optional trend and subtitle"""
         self.value_label.configure(text=new_value)
+        if subtitle and hasattr(self, 'subtitle_label'):
+            self.subtitle_label.configure(text=subtitle)
         if trend and hasattr(self, 'trend_label'):
             trend_color = PremiumDesignSystem.SUCCESS_GREEN if "↑" in trend else PremiumDesignSystem.DANGER_RED
             self.trend_label.configure(text=trend, text_color=trend_color)
\ No newline at end of file
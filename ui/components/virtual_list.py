@@ -0,0 +1,221 @@
+"""
+📜 VIRTUAL LIST
+Scrollable list that only builds widgets for the rows on screen
+"""
+
+import math
+from collections import OrderedDict
+
+import customtkinter
+
+
+class ListDataSource:
+    """
+    📦 In-Memory Data Source
+    Serves a list through the paged interface VirtualList reads from
+    """
+    
+    def __init__(self, items):
+        self.items = items
+        
+    def count(self):
+        """Get the number of rows"""
+        return len(self.items)
+        
+    def fetch(self, offset, limit):
+        """Get up to limit rows starting at offset"""
+        return self.items[offset:offset + limit]
+
+
+class PagedRowCache:
+    """
+    🗂️ Paged Row Cache
+    Loads rows from a data source a page at a time, keeping recent pages
+    """
+    
+    def __init__(self, data_source, page_size=100, max_pages=8):
+        self.data_source = data_source
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.pages = OrderedDict()
+        
+    def get(self, index):
+        """Get row index, loading its page on first use (None if missing)"""
+        page_number, offset = divmod(index, self.page_size)
+        page = self.pages.get(page_number)
+        if page is None:
+            page = self.data_source.fetch(page_number * self.page_size, self.page_size)
+            self.pages[page_number] = page
+            if len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(page_number)
+        return page[offset] if offset < len(page) else None
+
+
+class VirtualList(customtkinter.CTkFrame):
+    """
+    📜 Premium Virtual List
+    Fixed-height rows drawn from a recycled widget pool
+    
+    Only the rows in view plus `overscan` on either side exist as widgets.
+    Row index i always lives in pool slot i % pool size, so scrolling by
+    one row rebinds a single widget. Rows are created by row_factory(parent)
+    and must implement set_row_data(data). A data source implements
+    count() and fetch(offset, limit); pages are loaded as rows come into view.
+    """
+    
+    def __init__(self, parent, row_factory, row_height, row_spacing=0,
+                 overscan=3, page_size=100, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(parent, **kwargs)
+        
+        self.row_factory = row_factory
+        self.row_height = row_height
+        self.row_spacing = row_spacing
+        self.overscan = overscan
+        self.page_size = page_size
+        
+        self.cache = None
+        self.row_count = 0
+        self.scroll_offset = 0
+        self.rows = []
+        self.row_indices = []
+        self.render_pending = False
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        
+        self.viewport = customtkinter.CTkFrame(self, fg_color="transparent")
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+        self.viewport.bind("<Configure>", lambda event: self.schedule_render())
+        
+        self.scrollbar = customtkinter.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        # Rows come and go while scrolling, so the wheel is caught globally
+        # and filtered by widget path, like CTkScrollableFrame does.
+        self.bind_all("<MouseWheel>", self.on_mouse_wheel, add="+")
+        self.bind_all("<Button-4>", self.on_mouse_wheel, add="+")
+        self.bind_all("<Button-5>", self.on_mouse_wheel, add="+")
+        
+    def set_data_source(self, data_source):
+        """Show a new data source from the top"""
+        self.cache = PagedRowCache(data_source, self.page_size)
+        self.row_count = data_source.count()
+        self.scroll_offset = 0
+        self.row_indices = [None] * len(self.rows)
+        self.schedule_render()
+        
+    def refresh(self, data_source=None):
+        """Reload rows, from data_source if given, keeping the position"""
+        if data_source is None:
+            if self.cache is None:
+                return
+            data_source = self.cache.data_source
+        scroll_offset = self.scroll_offset
+        self.set_data_source(data_source)
+        self.scroll_offset = scroll_offset
+        
+    def viewport_height(self):
+        """Get the viewport height in unscaled units, as used by place()"""
+        return self.viewport.winfo_height() / self._get_widget_scaling()
+        
+    def content_height(self):
+        """Get the height of all rows"""
+        return self.row_count * self.row_height
+        
+    def scroll_to(self, offset):
+        """Scroll so offset is at the top of the viewport"""
+        max_offset = max(0, self.content_height() - self.viewport_height())
+        offset = max(0, min(offset, max_offset))
+        if offset != self.scroll_offset:
+            self.scroll_offset = offset
+            self.schedule_render()
+            
+    def scroll_to_end(self):
+        """Scroll so the last row is at the bottom of the viewport"""
+        self.scroll_to(self.content_height())
+        
+    def yview(self, *args):
+        """Handle scrollbar commands"""
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.content_height())
+        elif args[0] == "scroll":
+            step = self.viewport_height() if args[2] == "pages" else self.row_height
+            self.scroll_to(self.scroll_offset + int(args[1]) * step)
+            
+    def on_mouse_wheel(self, event):
+        """Scroll when the wheel turns over the list"""
+        path = str(event.widget)
+        viewport_path = str(self.viewport)
+        if path != viewport_path and not path.startswith(viewport_path + "."):
+            return
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            direction = -1
+        else:
+            direction = 1
+        self.scroll_to(self.scroll_offset + direction * self.row_height)
+        
+    def schedule_render(self):
+        """Render once Tk is idle, coalescing bursts of scroll events"""
+        if not self.render_pending:
+            self.render_pending = True
+            self.after_idle(self.render)
+            
+    def render(self):
+        """Bind and place the rows in view, hiding the rest of the pool"""
+        self.render_pending = False
+        viewport_height = self.viewport_height()
+        if self.cache is None or viewport_height <= 1:
+            return
+            
+        max_offset = max(0, self.content_height() - viewport_height)
+        self.scroll_offset = max(0, min(self.scroll_offset, max_offset))
+        first = max(0, int(self.scroll_offset // self.row_height) - self.overscan)
+        last = min(
+            self.row_count,
+            math.ceil((self.scroll_offset + viewport_height) / self.row_height) + self.overscan
+        )
+        
+        # Sized for the worst case, so the pool does not grow (and rebind
+        # every row) once the list scrolls away from the top.
+        pool_size = math.ceil(viewport_height / self.row_height) + 1 + 2 * self.overscan
+        if len(self.rows) < pool_size:
+            self.grow_pool(pool_size)
+            
+        visible_slots = set()
+        for index in range(first, last):
+            slot = index % len(self.rows)
+            row = self.rows[slot]
+            if self.row_indices[slot] != index:
+                row_data = self.cache.get(index)
+                if row_data is None:
+                    continue
+                row.set_row_data(row_data)
+                self.row_indices[slot] = index
+            row.place(x=0, y=index * self.row_height - self.scroll_offset, relwidth=1)
+            visible_slots.add(slot)
+            
+        for slot, row in enumerate(self.rows):
+            if slot not in visible_slots:
+                row.place_forget()
+                
+        if self.content_height() > 0:
+            self.scrollbar.set(
+                self.scroll_offset / self.content_height(),
+                min(1.0, (self.scroll_offset + viewport_height) / self.content_height())
+            )
+        else:
+            self.scrollbar.set(0.0, 1.0)
+            
+    def grow_pool(self, size):
+        """Create row widgets until the pool holds size rows"""
+        while len(self.rows) < size:
+            row = self.row_factory(self.viewport)
+            # Rows keep their configured height so every offset is uniform.
+            row.configure(height=self.row_height - self.row_spacing)
+            row.pack_propagate(False)
+            self.rows.append(row)
+        # The slot of every index changed with the pool size.
+        self.row_indices = [None] * len(self.rows)
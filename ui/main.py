@@ -5,12 +5,17 @@ Ultra-modern, ice-inspired security interface with modular architecture
 
 import customtkinter
 import os
+import queue
 import sys
 import threading
 import time
+from datetime import timedelta
 from tkinter import Canvas
 import math
 
+# Startup is timed from here; see StartupTimer.
+PROCESS_START = time.perf_counter()
+
 if sys.platform == 'win32' and sys.version_info >= (3, 8):
     ui_dir = os.path.dirname(__file__)
     os.add_dll_directory(os.path.abspath(ui_dir))
@@ -28,9 +33,11 @@ try:
     from components.navigation import PremiumSidebar
     from components.dashboard import PremiumDashboard
     from components.file_scanner import PremiumFileScanner
-    from components.configuration_manager import ConfigurationManager
+    from components.configuration_manager import ConfigurationManager, ConfigurationStore
     from components.history_panel import ScanHistoryPanel
+    from components.history_store import ScanHistoryStore
     from components.log_analyzer import LogAnalyzer
+    from components.log_tailer import default_log_path
     from components.results_dashboard import ResultsDashboard
 except ImportError as e:
     print(f"Error importing UI components: {e}")
@@ -160,6 +167,29 @@ class IceGradientBackground(customtkinter.CTkFrame):
         self.animation_running = False
 
 
+class StartupTimer:
+    """Records the duration of each startup phase, from module import"""
+    
+    def __init__(self, origin=PROCESS_START):
+        self.origin = origin
+        self.last = origin
+        self.phases = []
+        
+    def mark(self, phase):
+        """Close the phase that ended now"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+        
+    def total_ms(self):
+        return (self.last - self.origin) * 1000
+        
+    def summary(self):
+        return ", ".join(
+            f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.phases
+        )
+
+
 class PremiumCaninanaApp(customtkinter.CTk):
     """
     🐍 PREMIUM CANINANA ANTIVIRUS APPLICATION
@@ -175,25 +205,58 @@ class PremiumCaninanaApp(customtkinter.CTk):
     🔒 Professional security aesthetics
     """
     
+    # Pause between building views in the background after startup.
+    PREWARM_DELAY_MS = 50
+    # How often queued work and the loading status are checked.
+    LOADING_STATUS_INTERVAL_MS = 500
+    # How often events handed over by core threads are picked up.
+    UI_EVENT_INTERVAL_MS = 100
+    
     def __init__(self):
         super().__init__()
         
         self.current_view = "dashboard"
         self.is_scanning = False
         self.selected_filepath = ""
+        self.startup = StartupTimer()
+        self.views = {}
+        self.pending_log_entries = []
+        # Core threads must not touch Tk, not even through after(); they
+        # put (callback, args) here and poll_ui_events runs them.
+        self.ui_events = queue.Queue()
+        self.config_store = ConfigurationStore()
+        self.history_store = ScanHistoryStore(on_commit=self.on_history_committed)
         
         self.initialize_core_engine()
+        self.startup.mark("core")
         
         self.setup_premium_window()
         
         self.create_premium_interface()
+        self.startup.mark("interface")
         
         self.load_application_data()
+        self.refresh_loading_status()
+        self.poll_ui_events()
+        
+        # The first frame is up once the window is mapped and Tk has run
+        # the idle redraws that follow.
+        self.first_frame_shown = False
+        self.bind("<Map>", self.on_window_mapped, add="+")
         
     def initialize_core_engine(self):
-        """Initialize the Caninana core security engine"""
+        """Create the core engine and start loading signatures in the background"""
         print("🐍 Initializing Premium Caninana Engine...")
         
+        self.engine_state = "loading"
+        self.engine_error = ""
+        self.pending_scans = []
+        # Set by the loader thread; refresh_loading_status picks the result
+        # up on the Tk thread, which may not be in mainloop() yet.
+        self.signatures_loaded = threading.Event()
+        self.signature_load_error = None
+        self.signature_load_seconds = 0.0
+        
         try:
             self.analyzer = caninana_core.FileTypeAnalyzer()
             self.scanner = caninana_core.SignatureEngine()
@@ -202,15 +265,111 @@ class PremiumCaninanaApp(customtkinter.CTk):
             signatures_path = os.path.join(
                 os.path.dirname(__file__), "..", "signatures", "default.json"
             )
-            print("📋 Loading premium threat signatures...")
-            
-            if self.scanner.load_signatures(signatures_path):
-                print("✅ Premium signatures loaded.")
-            else:
-                print("⚠ Warning: Failed to load signatures.")
-                
+            self.signatures_path = signatures_path
         except Exception as e:
             print(f"❌ Error initializing core engine: {e}")
+            self.engine_state = "failed"
+            self.engine_error = str(e)
+            return
+            
+        # Compiling a large database takes a while; the window comes up
+        # meanwhile and scans requested before it finishes are queued.
+        print("📋 Loading premium threat signatures...")
+        self.signature_load_started = time.perf_counter()
+        threading.Thread(target=self.load_signatures_in_background, daemon=True).start()
+        
+    def load_signatures_in_background(self):
+        """Load signatures off the UI thread (the engine releases the GIL)"""
+        try:
+            self.scanner.load_signatures(self.signatures_path)
+        except Exception as e:
+            self.signature_load_error = str(e)
+        self.signature_load_seconds = time.perf_counter() - self.signature_load_started
+        self.signatures_loaded.set()
+        
+    def on_signatures_loaded(self, error):
+        """Mark the engine ready (or failed) and run any queued scans"""
+        elapsed = self.signature_load_seconds
+        if error is None:
+            self.engine_state = "ready"
+            count = self.scanner.get_signature_count()
+            print(f"✅ {count} premium signatures loaded in {elapsed:.1f}s.")
+            self.add_log_entry(
+                "INFO", f"{count:,} threat signatures loaded in {elapsed:.1f}s", "Engine"
+            )
+        else:
+            self.engine_state = "failed"
+            self.engine_error = error
+            print(f"⚠ Warning: Failed to load signatures: {error}")
+            self.add_log_entry("ERROR", f"Failed to load threat signatures: {error}", "Engine")
+            
+        if not self.is_scanning:
+            self.show_engine_status()
+        self.run_pending_scans()
+        
+    def show_engine_status(self):
+        """Show the engine state in the sidebar"""
+        if self.engine_state == "loading":
+            elapsed = time.perf_counter() - self.signature_load_started
+            self.sidebar.update_status(
+                "scanning",
+                "Loading Signatures",
+                f"Preparing threat database... {elapsed:.0f}s"
+            )
+        elif self.engine_state == "ready":
+            self.sidebar.update_status(
+                "secure",
+                "Protection Active",
+                f"{self.scanner.get_signature_count():,} signatures loaded"
+            )
+        else:
+            self.sidebar.update_status(
+                "warning",
+                "Signatures Unavailable",
+                f"Error: {self.engine_error}"
+            )
+            
+    def refresh_loading_status(self):
+        """Show loading progress until the loader thread is done, then finish loading"""
+        if self.engine_state != "loading":
+            return
+        if self.signatures_loaded.is_set():
+            self.on_signatures_loaded(self.signature_load_error)
+            return
+        self.show_engine_status()
+        self.after(self.LOADING_STATUS_INTERVAL_MS, self.refresh_loading_status)
+        
+    def poll_ui_events(self):
+        """Run callbacks handed over by core threads, then check again later"""
+        while True:
+            try:
+                callback, args = self.ui_events.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+        self.ui_events_job = self.after(self.UI_EVENT_INTERVAL_MS, self.poll_ui_events)
+        
+    def queue_scan(self, start_scan, fail_scan):
+        """Run a scan once signatures are loaded, or fail it if they never will be"""
+        if self.engine_state == "failed":
+            fail_scan(f"Threat signatures are unavailable: {self.engine_error}")
+        else:
+            self.pending_scans.append((start_scan, fail_scan))
+            
+    def run_pending_scans(self):
+        """Start queued scans one at a time once the engine has settled"""
+        if self.engine_state == "failed":
+            pending_scans, self.pending_scans = self.pending_scans, []
+            for _, fail_scan in pending_scans:
+                fail_scan(f"Threat signatures are unavailable: {self.engine_error}")
+            return
+        if self.engine_state != "ready" or not self.pending_scans:
+            return
+        if not self.is_scanning:
+            start_scan, _ = self.pending_scans.pop(0)
+            start_scan()
+        if self.pending_scans:
+            self.after(self.LOADING_STATUS_INTERVAL_MS, self.run_pending_scans)
             
     def setup_premium_window(self):
         """Configure premium window with beautiful styling"""
@@ -267,28 +426,116 @@ class PremiumCaninanaApp(customtkinter.CTk):
         self.show_dashboard()
         
     def create_view_components(self):
-        """Create all view components"""
-        self.dashboard = PremiumDashboard(self.main_container)
-        self.dashboard.set_action_commands({
+        """Register view builders; only the dashboard is built up front"""
+        # Views are built on first navigation, or while the app is idle
+        # after the first frame (see prewarm_views), in this order.
+        self.view_builders = {
+            "dashboard": self.build_dashboard,
+            "file_scanner": self.build_file_scanner,
+            "results_dashboard": self.build_results_dashboard,
+            "history_panel": self.build_history_panel,
+            "log_analyzer": self.build_log_analyzer,
+            "config_manager": self.build_config_manager,
+        }
+        self.get_view("dashboard")
+        
+    def get_view(self, name):
+        """Return a view, building it on first use"""
+        view = self.views.get(name)
+        if view is None:
+            started = time.perf_counter()
+            view = self.view_builders[name]()
+            self.views[name] = view
+            setattr(self, name, view)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"🧱 Built {name} view in {elapsed_ms:.0f} ms")
+        return view
+        
+    def build_dashboard(self):
+        dashboard = PremiumDashboard(self.main_container)
+        dashboard.set_action_commands({
             "quick_scan": self.start_quick_scan,
             "file_scan": self.show_file_scanner
         })
-        
-        self.file_scanner = PremiumFileScanner(self.main_container)
-        self.file_scanner.set_scan_callback(self.perform_file_scan)
-        self.file_scanner.set_back_callback(self.show_dashboard)
-        
-        self.config_manager = ConfigurationManager(self.main_container)
-        
-        self.history_panel = ScanHistoryPanel(self.main_container)
-        self.history_panel.set_back_callback(self.show_dashboard)
-        
-        self.log_analyzer = LogAnalyzer(self.main_container)
-        self.log_analyzer.set_back_callback(self.show_dashboard)
-        
-        self.results_dashboard = ResultsDashboard(self.main_container)
-        self.results_dashboard.set_new_scan_callback(self.show_file_scanner)
-        self.results_dashboard.set_back_callback(self.show_dashboard)
+        return dashboard
+        
+    def build_file_scanner(self):
+        file_scanner = PremiumFileScanner(self.main_container)
+        file_scanner.set_scan_callback(self.perform_file_scan)
+        file_scanner.set_back_callback(self.show_dashboard)
+        return file_scanner
+        
+    def build_config_manager(self):
+        config_manager = ConfigurationManager(self.main_container, store=self.config_store)
+        config_manager.set_config_change_callback(self.apply_config_setting)
+        return config_manager
+        
+    def build_history_panel(self):
+        history_panel = ScanHistoryPanel(self.main_container, store=self.history_store)
+        history_panel.set_back_callback(self.show_dashboard)
+        return history_panel
+        
+    def build_log_analyzer(self):
+        log_analyzer = LogAnalyzer(self.main_container)
+        log_analyzer.set_back_callback(self.show_dashboard)
+        try:
+            log_analyzer.follow_log_file(default_log_path())
+        except Exception as e:
+            print(f"⚠ Warning: Could not follow the log file: {e}")
+        try:
+            core_logger = caninana_core.SecurityLogger.get_instance()
+            log_analyzer.set_record_source(core_logger.get_records_since)
+        except Exception as e:
+            print(f"⚠ Warning: Live engine logs unavailable: {e}")
+        for level, message, component in self.pending_log_entries:
+            log_analyzer.add_log_entry(level, message, component)
+        self.pending_log_entries = []
+        return log_analyzer
+        
+    def build_results_dashboard(self):
+        results_dashboard = ResultsDashboard(self.main_container)
+        results_dashboard.set_new_scan_callback(self.show_file_scanner)
+        results_dashboard.set_back_callback(self.show_dashboard)
+        return results_dashboard
+        
+    def on_window_mapped(self, event):
+        """Schedule on_first_frame the first time the window appears"""
+        if event.widget is self and not self.first_frame_shown:
+            self.first_frame_shown = True
+            self.after_idle(self.on_first_frame)
+            
+    def on_first_frame(self):
+        """Record cold-start time, then build the other views while idle"""
+        self.startup.mark("first_frame")
+        message = (
+            f"Dashboard interactive {self.startup.total_ms():.0f} ms after launch "
+            f"({self.startup.summary()})"
+        )
+        print(f"⏱ {message}")
+        try:
+            fields = caninana_core.LogFields()
+            fields.duration_ms = self.startup.total_ms()
+            caninana_core.SecurityLogger.get_instance().log(
+                caninana_core.LogLevel.INFO, "UI", message, fields
+            )
+        except Exception as e:
+            print(f"⚠ Warning: Could not record startup time: {e}")
+        self.after(self.PREWARM_DELAY_MS, self.prewarm_views)
+        
+    def prewarm_views(self):
+        """Build one pending view per idle turn so input stays responsive"""
+        for name in self.view_builders:
+            if name not in self.views:
+                self.get_view(name)
+                self.after(self.PREWARM_DELAY_MS, self.prewarm_views)
+                return
+        
+    def add_log_entry(self, level, message, component="System"):
+        """Add a log entry, holding it until the log view exists"""
+        if "log_analyzer" in self.views:
+            self.log_analyzer.add_log_entry(level, message, component)
+        else:
+            self.pending_log_entries.append((level, message, component))
         
     def handle_navigation(self, nav_item):
         """Handle navigation between different views"""
@@ -311,60 +558,59 @@ class PremiumCaninanaApp(customtkinter.CTk):
             
     def hide_all_views(self):
         """Hide all view components"""
-        views = [
-            self.dashboard,
-            self.file_scanner,
-            self.config_manager,
-            self.history_panel,
-            self.log_analyzer,
-            self.results_dashboard
-        ]
-        
-        for view in views:
+        for view in self.views.values():
             view.grid_forget()
             
     def show_dashboard(self):
         """Show main dashboard"""
         self.current_view = "dashboard"
-        self.dashboard.grid(row=0, column=0, sticky="nsew")
+        self.get_view("dashboard").grid(row=0, column=0, sticky="nsew")
         
-        self.sidebar.update_status(
-            "secure",
-            "Protection Active",
-            "System monitoring enabled"
-        )
+        if not self.is_scanning:
+            self.show_engine_status()
         
     def show_file_scanner(self):
         """Show file scanner interface"""
         self.current_view = "file_scan"
-        self.file_scanner.grid(row=0, column=0, sticky="nsew")
+        self.get_view("file_scanner").grid(row=0, column=0, sticky="nsew")
         
     def show_settings(self):
         """Show configuration manager"""
         self.current_view = "settings"
-        self.config_manager.grid(row=0, column=0, sticky="nsew")
+        self.get_view("config_manager").grid(row=0, column=0, sticky="nsew")
         
     def show_history(self):
         """Show scan history"""
         self.current_view = "history"
-        self.history_panel.grid(row=0, column=0, sticky="nsew")
+        self.get_view("history_panel").grid(row=0, column=0, sticky="nsew")
         
     def show_quarantine(self):
         """Show quarantine manager"""
         self.current_view = "quarantine"
-        self.log_analyzer.grid(row=0, column=0, sticky="nsew")
+        self.get_view("log_analyzer").grid(row=0, column=0, sticky="nsew")
         
     def show_results(self, scan_results):
         """Show scan results dashboard"""
         self.current_view = "results"
-        self.results_dashboard.set_scan_results(scan_results)
-        self.results_dashboard.grid(row=0, column=0, sticky="nsew")
+        results_dashboard = self.get_view("results_dashboard")
+        results_dashboard.set_scan_results(scan_results)
+        results_dashboard.grid(row=0, column=0, sticky="nsew")
         
     def start_quick_scan(self):
         """Start quick system scan"""
         if self.is_scanning:
             return
             
+        if self.engine_state != "ready":
+            self.queue_scan(self.start_quick_scan, self.show_scan_error)
+            if self.engine_state == "loading":
+                self.dashboard.update_system_status(
+                    "scanning",
+                    "Quick Scan Queued",
+                    "Starts as soon as threat signatures are loaded..."
+                )
+            return
+            
         self.sidebar.update_status(
             "scanning",
             "Quick Scan Running",
@@ -447,6 +693,15 @@ class PremiumCaninanaApp(customtkinter.CTk):
         if self.is_scanning:
             return
             
+        if self.engine_state != "ready":
+            self.queue_scan(
+                lambda: self.perform_file_scan(filepath),
+                self.file_scanner.show_scan_error
+            )
+            if self.engine_state == "loading":
+                self.file_scanner.show_waiting("Waiting for threat signatures to load...")
+            return
+            
         self.is_scanning = True
         filename = os.path.basename(filepath)
         
@@ -459,52 +714,90 @@ class PremiumCaninanaApp(customtkinter.CTk):
         
     def execute_file_scan(self, filepath, filename):
         """Execute file scan with core engine"""
+        # Only the engine's work counts towards the recorded duration, not
+        # the pauses that pace the progress display.
+        duration = 0.0
         try:
             self.after(0, lambda: self.file_scanner.update_progress(0.2, "Analyzing file structure..."))
             time.sleep(0.8)
             
+            started = time.perf_counter()
             file_info = self.analyzer.analyze_file(filepath)
+            duration += time.perf_counter() - started
             
             self.after(0, lambda: self.file_scanner.update_progress(0.5, "Reading file content..."))
             time.sleep(0.6)
             
+            started = time.perf_counter()
             with open(filepath, "rb") as f:
                 file_bytes = f.read()
+            duration += time.perf_counter() - started
                 
             self.after(0, lambda: self.file_scanner.update_progress(0.8, "Scanning for threats..."))
             time.sleep(0.8)
             
+            started = time.perf_counter()
             scan_result = self.scanner.scan_bytes(file_bytes, file_info)
+            duration += time.perf_counter() - started
             
+            # A scan stopped by its budget did not finish; that is an error,
+            # not a verdict on the file.
+            if scan_result.status != caninana_core.ScanStatus.COMPLETE:
+                raise RuntimeError(scan_result.status_message)
+                
             self.after(0, lambda: self.file_scanner.update_progress(1.0, "Scan complete"))
             time.sleep(0.3)
             
             self.after(0, lambda: self.file_scanner.show_scan_results(scan_result, filename))
             
             self.log_scan_result(filepath, scan_result)
+            self.history_store.record(
+                filename,
+                "threat" if scan_result.threat_detected else "clean",
+                filepath=filepath,
+                size=len(file_bytes),
+                duration=duration,
+                threats=scan_result.detected_signatures
+            )
             
         except Exception as e:
-            self.after(0, lambda: self.file_scanner.show_scan_error(str(e)))
+            error_message = str(e)
+            self.after(0, lambda: self.file_scanner.show_scan_error(error_message))
+            self.after(0, self.add_log_entry,
+                "ERROR",
+                f"File scan failed: {filename} - {error_message}",
+                "FileScanner"
+            )
+            self.history_store.record(filename, "error", filepath=filepath, duration=duration)
         finally:
             self.is_scanning = False
             
     def log_scan_result(self, filepath, scan_result):
         """Log scan result to system logs"""
-        if hasattr(self, 'log_analyzer'):
-            if scan_result.threat_detected:
-                threats = ', '.join(scan_result.detected_signatures)
-                self.log_analyzer.add_log_entry(
-                    "WARNING",
-                    f"Threat detected in {os.path.basename(filepath)}: {threats}",
-                    "FileScanner"
-                )
-            else:
-                self.log_analyzer.add_log_entry(
-                    "INFO",
-                    f"File scan completed: {os.path.basename(filepath)} - Clean",
-                    "FileScanner"
-                )
+        # Called from the scan thread; widgets are only touched on the UI thread.
+        if scan_result.threat_detected:
+            threats = ', '.join(scan_result.detected_signatures)
+            self.after(0, self.add_log_entry,
+                "WARNING",
+                f"Threat detected in {os.path.basename(filepath)}: {threats}",
+                "FileScanner"
+            )
+        else:
+            self.after(0, self.add_log_entry,
+                "INFO",
+                f"File scan completed: {os.path.basename(filepath)} - Clean",
+                "FileScanner"
+            )
                 
+    def on_history_committed(self):
+        """Refresh the history view after the store commits (writer thread)"""
+        self.ui_events.put((self.refresh_history, ()))
+        
+    def refresh_history(self):
+        """Show newly recorded scans if the history view exists"""
+        if "history_panel" in self.views:
+            self.history_panel.refresh()
+            
     def show_scan_error(self, error_msg):
         """Show scan error"""
         self.sidebar.update_status(
@@ -515,36 +808,119 @@ class PremiumCaninanaApp(customtkinter.CTk):
         
     def load_application_data(self):
         """Load initial application data"""
-        if hasattr(self, 'config_manager'):
-            self.config_manager.load_configuration()
+        self.config_store.load_configuration()
+        for key in ("debug_logging", "scan_timeout", "update_frequency"):
+            self.apply_config_setting(
+                key, self.config_store.get_config(key)
+            )
             
-        if hasattr(self, 'log_analyzer'):
-            self.log_analyzer.add_log_entry(
-                "INFO",
-                "Caninana Antivirus started successfully",
-                "System"
+        self.add_log_entry(
+            "INFO",
+            "Caninana Antivirus started successfully",
+            "System"
+        )
+        self.add_log_entry(
+            "INFO", 
+            "Real-time protection enabled",
+            "Protection"
+        )
+            
+    def apply_config_setting(self, key, value):
+        """Apply a changed setting to the running core engine"""
+        if key == "debug_logging":
+            try:
+                level = (caninana_core.LogLevel.DEBUG if value
+                         else caninana_core.LogLevel.INFO)
+                caninana_core.SecurityLogger.get_instance().set_min_level(level)
+            except Exception as e:
+                print(f"⚠ Warning: Could not update core log level: {e}")
+        elif key == "scan_timeout":
+            # The setting is in minutes and caps the engine's adaptive
+            # per-file budget, which scales with file size.
+            try:
+                minutes = float(value)
+            except (TypeError, ValueError):
+                print(f"⚠ Warning: Ignoring invalid scan timeout: {value!r}")
+                return
+            if minutes <= 0 or not hasattr(self, 'scanner'):
+                return
+            try:
+                self.scanner.set_adaptive_ceiling(int(minutes * 60 * 1000))
+            except Exception as e:
+                print(f"⚠ Warning: Could not update scan timeout: {e}")
+        elif key == "update_frequency":
+            self.apply_update_frequency(value)
+            
+    def apply_update_frequency(self, frequency):
+        """Start, retime or stop the core's background signature updates"""
+        intervals = {
+            "Every Hour": timedelta(hours=1),
+            "Daily": timedelta(days=1),
+            "Weekly": timedelta(weeks=1),
+        }
+        interval = intervals.get(frequency)
+        scheduler = getattr(self, 'update_scheduler', None)
+        if interval is None:
+            # "Manual": updates only when the user asks for them.
+            if scheduler is not None:
+                scheduler.stop()
+            return
+        if scheduler is not None:
+            scheduler.set_interval(interval)
+            scheduler.start(self.on_update_event)
+            return
+        
+        update_url = self.config_store.get_config("update_url", "")
+        if not update_url or not hasattr(self, 'signatures_path'):
+            return
+        try:
+            options = caninana_core.UpdateSchedulerOptions()
+            options.interval = interval
+            self.update_scheduler = caninana_core.UpdateScheduler(
+                update_url, self.signatures_path, self.scanner, options
             )
-            self.log_analyzer.add_log_entry(
-                "INFO", 
-                "Real-time protection enabled",
-                "Protection"
+            self.update_scheduler.start(self.on_update_event)
+        except Exception as e:
+            print(f"⚠ Warning: Could not start signature updates: {e}")
+            
+    def on_update_event(self, event):
+        """Called on the core's update thread after every update check; logs via the Tk thread"""
+        if event.kind == caninana_core.UpdateEventKind.APPLIED:
+            level, message = "INFO", (
+                f"Signatures updated to version {event.version} "
+                f"({event.signature_count} signatures)"
             )
-            
+        elif event.kind == caninana_core.UpdateEventKind.FAILED:
+            level, message = "WARNING", (
+                f"Signature update failed, retrying in {event.next_check}: "
+                f"{event.error}"
+            )
+        else:
+            return
+        self.ui_events.put((self.add_log_entry, (level, message, "Updates")))
+                
     def on_closing(self):
         """Handle application closing"""
+        if hasattr(self, 'update_scheduler'):
+            self.update_scheduler.stop()
+            
         if hasattr(self, 'background'):
             self.background.stop_animation()
             
-        if hasattr(self, 'config_manager'):
-            self.config_manager.save_configuration()
-            
-        if hasattr(self, 'log_analyzer'):
-            self.log_analyzer.add_log_entry(
-                "INFO",
-                "Caninana Antivirus shutting down",
-                "System"
-            )
-            
+        self.config_store.save_configuration()
+        
+        # The writer must not call back into Tk while the main thread is
+        # blocked waiting for it.
+        self.history_store.on_commit = None
+        self.history_store.close()
+        
+        self.add_log_entry(
+            "INFO",
+            "Caninana Antivirus shutting down",
+            "System"
+        )
+        
+        self.after_cancel(self.ui_events_job)
         self.destroy()
 
 